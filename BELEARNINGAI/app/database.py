@@ -2,19 +2,36 @@
 from typing import Optional
 
 from beanie import init_beanie
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 from config.config import get_settings
 from models.models import (
+    ActivitySketchDocument,
+    AnalyticsRollupDocument,
+    AnnouncementDocument,
+    AssessmentDocument,
+    AuditLogDocument,
     ChatSessionDocument,
+    ClassDocument,
+    ClassJoinCodeDocument,
+    ClassMembershipDocument,
+    CounterDocument,
     CourseDocument,
+    CourseSimilarityDocument,
     DashboardDocument,
+    EmailDeadLetterDocument,
     EnrollmentDocument,
     FileUploadDocument,
+    JobDocument,
+    NotificationCounterDocument,
     NotificationDocument,
     RefreshTokenDocument,
     ProgressDocument,
+    QuestionBankDocument,
+    QuizAttemptDocument,
     QuizDocument,
+    SeenQuestionsDocument,
+    TopicMasteryDocument,
     UserDocument,
 )
 
@@ -34,17 +51,42 @@ async def init_database() -> None:
             UserDocument,
             CourseDocument,
             EnrollmentDocument,
+            ClassDocument,
+            ClassMembershipDocument,
+            ClassJoinCodeDocument,
             QuizDocument,
             ChatSessionDocument,
             FileUploadDocument,
             ProgressDocument,
             NotificationDocument,
+            AnnouncementDocument,
+            NotificationCounterDocument,
+            EmailDeadLetterDocument,
+            AuditLogDocument,
             DashboardDocument,
+            AnalyticsRollupDocument,
+            ActivitySketchDocument,
             RefreshTokenDocument,
+            JobDocument,
+            QuizAttemptDocument,
+            QuestionBankDocument,
+            AssessmentDocument,
+            TopicMasteryDocument,
+            CounterDocument,
+            SeenQuestionsDocument,
+            CourseSimilarityDocument,
         ],
     )
 
 
+def get_database() -> AsyncIOMotorDatabase:
+    """Database đã khởi tạo, dùng cho collection không quản lý qua Beanie (ví dụ capped collection)."""
+
+    if _mongo_client is None:
+        raise RuntimeError("Database chưa được khởi tạo")
+    return _mongo_client[_settings.mongodb_database]
+
+
 async def close_database() -> None:
     """Đóng kết nối MongoDB khi ứng dụng shutdown."""
 
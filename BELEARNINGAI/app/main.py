@@ -4,21 +4,51 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import close_database, init_database
+from app.database import close_database, get_database, init_database
 from config.config import get_settings
 from config.logging_config import setup_logging
 from routers.routers import api_router
+from services.active_users_service import sketch_flusher
+from services.audit_service import audit_flusher
+from services.dashboard_service import dashboard_snapshotter
+from services.digest_service import close_mailer, digest_dispatcher
+from services.job_service import JobWorker
+from services.progress_service import progress_flusher
+from services.realtime_service import build_event_backend, event_bus
+from services.rollup_service import rollup_flusher
 
 settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Quản lý vòng đời ứng dụng: logging, database."""
+    """Quản lý vòng đời ứng dụng: logging, database, worker job nền, các vòng ghi gộp."""
 
     setup_logging()
     await init_database()
+    await event_bus.start(build_event_backend(get_database))
+    progress_flusher.start()
+    rollup_flusher.start()
+    sketch_flusher.start()
+    audit_flusher.start()
+    if settings.dashboard_snapshot_enabled:
+        dashboard_snapshotter.start()
+    if settings.smtp_host:
+        digest_dispatcher.start()
+    job_worker = JobWorker() if settings.job_worker_enabled else None
+    if job_worker is not None:
+        await job_worker.start()
     yield
+    if job_worker is not None:
+        await job_worker.stop()
+    await progress_flusher.stop()
+    await rollup_flusher.stop()
+    await sketch_flusher.stop()
+    await audit_flusher.stop()
+    await dashboard_snapshotter.stop()
+    await digest_dispatcher.stop()
+    await close_mailer()
+    await event_bus.stop()
     await close_database()
 
 
@@ -1,6 +1,6 @@
 """Định nghĩa cấu hình ứng dụng FastAPI dựa trên HE_THONG.md."""
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -26,6 +26,138 @@ class Settings(BaseSettings):
         default="gemini-1.5-pro",
         description="Model sử dụng cho gợi ý khóa học (placeholder, override qua ENV)",
     )
+    recommender_model_dir: str = Field(
+        default="artifacts/recommender",
+        description="Thư mục chứa ma trận nhân tố ALS do scripts/train_recommender.py sinh ra",
+    )
+    similarity_top_k: int = Field(default=50, ge=1, description="Số khóa học tương tự lưu cho mỗi khóa học")
+    similarity_cache_ttl_seconds: int = Field(default=300, ge=0, description="Chu kỳ nạp lại bảng khóa học tương tự")
+    similarity_index_max_age_seconds: int = Field(
+        default=3600, ge=0, description="Tuổi tối đa của chỉ mục tương đồng trong worker trước khi dựng lại toàn bộ"
+    )
+
+    job_worker_enabled: bool = Field(default=True, description="Chạy worker job nền ngay trong tiến trình API")
+    job_worker_concurrency: int = Field(default=2, ge=1, description="Số job xử lý song song trên mỗi worker")
+    job_lease_seconds: int = Field(default=60, ge=5, description="Thời hạn lease của job trước khi worker khác nhận lại")
+    job_poll_interval_seconds: float = Field(default=1.0, gt=0, description="Chu kỳ worker hỏi job mới khi hàng đợi rỗng")
+    job_max_attempts: int = Field(default=3, ge=1, description="Số lần thử tối đa trước khi đánh dấu job thất bại")
+
+    progress_flush_interval_ms: int = Field(default=250, ge=10, description="Chu kỳ ghi gộp sự kiện tiến độ học")
+    progress_buffer_max_keys: int = Field(
+        default=5000, ge=1, description="Số cặp người học × khóa học chờ ghi tối đa trước khi flush sớm"
+    )
+    lesson_index_ttl_seconds: int = Field(default=600, ge=0, description="Thời gian giữ chỉ mục bài học của khóa học")
+    lesson_index_max_courses: int = Field(default=5000, ge=1, description="Số khóa học tối đa giữ chỉ mục bài học")
+    progress_flush_max_attempts: int = Field(default=3, ge=1, description="Số lần thử ghi một lô tiến độ trước khi báo lỗi")
+
+    bulk_enrollment_max_rows: int = Field(default=10_000, ge=1, description="Số dòng tối đa của một lượt đăng ký hàng loạt")
+    bulk_enrollment_chunk_size: int = Field(default=1000, ge=1, description="Số thao tác mỗi lệnh bulk_write enrollment")
+    roster_page_size_max: int = Field(default=200, ge=1, description="Số học viên tối đa mỗi trang roster")
+    roster_summary_ttl_seconds: int = Field(default=120, ge=0, description="Thời gian giữ tóm tắt roster của lớp")
+    class_membership_cache_ttl_seconds: int = Field(
+        default=300, ge=0, description="Thời gian giữ danh sách lớp của cặp người học × khóa học"
+    )
+    class_join_code_length: int = Field(default=8, ge=6, le=16, description="Độ dài mã tham gia lớp")
+    class_join_code_ttl_hours: int = Field(default=72, ge=1, description="Thời hạn mã tham gia lớp")
+    class_join_code_cache_seconds: int = Field(default=60, ge=0, description="Thời gian giữ mã tham gia trong bộ nhớ")
+    class_invite_base_url: str = Field(
+        default="https://learning.local/classes/join", description="URL trang tham gia lớp gửi kèm mã mời"
+    )
+    class_cache_max_entries: int = Field(default=50_000, ge=1, description="Số mục tối đa của các cache lớp học")
+    ownership_cache_ttl_seconds: int = Field(default=60, ge=0, description="Thời gian giữ chủ sở hữu lớp/khóa học trong bộ nhớ")
+    ownership_negative_ttl_seconds: int = Field(
+        default=10, ge=0, description="Thời gian giữ kết quả 'không tồn tại' khi tra chủ sở hữu"
+    )
+    ownership_cache_max_entries: int = Field(default=100_000, ge=1, description="Số mục tối đa của cache chủ sở hữu")
+
+    analytics_flush_interval_ms: int = Field(default=1000, ge=10, description="Chu kỳ ghi gộp bộ đếm analytics rollup")
+    analytics_hourly_retention_days: int = Field(default=14, ge=1, description="Số ngày giữ bucket theo giờ")
+    analytics_daily_retention_days: int = Field(default=400, ge=1, description="Số ngày giữ bucket theo ngày")
+    analytics_export_dir: str = Field(
+        default="artifacts/analytics",
+        description="Thư mục chứa bản export Arrow IPC do scripts/export_analytics.py sinh ra",
+    )
+    analytics_export_batch_size: int = Field(default=10_000, ge=100, description="Số dòng mỗi record batch khi export")
+    active_users_sketch_precision: int = Field(default=14, ge=10, le=16, description="Precision HyperLogLog (sai số ~1.04/√2^p)")
+    active_users_flush_interval_seconds: int = Field(default=30, ge=1, description="Chu kỳ ghi sketch người dùng hoạt động")
+    active_users_retention_days: int = Field(default=60, ge=31, description="Số ngày giữ sketch theo ngày (tối thiểu đủ cho MAU)")
+
+    announcement_fanout_batch_size: int = Field(
+        default=1000, ge=1, le=10000, description="Số thông báo ghi trong mỗi lệnh insert_many khi fan-out"
+    )
+    announcement_fanout_max_recipients: int = Field(
+        default=50000, ge=0, description="Số người nhận tối đa để ghi từng bản; lớn hơn thì chuyển sang ghép lúc đọc"
+    )
+    announcement_retention_days: int = Field(default=30, ge=1, description="Số ngày hiển thị thông báo chung chế độ on_read")
+    inbox_page_size: int = Field(default=50, ge=1, le=200, description="Số thông báo tối đa mỗi trang hộp thư")
+    admin_user_page_size: int = Field(default=50, ge=1, le=200, description="Số người dùng mặc định mỗi trang quản trị")
+    admin_user_count_cap: int = Field(
+        default=10_000, ge=1, description="Đếm tối đa bấy nhiêu người dùng khớp bộ lọc; vượt thì trả tổng ước lượng"
+    )
+    admin_user_count_cache_seconds: int = Field(
+        default=60, ge=0, description="Thời gian giữ tổng số người dùng theo bộ lọc trong bộ nhớ"
+    )
+
+    smtp_host: Optional[str] = Field(default=None, description="Máy chủ SMTP; bỏ trống thì không gửi bản tin email")
+    smtp_port: int = Field(default=587, ge=1, le=65535)
+    smtp_username: Optional[str] = None
+    smtp_password: Optional[str] = None
+    smtp_starttls: bool = Field(default=True, description="Nâng cấp kết nối SMTP bằng STARTTLS")
+    smtp_sender: str = Field(default="no-reply@belearning.ai", description="Địa chỉ From của email hệ thống")
+    smtp_pool_size: int = Field(default=4, ge=1, description="Số kết nối SMTP giữ mở và gửi song song")
+    smtp_rate_per_second: float = Field(default=10.0, gt=0, description="Số email tối đa gửi mỗi giây (token bucket)")
+    smtp_timeout_seconds: float = Field(default=10.0, gt=0)
+    smtp_send_retries: int = Field(default=2, ge=0, description="Số lần thử lại ngay khi lỗi SMTP tạm thời")
+    digest_interval_seconds: int = Field(default=60, ge=5, description="Chu kỳ gom và gửi bản tin email")
+    digest_window_minutes: int = Field(
+        default=60,
+        ge=1,
+        description="Gom thông báo trong cửa sổ này thành một bản tin; mỗi người nhận tối đa một bản tin mỗi cửa sổ",
+    )
+    digest_batch_users: int = Field(default=200, ge=1, description="Số người nhận xử lý mỗi lượt gom")
+    digest_max_items: int = Field(default=20, ge=1, description="Số thông báo liệt kê trong một bản tin")
+    digest_max_attempts: int = Field(default=5, ge=1, description="Số lượt gửi lỗi trước khi chuyển bản tin vào dead-letter")
+    digest_lease_seconds: int = Field(default=300, ge=10, description="Thời gian giữ người nhận trong một lượt gửi")
+
+    audit_buffer_capacity: int = Field(
+        default=10_000, ge=100, description="Số sự kiện audit tối đa chờ ghi; đầy thì bỏ sự kiện cũ nhất"
+    )
+    audit_flush_interval_ms: int = Field(default=1000, ge=10, description="Chu kỳ ghi gộp sự kiện audit")
+    audit_flush_batch_size: int = Field(default=500, ge=1, description="Số sự kiện mỗi lệnh insert_many audit")
+    audit_retention_days: int = Field(default=180, ge=1, description="Số ngày giữ audit log (TTL)")
+    audit_page_size: int = Field(default=50, ge=1, le=200, description="Số audit log mặc định mỗi trang")
+
+    realtime_backend: Literal["memory", "mongo"] = Field(
+        default="memory", description="Phát sự kiện WebSocket chỉ trong tiến trình hoặc qua capped collection MongoDB"
+    )
+    realtime_events_collection: str = Field(default="realtime_events", description="Capped collection cho backend mongo")
+    realtime_events_size_bytes: int = Field(
+        default=16 * 1024 * 1024, ge=4096, description="Dung lượng capped collection sự kiện realtime"
+    )
+    realtime_heartbeat_seconds: float = Field(default=25.0, gt=0, description="Chu kỳ ping kết nối WebSocket im lặng")
+    realtime_max_connections_per_user: int = Field(
+        default=5, ge=1, description="Số kết nối WebSocket tối đa mỗi người dùng trên một worker"
+    )
+    realtime_send_timeout_seconds: float = Field(
+        default=5.0, gt=0, description="Thời gian chờ gửi một sự kiện trước khi loại kết nối chậm"
+    )
+
+    dashboard_snapshot_enabled: bool = Field(default=True, description="Tự chụp snapshot số liệu dashboard định kỳ")
+    dashboard_snapshot_interval_seconds: int = Field(default=300, ge=10, description="Chu kỳ chụp snapshot dashboard")
+    dashboard_snapshot_retention_days: int = Field(default=30, ge=1, description="Số ngày giữ snapshot dashboard")
+
+    assessment_question_count: int = Field(default=10, ge=1, description="Số câu hỏi rút cho mỗi bài đánh giá")
+    assessment_difficulty_mix: Dict[str, float] = Field(
+        default_factory=lambda: {"easy": 0.3, "medium": 0.4, "hard": 0.3},
+        description="Tỉ lệ độ khó khi rút đề đánh giá",
+    )
+    adaptive_max_items: int = Field(default=20, ge=1, description="Số câu tối đa của bài đánh giá thích ứng")
+    adaptive_target_se: float = Field(default=0.3, gt=0, description="Dừng bài thích ứng khi sai số chuẩn của theta đủ nhỏ")
+    item_index_ttl_seconds: int = Field(default=300, ge=0, description="Thời gian giữ chỉ mục ngân hàng câu hỏi trong bộ nhớ")
+    learning_graph_ttl_seconds: int = Field(
+        default=300, ge=0, description="Chu kỳ kiểm tra dữ liệu khóa học để dựng lại đồ thị lộ trình"
+    )
+    learning_path_cache_size: int = Field(default=1024, ge=1, description="Số lộ trình đã tính được giữ trong bộ nhớ")
 
     class Config:
         env_file = ".env"
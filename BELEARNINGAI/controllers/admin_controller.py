@@ -1,53 +1,65 @@
 """Controller cho chức năng quản trị."""
-from typing import List
-
-from schemas.admin import AdminBroadcastRequest, AdminSystemStats, SystemSummary, UserAuditLog
+from typing import Optional
+
+from schemas.admin import (
+    AdminBroadcastRequest,
+    AdminSystemStats,
+    AdminUserFilters,
+    AdminUserPage,
+    AnnouncementAcceptedResponse,
+    AuditLogFilters,
+    AuditLogPage,
+    SystemSummary,
+)
 from schemas.common import MessageResponse
 from services.admin_service import (
     create_announcement,
     get_system_overview,
     get_system_stats,
-    list_audit_logs,
 )
+from services.audit_service import list_audit_logs, record_audit
 from services.permissions_service import list_roles_matrix
+from services.user_service import list_users
 
 
 async def handle_system_stats() -> AdminSystemStats:
     return await get_system_stats()
 
 
-async def handle_broadcast(payload: AdminBroadcastRequest) -> dict:
-    return await create_announcement(payload)
+async def handle_broadcast(payload: AdminBroadcastRequest, current_user: dict) -> AnnouncementAcceptedResponse:
+    return await create_announcement(payload, current_user)
 
 
 async def handle_system_overview() -> SystemSummary:
     return await get_system_overview()
 
 
-async def handle_audit_logs(limit: int = 5) -> List[UserAuditLog]:
-    return await list_audit_logs(limit)
+async def handle_audit_logs(filters: AuditLogFilters, limit: Optional[int], cursor: Optional[str]) -> AuditLogPage:
+    return await list_audit_logs(filters, limit, cursor)
 
 
 async def handle_roles_matrix():
     return await list_roles_matrix()
 
 
-async def handle_admin_users_list() -> MessageResponse:
-    """Placeholder danh sách người dùng."""
-
-    return MessageResponse(message="Placeholder: danh sách người dùng với phân trang")
+async def handle_admin_users_list(
+    filters: AdminUserFilters, limit: Optional[int], cursor: Optional[str]
+) -> AdminUserPage:
+    return await list_users(filters, limit, cursor)
 
 
-async def handle_admin_update_role(user_id: str, payload: dict) -> MessageResponse:
+async def handle_admin_update_role(user_id: str, payload: dict, current_user: dict) -> MessageResponse:
     """Placeholder cập nhật vai trò người dùng."""
 
     new_role = payload.get("role", "student")
+    record_audit("admin.user.update_role", current_user, target=user_id, role=new_role)
     return MessageResponse(message=f"Placeholder: đã đổi vai trò {user_id} thành {new_role}")
 
 
-async def handle_admin_suspend_user(user_id: str) -> MessageResponse:
+async def handle_admin_suspend_user(user_id: str, current_user: dict) -> MessageResponse:
     """Placeholder khóa tài khoản người dùng."""
 
+    record_audit("admin.user.suspend", current_user, target=user_id)
     return MessageResponse(message=f"Placeholder: đã vô hiệu hóa tài khoản {user_id}")
 
 
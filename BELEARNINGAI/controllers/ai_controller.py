@@ -1,11 +1,16 @@
 """Controller cho các endpoint AI."""
-from schemas.ai import AIChatRequest, AIChatResponse, AIContentRequest, AIContentResponse
+from controllers.job_controller import build_job_accepted
+from schemas.ai import AIChatRequest, AIChatResponse, AIContentRequest
 from schemas.common import MessageResponse
-from services.ai_service import chat_with_ai, generate_course_from_prompt
+from schemas.job import JobAcceptedResponse
+from schemas.recommendation import LearningPathRequest, LearningPathResponse
+from services.ai_service import chat_with_ai, enqueue_course_generation
+from services.learning_path_service import plan_learning_path
 
 
-async def handle_ai_course_generation(payload: AIContentRequest) -> AIContentResponse:
-    return await generate_course_from_prompt(payload)
+async def handle_ai_course_generation(payload: AIContentRequest, current_user: dict) -> JobAcceptedResponse:
+    job = await enqueue_course_generation(payload, owner_id=current_user.get("sub"))
+    return build_job_accepted(job)
 
 
 async def handle_ai_chat(payload: AIChatRequest) -> AIChatResponse:
@@ -26,8 +31,8 @@ async def handle_ai_course_recommendations(payload: dict) -> MessageResponse:
     return MessageResponse(message=f"Placeholder: AI gợi ý khóa học cho {user_id}")
 
 
-async def handle_ai_learning_path(payload: dict) -> MessageResponse:
-    """Placeholder tạo lộ trình học cá nhân hóa."""
+async def handle_ai_learning_path(payload: LearningPathRequest, current_user: dict) -> LearningPathResponse:
+    """Lập lộ trình từ các chủ đề yếu tới kỹ năng mục tiêu trên đồ thị tiên quyết."""
 
-    goal = payload.get("goal", "mục tiêu học tập")
-    return MessageResponse(message=f"Placeholder: AI tạo lộ trình cho mục tiêu {goal}")
+    user_id = current_user.get("sub", "demo-user")
+    return await plan_learning_path(user_id, payload.weaknesses, payload.target_skill)
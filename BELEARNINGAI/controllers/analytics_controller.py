@@ -1,16 +1,25 @@
 """Controller cho analytics."""
-from schemas.analytics import StudentDashboardResponse
+from schemas.analytics import (
+    ActiveUsersResponse,
+    AnalyticsReportResponse,
+    InstructorCoursesResponse,
+    InstructorStudentsResponse,
+    StudentDashboardResponse,
+    TimeSeriesResponse,
+)
 from schemas.common import MessageResponse
-from services.analytics_service import build_student_dashboard, get_student_dashboard
-
-from controllers.progress_controller import get_course_progress
+from services.analytics_export_service import get_instructor_course_report, get_instructor_student_report
+from services.analytics_service import (
+    get_active_users,
+    get_instructor_overview,
+    get_platform_activity,
+    get_student_dashboard,
+    get_time_series,
+)
 
 
 async def handle_student_dashboard(current_user: dict) -> StudentDashboardResponse:
     user_id = current_user.get("sub", "demo-user")
-    snapshot = await get_course_progress(user_id, course_id="course-demo")
-    if snapshot.progress:
-        return await build_student_dashboard(snapshot.progress)
     return await get_student_dashboard(user_id=user_id)
 
 
@@ -19,9 +28,9 @@ async def handle_student_progress(current_user: dict) -> MessageResponse:
     return MessageResponse(message=f"Placeholder: tiến độ chi tiết của {user_id}")
 
 
-async def handle_student_time_spent(current_user: dict) -> MessageResponse:
+async def handle_student_time_spent(current_user: dict, granularity: str, periods: int) -> TimeSeriesResponse:
     user_id = current_user.get("sub", "demo-user")
-    return MessageResponse(message=f"Placeholder: thời gian học của {user_id}")
+    return await get_time_series("user", user_id, "study_minutes", granularity, periods)
 
 
 async def handle_student_achievements(current_user: dict) -> MessageResponse:
@@ -29,24 +38,29 @@ async def handle_student_achievements(current_user: dict) -> MessageResponse:
     return MessageResponse(message=f"Placeholder: thành tích học tập của {user_id}")
 
 
-async def handle_instructor_overview(current_user: dict) -> MessageResponse:
+async def handle_instructor_overview(current_user: dict) -> AnalyticsReportResponse:
     instructor_id = current_user.get("sub", "demo-user")
-    return MessageResponse(message=f"Placeholder: tổng quan giảng viên {instructor_id}")
+    return await get_instructor_overview(instructor_id)
 
 
-async def handle_instructor_courses(current_user: dict) -> MessageResponse:
+async def handle_instructor_courses(current_user: dict) -> InstructorCoursesResponse:
     instructor_id = current_user.get("sub", "demo-user")
-    return MessageResponse(message=f"Placeholder: hiệu suất khóa học của {instructor_id}")
+    return await get_instructor_course_report(instructor_id)
 
 
-async def handle_instructor_students(current_user: dict) -> MessageResponse:
+async def handle_instructor_students(current_user: dict, limit: int) -> InstructorStudentsResponse:
     instructor_id = current_user.get("sub", "demo-user")
-    return MessageResponse(message=f"Placeholder: hoạt động học viên của {instructor_id}")
+    return await get_instructor_student_report(instructor_id, limit)
+
+
+async def handle_admin_system(current_user: dict) -> AnalyticsReportResponse:
+    _ = current_user
+    return await get_platform_activity()
 
 
-async def handle_admin_system(current_user: dict) -> MessageResponse:
+async def handle_admin_active_users(current_user: dict) -> ActiveUsersResponse:
     _ = current_user
-    return MessageResponse(message="Placeholder: thống kê hệ thống cho admin")
+    return await get_active_users()
 
 
 async def handle_admin_users(current_user: dict) -> MessageResponse:
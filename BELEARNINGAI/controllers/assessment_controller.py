@@ -2,34 +2,77 @@
 from datetime import datetime, timedelta
 from typing import List
 
+from fastapi import HTTPException, status
+
 from schemas.assessment import (
+    AdaptiveAnswerRequest,
+    AdaptiveStepResponse,
     AssessmentResultResponse,
     AssessmentStartRequest,
     AssessmentSubmitRequest,
     AssessmentSummary,
+    AssessmentTopicInsight,
     RecommendationItem,
 )
 from schemas.common import MessageResponse
-from services.assessment_service import evaluate_skill_test, start_assessment, submit_assessment
+from services.adaptive_service import answer_adaptive, start_adaptive_assessment
+from services.assessment_service import (
+    analyze_topics,
+    build_summary,
+    evaluate_skill_test,
+    get_assessment,
+    start_assessment,
+    submit_assessment,
+)
 from services.recommendation_service import build_learning_path, suggest_courses
 
 
 async def handle_start_assessment(payload: AssessmentStartRequest, current_user: dict) -> AssessmentSummary:
     user_id = current_user.get("sub", "demo-user")
+    if payload.adaptive:
+        assessment = await start_adaptive_assessment(
+            user_id=user_id,
+            category=payload.category,
+            assessment_type=payload.assessment_type,
+            max_items=payload.max_questions,
+        )
+        return build_summary(assessment)
     return await start_assessment(user_id=user_id, category=payload.category, assessment_type=payload.assessment_type)
 
 
-async def handle_submit_assessment(assessment_id: str, payload: AssessmentSubmitRequest) -> AssessmentSummary:
-    return await submit_assessment(assessment_id=assessment_id, answers=payload.answers)
+async def handle_adaptive_answer(
+    assessment_id: str, payload: AdaptiveAnswerRequest, current_user: dict
+) -> AdaptiveStepResponse:
+    user_id = current_user.get("sub", "demo-user")
+    step = await answer_adaptive(assessment_id, user_id=user_id, answer=payload.answer)
+    if step is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy bài đánh giá")
+    return step
+
+
+async def handle_submit_assessment(
+    assessment_id: str, payload: AssessmentSubmitRequest, current_user: dict
+) -> AssessmentSummary:
+    user_id = current_user.get("sub", "demo-user")
+    summary = await submit_assessment(assessment_id=assessment_id, user_id=user_id, answers=payload.answers)
+    if summary is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy bài đánh giá")
+    return summary
 
 
-async def handle_skill_test(payload: AssessmentSubmitRequest, current_user: dict) -> AssessmentResultResponse:
-    """Gom dữ liệu đánh giá + lộ trình gợi ý theo mục 5.1.1."""
+async def handle_skill_test(
+    payload: AssessmentSubmitRequest, current_user: dict, category: str = "programming"
+) -> AssessmentResultResponse:
+    """Gom dữ liệu đánh giá + lộ trình gợi ý theo mục 5.1.1.
 
+    Năng lực được đọc từ bộ đếm chủ đề đã cộng dồn qua các bài đã chấm.
+    """
+
+    _ = payload
     user_id = current_user.get("sub", "demo-user")
-    base_result = await evaluate_skill_test(user_id=user_id, payload=payload.answers)
+    base_result = await evaluate_skill_test(user_id=user_id, category=category)
     learning_path = await build_learning_path(base_result.strengths, base_result.weaknesses)
-    recommendations = await suggest_courses(user_id=user_id, category="programming")
+    recommendations = await suggest_courses(user_id=user_id, category=category)
     return base_result.model_copy(
         update={"recommended_courses": recommendations, "learning_path": learning_path}
     )
@@ -68,11 +111,20 @@ async def handle_assessment_history(current_user: dict) -> List[AssessmentSummar
 
 
 async def handle_assessment_result(assessment_id: str, current_user: dict) -> AssessmentResultResponse:
-    """Kết quả chi tiết bài đánh giá (placeholder)."""
+    """Kết quả bài đánh giá kèm thống kê chủ đề của người dùng trong lĩnh vực đó."""
+
+    user_id = current_user.get("sub", "demo-user")
+    assessment = await get_assessment(assessment_id, user_id)
+    if assessment is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy bài đánh giá")
+    return await evaluate_skill_test(user_id=user_id, category=assessment.category, assessment=assessment)
+
+
+async def handle_topic_insights(category: str, current_user: dict) -> List[AssessmentTopicInsight]:
+    """Thống kê đúng/sai theo chủ đề, đọc thẳng từ bộ đếm đã tổng hợp sẵn."""
 
     user_id = current_user.get("sub", "demo-user")
-    dummy_answers = [1, 0, 2, 3]
-    return await evaluate_skill_test(user_id=user_id, payload=dummy_answers)
+    return await analyze_topics(user_id=user_id, category=category)
 
 
 async def handle_assessment_recommendations(assessment_id: str, current_user: dict) -> List[RecommendationItem]:
@@ -10,10 +10,10 @@ async def handle_start_session(user_id: str, course_id: str | None = None) -> st
     return await start_chat_session(user_id, course_id)
 
 
-async def handle_send_message(session_id: str, message: str) -> ChatResponse:
+async def handle_send_message(session_id: str, message: str, user_id: str | None = None) -> ChatResponse:
     """Gửi câu hỏi tới AI."""
 
-    return await send_chat_message(session_id, message)
+    return await send_chat_message(session_id, message, user_id)
 
 
 async def handle_list_sessions(user_id: str) -> MessageResponse:
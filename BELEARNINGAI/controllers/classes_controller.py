@@ -1,28 +1,69 @@
 """Controller cho module lớp học."""
-from typing import List
+from typing import List, Optional
 
-from schemas.classes import ClassInvitation, RosterStudent
+from schemas.classes import (
+    ClassInvitation,
+    ClassJoinRequest,
+    ClassJoinResponse,
+    ClassResponse,
+    RosterPage,
+    RosterSummary,
+)
 from schemas.common import MessageResponse
 from schemas.enrollment import ClassCreateRequest
-from services.classes_service import create_class, generate_join_code, list_classes, list_roster_preview
+from services.classes_service import (
+    create_class,
+    generate_join_code,
+    get_roster_summary,
+    join_class,
+    list_classes,
+    list_roster,
+)
 
 
-async def handle_list_classes(current_user: dict) -> list[dict]:
+async def handle_list_classes(current_user: dict) -> List[ClassResponse]:
     user_id = current_user.get("sub", "demo-user")
     return await list_classes(instructor_id=user_id)
 
 
-async def handle_create_class(payload: ClassCreateRequest, current_user: dict) -> dict:
+async def handle_create_class(payload: ClassCreateRequest, current_user: dict) -> ClassResponse:
     user_id = current_user.get("sub", "demo-user")
     return await create_class(payload, instructor_id=user_id)
 
 
-async def handle_generate_invite(class_id: str) -> ClassInvitation:
-    return await generate_join_code(class_id)
+async def handle_generate_invite(class_id: str, current_user: dict) -> ClassInvitation:
+    return await generate_join_code(class_id, current_user)
 
 
-async def handle_list_roster(class_id: str) -> List[RosterStudent]:
-    return await list_roster_preview(class_id)
+async def handle_join_class(payload: ClassJoinRequest, current_user: dict) -> ClassJoinResponse:
+    user_id = current_user.get("sub", "demo-user")
+    return await join_class(payload.code, user_id)
+
+
+async def handle_list_roster(
+    class_id: str,
+    current_user: dict,
+    sort: str,
+    order: str,
+    limit: int,
+    cursor: Optional[str],
+    member_status: Optional[str],
+    tag: Optional[str],
+) -> RosterPage:
+    return await list_roster(
+        class_id,
+        current_user,
+        sort=sort,
+        descending=order == "desc",
+        limit=limit,
+        cursor=cursor,
+        member_status=member_status,
+        tag=tag,
+    )
+
+
+async def handle_roster_summary(class_id: str, current_user: dict) -> RosterSummary:
+    return await get_roster_summary(class_id, current_user)
 
 
 async def handle_class_detail(class_id: str) -> MessageResponse:
@@ -4,9 +4,15 @@ from typing import List, Optional
 from fastapi import HTTPException, status
 from beanie import PydanticObjectId
 
+from controllers.job_controller import build_job_accepted
 from models.models import CourseCreate, CourseResponse
+from schemas.ai import AIContentRequest
 from schemas.common import MessageResponse
-from services.course_service import create_course, get_course_by_id, list_courses
+from schemas.course import RelatedCourseItem
+from schemas.job import JobAcceptedResponse
+from services.ai_service import enqueue_course_generation
+from services.course_service import authorize_course_edit, create_course, get_course_by_id, list_courses
+from services.course_similarity_service import recommend_similar_for_user, related_courses
 
 
 async def handle_list_courses() -> List[CourseResponse]:
@@ -41,11 +47,17 @@ async def handle_list_public_courses() -> MessageResponse:
     return MessageResponse(message="Placeholder: danh sách khóa học công khai")
 
 
-async def handle_recommended_courses(current_user: dict) -> MessageResponse:
-    """Placeholder gợi ý khóa học theo người dùng."""
+async def handle_recommended_courses(current_user: dict, limit: int) -> List[RelatedCourseItem]:
+    """Gợi ý khóa học tương tự các khóa người dùng đã đăng ký."""
 
     user_id = current_user.get("sub", "demo-user")
-    return MessageResponse(message=f"Placeholder: khóa học gợi ý cho {user_id}")
+    return await recommend_similar_for_user(user_id, limit)
+
+
+async def handle_related_courses(course_id: str, limit: int) -> List[RelatedCourseItem]:
+    """Khóa học tương tự một khóa học, đọc từ chỉ mục đã tính sẵn."""
+
+    return await related_courses(course_id, limit)
 
 
 async def handle_search_courses(keyword: Optional[str]) -> MessageResponse:
@@ -62,12 +74,18 @@ async def handle_course_categories() -> MessageResponse:
     return MessageResponse(message="Placeholder: Programming/Design/Business")
 
 
-async def handle_create_course_from_prompt(payload: dict, current_user: dict) -> MessageResponse:
-    """Placeholder tạo khóa học bằng AI."""
+async def handle_create_course_from_prompt(payload: dict, current_user: dict) -> JobAcceptedResponse:
+    """Đưa yêu cầu tạo khóa học bằng AI vào hàng đợi, khóa học được lưu khi job xong."""
 
-    topic = payload.get("topic", "Chủ đề chưa xác định")
+    request = AIContentRequest(
+        topic=payload.get("topic", "Chủ đề chưa xác định"),
+        level=payload.get("level"),
+        language=payload.get("language", "vi"),
+        goals=payload.get("goals", []),
+    )
     user_id = current_user.get("sub", "demo-user")
-    return MessageResponse(message=f"Placeholder: AI đang sinh khóa học '{topic}' cho {user_id}")
+    job = await enqueue_course_generation(request, owner_id=user_id, persist_course=True)
+    return build_job_accepted(job)
 
 
 async def handle_create_course_from_upload(payload: dict, current_user: dict) -> MessageResponse:
@@ -88,8 +106,8 @@ async def handle_duplicate_course(course_id: str, current_user: dict) -> Message
 async def handle_update_visibility(course_id: str, payload: dict, current_user: dict) -> MessageResponse:
     """Placeholder cập nhật trạng thái hiển thị khóa học."""
 
+    await authorize_course_edit(course_id, current_user)
     visibility = payload.get("visibility", "public")
-    _ = current_user
     return MessageResponse(message=f"Placeholder: khóa học {course_id} chuyển sang trạng thái {visibility}")
 
 
@@ -99,23 +117,28 @@ async def handle_list_chapters(course_id: str) -> MessageResponse:
     return MessageResponse(message=f"Placeholder: chương học cho khóa {course_id}")
 
 
-async def handle_create_chapter(course_id: str, payload: dict) -> MessageResponse:
+async def handle_create_chapter(course_id: str, payload: dict, current_user: dict) -> MessageResponse:
     """Placeholder thêm chương mới."""
 
+    await authorize_course_edit(course_id, current_user)
     chapter_title = payload.get("title", "Chương mới")
     return MessageResponse(message=f"Placeholder: đã tạo chương '{chapter_title}' cho khóa {course_id}")
 
 
-async def handle_update_chapter(course_id: str, chapter_id: str, payload: dict) -> MessageResponse:
+async def handle_update_chapter(
+    course_id: str, chapter_id: str, payload: dict, current_user: dict
+) -> MessageResponse:
     """Placeholder cập nhật chương."""
 
+    await authorize_course_edit(course_id, current_user)
     chapter_title = payload.get("title", "Chương cập nhật")
     return MessageResponse(
         message=f"Placeholder: đã cập nhật chương {chapter_id} của khóa {course_id} thành '{chapter_title}'"
     )
 
 
-async def handle_delete_chapter(course_id: str, chapter_id: str) -> MessageResponse:
+async def handle_delete_chapter(course_id: str, chapter_id: str, current_user: dict) -> MessageResponse:
     """Placeholder xóa chương."""
 
+    await authorize_course_edit(course_id, current_user)
     return MessageResponse(message=f"Placeholder: đã xóa chương {chapter_id} khỏi khóa {course_id}")
@@ -1,10 +1,26 @@
 """Controller quản lý enrollment."""
-from typing import List
+from typing import List, Optional
 
+from fastapi import HTTPException, status
+
+from controllers.progress_controller import handle_record_progress_event
 from models.models import EnrollmentResponse
 from schemas.common import MessageResponse
-from schemas.enrollment import ProgressSnapshot
-from services.enrollment_service import enroll_course, list_enrollments, update_progress, update_progress_demo
+from schemas.enrollment import (
+    BulkEnrollmentRequest,
+    BulkEnrollmentResponse,
+    ProgressEventRequest,
+    ProgressSnapshot,
+)
+from services.enrollment_service import (
+    bulk_update_enrollments,
+    enroll_course,
+    list_enrollments,
+    parse_identifiers_csv,
+    unenroll_course,
+    update_progress,
+    update_progress_demo,
+)
 
 
 async def handle_enroll(user_id: str, course_id: str) -> EnrollmentResponse:
@@ -19,17 +35,39 @@ async def handle_list_enrollments(user_id: str) -> List[EnrollmentResponse]:
     return await list_enrollments(user_id)
 
 
-async def handle_update_progress(enrollment_id: str, progress: float) -> EnrollmentResponse:
-    """Cập nhật tiến độ học."""
+async def handle_update_progress(
+    enrollment_id: str, user_id: str, progress: Optional[float], lesson_id: Optional[str]
+) -> EnrollmentResponse:
+    """Cập nhật tiến độ học: đánh dấu hoàn thành một bài học hoặc ghi đè phần trăm."""
 
-    return await update_progress(enrollment_id, progress)
+    if progress is None and lesson_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cần lesson_id hoặc progress")
+    return await update_progress(enrollment_id, user_id, progress=progress, lesson_id=lesson_id)
 
 
 async def handle_unenroll(user_id: str, course_id: str) -> MessageResponse:
-    """Placeholder rời khỏi khóa học."""
+    """Rời khỏi khóa học."""
+
+    await unenroll_course(user_id, course_id)
+    return MessageResponse(message="Đã hủy đăng ký khóa học")
+
+
+async def handle_bulk_enrollments(
+    course_id: str, payload: BulkEnrollmentRequest, current_user: dict
+) -> BulkEnrollmentResponse:
+    return await bulk_update_enrollments(course_id, payload.user_ids, current_user, payload.action)
+
 
-    _ = user_id, course_id
-    return MessageResponse(message="Placeholder: đã hủy đăng ký khóa học")
+async def handle_bulk_enrollments_csv(
+    course_id: str, content: bytes, action: str, current_user: dict
+) -> BulkEnrollmentResponse:
+    try:
+        identifiers = parse_identifiers_csv(content)
+    except UnicodeDecodeError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV phải mã hóa UTF-8") from error
+    if not identifiers:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV không có dòng dữ liệu")
+    return await bulk_update_enrollments(course_id, identifiers, current_user, action)
 
 
 async def handle_get_course_progress(user_id: str, course_id: str) -> ProgressSnapshot:
@@ -38,8 +76,7 @@ async def handle_get_course_progress(user_id: str, course_id: str) -> ProgressSn
     return await update_progress_demo(user_id, course_id)
 
 
-async def handle_post_course_progress(user_id: str, course_id: str, payload: dict) -> MessageResponse:
-    """Placeholder cập nhật tiến độ khóa học."""
+async def handle_post_course_progress(user_id: str, course_id: str, payload: ProgressEventRequest) -> MessageResponse:
+    """Ghi nhận sự kiện tiến độ của khóa học (cùng luồng với ``/progress``)."""
 
-    _ = user_id, course_id, payload
-    return MessageResponse(message="Placeholder: tiến độ đã được ghi nhận")
+    return await handle_record_progress_event(user_id, course_id, payload)
@@ -0,0 +1,78 @@
+"""Controller theo dõi job nền (polling và SSE)."""
+import asyncio
+import json
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+
+from config.config import get_settings
+from models.models import JobDocument
+from schemas.job import JobAcceptedResponse, JobStatusResponse
+from services.job_service import TERMINAL_STATUSES, get_job
+
+_settings = get_settings()
+
+
+def build_job_status(job: JobDocument) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=str(job.id),
+        job_type=job.job_type,
+        status=job.status.value,
+        attempts=job.attempts,
+        result=job.result,
+        progress=job.progress,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        finished_at=job.finished_at,
+    )
+
+
+def build_job_accepted(job: JobDocument) -> JobAcceptedResponse:
+    job_id = str(job.id)
+    return JobAcceptedResponse(
+        job_id=job_id,
+        status=job.status.value,
+        status_url=f"/api/v1/jobs/{job_id}",
+        events_url=f"/api/v1/jobs/{job_id}/events",
+    )
+
+
+async def _load_owned_job(job_id: str, current_user: dict) -> JobDocument:
+    job = await get_job(job_id)
+    is_owner = job is not None and job.owner_id in (None, current_user.get("sub"))
+    if job is None or not (is_owner or current_user.get("role") == "admin"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy job")
+    return job
+
+
+async def handle_get_job(job_id: str, current_user: dict) -> JobStatusResponse:
+    """Trả trạng thái job cho client polling."""
+
+    return build_job_status(await _load_owned_job(job_id, current_user))
+
+
+async def handle_job_events(job_id: str, current_user: dict) -> AsyncIterator[str]:
+    """Kiểm tra quyền rồi trả generator SSE, phát sự kiện mỗi khi trạng thái đổi."""
+
+    job = await _load_owned_job(job_id, current_user)
+
+    async def event_stream() -> AsyncIterator[str]:
+        current = job
+        last_marker = None
+        while True:
+            marker = (current.status, current.attempts, current.updated_at)
+            if marker != last_marker:
+                last_marker = marker
+                data = build_job_status(current).model_dump_json()
+                yield f"event: status\ndata: {data}\n\n"
+            if current.status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(_settings.job_poll_interval_seconds)
+            refreshed = await get_job(job_id)
+            if refreshed is None:
+                yield f"event: error\ndata: {json.dumps({'detail': 'Job đã bị xóa'})}\n\n"
+                return
+            current = refreshed
+
+    return event_stream()
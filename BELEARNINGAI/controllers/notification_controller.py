@@ -1,17 +1,29 @@
 """Controller thông báo."""
-from typing import List
+from typing import Optional
 
-from models.models import NotificationResponse
-from services.notification_service import list_notifications, mark_as_read
+from schemas.notification import MarkAllReadResponse, NotificationPage, NotificationResponse, UnreadCountResponse
+from services.notification_service import list_notifications, mark_all_as_read, mark_as_read, unread_count
 
 
-async def handle_list_notifications(user_id: str) -> List[NotificationResponse]:
-    """Lấy danh sách thông báo."""
+async def handle_list_notifications(current_user: dict, limit: int, cursor: Optional[str]) -> NotificationPage:
+    """Lấy một trang thông báo."""
 
-    return await list_notifications(user_id)
+    return await list_notifications(current_user, limit, cursor)
 
 
-async def handle_mark_as_read(notification_id: str) -> NotificationResponse:
+async def handle_unread_count(current_user: dict) -> UnreadCountResponse:
+    """Số thông báo chưa đọc cho badge."""
+
+    return UnreadCountResponse(unread_count=await unread_count(current_user))
+
+
+async def handle_mark_as_read(notification_id: str, current_user: dict) -> NotificationResponse:
     """Đánh dấu thông báo đã đọc."""
 
-    return await mark_as_read(notification_id)
+    return await mark_as_read(notification_id, current_user)
+
+
+async def handle_mark_all_as_read(current_user: dict) -> MarkAllReadResponse:
+    """Đánh dấu toàn bộ hộp thư đã đọc."""
+
+    return await mark_all_as_read(current_user)
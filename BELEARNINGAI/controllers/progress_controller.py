@@ -1,8 +1,9 @@
 """Controller tiến độ học tập."""
 from models.models import ProgressResponse
-from schemas.enrollment import ProgressSnapshot
+from schemas.common import MessageResponse
+from schemas.enrollment import ProgressEventRequest, ProgressSnapshot
 from services.enrollment_service import update_progress_demo
-from services.progress_service import get_progress, update_progress
+from services.progress_service import get_progress, record_progress_event, update_progress
 
 
 async def handle_get_progress(user_id: str, course_id: str) -> ProgressResponse:
@@ -17,6 +18,21 @@ async def handle_update_progress(user_id: str, course_id: str, progress: float)
     return await update_progress(user_id, course_id, progress)
 
 
+async def handle_record_progress_event(
+    user_id: str, course_id: str, payload: ProgressEventRequest
+) -> MessageResponse:
+    """Ghi nhận sự kiện tiến độ; trả về khi sự kiện đã được ghi bền vững."""
+
+    await record_progress_event(
+        user_id,
+        course_id,
+        lesson_id=payload.lesson_id,
+        duration_minutes=payload.duration_minutes,
+        activity=payload.activity,
+    )
+    return MessageResponse(message="Đã ghi nhận tiến độ")
+
+
 async def get_course_progress(user_id: str, course_id: str) -> ProgressSnapshot:
     """Tổng hợp tiến độ dùng cho dashboard analytics."""
 
@@ -1,10 +1,28 @@
 """Controller quiz."""
 from typing import List
 
+from fastapi import HTTPException, status
+
 from models.models import QuizDocument, QuizResponse
+from schemas.assessment import AdaptiveAnswerRequest, AdaptiveStepResponse
 from schemas.common import MessageResponse
-from schemas.quiz import QuizGenerationResponse
-from services.quiz_service import generate_quiz, generate_quiz_template, list_quizzes, save_quiz
+from schemas.quiz import (
+    AdaptiveQuizRequest,
+    QuizBatchResultResponse,
+    QuizBatchSubmitRequest,
+    QuizGenerationResponse,
+    QuizResultResponse,
+    QuizSubmitRequest,
+)
+from services.adaptive_service import answer_adaptive, build_step, start_adaptive_assessment
+from services.quiz_service import (
+    generate_quiz,
+    generate_quiz_template,
+    list_quizzes,
+    save_quiz,
+    submit_quiz,
+    submit_quiz_batch,
+)
 
 
 async def handle_generate_quiz(course_id: str) -> QuizResponse:
@@ -70,11 +88,26 @@ async def handle_quiz_from_content(payload: dict) -> MessageResponse:
     return MessageResponse(message=f"Placeholder: tạo quiz từ nội dung {topic}")
 
 
-async def handle_adaptive_quiz(payload: dict) -> MessageResponse:
-    """Placeholder tạo quiz thích ứng."""
+async def handle_adaptive_quiz(payload: AdaptiveQuizRequest, current_user: dict) -> AdaptiveStepResponse:
+    """Tạo quiz thích ứng, trả câu hỏi đầu tiên."""
+
+    user_id = current_user.get("sub", "demo-user")
+    assessment = await start_adaptive_assessment(
+        user_id=user_id, category=payload.category, assessment_type="adaptive_quiz", max_items=payload.max_questions
+    )
+    return build_step(assessment)
+
+
+async def handle_adaptive_quiz_answer(
+    assessment_id: str, payload: AdaptiveAnswerRequest, current_user: dict
+) -> AdaptiveStepResponse:
+    """Trả lời câu hiện tại của quiz thích ứng."""
 
-    difficulty = payload.get("difficulty", "medium")
-    return MessageResponse(message=f"Placeholder: tạo quiz thích ứng mức {difficulty}")
+    user_id = current_user.get("sub", "demo-user")
+    step = await answer_adaptive(assessment_id, user_id=user_id, answer=payload.answer)
+    if step is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy quiz thích ứng")
+    return step
 
 
 async def handle_start_quiz(quiz_id: str) -> MessageResponse:
@@ -83,11 +116,25 @@ async def handle_start_quiz(quiz_id: str) -> MessageResponse:
     return MessageResponse(message=f"Placeholder: bắt đầu làm quiz {quiz_id}")
 
 
-async def handle_submit_quiz(quiz_id: str, payload: dict) -> MessageResponse:
-    """Placeholder nộp quiz."""
+async def handle_submit_quiz(quiz_id: str, payload: QuizSubmitRequest, current_user: dict) -> QuizResultResponse:
+    """Chấm bài nộp của người dùng hiện tại."""
+
+    user_id = current_user.get("sub", "demo-user")
+    result = await submit_quiz(quiz_id, user_id=user_id, answers=payload.answers)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy quiz")
+    return result
+
+
+async def handle_submit_quiz_batch(
+    quiz_id: str, payload: QuizBatchSubmitRequest, current_user: dict
+) -> QuizBatchResultResponse:
+    """Chấm hàng loạt bài nộp của cả lớp."""
 
-    _ = payload
-    return MessageResponse(message=f"Placeholder: đã nộp quiz {quiz_id}")
+    result = await submit_quiz_batch(quiz_id, payload.submissions, current_user)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy quiz")
+    return result
 
 
 async def handle_quiz_result_detail(quiz_id: str) -> MessageResponse:
@@ -0,0 +1,10 @@
+"""Controller kênh realtime (WebSocket)."""
+from fastapi import WebSocket
+
+from services.realtime_service import serve_connection
+
+
+async def handle_websocket(websocket: WebSocket) -> None:
+    """Phục vụ một kết nối WebSocket tới khi client ngắt."""
+
+    await serve_connection(websocket)
@@ -14,7 +14,7 @@ async def handle_get_profile(user_id: str) -> UserResponse:
 async def handle_list_users() -> List[UserResponse]:
     """Danh sách người dùng."""
 
-    return await list_users()
+    return (await list_users()).items
 
 
 async def handle_deactivate_user(user_id: str) -> UserResponse:
@@ -3,6 +3,7 @@ from typing import Optional
 
 from fastapi import HTTPException, Request, status
 
+from services.active_users_service import record_activity
 from utils.security import decode_token
 
 
@@ -10,7 +11,8 @@ async def get_current_user(request: Request) -> dict:
     """Giải mã access token từ header Authorization.
 
     Trả về payload (sub, role, session_id). Hiện tại chỉ làm nhiệm vụ decode cơ bản,
-    cần bổ sung truy vấn DB, kiểm tra revoke khi triển khai thực tế.
+    cần bổ sung truy vấn DB, kiểm tra revoke khi triển khai thực tế. Mỗi request hợp lệ
+    được ghi nhận vào sketch người dùng hoạt động (DAU/WAU/MAU).
     """
 
     auth_header: Optional[str] = request.headers.get("Authorization")
@@ -19,4 +21,5 @@ async def get_current_user(request: Request) -> dict:
 
     token = auth_header.replace("Bearer ", "", 1).strip()
     payload = decode_token(token)
+    record_activity(payload.get("sub"))
     return payload
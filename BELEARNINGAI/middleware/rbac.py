@@ -1,7 +1,8 @@
-"""Middleware kiểm tra quyền truy cập (placeholder)."""
+"""Dependency kiểm tra quyền truy cập theo vai trò."""
 from fastapi import Depends, HTTPException, status
 
 from middleware.auth import get_current_user
+from services.permissions_service import permission_table
 
 
 def require_roles(*allowed_roles: str):
@@ -14,3 +15,25 @@ def require_roles(*allowed_roles: str):
         return user
 
     return checker
+
+
+def require_permission(resource: str, action: str):
+    """Factory tạo dependency kiểm tra quyền ``resource:action`` trong bảng đã biên dịch.
+
+    Bit của quyền được tra lúc khai báo route (sai tên quyền lỗi ngay khi import); mỗi request
+    chỉ còn một lần tra mặt nạ theo vai trò. Quyền phạm vi ``own`` được cho qua ở đây, service
+    kiểm tra chủ sở hữu bằng ``ensure_permission`` sau khi đã tải tài nguyên.
+    """
+
+    bit = permission_table.bit(resource, action)
+    granted = {
+        role: permission_table.global_masks.get(role, 0) | permission_table.owned_masks.get(role, 0)
+        for role in {*permission_table.global_masks, *permission_table.owned_masks}
+    }
+
+    async def checker(user=Depends(get_current_user)) -> dict:
+        if not granted.get(user.get("role"), 0) & bit:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Không đủ quyền truy cập")
+        return user
+
+    return checker
@@ -1,15 +1,17 @@
 """Định nghĩa schema Pydantic và document lưu dữ liệu hệ thống."""
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from beanie import Document
 from pydantic import BaseModel, EmailStr, Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 
 class LessonContent(BaseModel):
     """Mô tả nội dung từng bài học trong chương."""
 
+    lesson_id: Optional[str] = Field(default=None, description="ID ổn định của bài học, dùng để ghi nhận hoàn thành")
     title: str = Field(..., description="Tiêu đề bài học")
     summary: str = Field(..., description="Tóm tắt nội dung để AI chat sử dụng")
     duration_minutes: int = Field(default=15, ge=1, description="Thời lượng dự kiến (phút)")
@@ -32,6 +34,7 @@ class CourseBase(BaseModel):
     category: str = Field(default="Khoa học", description="Danh mục khóa học")
     estimated_duration_hours: float = Field(default=4.0, ge=0.5, description="Thời lượng ước tính (giờ)")
     tags: List[str] = Field(default_factory=list, description="Từ khóa gợi ý khóa học")
+    prerequisites: List[str] = Field(default_factory=list, description="ID các khóa học cần học trước")
 
 
 class CourseDocument(Document, CourseBase):
@@ -40,12 +43,22 @@ class CourseDocument(Document, CourseBase):
     created_by: str = Field(..., description="ID người tạo khóa học")
     source_type: str = Field(default="ai_generated", description="Nguồn gốc: manual/ai_generated/from_upload")
     modules: List[ModuleOutline] = Field(default_factory=list, description="Danh sách chương")
+    source_job_id: Optional[str] = Field(default=None, description="Job AI đã sinh khóa học, duy nhất theo job")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "courses"
-        indexes = ["title", "category", "tags"]
+        indexes = [
+            "title",
+            "category",
+            "tags",
+            IndexModel(
+                [("source_job_id", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"source_job_id": {"$type": "string"}},
+            ),
+        ]
 
 
 class CourseCreate(CourseBase):
@@ -154,7 +167,18 @@ class UserDocument(Document, UserBase):
 
     class Settings:
         name = "users"
-        indexes = ["email", "role", "status", "created_at"]
+        indexes = [
+            "email",
+            "role",
+            "status",
+            "created_at",
+            IndexModel([("role", ASCENDING), ("_id", ASCENDING)]),
+            # Danh sách người dùng cho admin: lọc bằng tiền tố index, sắp xếp keyset theo (khóa, _id).
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("role", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("email", ASCENDING), ("_id", ASCENDING)]),
+        ]
 
 
 class RegisterRequest(UserBase):
@@ -219,7 +243,97 @@ class EnrollmentDocument(Document):
 
     class Settings:
         name = "enrollments"
-        indexes = [("course_id", "user_id")]
+        indexes = [IndexModel([("course_id", ASCENDING), ("user_id", ASCENDING)], unique=True), "user_id"]
+
+
+class ClassStatus(str, Enum):
+    """Trạng thái lớp học."""
+
+    active = "active"
+    archived = "archived"
+
+
+class MembershipStatus(str, Enum):
+    """Trạng thái học viên trong lớp."""
+
+    active = "active"
+    pending = "pending"
+    removed = "removed"
+
+
+class ClassSchedule(BaseModel):
+    """Một buổi học lặp lại hằng tuần."""
+
+    day_of_week: int = Field(..., ge=0, le=6)
+    start_time: str
+    end_time: str
+    timezone: Optional[str] = None
+
+
+class ClassDocument(Document):
+    """Lớp học do giảng viên mở trên một khóa học."""
+
+    name: str = Field(...)
+    course_id: str = Field(...)
+    instructor_id: str = Field(...)
+    description: Optional[str] = None
+    max_students: Optional[int] = Field(default=None, ge=1)
+    schedule: List[ClassSchedule] = Field(default_factory=list)
+    status: ClassStatus = Field(default=ClassStatus.active)
+    student_count: int = Field(default=0, ge=0, description="Số học viên active, cập nhật khi thêm/xóa thành viên")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "classes"
+        indexes = [IndexModel([("instructor_id", ASCENDING), ("created_at", DESCENDING)])]
+
+
+class ClassMembershipDocument(Document):
+    """Học viên thuộc một lớp; ``course_id`` chép từ lớp để nối với tiến độ.
+
+    ``progress_percent``/``last_active`` được chép từ ``progress`` sau mỗi lô ghi tiến độ, để
+    roster sắp xếp và phân trang ngay trên index của ``class_memberships``.
+    """
+
+    class_id: str = Field(...)
+    user_id: str = Field(...)
+    course_id: str = Field(...)
+    status: MembershipStatus = Field(default=MembershipStatus.active)
+    tags: List[str] = Field(default_factory=list)
+    joined_at: datetime = Field(default_factory=datetime.utcnow)
+    progress_percent: float = Field(default=0.0, ge=0.0, le=100.0)
+    last_active: Optional[datetime] = None
+    last_active_key: datetime = Field(
+        default=datetime(1970, 1, 1), description="``last_active`` hoặc mốc 1970 khi chưa học, làm khóa keyset"
+    )
+
+    class Settings:
+        name = "class_memberships"
+        indexes = [
+            IndexModel([("class_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+            IndexModel([("user_id", ASCENDING), ("course_id", ASCENDING)]),
+            IndexModel([("class_id", ASCENDING), ("progress_percent", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("class_id", ASCENDING), ("last_active_key", DESCENDING), ("_id", DESCENDING)]),
+        ]
+
+
+class ClassJoinCodeDocument(Document):
+    """Mã tham gia lớp học; tự xóa khi hết hạn (TTL trên ``expires_at``)."""
+
+    code: str = Field(..., description="Mã ngẫu nhiên, duy nhất trong các mã còn hiệu lực")
+    class_id: str = Field(...)
+    course_id: str = Field(...)
+    created_by: str = Field(...)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(...)
+
+    class Settings:
+        name = "class_join_codes"
+        indexes = [
+            IndexModel([("code", ASCENDING)], unique=True),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
 
 
 class EnrollmentResponse(BaseModel):
@@ -258,6 +372,161 @@ class QuizDocument(Document):
         indexes = ["course_id"]
 
 
+class QuizAttemptDocument(Document):
+    """Document lưu một lần nộp quiz đã được chấm."""
+
+    quiz_id: str = Field(...)
+    course_id: str = Field(...)
+    user_id: str = Field(...)
+    answers: List[int] = Field(default_factory=list, description="Chỉ số phương án đã chọn, -1 nếu bỏ trống")
+    correct: List[bool] = Field(default_factory=list, description="Đúng/sai theo từng câu")
+    score: float = Field(default=0.0, ge=0.0)
+    max_score: float = Field(default=0.0, ge=0.0)
+    percentage: float = Field(default=0.0, ge=0.0, le=100.0)
+    submitted_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "quiz_attempts"
+        indexes = [
+            [("quiz_id", 1), ("user_id", 1)],
+            [("course_id", 1), ("submitted_at", 1)],
+        ]
+
+
+class QuestionBankDocument(Document):
+    """Câu hỏi trong ngân hàng đề dùng cho bài đánh giá năng lực."""
+
+    question_text: str = Field(...)
+    question_type: str = Field(default="multiple_choice")
+    options: List[str] = Field(default_factory=list)
+    correct_answer: int = Field(..., ge=0, description="Chỉ số phương án đúng")
+    category: str = Field(..., description="Lĩnh vực đánh giá, ví dụ programming")
+    topic: str = Field(default="general", description="Chủ đề nhỏ dùng cho phân tích điểm mạnh/yếu")
+    difficulty: str = Field(default="medium", description="easy/medium/hard")
+    irt_a: Optional[float] = Field(default=None, description="Độ phân biệt IRT")
+    irt_b: Optional[float] = Field(default=None, description="Độ khó IRT, None khi chưa hiệu chỉnh")
+    irt_c: Optional[float] = Field(default=None, description="Xác suất đoán mò (3PL)")
+    calibrated_at: Optional[datetime] = None
+    seq: Optional[int] = Field(
+        default=None, description="Số thứ tự liên tục trong lĩnh vực, là vị trí bit trong bitmap câu đã gặp"
+    )
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "question_bank"
+        indexes = [[("category", 1), ("difficulty", 1)], [("category", 1), ("seq", 1)]]
+
+
+class CounterDocument(Document):
+    """Bộ đếm tăng dần dùng cấp số thứ tự (ví dụ ``seq`` của câu hỏi)."""
+
+    name: str = Field(...)
+    value: int = Field(default=0)
+
+    class Settings:
+        name = "counters"
+        indexes = [IndexModel([("name", ASCENDING)], unique=True)]
+
+
+class SeenQuestionsDocument(Document):
+    """Bitmap các câu hỏi người dùng đã gặp trong một lĩnh vực (bit ``seq``)."""
+
+    user_id: str = Field(...)
+    category: str = Field(...)
+    bitmap: bytes = Field(default=b"")
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "seen_questions"
+        indexes = [IndexModel([("user_id", ASCENDING), ("category", ASCENDING)], unique=True)]
+
+
+class AssessmentItem(BaseModel):
+    """Câu hỏi đã được rút vào một bài đánh giá cụ thể."""
+
+    question_id: str
+    question_text: str
+    question_type: str = "multiple_choice"
+    options: List[str] = Field(default_factory=list)
+    correct_answer: Optional[int] = None
+    topic: str = "general"
+    difficulty: Optional[str] = None
+    irt_a: Optional[float] = None
+    irt_b: Optional[float] = None
+    irt_c: Optional[float] = None
+
+
+class AssessmentDocument(Document):
+    """Document lưu một lượt làm bài đánh giá năng lực."""
+
+    user_id: str = Field(...)
+    category: str = Field(...)
+    assessment_type: str = Field(default="skill_assessment")
+    status: str = Field(default="in_progress", description="in_progress/submitted")
+    questions: List[AssessmentItem] = Field(default_factory=list)
+    answers: List[int] = Field(default_factory=list)
+    correct: List[bool] = Field(default_factory=list)
+    score: float = Field(default=0.0)
+    level: str = Field(default="beginner")
+    strengths: List[str] = Field(default_factory=list)
+    weaknesses: List[str] = Field(default_factory=list)
+    adaptive: bool = Field(default=False, description="Bài thích ứng: câu hỏi được chọn dần theo IRT")
+    max_items: int = Field(default=0)
+    theta: float = Field(default=0.0, description="Ước lượng năng lực hiện tại")
+    theta_se: Optional[float] = None
+    log_posterior: List[float] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    submitted_at: Optional[datetime] = None
+
+    class Settings:
+        name = "assessments"
+        indexes = [[("user_id", 1), ("created_at", -1)]]
+
+
+class TopicMasteryDocument(Document):
+    """Bộ đếm đúng/tổng theo người dùng × lĩnh vực × chủ đề (materialized view).
+
+    Được cộng dồn bằng ``$inc`` mỗi khi một câu trả lời được chấm, nên đọc thống kê
+    chủ đề không cần quét lại lịch sử bài làm.
+    """
+
+    user_id: str = Field(...)
+    category: str = Field(...)
+    topic: str = Field(...)
+    correct: int = Field(default=0)
+    total: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "topic_mastery"
+        indexes = [
+            IndexModel(
+                [("user_id", ASCENDING), ("category", ASCENDING), ("topic", ASCENDING)],
+                unique=True,
+            )
+        ]
+
+
+class SimilarCourse(BaseModel):
+    """Một láng giềng trong danh sách khóa học tương tự."""
+
+    course_id: str
+    title: str
+    score: float
+
+
+class CourseSimilarityDocument(Document):
+    """Top láng giềng nội dung của một khóa học, tính sẵn bởi chỉ mục tương đồng."""
+
+    course_id: str = Field(...)
+    neighbours: List[SimilarCourse] = Field(default_factory=list)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "course_similarity"
+        indexes = [IndexModel([("course_id", ASCENDING)], unique=True)]
+
+
 class QuizResponse(BaseModel):
     """Schema trả về cho quiz."""
 
@@ -330,15 +599,18 @@ class ProgressDocument(Document):
     course_id: str = Field(...)
     user_id: str = Field(...)
     completed_lessons: List[str] = Field(default_factory=list)
+    completed_count: int = Field(default=0, ge=0, description="Số bài học đã hoàn thành (= len(completed_lessons))")
     progress: float = Field(default=0.0, ge=0.0, le=100.0)
     streak_days: int = Field(default=0, ge=0)
     last_activity: datetime = Field(default_factory=datetime.utcnow)
     learning_sessions: List["StudySessionModel"] = Field(default_factory=list)
+    total_minutes: int = Field(default=0, ge=0, description="Tổng phút học cộng dồn từ sự kiện tiến độ")
+    applied_events: List[str] = Field(default_factory=list, description="ID sự kiện học đã cộng gần nhất, chống cộng trùng khi ghi lại")
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "progress"
-        indexes = [("course_id", "user_id")]
+        indexes = [IndexModel([("user_id", ASCENDING), ("course_id", ASCENDING)], unique=True)]
 
 
 class ProgressResponse(BaseModel):
@@ -372,11 +644,145 @@ class NotificationDocument(Document):
     title: str = Field(...)
     message: str = Field(...)
     is_read: bool = Field(default=False)
+    announcement_id: Optional[str] = Field(default=None, description="Thông báo chung sinh ra bản ghi này (fan-out)")
+    category: str = Field(default="system", description="Loại thông báo: system, announcement, study_reminder, ...")
+    email_pending: bool = Field(default=False, description="Chờ gửi qua email trong bản tin tổng hợp kế tiếp")
+    emailed_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "notifications"
-        indexes = ["target_user_id", "is_read"]
+        indexes = [
+            # Chỉ chứa thông báo đang chờ email; bộ gom bản tin chọn người nhận chỉ từ index này.
+            IndexModel(
+                [("created_at", ASCENDING), ("target_user_id", ASCENDING)], partialFilterExpression={"email_pending": True}
+            ),
+            # Hộp thư phân trang keyset theo (created_at, _id) của từng người dùng.
+            IndexModel([("target_user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("target_user_id", ASCENDING), ("is_read", ASCENDING)]),
+            # Chạy lại job fan-out không tạo bản ghi trùng cho cùng người nhận.
+            IndexModel(
+                [("announcement_id", ASCENDING), ("target_user_id", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"announcement_id": {"$type": "string"}},
+            ),
+        ]
+
+
+class AnnouncementMode(str, Enum):
+    """Cách phân phối thông báo chung tới người nhận."""
+
+    fan_out = "fan_out"
+    on_read = "on_read"
+
+
+class AnnouncementStatus(str, Enum):
+    """Trạng thái phân phối thông báo chung."""
+
+    queued = "queued"
+    delivering = "delivering"
+    delivered = "delivered"
+
+
+class AnnouncementDocument(Document):
+    """Thông báo chung của admin gửi tới một hoặc nhiều vai trò.
+
+    Chế độ ``fan_out`` ghi một ``NotificationDocument`` cho từng người nhận bằng job nền;
+    chế độ ``on_read`` chỉ lưu bản ghi này và ghép vào hộp thư lúc người dùng đọc.
+    """
+
+    title: str = Field(...)
+    message: str = Field(...)
+    audience_roles: List[UserRole] = Field(...)
+    mode: AnnouncementMode = Field(...)
+    status: AnnouncementStatus = Field(default=AnnouncementStatus.queued)
+    created_by: Optional[str] = None
+    audience_size: int = Field(default=0, ge=0, description="Số người nhận ước tính lúc tạo")
+    delivered_count: int = Field(default=0, ge=0, description="Số thông báo đã ghi (fan_out)")
+    last_user_id: Optional[str] = Field(default=None, description="Người nhận cuối đã ghi, để job chạy lại tiếp tục")
+    job_id: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: Optional[datetime] = Field(default=None, description="Hết hạn hiển thị (chỉ on_read), TTL index")
+
+    class Settings:
+        name = "announcements"
+        indexes = [
+            # Hộp thư phân trang/đếm thông báo chung on_read theo vai trò và (created_at, _id).
+            IndexModel(
+                [
+                    ("mode", ASCENDING),
+                    ("audience_roles", ASCENDING),
+                    ("created_at", DESCENDING),
+                    ("_id", DESCENDING),
+                ]
+            ),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
+
+
+class NotificationCounterDocument(Document):
+    """Trạng thái hộp thư của một người dùng, đọc một lần để hiện badge chưa đọc.
+
+    ``unread`` được cộng/trừ bằng ``$inc`` cùng lúc với ghi/đánh dấu thông báo riêng.
+    Thông báo chung chế độ ``on_read`` được coi là đã đọc nếu tạo trước
+    ``broadcasts_read_before`` hoặc nằm trong ``read_broadcast_ids``.
+    """
+
+    user_id: str = Field(...)
+    unread: int = Field(default=0)
+    broadcasts_read_before: Optional[datetime] = None
+    read_broadcast_ids: List[str] = Field(default_factory=list)
+    last_digest_at: Optional[datetime] = Field(default=None, description="Lần gửi bản tin email gần nhất")
+    digest_lease_owner: Optional[str] = Field(default=None, description="Lượt gom bản tin đang giữ người dùng này")
+    digest_lease_until: Optional[datetime] = Field(default=None, description="Hết hạn lease, cũng là mốc thử lại sau lỗi")
+    digest_failures: int = Field(default=0, ge=0, description="Số lần gửi bản tin lỗi liên tiếp")
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "notification_counters"
+        indexes = [IndexModel([("user_id", ASCENDING)], unique=True)]
+
+
+class EmailDeadLetterDocument(Document):
+    """Bản tin email không gửi được sau số lần thử tối đa hoặc bị máy chủ từ chối hẳn."""
+
+    user_id: str = Field(...)
+    recipient: str = Field(...)
+    subject: str = Field(...)
+    body: str = Field(...)
+    notification_ids: List[str] = Field(default_factory=list)
+    error: str = Field(...)
+    attempts: int = Field(default=1, ge=1)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "email_dead_letters"
+        indexes = [IndexModel([("created_at", DESCENDING)]), "user_id"]
+
+
+class AuditLogDocument(Document):
+    """Bản ghi audit chỉ thêm (append-only), tự xóa khi tới ``expires_at``."""
+
+    actor_id: Optional[str] = None
+    actor_role: Optional[str] = None
+    action: str = Field(..., description="Tên thao tác, ví dụ ``auth.login``")
+    target: Optional[str] = None
+    outcome: str = Field(default="success")
+    ip: Optional[str] = None
+    metadata: Dict[str, str] = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(...)
+
+    class Settings:
+        name = "audit_logs"
+        indexes = [
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("actor_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("action", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("target", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
 
 
 class NotificationResponse(BaseModel):
@@ -425,9 +831,79 @@ class DashboardDocument(Document):
 
     snapshot_at: datetime = Field(default_factory=datetime.utcnow)
     metrics: List[DashboardMetric] = Field(default_factory=list)
+    expires_at: Optional[datetime] = Field(default=None, description="Snapshot cũ tự xóa sau thời điểm này (TTL)")
 
     class Settings:
         name = "dashboard_metrics"
+        indexes = [
+            IndexModel([("snapshot_at", DESCENDING)]),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
+
+
+class RollupScope(str, Enum):
+    """Phạm vi tổng hợp số liệu analytics."""
+
+    user = "user"
+    course = "course"
+    class_ = "class"
+    platform = "platform"
+
+
+class RollupGranularity(str, Enum):
+    """Độ rộng bucket thời gian."""
+
+    hour = "hour"
+    day = "day"
+    week = "week"
+
+
+class AnalyticsRollupDocument(Document):
+    """Bộ đếm cộng dồn của một phạm vi trong một bucket thời gian."""
+
+    scope: RollupScope
+    scope_id: str = Field(..., description="ID người dùng/khóa học/lớp; 'all' cho toàn nền tảng")
+    granularity: RollupGranularity
+    bucket_start: datetime
+    counters: Dict[str, float] = Field(default_factory=dict)
+    expires_at: Optional[datetime] = Field(default=None, description="Bucket tự xóa sau thời điểm này (TTL)")
+
+    class Settings:
+        name = "analytics_rollups"
+        indexes = [
+            IndexModel(
+                [("scope", ASCENDING), ("scope_id", ASCENDING), ("granularity", ASCENDING), ("bucket_start", ASCENDING)],
+                unique=True,
+            ),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
+
+
+class ActivitySketchDocument(Document):
+    """Sketch HyperLogLog người dùng hoạt động của một worker trong một ngày.
+
+    Mỗi worker ghi đè sketch tích lũy của chính nó; số người hoạt động của ngày (hoặc
+    nhiều ngày) là hợp các sketch theo phép max từng thanh ghi.
+    """
+
+    scope: RollupScope
+    scope_id: str = Field(..., description="ID khóa học; 'all' cho toàn nền tảng")
+    bucket_start: datetime = Field(..., description="Đầu ngày (UTC)")
+    worker_id: str
+    precision: int = 14
+    registers: bytes
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: Optional[datetime] = Field(default=None, description="Sketch tự xóa sau thời điểm này (TTL)")
+
+    class Settings:
+        name = "activity_sketches"
+        indexes = [
+            IndexModel(
+                [("scope", ASCENDING), ("scope_id", ASCENDING), ("bucket_start", ASCENDING), ("worker_id", ASCENDING)],
+                unique=True,
+            ),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
 
 
 class DashboardResponse(BaseModel):
@@ -435,3 +911,39 @@ class DashboardResponse(BaseModel):
 
     metrics: List[DashboardMetric]
     generated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class JobStatus(str, Enum):
+    """Trạng thái của một job nền."""
+
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class JobDocument(Document):
+    """Document lưu job nền (hàng đợi bền vững trên MongoDB)."""
+
+    job_type: str = Field(..., description="Loại job, ánh xạ tới handler đã đăng ký")
+    payload: dict = Field(default_factory=dict, description="Tham số đầu vào của job")
+    owner_id: Optional[str] = Field(default=None, description="ID người tạo job")
+    status: JobStatus = Field(default=JobStatus.queued)
+    attempts: int = Field(default=0, ge=0, description="Số lần worker đã nhận job")
+    max_attempts: int = Field(default=3, ge=1)
+    lease_owner: Optional[str] = Field(default=None, description="Worker đang giữ lease")
+    lease_expires_at: Optional[datetime] = Field(default=None, description="Hết hạn lease, quá hạn thì job được nhận lại")
+    result: Optional[dict] = None
+    progress: Optional[dict] = Field(default=None, description="Tiến độ handler tự báo khi đang chạy")
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "jobs"
+        indexes = [
+            [("status", 1), ("created_at", 1)],
+            [("status", 1), ("lease_expires_at", 1)],
+            "owner_id",
+        ]
@@ -0,0 +1,197 @@
+"""Bản export dạng cột (Arrow IPC) của lượt làm quiz và tiến độ học tập.
+
+Export chạy offline (``scripts/export_analytics.py``), ghi vào thư mục tạm rồi đổi tên như
+model gợi ý. Khi phục vụ, ``AnalyticsExport`` mở file bằng ``memory_map`` nên các worker
+dùng chung trang bộ nhớ của hệ điều hành; báo cáo giảng viên là các phép lọc/group-by
+vector hóa của ``pyarrow.compute`` thay vì aggregation trên cụm Mongo chính.
+"""
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Collection, Dict, List, Mapping, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+MANIFEST_FILE = "manifest.json"
+ATTEMPTS_TABLE = "quiz_attempts"
+PROGRESS_TABLE = "progress"
+
+SCHEMAS: Dict[str, pa.Schema] = {
+    ATTEMPTS_TABLE: pa.schema(
+        [
+            ("course_id", pa.string()),
+            ("quiz_id", pa.string()),
+            ("user_id", pa.string()),
+            ("percentage", pa.float32()),
+            ("submitted_at", pa.timestamp("ms")),
+        ]
+    ),
+    PROGRESS_TABLE: pa.schema(
+        [
+            ("course_id", pa.string()),
+            ("user_id", pa.string()),
+            ("progress", pa.float32()),
+            ("completed_count", pa.int32()),
+            ("total_minutes", pa.int64()),
+            ("last_activity", pa.timestamp("ms")),
+        ]
+    ),
+}
+
+
+class ExportWriter:
+    """Ghi các bảng theo lô vào thư mục tạm; ``commit`` thay thư mục đích một lần."""
+
+    def __init__(self, directory: os.PathLike) -> None:
+        self.target = Path(directory)
+        self.staging = self.target.with_name(self.target.name + ".tmp")
+        shutil.rmtree(self.staging, ignore_errors=True)
+        self.staging.mkdir(parents=True)
+        self._writers: Dict[str, pa.ipc.RecordBatchFileWriter] = {}
+        self.rows: Dict[str, int] = {name: 0 for name in SCHEMAS}
+
+    def _writer(self, table: str) -> pa.ipc.RecordBatchFileWriter:
+        writer = self._writers.get(table)
+        if writer is None:
+            writer = self._writers[table] = pa.ipc.new_file(self.staging / f"{table}.arrow", SCHEMAS[table])
+        return writer
+
+    def write(self, table: str, columns: Mapping[str, Sequence]) -> None:
+        batch = pa.RecordBatch.from_pydict(dict(columns), schema=SCHEMAS[table])
+        if batch.num_rows:
+            self._writer(table).write_batch(batch)
+            self.rows[table] += batch.num_rows
+
+    def commit(self, exported_at: datetime) -> Path:
+        for table in SCHEMAS:
+            self._writer(table).close()
+        manifest = {"exported_at": exported_at.isoformat(), "rows": self.rows}
+        (self.staging / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+
+        backup = self.target.with_name(self.target.name + ".old")
+        shutil.rmtree(backup, ignore_errors=True)
+        if self.target.exists():
+            self.target.rename(backup)
+        self.staging.rename(self.target)
+        shutil.rmtree(backup, ignore_errors=True)
+        return self.target
+
+    def abort(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+
+@dataclass
+class AnalyticsExport:
+    """Bản export đã nạp (zero-copy trên ``memory_map``)."""
+
+    exported_at: datetime
+    attempts: pa.Table
+    progress: pa.Table
+
+    @classmethod
+    def load(cls, directory: os.PathLike) -> "AnalyticsExport":
+        path = Path(directory)
+        manifest = json.loads((path / MANIFEST_FILE).read_text(encoding="utf-8"))
+        tables = {
+            table: pa.ipc.open_file(pa.memory_map(str(path / f"{table}.arrow"), "r")).read_all() for table in SCHEMAS
+        }
+        return cls(
+            exported_at=datetime.fromisoformat(manifest["exported_at"]),
+            attempts=tables[ATTEMPTS_TABLE],
+            progress=tables[PROGRESS_TABLE],
+        )
+
+
+def _only_courses(table: pa.Table, course_ids: Collection[str]) -> pa.Table:
+    return table.filter(pc.is_in(table["course_id"], value_set=pa.array(list(course_ids), type=pa.string())))
+
+
+def _fill(row: dict, defaults: Mapping[str, object]) -> dict:
+    return {name: default if row.get(name) is None else row[name] for name, default in defaults.items()}
+
+
+def course_performance(export: AnalyticsExport, course_ids: Collection[str]) -> List[dict]:
+    """Số học viên, tỷ lệ hoàn thành, phút học và điểm quiz của từng khóa học."""
+
+    progress = _only_courses(export.progress, course_ids)
+    progress = progress.append_column("completed", pc.cast(pc.greater_equal(progress["progress"], 100.0), pa.int64()))
+    learners = progress.group_by("course_id").aggregate(
+        [("user_id", "count_distinct"), ("progress", "mean"), ("completed", "sum"), ("total_minutes", "sum")]
+    )
+    quizzes = _only_courses(export.attempts, course_ids).group_by("course_id").aggregate(
+        [("percentage", "count"), ("percentage", "mean")]
+    )
+    joined = learners.join(quizzes, keys="course_id", join_type="full outer")
+    rows = {row["course_id"]: row for row in joined.to_pylist()}
+    report = []
+    for course_id in course_ids:
+        row = _fill(
+            rows.get(course_id, {}),
+            {
+                "user_id_count_distinct": 0,
+                "progress_mean": 0.0,
+                "completed_sum": 0,
+                "total_minutes_sum": 0,
+                "percentage_count": 0,
+                "percentage_mean": 0.0,
+            },
+        )
+        learner_count = row["user_id_count_distinct"]
+        report.append(
+            {
+                "course_id": course_id,
+                "learners": learner_count,
+                "completion_rate": round(100 * row["completed_sum"] / learner_count, 2) if learner_count else 0.0,
+                "average_progress": round(row["progress_mean"], 2),
+                "study_minutes": row["total_minutes_sum"],
+                "quiz_attempts": row["percentage_count"],
+                "average_score": round(row["percentage_mean"], 2),
+            }
+        )
+    return report
+
+
+def student_activity(export: AnalyticsExport, course_ids: Collection[str], limit: int = 50) -> List[dict]:
+    """Hoạt động của học viên trong các khóa học, học viên hoạt động gần nhất trước."""
+
+    learners = _only_courses(export.progress, course_ids).group_by("user_id").aggregate(
+        [("course_id", "count_distinct"), ("progress", "mean"), ("total_minutes", "sum"), ("last_activity", "max")]
+    )
+    quizzes = _only_courses(export.attempts, course_ids).group_by("user_id").aggregate(
+        [("percentage", "count"), ("percentage", "mean"), ("submitted_at", "max")]
+    )
+    joined = learners.join(quizzes, keys="user_id", join_type="full outer")
+    joined = joined.append_column(
+        "last_seen", pc.max_element_wise(joined["last_activity_max"], joined["submitted_at_max"])
+    )
+    top = joined.sort_by([("last_seen", "descending")]).slice(0, limit)
+    report = []
+    for row in top.to_pylist():
+        filled = _fill(
+            row,
+            {
+                "course_id_count_distinct": 0,
+                "progress_mean": 0.0,
+                "total_minutes_sum": 0,
+                "percentage_count": 0,
+                "percentage_mean": 0.0,
+            },
+        )
+        report.append(
+            {
+                "user_id": row["user_id"],
+                "courses": filled["course_id_count_distinct"],
+                "average_progress": round(filled["progress_mean"], 2),
+                "study_minutes": filled["total_minutes_sum"],
+                "quiz_attempts": filled["percentage_count"],
+                "average_score": round(filled["percentage_mean"], 2),
+                "last_activity": row["last_seen"],
+            }
+        )
+    return report
@@ -0,0 +1,240 @@
+"""Engine chấm điểm quiz/assessment dạng vector hóa bằng NumPy.
+
+Đáp án của mỗi quiz được biên dịch một lần thành mảng ``key`` (chỉ số phương án
+đúng, ``-1`` nếu câu không chấm tự động) cùng trọng số và ma trận one-hot chủ đề.
+Bài nộp được mã hóa thành mảng chỉ số phương án (``-1`` = bỏ trống) nên chấm một
+bài hay cả lớp chỉ là vài phép so sánh mảng.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional, Sequence
+
+import numpy as np
+
+UNANSWERED = -1
+
+
+@dataclass(frozen=True)
+class CompiledAnswerKey:
+    """Đáp án đã biên dịch của một bộ câu hỏi."""
+
+    key: np.ndarray
+    weights: np.ndarray
+    topic_matrix: np.ndarray
+    topic_labels: tuple[str, ...]
+    option_lookup: tuple[dict[str, int], ...]
+    max_score: float
+
+    @property
+    def num_questions(self) -> int:
+        return int(self.key.shape[0])
+
+
+@dataclass(frozen=True)
+class GradeResult:
+    """Kết quả chấm một bài nộp."""
+
+    score: float
+    max_score: float
+    percentage: float
+    answers: np.ndarray
+    correct: np.ndarray
+    topic_correct: np.ndarray
+    topic_total: np.ndarray
+
+
+@dataclass(frozen=True)
+class BatchGradeResult:
+    """Kết quả chấm hàng loạt; ``correctness`` là ma trận học viên × câu hỏi."""
+
+    scores: np.ndarray
+    percentages: np.ndarray
+    answers: np.ndarray
+    correctness: np.ndarray
+    question_accuracy: np.ndarray
+    topic_correct: np.ndarray
+    topic_total: np.ndarray
+
+
+def _resolve_correct_index(options: Sequence[str], correct_answer: Any) -> int:
+    if correct_answer is None:
+        return UNANSWERED
+    if isinstance(correct_answer, (int, np.integer)) and not isinstance(correct_answer, bool):
+        index = int(correct_answer)
+        return index if 0 <= index < len(options) else UNANSWERED
+    text = str(correct_answer).strip()
+    if text in options:
+        return list(options).index(text)
+    if text.isdigit():
+        return _resolve_correct_index(options, int(text))
+    if len(text) == 1 and text.isalpha():
+        return _resolve_correct_index(options, ord(text.upper()) - ord("A"))
+    return UNANSWERED
+
+
+def compile_answer_key(
+    questions: Sequence[Any],
+    weights: Optional[Sequence[float]] = None,
+    topics: Optional[Sequence[Optional[str]]] = None,
+) -> CompiledAnswerKey:
+    """Biên dịch danh sách câu hỏi (có ``options``/``correct_answer``) thành đáp án NumPy.
+
+    ``correct_answer`` có thể là chỉ số, nội dung phương án hoặc ký tự A/B/C/D.
+    Câu không có đáp án hợp lệ nhận trọng số 0 và không tính vào điểm tối đa.
+    """
+
+    count = len(questions)
+    key = np.full(count, UNANSWERED, dtype=np.int16)
+    lookups: list[dict[str, int]] = []
+    for index, question in enumerate(questions):
+        options = list(getattr(question, "options", []) or [])
+        key[index] = _resolve_correct_index(options, getattr(question, "correct_answer", None))
+        lookups.append({option: position for position, option in enumerate(options)})
+
+    weight_array = np.ones(count, dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+    weight_array = np.where(key >= 0, weight_array, 0.0).astype(np.float32)
+
+    if topics is None:
+        topics = [getattr(question, "topic", None) for question in questions]
+    labels = tuple(dict.fromkeys(topic or "general" for topic in topics))
+    codes = {label: code for code, label in enumerate(labels)}
+    topic_matrix = np.zeros((count, len(labels)), dtype=np.float32)
+    for index, topic in enumerate(topics):
+        if key[index] >= 0:
+            topic_matrix[index, codes[topic or "general"]] = 1.0
+
+    for array in (key, weight_array, topic_matrix):
+        array.setflags(write=False)
+    return CompiledAnswerKey(
+        key=key,
+        weights=weight_array,
+        topic_matrix=topic_matrix,
+        topic_labels=labels,
+        option_lookup=tuple(lookups),
+        max_score=float(weight_array.sum()),
+    )
+
+
+def encode_answers(compiled: CompiledAnswerKey, answers: Sequence[Any]) -> np.ndarray:
+    """Mã hóa bài nộp thành mảng chỉ số có độ dài đúng bằng số câu hỏi.
+
+    Phần tử là ``int`` được hiểu là chỉ số phương án, ``str`` là nội dung phương án;
+    câu thiếu, ``None`` hoặc không khớp phương án nào được coi là bỏ trống.
+    """
+
+    encoded = np.full(compiled.num_questions, UNANSWERED, dtype=np.int16)
+    for index, answer in enumerate(answers[: compiled.num_questions]):
+        if answer is None or isinstance(answer, bool):
+            continue
+        if isinstance(answer, (int, np.integer)):
+            encoded[index] = answer if 0 <= answer < np.iinfo(np.int16).max else UNANSWERED
+        else:
+            encoded[index] = compiled.option_lookup[index].get(str(answer), UNANSWERED)
+    return encoded
+
+
+def _encode_matrix(compiled: CompiledAnswerKey, submissions: Sequence[Sequence[Any]]) -> np.ndarray:
+    try:
+        matrix = np.asarray(submissions)
+    except ValueError:
+        matrix = None
+    if (
+        matrix is not None
+        and matrix.ndim == 2
+        and matrix.shape[1] == compiled.num_questions
+        and np.issubdtype(matrix.dtype, np.integer)
+    ):
+        # Đường nhanh: cả lớp nộp đủ số câu dưới dạng chỉ số phương án.
+        return np.where((matrix >= 0) & (matrix < np.iinfo(np.int16).max), matrix, UNANSWERED).astype(np.int16)
+    return np.vstack([encode_answers(compiled, answers) for answers in submissions])
+
+
+def _percentages(scores: np.ndarray, max_score: float) -> np.ndarray:
+    if max_score <= 0:
+        return np.zeros_like(scores, dtype=np.float64)
+    return np.round(scores / max_score * 100.0, 2)
+
+
+def grade_submission(compiled: CompiledAnswerKey, answers: Sequence[Any]) -> GradeResult:
+    """Chấm một bài nộp."""
+
+    encoded = encode_answers(compiled, answers)
+    correct = (encoded == compiled.key) & (compiled.key >= 0)
+    score = float(np.dot(correct, compiled.weights))
+    return GradeResult(
+        score=score,
+        max_score=compiled.max_score,
+        percentage=float(_percentages(np.array([score]), compiled.max_score)[0]),
+        answers=encoded,
+        correct=correct,
+        topic_correct=correct.astype(np.float32) @ compiled.topic_matrix,
+        topic_total=compiled.topic_matrix.sum(axis=0),
+    )
+
+
+def grade_batch(compiled: CompiledAnswerKey, submissions: Sequence[Sequence[Any]]) -> BatchGradeResult:
+    """Chấm nhiều bài nộp cùng lúc (ví dụ cả lớp nộp bài thi).
+
+    Trả thêm ma trận đúng/sai và tỷ lệ đúng từng câu, tổng hợp theo chủ đề
+    ngay trong cùng lượt tính nên analytics không phải duyệt lại dữ liệu.
+    """
+
+    if not submissions:
+        empty = np.zeros(0, dtype=np.float64)
+        return BatchGradeResult(
+            scores=empty,
+            percentages=empty,
+            answers=np.zeros((0, compiled.num_questions), dtype=np.int16),
+            correctness=np.zeros((0, compiled.num_questions), dtype=bool),
+            question_accuracy=np.zeros(compiled.num_questions, dtype=np.float64),
+            topic_correct=np.zeros((0, len(compiled.topic_labels)), dtype=np.float32),
+            topic_total=compiled.topic_matrix.sum(axis=0),
+        )
+    matrix = _encode_matrix(compiled, submissions)
+    correctness = (matrix == compiled.key) & (compiled.key >= 0)
+    scores = correctness @ compiled.weights.astype(np.float64)
+    return BatchGradeResult(
+        scores=scores,
+        percentages=_percentages(scores, compiled.max_score),
+        answers=matrix,
+        correctness=correctness,
+        question_accuracy=correctness.mean(axis=0),
+        topic_correct=correctness.astype(np.float32) @ compiled.topic_matrix,
+        topic_total=compiled.topic_matrix.sum(axis=0),
+    )
+
+
+class AnswerKeyCache:
+    """Cache LRU cho đáp án đã biên dịch, khóa thường là ``quiz_id``."""
+
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, cache_key: Hashable) -> Any:
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            self._entries.move_to_end(cache_key)
+        return entry
+
+    def put(self, cache_key: Hashable, value: Any) -> None:
+        self._entries[cache_key] = value
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_or_compile(self, cache_key: Hashable, compile_fn: Callable[[], Any]) -> Any:
+        entry = self.get(cache_key)
+        if entry is None:
+            entry = compile_fn()
+            self.put(cache_key, entry)
+        return entry
+
+    def invalidate(self, cache_key: Hashable) -> None:
+        self._entries.pop(cache_key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+answer_key_cache = AnswerKeyCache()
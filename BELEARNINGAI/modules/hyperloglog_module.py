@@ -0,0 +1,85 @@
+"""HyperLogLog đếm xấp xỉ số phần tử phân biệt với bộ nhớ cố định.
+
+Với ``precision=14`` (16384 thanh ghi, 16 KB) sai số chuẩn khoảng 1.04/√m ≈ 0.8%.
+Hai sketch cùng precision gộp bằng phép max theo từng thanh ghi, nên có thể gộp sketch
+của nhiều worker hoặc nhiều bucket thời gian (ngày → tuần/tháng) mà không đếm trùng.
+"""
+import hashlib
+import math
+from typing import Iterable, Optional
+
+import numpy as np
+
+DEFAULT_PRECISION = 14
+
+
+def _hash64(item: str) -> int:
+    # Hash ổn định giữa các tiến trình (``hash()`` của Python bị ngẫu nhiên hóa).
+    return int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[np.ndarray] = None) -> None:
+        if not 4 <= precision <= 18:
+            raise ValueError("precision phải nằm trong khoảng 4..18")
+        self.precision = precision
+        size = 1 << precision
+        if registers is None:
+            registers = np.zeros(size, dtype=np.uint8)
+        elif registers.shape != (size,):
+            raise ValueError("Số thanh ghi không khớp precision")
+        self.registers = registers
+
+    def add(self, item: str) -> bool:
+        """Thêm phần tử; trả True nếu sketch thay đổi."""
+
+        value = _hash64(item)
+        width = 64 - self.precision
+        index = value >> width
+        rank = width - (value & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Không thể gộp sketch khác precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def copy(self) -> "HyperLogLog":
+        return HyperLogLog(self.precision, self.registers.copy())
+
+    def estimate(self) -> float:
+        size = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        raw = alpha * size * size / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int32))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * size and zeros:
+            # Linear counting cho tập nhỏ.
+            return size * math.log(size / zeros)
+        return raw
+
+    def __len__(self) -> int:
+        return int(round(self.estimate()))
+
+    def to_bytes(self) -> bytes:
+        return self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        return cls(precision, np.frombuffer(data, dtype=np.uint8).copy())
+
+    @classmethod
+    def union(cls, sketches: Iterable["HyperLogLog"], precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        result = cls(precision)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
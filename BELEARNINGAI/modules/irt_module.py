@@ -0,0 +1,198 @@
+"""Lý thuyết ứng đáp câu hỏi (IRT 2PL/3PL) cho bài đánh giá thích ứng.
+
+Năng lực ``theta`` được biểu diễn bằng phân phối hậu nghiệm trên một lưới cố định
+(``THETA_GRID``), nên cập nhật sau mỗi câu trả lời chỉ là cộng một vector log-likelihood.
+``ItemBankIndex`` tính sẵn lượng thông tin của mọi câu hỏi tại từng điểm lưới và thứ tự
+giảm dần tương ứng, nhờ đó chọn câu tiếp theo chỉ cần tra bảng thay vì tính lại.
+"""
+from dataclasses import dataclass
+from typing import Any, Collection, Optional, Sequence
+
+import numpy as np
+
+SCALING = 1.702
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+_GRID_STEP = float(THETA_GRID[1] - THETA_GRID[0])
+_LOG_PRIOR = -0.5 * THETA_GRID**2
+
+DIFFICULTY_TO_B = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+
+
+def probability(theta: Any, a: Any, b: Any, c: Any = 0.0) -> np.ndarray:
+    """Xác suất trả lời đúng theo mô hình 3PL (``c = 0`` là 2PL)."""
+
+    logistic = 1.0 / (1.0 + np.exp(-SCALING * np.asarray(a) * (np.asarray(theta) - np.asarray(b))))
+    return c + (1.0 - c) * logistic
+
+
+def item_information(theta: Any, a: Any, b: Any, c: Any = 0.0) -> np.ndarray:
+    """Lượng thông tin Fisher của câu hỏi tại ``theta``."""
+
+    p = np.clip(probability(theta, a, b, c), 1e-9, 1 - 1e-9)
+    c = np.asarray(c)
+    return (SCALING * np.asarray(a)) ** 2 * ((1.0 - p) / p) * ((p - c) / (1.0 - c)) ** 2
+
+
+@dataclass(frozen=True)
+class ItemParameters:
+    a: float
+    b: float
+    c: float
+
+
+def item_parameters(item: Any) -> ItemParameters:
+    """Đọc tham số IRT của câu hỏi, quy đổi từ ``difficulty`` khi chưa hiệu chỉnh."""
+
+    b = getattr(item, "irt_b", None)
+    if b is None:
+        b = DIFFICULTY_TO_B.get(getattr(item, "difficulty", None) or "medium", 0.0)
+    return ItemParameters(
+        a=float(getattr(item, "irt_a", None) or 1.0),
+        b=float(b),
+        c=float(getattr(item, "irt_c", None) or 0.0),
+    )
+
+
+def initial_log_posterior() -> np.ndarray:
+    """Phân phối tiên nghiệm chuẩn N(0, 1) trên lưới theta (dạng log)."""
+
+    return _LOG_PRIOR.copy()
+
+
+def update_log_posterior(log_posterior: Sequence[float], params: ItemParameters, correct: bool) -> np.ndarray:
+    """Cập nhật hậu nghiệm sau một câu trả lời, độ phức tạp O(kích thước lưới)."""
+
+    p = np.clip(probability(THETA_GRID, params.a, params.b, params.c), 1e-9, 1 - 1e-9)
+    updated = np.asarray(log_posterior, dtype=np.float64) + np.log(p if correct else 1.0 - p)
+    return updated - updated.max()
+
+
+def estimate_ability(log_posterior: Sequence[float]) -> tuple[float, float]:
+    """Ước lượng EAP của theta và sai số chuẩn từ hậu nghiệm."""
+
+    weights = np.exp(np.asarray(log_posterior, dtype=np.float64) - np.max(log_posterior))
+    weights /= weights.sum()
+    theta = float(weights @ THETA_GRID)
+    se = float(np.sqrt(weights @ (THETA_GRID - theta) ** 2))
+    return theta, se
+
+
+class ItemBankIndex:
+    """Chỉ mục ngân hàng câu hỏi cho chọn câu theo thông tin cực đại.
+
+    ``order[g]`` là danh sách vị trí câu hỏi sắp xếp giảm dần theo lượng thông tin
+    tại điểm lưới ``g``; chọn câu chỉ duyệt từ đầu danh sách và bỏ qua câu đã làm.
+    """
+
+    def __init__(self, item_ids: Sequence[str], a: Sequence[float], b: Sequence[float], c: Sequence[float]) -> None:
+        self.item_ids = list(item_ids)
+        self.positions = {item_id: position for position, item_id in enumerate(self.item_ids)}
+        self.a = np.asarray(a, dtype=np.float64)
+        self.b = np.asarray(b, dtype=np.float64)
+        self.c = np.asarray(c, dtype=np.float64)
+        information = item_information(THETA_GRID[:, None], self.a, self.b, self.c)
+        self.order = np.argsort(-information, axis=1, kind="stable").astype(np.int32)
+
+    @classmethod
+    def from_items(cls, items: Sequence[Any]) -> "ItemBankIndex":
+        params = [item_parameters(item) for item in items]
+        return cls(
+            [str(item.id) for item in items],
+            [param.a for param in params],
+            [param.b for param in params],
+            [param.c for param in params],
+        )
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def select_next(self, theta: float, exclude: Collection[str] = ()) -> Optional[str]:
+        """Trả ID câu hỏi có thông tin lớn nhất tại ``theta`` mà chưa nằm trong ``exclude``."""
+
+        grid_index = int(np.clip(round((theta - THETA_GRID[0]) / _GRID_STEP), 0, len(THETA_GRID) - 1))
+        excluded = {self.positions[item_id] for item_id in exclude if item_id in self.positions}
+        for position in self.order[grid_index]:
+            if position not in excluded:
+                return self.item_ids[position]
+        return None
+
+
+@dataclass(frozen=True)
+class CalibrationResult:
+    a: np.ndarray
+    b: np.ndarray
+    c: np.ndarray
+    theta: np.ndarray
+    iterations: int
+
+
+def _log_likelihood_on_grid(answers: np.ndarray, observed: np.ndarray, p: np.ndarray) -> np.ndarray:
+    """Log-likelihood người học × điểm lưới, tính bằng hai phép nhân ma trận."""
+
+    return answers @ np.log(p).T + (observed - answers) @ np.log(1.0 - p).T
+
+
+def calibrate(
+    responses: np.ndarray,
+    guessing: Optional[Sequence[float]] = None,
+    max_iter: int = 200,
+    tolerance: float = 1e-4,
+    newton_steps: int = 3,
+) -> CalibrationResult:
+    """Hiệu chỉnh tham số ``a``/``b`` theo Marginal Maximum Likelihood (EM Bock–Aitkin).
+
+    ``responses`` là ma trận người học × câu hỏi với giá trị 1/0 và ``NaN`` cho câu
+    không làm. ``guessing`` là tham số ``c`` cố định cho từng câu (ví dụ
+    ``1/số phương án`` với mô hình 3PL); bỏ trống nghĩa là 2PL. Theta trả về là
+    ước lượng EAP của từng người học theo tham số cuối cùng.
+    """
+
+    data = np.asarray(responses, dtype=np.float64)
+    observed = (~np.isnan(data)).astype(np.float64)
+    answers = np.where(observed > 0, data, 0.0)
+    c = np.zeros(data.shape[1]) if guessing is None else np.asarray(guessing, dtype=np.float64)
+
+    item_rate = (answers.sum(axis=0) + 0.5) / (observed.sum(axis=0) + 1.0)
+    a = np.ones(data.shape[1])
+    b = np.clip(-np.log(item_rate / (1 - item_rate)) / SCALING, -3, 3)
+    grid = THETA_GRID[:, None]
+
+    iteration = 0
+    for iteration in range(1, max_iter + 1):
+        previous = np.concatenate([a, b])
+
+        # E-step: phân phối hậu nghiệm của từng người học trên lưới theta.
+        p = np.clip(probability(grid, a, b, c), 1e-9, 1 - 1e-9)
+        log_post = _log_likelihood_on_grid(answers, observed, p) + _LOG_PRIOR
+        posterior = np.exp(log_post - log_post.max(axis=1, keepdims=True))
+        posterior /= posterior.sum(axis=1, keepdims=True)
+        expected_correct = posterior.T @ answers
+        expected_total = posterior.T @ observed
+
+        # M-step: Fisher scoring cho (a, b) của mọi câu hỏi cùng lúc.
+        for _ in range(newton_steps):
+            logistic = 1.0 / (1.0 + np.exp(-SCALING * a * (grid - b)))
+            p = np.clip(c + (1 - c) * logistic, 1e-9, 1 - 1e-9)
+            slope = SCALING * (1 - c) * logistic * (1 - logistic)
+            residual = (expected_correct - expected_total * p) / (p * (1 - p))
+            weight = expected_total / (p * (1 - p))
+            d_a = slope * (grid - b)
+            d_b = -slope * a
+            grad_a, grad_b = (residual * d_a).sum(axis=0), (residual * d_b).sum(axis=0)
+            info_aa = (weight * d_a**2).sum(axis=0) + 1e-6
+            info_bb = (weight * d_b**2).sum(axis=0) + 1e-6
+            info_ab = (weight * d_a * d_b).sum(axis=0)
+            det = info_aa * info_bb - info_ab**2
+            step_a = (info_bb * grad_a - info_ab * grad_b) / det
+            step_b = (info_aa * grad_b - info_ab * grad_a) / det
+            a = np.clip(a + np.clip(step_a, -0.5, 0.5), 0.2, 4.0)
+            b = np.clip(b + np.clip(step_b, -1.0, 1.0), -4.0, 4.0)
+
+        if np.max(np.abs(np.concatenate([a, b]) - previous)) < tolerance:
+            break
+
+    p = np.clip(probability(grid, a, b, c), 1e-9, 1 - 1e-9)
+    log_post = _log_likelihood_on_grid(answers, observed, p) + _LOG_PRIOR
+    posterior = np.exp(log_post - log_post.max(axis=1, keepdims=True))
+    theta = (posterior @ THETA_GRID) / posterior.sum(axis=1)
+    return CalibrationResult(a=a, b=b, c=c, theta=theta, iterations=iteration)
@@ -0,0 +1,169 @@
+"""Chỉ mục ngân hàng câu hỏi phân tầng theo độ khó × chủ đề.
+
+Mỗi câu hỏi có số thứ tự ``seq`` liên tục trong lĩnh vực của nó, dùng làm vị trí bit trong
+bitmap các câu người học đã gặp. Rút đề chỉ bốc ngẫu nhiên trong từng bucket và loại câu đã
+gặp bằng tra bit trực tiếp trên bytes của bitmap (không giải nén), nên chi phí tỉ lệ với số
+câu cần rút thay vì kích thước cả ngân hàng.
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set
+
+import numpy as np
+
+_MAX_REJECTIONS = 8
+
+
+class SeenBitmap:
+    """Bitmap câu đã gặp (bit thứ ``seq`` = đã gặp), tra bit trên bytes gốc không sao chép."""
+
+    def __init__(self, bitmap: Optional[bytes] = None) -> None:
+        self._bytes = np.frombuffer(bitmap or b"", dtype=np.uint8)
+
+    def __contains__(self, seq: int) -> bool:
+        index = seq >> 3
+        return index < self._bytes.size and bool((self._bytes[index] >> (seq & 7)) & 1)
+
+    def unseen(self, seqs: np.ndarray) -> np.ndarray:
+        """Các ``seq`` chưa gặp trong ``seqs``; chỉ đọc các byte ứng với ``seqs``."""
+
+        index = seqs >> 3
+        inside = index < self._bytes.size
+        seen = np.zeros(seqs.size, dtype=bool)
+        seen[inside] = ((self._bytes[index[inside]] >> (seqs[inside] & 7)) & 1).astype(bool)
+        return seqs[~seen]
+
+
+def mark_seen(bitmap: Optional[bytes], seqs: Sequence[int]) -> bytes:
+    """Bật các bit ``seqs`` trong bitmap, nới rộng bitmap khi cần."""
+
+    if not seqs:
+        return bitmap or b""
+    current = np.frombuffer(bitmap or b"", dtype=np.uint8)
+    width = max(current.size, max(seqs) // 8 + 1)
+    bits = np.zeros(width, dtype=np.uint8)
+    bits[: current.size] = current
+    positions = np.asarray(seqs, dtype=np.int64)
+    np.bitwise_or.at(bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+    return bits.tobytes()
+
+
+def allocate(count: int, weights: Mapping[str, float]) -> Dict[str, int]:
+    """Chia ``count`` câu theo tỉ lệ ``weights`` bằng phương pháp phần dư lớn nhất."""
+
+    total = sum(weights.values())
+    if count <= 0 or total <= 0:
+        return {key: 0 for key in weights}
+    exact = {key: count * weight / total for key, weight in weights.items()}
+    shares = {key: int(value) for key, value in exact.items()}
+    remainder = count - sum(shares.values())
+    for key in sorted(exact, key=lambda key: exact[key] - shares[key], reverse=True)[:remainder]:
+        shares[key] += 1
+    return shares
+
+
+class _Bucket:
+    """Trạng thái rút câu trong một bucket cho một lượt lấy đề."""
+
+    def __init__(self, seqs: np.ndarray) -> None:
+        self.seqs = seqs
+        self.exhausted = False
+        self._fallback: Optional[List[int]] = None
+
+    def draw(self, seen: SeenBitmap, taken: Set[int], rng: np.random.Generator) -> Optional[int]:
+        if self.exhausted:
+            return None
+        if self._fallback is None:
+            # Bốc ngẫu nhiên có loại bỏ: kỳ vọng O(1) mỗi câu khi phần lớn bucket chưa gặp.
+            for _ in range(_MAX_REJECTIONS):
+                seq = int(self.seqs[rng.integers(self.seqs.size)])
+                if seq not in seen and seq not in taken:
+                    return seq
+            candidates = seen.unseen(self.seqs)
+            self._fallback = [int(seq) for seq in rng.permutation(candidates)]
+        while self._fallback:
+            seq = self._fallback.pop()
+            if seq not in taken:
+                return seq
+        self.exhausted = True
+        return None
+
+
+def _fill(
+    buckets: List[_Bucket],
+    want: int,
+    seen: SeenBitmap,
+    taken: Set[int],
+    chosen: List[int],
+    rng: np.random.Generator,
+) -> None:
+    """Rút ``want`` câu xoay vòng qua các chủ đề để đề không dồn vào một chủ đề."""
+
+    active = [bucket for bucket in buckets if not bucket.exhausted]
+    rng.shuffle(active)
+    while want > 0 and active:
+        for bucket in list(active):
+            seq = bucket.draw(seen, taken, rng)
+            if seq is None:
+                active.remove(bucket)
+                continue
+            taken.add(seq)
+            chosen.append(seq)
+            want -= 1
+            if want == 0:
+                return
+
+
+class StratifiedItemBank:
+    """Ngân hàng câu hỏi của một lĩnh vực, chia bucket theo (độ khó, chủ đề)."""
+
+    def __init__(self, items: Sequence[Any]) -> None:
+        self.items_by_seq: Dict[int, Any] = {int(item.seq): item for item in items}
+        grouped: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        for seq, item in self.items_by_seq.items():
+            grouped[item.difficulty or "medium"][item.topic or "general"].append(seq)
+        self.buckets: Dict[str, Dict[str, np.ndarray]] = {
+            difficulty: {topic: np.asarray(seqs, dtype=np.int64) for topic, seqs in topics.items()}
+            for difficulty, topics in grouped.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.items_by_seq)
+
+    def sample(
+        self,
+        count: int,
+        seen: Optional[SeenBitmap] = None,
+        difficulty_mix: Optional[Mapping[str, float]] = None,
+        rng: Optional[np.random.Generator] = None,
+    ) -> List[Any]:
+        """Rút tối đa ``count`` câu chưa gặp, phân bổ theo độ khó và xoay vòng chủ đề.
+
+        Độ khó thiếu câu sẽ nhường phần còn lại cho độ khó khác; kết quả có thể ít hơn
+        ``count`` khi người học đã gặp gần hết ngân hàng.
+        """
+
+        rng = rng or np.random.default_rng()
+        seen = seen if seen is not None else SeenBitmap()
+        mix = {
+            difficulty: (difficulty_mix or {}).get(difficulty, 0.0 if difficulty_mix else 1.0)
+            for difficulty in self.buckets
+        }
+        if not any(mix.values()):
+            mix = {difficulty: 1.0 for difficulty in self.buckets}
+
+        states = {
+            difficulty: [_Bucket(seqs) for seqs in topics.values()]
+            for difficulty, topics in self.buckets.items()
+        }
+        taken: Set[int] = set()
+        chosen: List[int] = []
+        order = sorted(states, key=lambda key: -mix[key])
+        targets = allocate(count, mix)
+        for difficulty in order:
+            _fill(states[difficulty], targets[difficulty], seen, taken, chosen, rng)
+        # Độ khó đã cạn câu nhường phần thiếu cho độ khó còn câu.
+        for difficulty in order:
+            if len(chosen) >= count:
+                break
+            _fill(states[difficulty], count - len(chosen), seen, taken, chosen, rng)
+        return [self.items_by_seq[seq] for seq in chosen]
@@ -0,0 +1,234 @@
+"""Đồ thị tiên quyết giữa khóa học và chủ đề, dùng để lập lộ trình học.
+
+Cạnh ``A -> B`` nghĩa là khóa ``A`` cần học trước khóa ``B``, trọng số là thời lượng
+của ``B``. Lộ trình đi từ các khóa phủ chủ đề yếu tới khóa phủ kỹ năng mục tiêu bằng
+Dijkstra, bổ sung toàn bộ khóa tiên quyết còn thiếu rồi sắp theo thứ tự topo (khóa
+ngắn hơn được học trước khi không bị ràng buộc).
+"""
+import heapq
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_COURSE_MINUTES = 60
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+@dataclass(frozen=True)
+class CourseNode:
+    course_id: str
+    title: str
+    duration_minutes: int
+    prerequisites: Tuple[str, ...]
+    topics: FrozenSet[str]
+
+
+def course_duration_minutes(course: Any) -> int:
+    """Tổng thời lượng bài học; khóa chưa có bài học dùng ``estimated_duration_hours``."""
+
+    minutes = sum(lesson.duration_minutes for module in course.modules for lesson in module.lessons)
+    if minutes:
+        return minutes
+    hours = getattr(course, "estimated_duration_hours", None)
+    return int(round(hours * 60)) if hours else DEFAULT_COURSE_MINUTES
+
+
+def course_topics(course: Any) -> FrozenSet[str]:
+    names = list(course.tags) + [module.name for module in course.modules]
+    return frozenset(normalize_topic(name) for name in names if name and name.strip())
+
+
+@dataclass
+class LearningGraph:
+    """Đồ thị khóa học đã dựng sẵn; ``version`` đổi mỗi khi dữ liệu khóa học đổi."""
+
+    version: int = 0
+    nodes: Dict[str, CourseNode] = field(default_factory=dict)
+    dependents: Dict[str, List[str]] = field(default_factory=dict)
+    topic_courses: Dict[str, List[str]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, courses: Iterable[Any], version: int = 0) -> "LearningGraph":
+        graph = cls(version=version)
+        for course in courses:
+            course_id = str(course.id)
+            graph.nodes[course_id] = CourseNode(
+                course_id=course_id,
+                title=course.title,
+                duration_minutes=course_duration_minutes(course),
+                prerequisites=tuple(getattr(course, "prerequisites", []) or []),
+                topics=course_topics(course),
+            )
+        dependents: Dict[str, List[str]] = defaultdict(list)
+        topic_courses: Dict[str, List[str]] = defaultdict(list)
+        for node in graph.nodes.values():
+            for prerequisite in node.prerequisites:
+                if prerequisite in graph.nodes and prerequisite != node.course_id:
+                    dependents[prerequisite].append(node.course_id)
+            for topic in node.topics:
+                topic_courses[topic].append(node.course_id)
+        for course_ids in topic_courses.values():
+            course_ids.sort(key=lambda course_id: (graph.nodes[course_id].duration_minutes, course_id))
+        graph.dependents = dict(dependents)
+        graph.topic_courses = dict(topic_courses)
+        return graph
+
+    def courses_for(self, skill: str) -> List[str]:
+        """Khóa học phủ một chủ đề; ``skill`` cũng có thể là ID khóa học."""
+
+        if skill in self.nodes:
+            return [skill]
+        return self.topic_courses.get(normalize_topic(skill), [])
+
+    def prerequisite_closure(self, course_ids: Iterable[str]) -> Set[str]:
+        closure: Set[str] = set()
+        stack = list(course_ids)
+        while stack:
+            course_id = stack.pop()
+            if course_id in closure or course_id not in self.nodes:
+                continue
+            closure.add(course_id)
+            stack.extend(self.nodes[course_id].prerequisites)
+        return closure
+
+    def closure_minutes(self, course_id: str) -> int:
+        return sum(self.nodes[item].duration_minutes for item in self.prerequisite_closure([course_id]))
+
+
+@dataclass(frozen=True)
+class LearningPlan:
+    course_ids: Tuple[str, ...]
+    uncovered_topics: Tuple[str, ...]
+    total_minutes: int
+
+
+def _shortest_path(graph: LearningGraph, sources: Iterable[str], targets: Set[str]) -> List[str]:
+    """Dijkstra nhiều nguồn theo cạnh tiên quyết, trả đường tới khóa mục tiêu gần nhất."""
+
+    distance: Dict[str, int] = {}
+    previous: Dict[str, Optional[str]] = {}
+    heap: List[Tuple[int, str]] = []
+    for source in sources:
+        cost = graph.nodes[source].duration_minutes
+        if cost < distance.get(source, cost + 1):
+            distance[source] = cost
+            previous[source] = None
+            heapq.heappush(heap, (cost, source))
+    while heap:
+        cost, course_id = heapq.heappop(heap)
+        if cost > distance[course_id]:
+            continue
+        if course_id in targets:
+            path = []
+            current: Optional[str] = course_id
+            while current is not None:
+                path.append(current)
+                current = previous[current]
+            return path[::-1]
+        for dependent in graph.dependents.get(course_id, []):
+            next_cost = cost + graph.nodes[dependent].duration_minutes
+            if next_cost < distance.get(dependent, next_cost + 1):
+                distance[dependent] = next_cost
+                previous[dependent] = course_id
+                heapq.heappush(heap, (next_cost, dependent))
+    return []
+
+
+def topological_order(graph: LearningGraph, course_ids: Set[str]) -> List[str]:
+    """Kahn với hàng đợi ưu tiên theo thời lượng; khóa nằm trong chu trình xếp cuối."""
+
+    indegree = {course_id: 0 for course_id in course_ids}
+    for course_id in course_ids:
+        for prerequisite in set(graph.nodes[course_id].prerequisites):
+            if prerequisite in indegree and prerequisite != course_id:
+                indegree[course_id] += 1
+    heap = [(graph.nodes[course_id].duration_minutes, course_id) for course_id, degree in indegree.items() if degree == 0]
+    heapq.heapify(heap)
+    ordered: List[str] = []
+    while heap:
+        _, course_id = heapq.heappop(heap)
+        ordered.append(course_id)
+        for dependent in graph.dependents.get(course_id, []):
+            if dependent in indegree:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    heapq.heappush(heap, (graph.nodes[dependent].duration_minutes, dependent))
+    if len(ordered) < len(course_ids):
+        remaining = course_ids.difference(ordered)
+        ordered.extend(sorted(remaining, key=lambda course_id: (graph.nodes[course_id].duration_minutes, course_id)))
+    return ordered
+
+
+def plan_path(graph: LearningGraph, weaknesses: Iterable[str], target: Optional[str] = None) -> LearningPlan:
+    """Lập lộ trình từ các chủ đề yếu tới kỹ năng mục tiêu (nếu có)."""
+
+    selected: Set[str] = set()
+    uncovered: List[str] = []
+    sources: Set[str] = set()
+    weak_courses: Dict[str, List[str]] = {}
+    for topic in sorted({normalize_topic(item) for item in weaknesses if item and item.strip()}):
+        course_ids = graph.courses_for(topic)
+        if course_ids:
+            weak_courses[topic] = course_ids
+            sources.update(course_ids)
+        else:
+            uncovered.append(topic)
+
+    if target:
+        targets = set(graph.courses_for(target))
+        path = _shortest_path(graph, sources, targets) if sources and targets else []
+        if not path and targets:
+            path = [min(targets, key=lambda course_id: (graph.closure_minutes(course_id), course_id))]
+        if not targets:
+            uncovered.append(normalize_topic(target))
+        selected.update(path)
+
+    for topic, course_ids in weak_courses.items():
+        if not any(topic in graph.nodes[course_id].topics for course_id in selected):
+            selected.add(min(course_ids, key=lambda course_id: (graph.closure_minutes(course_id), course_id)))
+
+    closure = graph.prerequisite_closure(selected)
+    ordered = topological_order(graph, closure)
+    return LearningPlan(
+        course_ids=tuple(ordered),
+        uncovered_topics=tuple(uncovered),
+        total_minutes=sum(graph.nodes[course_id].duration_minutes for course_id in ordered),
+    )
+
+
+class PlanMemo:
+    """LRU các lộ trình đã tính, khóa theo ``(phiên bản đồ thị, tập điểm yếu, mục tiêu)``."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, LearningPlan]" = OrderedDict()
+
+    @staticmethod
+    def key(graph: LearningGraph, weaknesses: Iterable[str], target: Optional[str]) -> Hashable:
+        return (
+            graph.version,
+            frozenset(normalize_topic(item) for item in weaknesses if item and item.strip()),
+            normalize_topic(target) if target else None,
+        )
+
+    def plan(self, graph: LearningGraph, weaknesses: Iterable[str], target: Optional[str] = None) -> LearningPlan:
+        weaknesses = list(weaknesses)
+        key = self.key(graph, weaknesses, target)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            return cached
+        result = plan_path(graph, weaknesses, target)
+        self._entries[key] = result
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,88 @@
+"""Bảng quyền RBAC biên dịch sẵn thành bitset.
+
+Mỗi cặp ``(resource, action)`` được gán một bit. Mỗi vai trò có hai mặt nạ: ``global``
+(được làm trên mọi tài nguyên) và ``owned`` (chỉ trên tài nguyên mình sở hữu, ví dụ giảng
+viên với lớp/khóa học của mình). Kiểm tra quyền chỉ là một lần tra dict và một phép ``&``.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Tuple
+
+ALL = "all"
+OWN = "own"
+
+Grants = Mapping[str, Mapping[str, Mapping[str, str]]]
+
+
+@dataclass(frozen=True)
+class PermissionTable:
+    """Bảng quyền bất biến: ``bits`` ánh xạ ``(resource, action)`` sang bit, mặt nạ theo vai trò."""
+
+    bits: Mapping[Tuple[str, str], int]
+    global_masks: Mapping[str, int]
+    owned_masks: Mapping[str, int]
+
+    def bit(self, resource: str, action: str) -> int:
+        try:
+            return self.bits[(resource, action)]
+        except KeyError:
+            raise KeyError(f"Quyền chưa được khai báo: {resource}:{action}") from None
+
+    def scope(self, role: Optional[str], bit: int) -> Optional[str]:
+        """``all``, ``own`` hoặc ``None`` nếu vai trò không có quyền ứng với ``bit``."""
+
+        if self.global_masks.get(role, 0) & bit:
+            return ALL
+        if self.owned_masks.get(role, 0) & bit:
+            return OWN
+        return None
+
+    def allows(self, role: Optional[str], bit: int, is_owner: bool = False) -> bool:
+        if self.global_masks.get(role, 0) & bit:
+            return True
+        return is_owner and bool(self.owned_masks.get(role, 0) & bit)
+
+    def grants_for(self, role: str) -> List[Tuple[str, str, str]]:
+        """Danh sách ``(resource, action, scope)`` của vai trò, theo thứ tự bit."""
+
+        granted = []
+        for (resource, action), bit in self.bits.items():
+            scope = self.scope(role, bit)
+            if scope is not None:
+                granted.append((resource, action, scope))
+        return granted
+
+
+def compile_permissions(grants: Grants, superusers: Iterable[str] = ()) -> PermissionTable:
+    """Biên dịch ``role -> resource -> action -> scope`` thành bảng bitset.
+
+    Vai trò trong ``superusers`` nhận mọi quyền đã khai báo với phạm vi ``all``.
+    """
+
+    pairs = sorted(
+        {(resource, action) for resources in grants.values() for resource, actions in resources.items() for action in actions}
+    )
+    bits = {pair: 1 << index for index, pair in enumerate(pairs)}
+    global_masks = {}
+    owned_masks = {}
+    for role, resources in grants.items():
+        global_mask = owned_mask = 0
+        for resource, actions in resources.items():
+            for action, scope in actions.items():
+                if scope == ALL:
+                    global_mask |= bits[(resource, action)]
+                elif scope == OWN:
+                    owned_mask |= bits[(resource, action)]
+                else:
+                    raise ValueError(f"Phạm vi quyền không hợp lệ cho {role} {resource}:{action}: {scope}")
+        global_masks[role] = global_mask
+        owned_masks[role] = owned_mask
+    full = (1 << len(pairs)) - 1
+    for role in superusers:
+        global_masks[role] = full
+        owned_masks[role] = 0
+    return PermissionTable(
+        bits=MappingProxyType(bits),
+        global_masks=MappingProxyType(global_masks),
+        owned_masks=MappingProxyType(owned_masks),
+    )
@@ -0,0 +1,173 @@
+"""Gợi ý khóa học bằng phân rã ma trận phản hồi ngầm (implicit ALS).
+
+Huấn luyện offline (``scripts/train_recommender.py``) trên ma trận thưa người học ×
+khóa học, lưu ma trận nhân tố dạng ``.npy``. Khi phục vụ, ``RecommenderModel`` mở các
+file bằng ``mmap`` nên nhiều worker dùng chung trang bộ nhớ của hệ điều hành; top-k
+chỉ là một phép nhân ma trận-vector cộng ``argpartition``.
+"""
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Collection, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+MANIFEST_FILE = "manifest.json"
+USER_FACTORS_FILE = "user_factors.npy"
+ITEM_FACTORS_FILE = "item_factors.npy"
+POPULARITY_FILE = "item_popularity.npy"
+
+
+def build_interaction_matrix(
+    interactions: Iterable[Tuple[str, str, float]],
+) -> Tuple[sparse.csr_matrix, List[str], List[str]]:
+    """Dựng ma trận CSR người học × khóa học, cộng dồn trọng số trùng lặp."""
+
+    user_index: Dict[str, int] = {}
+    item_index: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    values: List[float] = []
+    for user_id, item_id, weight in interactions:
+        rows.append(user_index.setdefault(user_id, len(user_index)))
+        cols.append(item_index.setdefault(item_id, len(item_index)))
+        values.append(weight)
+    matrix = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float32), (rows, cols)),
+        shape=(len(user_index), len(item_index)),
+    )
+    matrix.sum_duplicates()
+    return matrix, list(user_index), list(item_index)
+
+
+def _solve_side(
+    interactions: sparse.csr_matrix, fixed: np.ndarray, regularization: float, alpha: float
+) -> np.ndarray:
+    """Giải least squares có trọng số cho mọi hàng của ``interactions`` với ``fixed`` cố định."""
+
+    factors = fixed.shape[1]
+    gram = fixed.T @ fixed + regularization * np.eye(factors)
+    solved = np.zeros((interactions.shape[0], factors), dtype=np.float64)
+    indptr, indices, data = interactions.indptr, interactions.indices, interactions.data
+    for row in range(interactions.shape[0]):
+        start, end = indptr[row], indptr[row + 1]
+        if start == end:
+            continue
+        items = fixed[indices[start:end]]
+        confidence = alpha * data[start:end]
+        # (YᵀY + Yᵀ(Cᵤ − I)Y + λI) xᵤ = YᵀCᵤpᵤ, chỉ cộng phần của khóa học đã tương tác.
+        lhs = gram + (items.T * confidence) @ items
+        rhs = items.T @ (1.0 + confidence)
+        solved[row] = np.linalg.solve(lhs, rhs)
+    return solved
+
+
+def train_als(
+    interactions: sparse.csr_matrix,
+    factors: int = 32,
+    regularization: float = 0.1,
+    alpha: float = 20.0,
+    iterations: int = 15,
+    seed: int = 42,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Huấn luyện ALS cho phản hồi ngầm (Hu, Koren & Volinsky 2008)."""
+
+    rng = np.random.default_rng(seed)
+    users, items = interactions.shape
+    user_factors = rng.normal(scale=0.01, size=(users, factors))
+    item_factors = rng.normal(scale=0.01, size=(items, factors))
+    by_item = interactions.T.tocsr()
+    for _ in range(iterations):
+        user_factors = _solve_side(interactions, item_factors, regularization, alpha)
+        item_factors = _solve_side(by_item, user_factors, regularization, alpha)
+    return user_factors.astype(np.float32), item_factors.astype(np.float32)
+
+
+def save_model(
+    directory: os.PathLike,
+    user_factors: np.ndarray,
+    item_factors: np.ndarray,
+    user_ids: Sequence[str],
+    item_ids: Sequence[str],
+    popularity: np.ndarray,
+) -> Path:
+    """Ghi model vào thư mục tạm rồi đổi tên, tránh worker đọc phải file đang ghi dở."""
+
+    target = Path(directory)
+    staging = target.with_name(target.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    np.save(staging / USER_FACTORS_FILE, np.ascontiguousarray(user_factors, dtype=np.float32))
+    np.save(staging / ITEM_FACTORS_FILE, np.ascontiguousarray(item_factors, dtype=np.float32))
+    np.save(staging / POPULARITY_FILE, np.asarray(popularity, dtype=np.float32))
+    manifest = {"user_ids": list(user_ids), "item_ids": list(item_ids), "factors": int(item_factors.shape[1])}
+    (staging / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+
+    backup = target.with_name(target.name + ".old")
+    shutil.rmtree(backup, ignore_errors=True)
+    if target.exists():
+        target.rename(backup)
+    staging.rename(target)
+    shutil.rmtree(backup, ignore_errors=True)
+    return target
+
+
+@dataclass
+class RecommenderModel:
+    """Model đã nạp để phục vụ gợi ý."""
+
+    user_factors: np.ndarray
+    item_factors: np.ndarray
+    popularity: np.ndarray
+    user_index: Dict[str, int]
+    item_ids: List[str]
+    item_index: Dict[str, int]
+
+    @classmethod
+    def load(cls, directory: os.PathLike) -> "RecommenderModel":
+        path = Path(directory)
+        manifest = json.loads((path / MANIFEST_FILE).read_text(encoding="utf-8"))
+        item_ids = manifest["item_ids"]
+        return cls(
+            user_factors=np.load(path / USER_FACTORS_FILE, mmap_mode="r"),
+            item_factors=np.load(path / ITEM_FACTORS_FILE, mmap_mode="r"),
+            popularity=np.load(path / POPULARITY_FILE, mmap_mode="r"),
+            user_index={user_id: row for row, user_id in enumerate(manifest["user_ids"])},
+            item_ids=item_ids,
+            item_index={item_id: row for row, item_id in enumerate(item_ids)},
+        )
+
+    def recommend(
+        self,
+        user_id: str,
+        exclude: Collection[str] = (),
+        k: int = 10,
+        candidates: Optional[Collection[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Top-k khóa học cho người học, bỏ qua khóa đã đăng ký.
+
+        Người học chưa có trong model (mới đăng ký) nhận gợi ý theo độ phổ biến.
+        ``candidates`` giới hạn kết quả trong một tập khóa học (ví dụ cùng lĩnh vực).
+        """
+
+        row = self.user_index.get(user_id)
+        if row is None:
+            scores = np.array(self.popularity, dtype=np.float32)
+        else:
+            scores = self.item_factors @ self.user_factors[row]
+        if candidates is not None:
+            allowed = np.zeros(len(self.item_ids), dtype=bool)
+            allowed[[self.item_index[item] for item in candidates if item in self.item_index]] = True
+            scores = np.where(allowed, scores, -np.inf)
+        masked = [self.item_index[item] for item in exclude if item in self.item_index]
+        if masked:
+            scores[masked] = -np.inf
+        k = min(k, scores.size)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.item_ids[index], float(scores[index])) for index in top if np.isfinite(scores[index])]
@@ -0,0 +1,68 @@
+"""Tính bucket thời gian và khóa tổng hợp cho analytics rollup.
+
+Mỗi sự kiện được cộng vào bucket giờ/ngày/tuần của từng phạm vi liên quan (người học,
+khóa học, lớp, toàn nền tảng). Dashboard chỉ đọc vài bucket thay vì quét lịch sử thô.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+GRANULARITIES = ("hour", "day", "week")
+
+RollupKey = Tuple[str, str, str, datetime]
+
+_STEP = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Đầu bucket chứa ``moment``; tuần bắt đầu từ thứ Hai (UTC)."""
+
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Granularity không hợp lệ: {granularity}")
+
+
+def bucket_range(start: datetime, end: datetime, granularity: str) -> List[datetime]:
+    """Các đầu bucket từ bucket chứa ``start`` tới bucket chứa ``end`` (bao gồm)."""
+
+    current = bucket_start(start, granularity)
+    last = bucket_start(end, granularity)
+    buckets = []
+    while current <= last:
+        buckets.append(current)
+        current += _STEP[granularity]
+    return buckets
+
+
+def rollup_keys(moment: datetime, scopes: Iterable[Tuple[str, str]]) -> List[RollupKey]:
+    scopes = list(scopes)
+    return [
+        (scope, scope_id, granularity, bucket_start(moment, granularity))
+        for granularity in GRANULARITIES
+        for scope, scope_id in scopes
+    ]
+
+
+def merge_counters(left: Mapping[str, float], right: Mapping[str, float]) -> Dict[str, float]:
+    merged = dict(left)
+    for name, value in right.items():
+        merged[name] = merged.get(name, 0) + value
+    return merged
+
+
+def sum_counters(rows: Iterable[Mapping[str, float]]) -> Counter:
+    total: Counter = Counter()
+    for row in rows:
+        total.update(row)
+    return total
+
+
+def percent_change(current: float, previous: float) -> Optional[float]:
+    if not previous:
+        return None
+    return round((current - previous) * 100.0 / previous, 2)
@@ -0,0 +1,220 @@
+"""Chỉ mục độ tương đồng nội dung giữa các khóa học.
+
+Độ tương đồng = ``TEXT_WEIGHT`` × cosine TF-IDF (tiêu đề, mô tả, mục tiêu, bài học)
++ ``TAG_WEIGHT`` × Jaccard trên tags. Mỗi khóa học giữ ``top_k`` láng giềng; khi một
+khóa học thay đổi chỉ hàng của nó và các hàng có nó trong danh sách láng giềng
+(hoặc nay đủ điểm để vào danh sách) được tính lại.
+"""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+TEXT_WEIGHT = 0.7
+TAG_WEIGHT = 0.3
+DEFAULT_TOP_K = 50
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+Neighbour = Tuple[str, float]
+
+_BUILD_BLOCK = 256
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and not token.isdigit()]
+
+
+def course_tokens(course: Any) -> List[str]:
+    """Token của khóa học; tiêu đề được lặp hai lần để tăng trọng số."""
+
+    parts = [course.title, course.title, course.description]
+    for module in getattr(course, "modules", []) or []:
+        parts.append(module.name)
+        parts.extend(module.objectives)
+        for lesson in module.lessons:
+            parts.extend([lesson.title, lesson.summary])
+    return tokenize(" ".join(part for part in parts if part))
+
+
+def normalize_tags(tags: Iterable[str]) -> Set[str]:
+    return {tag.strip().lower() for tag in tags if tag and tag.strip()}
+
+
+def _replace_row(matrix: sparse.csr_matrix, row: int, vector: sparse.csr_matrix) -> sparse.csr_matrix:
+    return sparse.vstack([matrix[:row], vector, matrix[row + 1 :]], format="csr")
+
+
+@dataclass
+class CourseSimilarityIndex:
+    """Vector TF-IDF, tags và danh sách láng giềng của toàn bộ khóa học."""
+
+    top_k: int = DEFAULT_TOP_K
+    course_ids: List[str] = field(default_factory=list)
+    positions: Dict[str, int] = field(default_factory=dict)
+    titles: Dict[str, str] = field(default_factory=dict)
+    vocabulary: Dict[str, int] = field(default_factory=dict)
+    idf: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    vectors: Optional[sparse.csr_matrix] = None
+    tag_vocabulary: Dict[str, int] = field(default_factory=dict)
+    tag_matrix: Optional[sparse.csr_matrix] = None
+    neighbours: Dict[str, List[Neighbour]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, courses: Iterable[Any], top_k: int = DEFAULT_TOP_K) -> "CourseSimilarityIndex":
+        """Dựng toàn bộ chỉ mục (IDF tính lại từ đầu)."""
+
+        index = cls(top_k=top_k)
+        documents = []
+        tag_rows = []
+        for course in courses:
+            course_id = str(course.id)
+            index.positions[course_id] = len(index.course_ids)
+            index.course_ids.append(course_id)
+            index.titles[course_id] = course.title
+            tag_rows.append(normalize_tags(course.tags))
+            documents.append(course_tokens(course))
+
+        document_frequency: Counter = Counter()
+        for tokens in documents:
+            document_frequency.update(set(tokens))
+        index.vocabulary = {term: column for column, term in enumerate(sorted(document_frequency))}
+        total = len(documents)
+        index.idf = np.array(
+            [math.log((1 + total) / (1 + document_frequency[term])) + 1.0 for term in sorted(document_frequency)]
+        )
+        if not documents:
+            return index
+        index.vectors = sparse.vstack([index._vectorize(tokens) for tokens in documents], format="csr")
+        for tags in tag_rows:
+            for tag in tags:
+                index.tag_vocabulary.setdefault(tag, len(index.tag_vocabulary))
+        index.tag_matrix = sparse.vstack([index._tag_vector(tags) for tags in tag_rows], format="csr")
+
+        for start in range(0, len(index.course_ids), _BUILD_BLOCK):
+            rows = list(range(start, min(start + _BUILD_BLOCK, len(index.course_ids))))
+            block = index._scores_for_rows(rows)
+            for offset, row in enumerate(rows):
+                index.neighbours[index.course_ids[row]] = index._top_neighbours(row, block[offset])
+        return index
+
+    def _vectorize(self, tokens: List[str]) -> sparse.csr_matrix:
+        counts = Counter(token for token in tokens if token in self.vocabulary)
+        columns = [self.vocabulary[token] for token in counts]
+        values = np.array([(1 + math.log(count)) * self.idf[self.vocabulary[token]] for token, count in counts.items()])
+        norm = np.linalg.norm(values) if values.size else 0.0
+        if norm > 0:
+            values = values / norm
+        return sparse.csr_matrix((values, ([0] * len(columns), columns)), shape=(1, len(self.vocabulary)))
+
+    def _tag_vector(self, tags: Set[str]) -> sparse.csr_matrix:
+        for tag in tags:
+            self.tag_vocabulary.setdefault(tag, len(self.tag_vocabulary))
+        columns = [self.tag_vocabulary[tag] for tag in tags]
+        return sparse.csr_matrix(
+            (np.ones(len(columns)), ([0] * len(columns), columns)), shape=(1, len(self.tag_vocabulary))
+        )
+
+    def _aligned_tags(self) -> sparse.csr_matrix:
+        width = len(self.tag_vocabulary)
+        if self.tag_matrix.shape[1] != width:
+            self.tag_matrix = sparse.csr_matrix(
+                (self.tag_matrix.data, self.tag_matrix.indices, self.tag_matrix.indptr),
+                shape=(self.tag_matrix.shape[0], width),
+            )
+        return self.tag_matrix
+
+    def _scores_for_rows(self, rows: List[int]) -> np.ndarray:
+        """Điểm tương đồng của các hàng ``rows`` với mọi khóa học (ma trận len(rows) × N)."""
+
+        text = (self.vectors[rows] @ self.vectors.T).toarray()
+        tags = self._aligned_tags()
+        intersection = (tags[rows] @ tags.T).toarray()
+        sizes = np.asarray(tags.sum(axis=1)).ravel()
+        union = sizes[rows][:, None] + sizes[None, :] - intersection
+        jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+        scores = TEXT_WEIGHT * text + TAG_WEIGHT * jaccard
+        scores[np.arange(len(rows)), rows] = -np.inf
+        return scores
+
+    def _scores_for(self, row: int) -> np.ndarray:
+        return self._scores_for_rows([row])[0]
+
+    def _top_neighbours(self, row: int, scores: np.ndarray) -> List[Neighbour]:
+        k = min(self.top_k, scores.size - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.course_ids[column], round(float(scores[column]), 6)) for column in top if scores[column] > 0]
+
+    def upsert(self, course: Any) -> Set[str]:
+        """Thêm/cập nhật một khóa học, trả tập ID khóa học có danh sách láng giềng thay đổi.
+
+        IDF giữ nguyên từ lần dựng toàn bộ gần nhất; từ mới chưa có trong từ vựng bị bỏ qua
+        cho đến lần dựng lại định kỳ.
+        """
+
+        course_id = str(course.id)
+        vector = self._vectorize(course_tokens(course))
+        tag_vector = self._tag_vector(normalize_tags(course.tags))
+        self.titles[course_id] = course.title
+        if course_id in self.positions:
+            row = self.positions[course_id]
+            self.vectors = _replace_row(self.vectors, row, vector)
+            self.tag_matrix = _replace_row(self._aligned_tags(), row, tag_vector)
+        else:
+            row = len(self.course_ids)
+            self.positions[course_id] = row
+            self.course_ids.append(course_id)
+            if self.vectors is None:
+                self.vectors, self.tag_matrix = vector, tag_vector
+            else:
+                self.vectors = sparse.vstack([self.vectors, vector], format="csr")
+                self.tag_matrix = sparse.vstack([self._aligned_tags(), tag_vector], format="csr")
+
+        scores = self._scores_for(row)
+        self.neighbours[course_id] = self._top_neighbours(row, scores)
+        affected = {course_id}
+        for other_row, other_id in enumerate(self.course_ids):
+            if other_row == row:
+                continue
+            current = [item for item in self.neighbours.get(other_id, []) if item[0] != course_id]
+            was_listed = len(current) != len(self.neighbours.get(other_id, []))
+            score = float(scores[other_row])
+            qualifies = score > 0 and (len(current) < self.top_k or score > current[-1][1])
+            if not (was_listed or qualifies):
+                continue
+            if qualifies:
+                current.append((course_id, round(score, 6)))
+                current.sort(key=lambda item: -item[1])
+            if was_listed and len(current) < min(self.top_k, len(self.course_ids) - 1):
+                # Khóa học vừa rời danh sách: tính lại hàng để lấp chỗ trống.
+                current = self._top_neighbours(other_row, self._scores_for(other_row))
+            self.neighbours[other_id] = current[: self.top_k]
+            affected.add(other_id)
+        return affected
+
+    def remove(self, course_id: str) -> Set[str]:
+        """Gỡ khóa học khỏi chỉ mục, trả các khóa học cần ghi lại danh sách láng giềng."""
+
+        row = self.positions.pop(course_id, None)
+        if row is None:
+            return set()
+        keep = [position for position in range(len(self.course_ids)) if position != row]
+        self.vectors = self.vectors[keep]
+        self.tag_matrix = self._aligned_tags()[keep]
+        del self.course_ids[row]
+        self.titles.pop(course_id, None)
+        self.neighbours.pop(course_id, None)
+        self.positions = {other: position for position, other in enumerate(self.course_ids)}
+        affected = set()
+        for other_row, other_id in enumerate(self.course_ids):
+            if any(item[0] == course_id for item in self.neighbours.get(other_id, [])):
+                self.neighbours[other_id] = self._top_neighbours(other_row, self._scores_for(other_row))
+                affected.add(other_id)
+        return affected
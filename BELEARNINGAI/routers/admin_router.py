@@ -1,7 +1,8 @@
 """Router cho API quản trị."""
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query, status
 
 from controllers.admin_controller import (
     handle_admin_suspend_user,
@@ -17,7 +18,18 @@ from controllers.admin_controller import (
     handle_reject_course,
     handle_system_backup,
 )
-from schemas.admin import AdminBroadcastRequest, AdminSystemStats, SystemSummary, UserAuditLog
+from middleware.rbac import require_permission
+from models.models import UserRole
+from schemas.admin import (
+    AdminBroadcastRequest,
+    AdminSystemStats,
+    AdminUserFilters,
+    AdminUserPage,
+    AnnouncementAcceptedResponse,
+    AuditLogFilters,
+    AuditLogPage,
+    SystemSummary,
+)
 from schemas.common import MessageResponse
 from schemas.permissions import RolePermissionMatrix
 
@@ -29,10 +41,16 @@ async def system_stats_route() -> AdminSystemStats:
     return await handle_system_stats()
 
 
-@router.post("/announcements", response_model=MessageResponse, summary="Gửi thông báo toàn hệ thống")
-async def broadcast_route(payload: AdminBroadcastRequest) -> MessageResponse:
-    await handle_broadcast(payload)
-    return MessageResponse(message="Đã ghi nhận thông báo, sẽ gửi async")
+@router.post(
+    "/announcements",
+    response_model=AnnouncementAcceptedResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Gửi thông báo toàn hệ thống (fan-out bằng job nền hoặc ghép lúc đọc)",
+)
+async def broadcast_route(
+    payload: AdminBroadcastRequest, current_user: dict = Depends(require_permission("system", "publish_announcement"))
+) -> AnnouncementAcceptedResponse:
+    return await handle_broadcast(payload, current_user)
 
 
 @router.get(
@@ -44,9 +62,24 @@ async def dashboard_overview_route() -> SystemSummary:
     return await handle_system_overview()
 
 
-@router.get("/audit/logs", response_model=List[UserAuditLog], summary="Danh sách audit log")
-async def audit_logs_route(limit: int = 5) -> List[UserAuditLog]:
-    return await handle_audit_logs(limit)
+@router.get("/audit/logs", response_model=AuditLogPage, summary="Danh sách audit log")
+async def audit_logs_route(
+    actor_id: Optional[str] = None,
+    action: Optional[str] = None,
+    target: Optional[str] = None,
+    outcome: Optional[Literal["success", "failure"]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(require_permission("audit", "read")),
+) -> AuditLogPage:
+    """Mới nhất trước; sự kiện vừa xảy ra xuất hiện sau tối đa một chu kỳ ``audit_flush_interval_ms``."""
+
+    filters = AuditLogFilters(
+        actor_id=actor_id, action=action, target=target, outcome=outcome, since=since, until=until
+    )
+    return await handle_audit_logs(filters, limit, cursor)
 
 
 @router.get("/permissions/matrix", response_model=List[RolePermissionMatrix], summary="Bảng quyền hệ thống")
@@ -54,19 +87,41 @@ async def permission_matrix_route() -> List[RolePermissionMatrix]:
     return await handle_roles_matrix()
 
 
-@router.get("/users", response_model=MessageResponse, summary="Danh sách người dùng")
-async def admin_users_route() -> MessageResponse:
-    return await handle_admin_users_list()
+@router.get("/users", response_model=AdminUserPage, summary="Danh sách người dùng")
+async def admin_users_route(
+    role: Optional[UserRole] = None,
+    user_status: Optional[str] = Query(None, alias="status"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    email_prefix: Optional[str] = Query(None, max_length=254),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(require_permission("users", "list")),
+) -> AdminUserPage:
+    """Lọc theo vai trò, trạng thái, khoảng ngày tạo và tiền tố email; phân trang bằng ``cursor``."""
+
+    filters = AdminUserFilters(
+        role=role,
+        status=user_status,
+        created_from=created_from,
+        created_to=created_to,
+        email_prefix=email_prefix,
+    )
+    return await handle_admin_users_list(filters, limit, cursor)
 
 
 @router.put("/users/{user_id}/role", response_model=MessageResponse, summary="Cập nhật vai trò người dùng")
-async def admin_update_role_route(user_id: str, payload: dict) -> MessageResponse:
-    return await handle_admin_update_role(user_id, payload)
+async def admin_update_role_route(
+    user_id: str, payload: dict, current_user: dict = Depends(require_permission("users", "update"))
+) -> MessageResponse:
+    return await handle_admin_update_role(user_id, payload, current_user)
 
 
 @router.delete("/users/{user_id}", response_model=MessageResponse, summary="Vô hiệu hóa người dùng")
-async def admin_suspend_user_route(user_id: str) -> MessageResponse:
-    return await handle_admin_suspend_user(user_id)
+async def admin_suspend_user_route(
+    user_id: str, current_user: dict = Depends(require_permission("users", "suspend"))
+) -> MessageResponse:
+    return await handle_admin_suspend_user(user_id, current_user)
 
 
 @router.get("/courses/pending", response_model=MessageResponse, summary="Khóa học chờ duyệt")
@@ -1,5 +1,5 @@
 """Router cho các tính năng AI ngoài chat cơ bản."""
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, status
 
 from controllers.ai_controller import (
     handle_ai_chat,
@@ -8,15 +8,25 @@ from controllers.ai_controller import (
     handle_ai_learning_path,
     handle_ai_quiz_generation,
 )
-from schemas.ai import AIChatRequest, AIChatResponse, AIContentRequest, AIContentResponse
+from middleware.auth import get_current_user
+from schemas.ai import AIChatRequest, AIChatResponse, AIContentRequest
 from schemas.common import MessageResponse
+from schemas.job import JobAcceptedResponse
+from schemas.recommendation import LearningPathRequest, LearningPathResponse
 
 router = APIRouter(tags=["ai"])
 
 
-@router.post("/content-generation", response_model=AIContentResponse, summary="Sinh nội dung khóa học bằng AI")
-async def ai_content_generation_route(payload: AIContentRequest) -> AIContentResponse:
-    return await handle_ai_course_generation(payload)
+@router.post(
+    "/content-generation",
+    response_model=JobAcceptedResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Sinh nội dung khóa học bằng AI (job nền)",
+)
+async def ai_content_generation_route(
+    payload: AIContentRequest, current_user: dict = Depends(get_current_user)
+) -> JobAcceptedResponse:
+    return await handle_ai_course_generation(payload, current_user)
 
 
 @router.post("/chat", response_model=AIChatResponse, summary="Chat AI nâng cao")
@@ -34,6 +44,8 @@ async def ai_course_recommendations_route(payload: dict) -> MessageResponse:
     return await handle_ai_course_recommendations(payload)
 
 
-@router.post("/learning-path", response_model=MessageResponse, summary="AI tạo lộ trình học")
-async def ai_learning_path_route(payload: dict) -> MessageResponse:
-    return await handle_ai_learning_path(payload)
+@router.post("/learning-path", response_model=LearningPathResponse, summary="Lập lộ trình học theo đồ thị tiên quyết")
+async def ai_learning_path_route(
+    payload: LearningPathRequest, current_user: dict = Depends(get_current_user)
+) -> LearningPathResponse:
+    return await handle_ai_learning_path(payload, current_user)
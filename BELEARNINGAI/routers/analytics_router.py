@@ -1,7 +1,10 @@
 """Router cho analytics & reporting."""
-from fastapi import APIRouter, Depends
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
 
 from controllers.analytics_controller import (
+    handle_admin_active_users,
     handle_admin_courses,
     handle_admin_system,
     handle_admin_users,
@@ -14,7 +17,15 @@ from controllers.analytics_controller import (
     handle_student_time_spent,
 )
 from middleware.auth import get_current_user
-from schemas.analytics import StudentDashboardResponse
+from middleware.rbac import require_permission
+from schemas.analytics import (
+    ActiveUsersResponse,
+    AnalyticsReportResponse,
+    InstructorCoursesResponse,
+    InstructorStudentsResponse,
+    StudentDashboardResponse,
+    TimeSeriesResponse,
+)
 from schemas.common import MessageResponse
 
 router = APIRouter(tags=["analytics"])
@@ -25,24 +36,39 @@ async def student_dashboard_route(current_user: dict = Depends(get_current_user)
     return await handle_student_dashboard(current_user)
 
 
-@router.get("/instructor/overview", response_model=MessageResponse, summary="Dashboard giảng viên")
-async def instructor_overview_route(current_user: dict = Depends(get_current_user)) -> MessageResponse:
+@router.get("/instructor/overview", response_model=AnalyticsReportResponse, summary="Dashboard giảng viên")
+async def instructor_overview_route(
+    current_user: dict = Depends(require_permission("analytics", "view_instructor")),
+) -> AnalyticsReportResponse:
     return await handle_instructor_overview(current_user)
 
 
-@router.get("/admin/system", response_model=MessageResponse, summary="Dashboard hệ thống")
-async def admin_system_route(current_user: dict = Depends(get_current_user)) -> MessageResponse:
+@router.get("/admin/system", response_model=AnalyticsReportResponse, summary="Dashboard hệ thống")
+async def admin_system_route(
+    current_user: dict = Depends(require_permission("analytics", "view_system")),
+) -> AnalyticsReportResponse:
     return await handle_admin_system(current_user)
 
 
+@router.get("/admin/active-users", response_model=ActiveUsersResponse, summary="Người dùng hoạt động DAU/WAU/MAU")
+async def admin_active_users_route(
+    current_user: dict = Depends(require_permission("analytics", "view_system")),
+) -> ActiveUsersResponse:
+    return await handle_admin_active_users(current_user)
+
+
 @router.get("/student/progress", response_model=MessageResponse, summary="Tiến độ chi tiết theo khóa")
 async def student_progress_route(current_user: dict = Depends(get_current_user)) -> MessageResponse:
     return await handle_student_progress(current_user)
 
 
-@router.get("/student/time-spent", response_model=MessageResponse, summary="Thời gian học")
-async def student_time_spent_route(current_user: dict = Depends(get_current_user)) -> MessageResponse:
-    return await handle_student_time_spent(current_user)
+@router.get("/student/time-spent", response_model=TimeSeriesResponse, summary="Thời gian học")
+async def student_time_spent_route(
+    granularity: Literal["hour", "day", "week"] = "day",
+    periods: int = Query(30, ge=1, le=366),
+    current_user: dict = Depends(get_current_user),
+) -> TimeSeriesResponse:
+    return await handle_student_time_spent(current_user, granularity, periods)
 
 
 @router.get("/student/achievements", response_model=MessageResponse, summary="Thành tích học tập")
@@ -50,14 +76,19 @@ async def student_achievements_route(current_user: dict = Depends(get_current_us
     return await handle_student_achievements(current_user)
 
 
-@router.get("/instructor/courses", response_model=MessageResponse, summary="Hiệu suất khóa học")
-async def instructor_courses_route(current_user: dict = Depends(get_current_user)) -> MessageResponse:
+@router.get("/instructor/courses", response_model=InstructorCoursesResponse, summary="Hiệu suất khóa học")
+async def instructor_courses_route(
+    current_user: dict = Depends(require_permission("analytics", "view_instructor")),
+) -> InstructorCoursesResponse:
     return await handle_instructor_courses(current_user)
 
 
-@router.get("/instructor/students", response_model=MessageResponse, summary="Hoạt động học viên")
-async def instructor_students_route(current_user: dict = Depends(get_current_user)) -> MessageResponse:
-    return await handle_instructor_students(current_user)
+@router.get("/instructor/students", response_model=InstructorStudentsResponse, summary="Hoạt động học viên")
+async def instructor_students_route(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(require_permission("analytics", "view_instructor")),
+) -> InstructorStudentsResponse:
+    return await handle_instructor_students(current_user, limit)
 
 
 @router.get("/admin/users", response_model=MessageResponse, summary="Thống kê người dùng")
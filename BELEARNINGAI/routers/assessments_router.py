@@ -4,6 +4,7 @@ from typing import List
 from fastapi import APIRouter, Depends
 
 from controllers.assessment_controller import (
+    handle_adaptive_answer,
     handle_assessment_categories,
     handle_assessment_history,
     handle_assessment_recommendations,
@@ -12,13 +13,17 @@ from controllers.assessment_controller import (
     handle_skill_test,
     handle_start_assessment,
     handle_submit_assessment,
+    handle_topic_insights,
 )
 from middleware.auth import get_current_user
 from schemas.assessment import (
+    AdaptiveAnswerRequest,
+    AdaptiveStepResponse,
     AssessmentResultResponse,
     AssessmentStartRequest,
     AssessmentSubmitRequest,
     AssessmentSummary,
+    AssessmentTopicInsight,
     RecommendationItem,
 )
 from schemas.common import MessageResponse
@@ -31,6 +36,15 @@ async def list_assessment_categories() -> MessageResponse:
     return await handle_assessment_categories()
 
 
+@router.get(
+    "/categories/{category}/topics",
+    response_model=List[AssessmentTopicInsight],
+    summary="Mức độ thành thạo theo chủ đề của người dùng",
+)
+async def topic_insights_route(category: str, current_user: dict = Depends(get_current_user)) -> List[AssessmentTopicInsight]:
+    return await handle_topic_insights(category, current_user)
+
+
 @router.post("/start", response_model=AssessmentSummary, summary="Bắt đầu bài đánh giá")
 async def start_assessment_route(
     payload: AssessmentStartRequest, current_user: dict = Depends(get_current_user)
@@ -39,8 +53,21 @@ async def start_assessment_route(
 
 
 @router.post("/{assessment_id}/submit", response_model=AssessmentSummary, summary="Nộp bài đánh giá")
-async def submit_assessment_route(assessment_id: str, payload: AssessmentSubmitRequest) -> AssessmentSummary:
-    return await handle_submit_assessment(assessment_id, payload)
+async def submit_assessment_route(
+    assessment_id: str, payload: AssessmentSubmitRequest, current_user: dict = Depends(get_current_user)
+) -> AssessmentSummary:
+    return await handle_submit_assessment(assessment_id, payload, current_user)
+
+
+@router.post(
+    "/{assessment_id}/answer",
+    response_model=AdaptiveStepResponse,
+    summary="Trả lời câu hiện tại của bài đánh giá thích ứng",
+)
+async def adaptive_answer_route(
+    assessment_id: str, payload: AdaptiveAnswerRequest, current_user: dict = Depends(get_current_user)
+) -> AdaptiveStepResponse:
+    return await handle_adaptive_answer(assessment_id, payload, current_user)
 
 
 @router.post(
@@ -49,9 +76,11 @@ async def submit_assessment_route(assessment_id: str, payload: AssessmentSubmitR
     summary="Phân tích kết quả skill-test và gợi ý khóa học",
 )
 async def skill_test_route(
-    payload: AssessmentSubmitRequest, current_user: dict = Depends(get_current_user)
+    payload: AssessmentSubmitRequest,
+    category: str = "programming",
+    current_user: dict = Depends(get_current_user),
 ) -> AssessmentResultResponse:
-    return await handle_skill_test(payload, current_user)
+    return await handle_skill_test(payload, current_user, category)
 
 
 @router.get(
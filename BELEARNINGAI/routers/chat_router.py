@@ -35,10 +35,12 @@ async def start_session_route(
 
 
 @router.post("/sessions/{session_id}/messages", response_model=ChatResponse, summary="Gửi câu hỏi tới AI")
-async def send_message_route(session_id: str, message: str) -> ChatResponse:
+async def send_message_route(
+    session_id: str, message: str, current_user: dict = Depends(get_current_user)
+) -> ChatResponse:
     """Gửi tin nhắn trong phiên chat."""
 
-    return await handle_send_message(session_id, message)
+    return await handle_send_message(session_id, message, current_user.get("sub"))
 
 
 @router.delete(
@@ -1,36 +1,54 @@
 """Router cho quản lý lớp học."""
-from typing import List
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from controllers.classes_controller import (
     handle_create_class,
     handle_class_detail,
     handle_generate_invite,
+    handle_join_class,
     handle_list_classes,
     handle_list_roster,
     handle_remove_student,
+    handle_roster_summary,
 )
 from middleware.auth import get_current_user
-from schemas.classes import ClassInvitation, RosterStudent
+from middleware.rbac import require_permission
+from models.models import MembershipStatus
+from schemas.classes import (
+    ClassInvitation,
+    ClassJoinRequest,
+    ClassJoinResponse,
+    ClassResponse,
+    RosterPage,
+    RosterSummary,
+)
 from schemas.common import MessageResponse
 from schemas.enrollment import ClassCreateRequest
 
 router = APIRouter(tags=["classes"])
 
 
-@router.get("/", response_model=list[dict], summary="Danh sách lớp của giảng viên")
-async def list_classes_route(current_user: dict = Depends(get_current_user)) -> list[dict]:
+@router.get("/", response_model=List[ClassResponse], summary="Danh sách lớp của giảng viên")
+async def list_classes_route(current_user: dict = Depends(get_current_user)) -> List[ClassResponse]:
     return await handle_list_classes(current_user)
 
 
-@router.post("/", response_model=dict, summary="Tạo lớp học mới")
+@router.post("/", response_model=ClassResponse, summary="Tạo lớp học mới")
 async def create_class_route(
-    payload: ClassCreateRequest, current_user: dict = Depends(get_current_user)
-) -> dict:
+    payload: ClassCreateRequest, current_user: dict = Depends(require_permission("classes", "create"))
+) -> ClassResponse:
     return await handle_create_class(payload, current_user)
 
 
+@router.post("/join", response_model=ClassJoinResponse, summary="Tham gia lớp bằng mã")
+async def join_class_route(
+    payload: ClassJoinRequest, current_user: dict = Depends(get_current_user)
+) -> ClassJoinResponse:
+    return await handle_join_class(payload, current_user)
+
+
 @router.get("/{class_id}", response_model=MessageResponse, summary="Chi tiết lớp học")
 async def class_detail_route(class_id: str) -> MessageResponse:
     return await handle_class_detail(class_id)
@@ -47,17 +65,44 @@ async def class_analytics_route(class_id: str) -> MessageResponse:
     response_model=ClassInvitation,
     summary="Tạo mã mời lớp học",
 )
-async def generate_invite_route(class_id: str) -> ClassInvitation:
-    return await handle_generate_invite(class_id)
+async def generate_invite_route(
+    class_id: str, current_user: dict = Depends(require_permission("classes", "manage"))
+) -> ClassInvitation:
+    return await handle_generate_invite(class_id, current_user)
 
 
 @router.get(
     "/{class_id}/roster",
-    response_model=List[RosterStudent],
+    response_model=RosterPage,
     summary="Danh sách học viên trong lớp",
 )
-async def roster_preview_route(class_id: str) -> List[RosterStudent]:
-    return await handle_list_roster(class_id)
+async def roster_route(
+    class_id: str,
+    sort: Literal["progress", "last_active", "name"] = "progress",
+    order: Literal["asc", "desc"] = "desc",
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    member_status: Optional[MembershipStatus] = Query(None, alias="status"),
+    tag: Optional[str] = None,
+    current_user: dict = Depends(require_permission("classes", "manage")),
+) -> RosterPage:
+    return await handle_list_roster(
+        class_id,
+        current_user,
+        sort,
+        order,
+        limit,
+        cursor,
+        member_status.value if member_status else None,
+        tag,
+    )
+
+
+@router.get("/{class_id}/roster/summary", response_model=RosterSummary, summary="Tóm tắt roster lớp học")
+async def roster_summary_route(
+    class_id: str, current_user: dict = Depends(require_permission("classes", "manage"))
+) -> RosterSummary:
+    return await handle_roster_summary(class_id, current_user)
 
 
 @router.delete(
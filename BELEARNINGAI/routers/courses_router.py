@@ -1,7 +1,7 @@
 """Router khóa học."""
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, status
 
 from controllers.course_controller import (
     handle_create_chapter,
@@ -15,14 +15,18 @@ from controllers.course_controller import (
     handle_list_courses,
     handle_list_public_courses,
     handle_recommended_courses,
+    handle_related_courses,
     handle_search_courses,
     handle_update_chapter,
     handle_update_visibility,
     handle_course_categories,
 )
 from middleware.auth import get_current_user
+from middleware.rbac import require_permission
 from models.models import CourseCreate, CourseResponse
 from schemas.common import MessageResponse
+from schemas.course import RelatedCourseItem
+from schemas.job import JobAcceptedResponse
 
 router = APIRouter(tags=["courses"])
 
@@ -42,21 +46,16 @@ async def create_course_route(payload: CourseCreate, current_user: str = Depends
     return await handle_create_course(payload, current_user)
 
 
-@router.get("/{course_id}", response_model=CourseResponse, summary="Xem chi tiết khóa học")
-async def get_course_route(course_id: str) -> CourseResponse:
-    """Endpoint lấy chi tiết khóa học."""
-
-    return await handle_get_course(course_id)
-
-
 @router.get("/public", response_model=MessageResponse, summary="Danh sách khóa học công khai")
 async def public_courses_route() -> MessageResponse:
     return await handle_list_public_courses()
 
 
-@router.get("/recommended", response_model=MessageResponse, summary="Gợi ý khóa học")
-async def recommended_courses_route(current_user: dict = Depends(get_current_user)) -> MessageResponse:
-    return await handle_recommended_courses(current_user)
+@router.get("/recommended", response_model=List[RelatedCourseItem], summary="Gợi ý khóa học")
+async def recommended_courses_route(
+    limit: int = Query(10, ge=1, le=50), current_user: dict = Depends(get_current_user)
+) -> List[RelatedCourseItem]:
+    return await handle_recommended_courses(current_user, limit)
 
 
 @router.get("/search", response_model=MessageResponse, summary="Tìm kiếm khóa học")
@@ -69,8 +68,27 @@ async def course_categories_route() -> MessageResponse:
     return await handle_course_categories()
 
 
-@router.post("/from-prompt", response_model=MessageResponse, summary="Tạo khóa học bằng AI")
-async def course_from_prompt_route(payload: dict, current_user: dict = Depends(get_current_user)) -> MessageResponse:
+@router.get("/{course_id}", response_model=CourseResponse, summary="Xem chi tiết khóa học")
+async def get_course_route(course_id: str) -> CourseResponse:
+    """Endpoint lấy chi tiết khóa học."""
+
+    return await handle_get_course(course_id)
+
+
+@router.get("/{course_id}/related", response_model=List[RelatedCourseItem], summary="Khóa học tương tự")
+async def related_courses_route(course_id: str, limit: int = Query(10, ge=1, le=50)) -> List[RelatedCourseItem]:
+    return await handle_related_courses(course_id, limit)
+
+
+@router.post(
+    "/from-prompt",
+    response_model=JobAcceptedResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Tạo khóa học bằng AI (job nền)",
+)
+async def course_from_prompt_route(
+    payload: dict, current_user: dict = Depends(get_current_user)
+) -> JobAcceptedResponse:
     return await handle_create_course_from_prompt(payload, current_user)
 
 
@@ -88,7 +106,7 @@ async def duplicate_course_route(
 
 @router.patch("/{course_id}/visibility", response_model=MessageResponse, summary="Cập nhật trạng thái hiển thị")
 async def update_visibility_route(
-    course_id: str, payload: dict, current_user: dict = Depends(get_current_user)
+    course_id: str, payload: dict, current_user: dict = Depends(require_permission("courses", "update"))
 ) -> MessageResponse:
     return await handle_update_visibility(course_id, payload, current_user)
 
@@ -107,8 +125,10 @@ async def list_chapters_route(course_id: str) -> MessageResponse:
     response_model=MessageResponse,
     summary="Thêm chương mới",
 )
-async def create_chapter_route(course_id: str, payload: dict) -> MessageResponse:
-    return await handle_create_chapter(course_id, payload)
+async def create_chapter_route(
+    course_id: str, payload: dict, current_user: dict = Depends(require_permission("courses", "update"))
+) -> MessageResponse:
+    return await handle_create_chapter(course_id, payload, current_user)
 
 
 @router.put(
@@ -116,8 +136,13 @@ async def create_chapter_route(course_id: str, payload: dict) -> MessageResponse
     response_model=MessageResponse,
     summary="Cập nhật chương",
 )
-async def update_chapter_route(course_id: str, chapter_id: str, payload: dict) -> MessageResponse:
-    return await handle_update_chapter(course_id, chapter_id, payload)
+async def update_chapter_route(
+    course_id: str,
+    chapter_id: str,
+    payload: dict,
+    current_user: dict = Depends(require_permission("courses", "update")),
+) -> MessageResponse:
+    return await handle_update_chapter(course_id, chapter_id, payload, current_user)
 
 
 @router.delete(
@@ -125,5 +150,7 @@ async def update_chapter_route(course_id: str, chapter_id: str, payload: dict) -
     response_model=MessageResponse,
     summary="Xóa chương",
 )
-async def delete_chapter_route(course_id: str, chapter_id: str) -> MessageResponse:
-    return await handle_delete_chapter(course_id, chapter_id)
+async def delete_chapter_route(
+    course_id: str, chapter_id: str, current_user: dict = Depends(require_permission("courses", "update"))
+) -> MessageResponse:
+    return await handle_delete_chapter(course_id, chapter_id, current_user)
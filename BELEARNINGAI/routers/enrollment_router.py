@@ -1,9 +1,11 @@
 """Router enrollment."""
-from typing import List
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, Query, UploadFile
 
 from controllers.enrollment_controller import (
+    handle_bulk_enrollments,
+    handle_bulk_enrollments_csv,
     handle_enroll,
     handle_get_course_progress,
     handle_list_enrollments,
@@ -12,13 +14,45 @@ from controllers.enrollment_controller import (
     handle_update_progress,
 )
 from middleware.auth import get_current_user
+from middleware.rbac import require_permission
 from models.models import EnrollmentResponse
 from schemas.common import MessageResponse
-from schemas.enrollment import ProgressSnapshot
+from schemas.enrollment import BulkEnrollmentRequest, BulkEnrollmentResponse, ProgressEventRequest, ProgressSnapshot
 
 router = APIRouter(tags=["enrollments"])
 
 
+@router.post(
+    "/courses/{course_id}/bulk",
+    response_model=BulkEnrollmentResponse,
+    summary="Đăng ký/hủy đăng ký hàng loạt",
+)
+async def bulk_enrollments_route(
+    course_id: str,
+    payload: BulkEnrollmentRequest,
+    current_user: dict = Depends(require_permission("courses", "manage_enrollment")),
+) -> BulkEnrollmentResponse:
+    """Nhận user ID hoặc email; kết quả trả theo đúng thứ tự đầu vào."""
+
+    return await handle_bulk_enrollments(course_id, payload, current_user)
+
+
+@router.post(
+    "/courses/{course_id}/bulk/csv",
+    response_model=BulkEnrollmentResponse,
+    summary="Đăng ký/hủy đăng ký hàng loạt từ CSV",
+)
+async def bulk_enrollments_csv_route(
+    course_id: str,
+    file: UploadFile = File(...),
+    action: Literal["enroll", "unenroll"] = "enroll",
+    current_user: dict = Depends(require_permission("courses", "manage_enrollment")),
+) -> BulkEnrollmentResponse:
+    """CSV có cột ``user_id`` hoặc ``email`` (hoặc một cột không tiêu đề)."""
+
+    return await handle_bulk_enrollments_csv(course_id, await file.read(), action, current_user)
+
+
 @router.post("/{course_id}", response_model=EnrollmentResponse, summary="Đăng ký khóa học")
 async def enroll_route(course_id: str, current_user: dict = Depends(get_current_user)) -> EnrollmentResponse:
     """Đăng ký khóa học."""
@@ -59,14 +93,20 @@ async def course_progress_route(
     summary="Cập nhật tiến độ khóa học",
 )
 async def course_progress_update_route(
-    course_id: str, payload: dict, current_user: dict = Depends(get_current_user)
+    course_id: str, payload: ProgressEventRequest, current_user: dict = Depends(get_current_user)
 ) -> MessageResponse:
     user_id = current_user.get("sub", "demo-user")
     return await handle_post_course_progress(user_id, course_id, payload)
 
 
 @router.patch("/{enrollment_id}/progress", response_model=EnrollmentResponse, summary="Cập nhật tiến độ")
-async def update_progress_route(enrollment_id: str, progress: float) -> EnrollmentResponse:
-    """Cập nhật tiến độ học tập."""
+async def update_progress_route(
+    enrollment_id: str,
+    lesson_id: Optional[str] = None,
+    progress: Optional[float] = Query(None, ge=0, le=100),
+    current_user: dict = Depends(get_current_user),
+) -> EnrollmentResponse:
+    """Đánh dấu hoàn thành ``lesson_id`` (tiến độ tự tính lại) hoặc ghi đè ``progress``."""
 
-    return await handle_update_progress(enrollment_id, progress)
+    user_id = current_user.get("sub", "demo-user")
+    return await handle_update_progress(enrollment_id, user_id, progress, lesson_id)
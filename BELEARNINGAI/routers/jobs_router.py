@@ -0,0 +1,20 @@
+"""Router theo dõi job nền."""
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from controllers.job_controller import handle_get_job, handle_job_events
+from middleware.auth import get_current_user
+from schemas.job import JobStatusResponse
+
+router = APIRouter(tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse, summary="Trạng thái job nền")
+async def job_status_route(job_id: str, current_user: dict = Depends(get_current_user)) -> JobStatusResponse:
+    return await handle_get_job(job_id, current_user)
+
+
+@router.get("/{job_id}/events", summary="Luồng SSE theo dõi job đến khi hoàn tất")
+async def job_events_route(job_id: str, current_user: dict = Depends(get_current_user)) -> StreamingResponse:
+    stream = await handle_job_events(job_id, current_user)
+    return StreamingResponse(stream, media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,29 +1,49 @@
 """Router thông báo."""
-from typing import List
+from typing import Optional
 
-from fastapi import APIRouter, Depends, Header
+from fastapi import APIRouter, Depends, Query
 
-from controllers.notification_controller import handle_list_notifications, handle_mark_as_read
-from models.models import NotificationResponse
+from controllers.notification_controller import (
+    handle_list_notifications,
+    handle_mark_all_as_read,
+    handle_mark_as_read,
+    handle_unread_count,
+)
+from middleware.auth import get_current_user
+from schemas.notification import MarkAllReadResponse, NotificationPage, NotificationResponse, UnreadCountResponse
 
 router = APIRouter(tags=["notifications"])
 
 
-def get_current_user(user_id: str | None = Header(default="demo-user")) -> str:
-    """Giả lập user hiện tại."""
+@router.get("/", response_model=NotificationPage, summary="Danh sách thông báo")
+async def list_notifications_route(
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Giá trị next_cursor của trang trước"),
+    current_user: dict = Depends(get_current_user),
+) -> NotificationPage:
+    """Lấy thông báo của user, gồm cả thông báo chung theo vai trò, mới nhất trước."""
 
-    return user_id or "demo-user"
+    return await handle_list_notifications(current_user, limit, cursor)
 
 
-@router.get("/", response_model=List[NotificationResponse], summary="Danh sách thông báo")
-async def list_notifications_route(current_user: str = Depends(get_current_user)) -> List[NotificationResponse]:
-    """Lấy thông báo của user."""
+@router.get("/unread-count", response_model=UnreadCountResponse, summary="Số thông báo chưa đọc")
+async def unread_count_route(current_user: dict = Depends(get_current_user)) -> UnreadCountResponse:
+    """Badge chưa đọc, đọc từ bộ đếm của user."""
 
-    return await handle_list_notifications(current_user)
+    return await handle_unread_count(current_user)
+
+
+@router.post("/read-all", response_model=MarkAllReadResponse, summary="Đánh dấu tất cả đã đọc")
+async def mark_all_read_route(current_user: dict = Depends(get_current_user)) -> MarkAllReadResponse:
+    """Đánh dấu toàn bộ hộp thư đã đọc."""
+
+    return await handle_mark_all_as_read(current_user)
 
 
 @router.patch("/{notification_id}/read", response_model=NotificationResponse, summary="Đánh dấu đã đọc")
-async def mark_read_route(notification_id: str) -> NotificationResponse:
+async def mark_read_route(
+    notification_id: str, current_user: dict = Depends(get_current_user)
+) -> NotificationResponse:
     """Đánh dấu thông báo đã đọc."""
 
-    return await handle_mark_as_read(notification_id)
+    return await handle_mark_as_read(notification_id, current_user)
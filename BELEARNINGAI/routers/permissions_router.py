@@ -2,12 +2,12 @@
 from fastapi import APIRouter, Depends
 
 from controllers.permissions_controller import handle_permissions
-from schemas.permissions import PermissionResponse
+from schemas.permissions import RolePermissionMatrix
 from middleware.auth import get_current_user
 
 router = APIRouter(tags=["permissions"])
 
 
-@router.get("/me", response_model=PermissionResponse)
+@router.get("/me", response_model=RolePermissionMatrix)
 async def my_permissions_route(current_user: dict = Depends(get_current_user)):
     return await handle_permissions(current_user)
@@ -1,9 +1,11 @@
 """Router tiến độ học tập."""
 from fastapi import APIRouter, Depends
 
-from controllers.progress_controller import handle_get_progress, handle_update_progress
+from controllers.progress_controller import handle_get_progress, handle_record_progress_event, handle_update_progress
 from middleware.auth import get_current_user
 from models.models import ProgressResponse
+from schemas.common import MessageResponse
+from schemas.enrollment import ProgressEventRequest
 
 router = APIRouter(tags=["progress"])
 
@@ -26,3 +28,15 @@ async def update_progress_route(
 
     user_id = current_user.get("sub", "demo-user")
     return await handle_update_progress(user_id, course_id, progress)
+
+
+@router.post("/course/{course_id}/events", response_model=MessageResponse, summary="Ghi nhận sự kiện học tập")
+async def record_progress_event_route(
+    course_id: str,
+    payload: ProgressEventRequest,
+    current_user: dict = Depends(get_current_user),
+) -> MessageResponse:
+    """Sự kiện được gộp ghi theo lô; client nên gửi lại nếu không nhận được phản hồi."""
+
+    user_id = current_user.get("sub", "demo-user")
+    return await handle_record_progress_event(user_id, course_id, payload)
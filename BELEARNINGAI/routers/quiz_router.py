@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends
 
 from controllers.quiz_controller import (
     handle_adaptive_quiz,
+    handle_adaptive_quiz_answer,
     handle_ai_quiz_builder,
     handle_create_quiz,
     handle_delete_quiz,
@@ -17,12 +18,22 @@ from controllers.quiz_controller import (
     handle_quiz_result_detail,
     handle_start_quiz,
     handle_submit_quiz,
+    handle_submit_quiz_batch,
     handle_update_quiz_detail,
 )
 from middleware.auth import get_current_user
+from middleware.rbac import require_permission
 from models.models import QuizResponse
+from schemas.assessment import AdaptiveAnswerRequest, AdaptiveStepResponse
 from schemas.common import MessageResponse
-from schemas.quiz import QuizGenerationResponse
+from schemas.quiz import (
+    AdaptiveQuizRequest,
+    QuizBatchResultResponse,
+    QuizBatchSubmitRequest,
+    QuizGenerationResponse,
+    QuizResultResponse,
+    QuizSubmitRequest,
+)
 
 router = APIRouter(tags=["quiz"])
 
@@ -76,9 +87,22 @@ async def quiz_from_content_route(payload: dict) -> MessageResponse:
     return await handle_quiz_from_content(payload)
 
 
-@router.post("/adaptive", response_model=MessageResponse, summary="Tạo quiz thích ứng")
-async def adaptive_quiz_route(payload: dict) -> MessageResponse:
-    return await handle_adaptive_quiz(payload)
+@router.post("/adaptive", response_model=AdaptiveStepResponse, summary="Tạo quiz thích ứng")
+async def adaptive_quiz_route(
+    payload: AdaptiveQuizRequest, current_user: dict = Depends(get_current_user)
+) -> AdaptiveStepResponse:
+    return await handle_adaptive_quiz(payload, current_user)
+
+
+@router.post(
+    "/adaptive/{assessment_id}/answer",
+    response_model=AdaptiveStepResponse,
+    summary="Trả lời câu hiện tại của quiz thích ứng",
+)
+async def adaptive_quiz_answer_route(
+    assessment_id: str, payload: AdaptiveAnswerRequest, current_user: dict = Depends(get_current_user)
+) -> AdaptiveStepResponse:
+    return await handle_adaptive_quiz_answer(assessment_id, payload, current_user)
 
 
 @router.post("/ai-builder", response_model=QuizGenerationResponse, summary="Sinh template quiz bằng AI")
@@ -93,9 +117,20 @@ async def start_quiz_route(quiz_id: str) -> MessageResponse:
     return await handle_start_quiz(quiz_id)
 
 
-@router.post("/{quiz_id}/submit", response_model=MessageResponse, summary="Nộp bài quiz")
-async def submit_quiz_route(quiz_id: str, payload: dict) -> MessageResponse:
-    return await handle_submit_quiz(quiz_id, payload)
+@router.post("/{quiz_id}/submit", response_model=QuizResultResponse, summary="Nộp bài quiz")
+async def submit_quiz_route(
+    quiz_id: str, payload: QuizSubmitRequest, current_user: dict = Depends(get_current_user)
+) -> QuizResultResponse:
+    return await handle_submit_quiz(quiz_id, payload, current_user)
+
+
+@router.post("/{quiz_id}/submit/batch", response_model=QuizBatchResultResponse, summary="Chấm bài quiz hàng loạt")
+async def submit_quiz_batch_route(
+    quiz_id: str,
+    payload: QuizBatchSubmitRequest,
+    current_user: dict = Depends(require_permission("quiz", "grade_batch")),
+) -> QuizBatchResultResponse:
+    return await handle_submit_quiz_batch(quiz_id, payload, current_user)
 
 
 @router.get("/{quiz_id}/result", response_model=MessageResponse, summary="Kết quả quiz")
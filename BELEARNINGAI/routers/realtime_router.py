@@ -0,0 +1,13 @@
+"""Router kênh đẩy sự kiện realtime."""
+from fastapi import APIRouter, WebSocket
+
+from controllers.realtime_controller import handle_websocket
+
+router = APIRouter(tags=["realtime"])
+
+
+@router.websocket("/ws")
+async def realtime_socket_route(websocket: WebSocket) -> None:
+    """Kết nối WebSocket nhận thông báo, tin nhắn chat và trạng thái job (xác thực bằng ``?token=``)."""
+
+    await handle_websocket(websocket)
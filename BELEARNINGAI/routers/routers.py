@@ -11,10 +11,12 @@ from .classes_router import router as classes_router
 from .courses_router import router as courses_router
 from .dashboard_router import router as dashboard_router
 from .enrollment_router import router as enrollment_router
+from .jobs_router import router as jobs_router
 from .notification_router import router as notification_router
 from .permissions_router import router as permissions_router
 from .progress_router import router as progress_router
 from .quiz_router import router as quiz_router
+from .realtime_router import router as realtime_router
 from .recommendation_router import router as recommendation_router
 from .search_router import router as search_router
 from .upload_router import router as upload_router
@@ -40,3 +42,5 @@ api_router.include_router(assessments_router, prefix="/assessments")
 api_router.include_router(admin_router, prefix="/admin")
 api_router.include_router(search_router, prefix="/search")
 api_router.include_router(recommendation_router, prefix="/recommendations")
+api_router.include_router(jobs_router, prefix="/jobs")
+api_router.include_router(realtime_router, prefix="/realtime")
@@ -1,8 +1,10 @@
 """Schemas cho module quản trị."""
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from models.models import UserResponse, UserRole
 
 
 class AdminUserUpdate(BaseModel):
@@ -10,10 +12,45 @@ class AdminUserUpdate(BaseModel):
     status: str
 
 
+class AdminUserFilters(BaseModel):
+    """Bộ lọc danh sách người dùng cho admin."""
+
+    role: Optional[UserRole] = None
+    status: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    email_prefix: Optional[str] = Field(default=None, max_length=254)
+
+
+class AdminUserPage(BaseModel):
+    """Một trang người dùng kèm tổng số khớp bộ lọc."""
+
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+    total: int
+    total_is_estimate: bool = Field(
+        default=False, description="Tổng là ước lượng (không lọc) hoặc là cận dưới khi vượt ngưỡng đếm"
+    )
+
+
 class AdminBroadcastRequest(BaseModel):
-    title: str
-    message: str
-    audience_roles: List[str]
+    title: str = Field(..., min_length=1)
+    message: str = Field(..., min_length=1)
+    audience_roles: List[str] = Field(..., min_length=1)
+    mode: Optional[Literal["fan_out", "on_read"]] = Field(
+        default=None, description="Bỏ trống để tự chọn theo số người nhận"
+    )
+
+
+class AnnouncementAcceptedResponse(BaseModel):
+    """Phản hồi khi thông báo chung đã được ghi nhận."""
+
+    announcement_id: str
+    mode: str
+    status: str
+    audience_size: int
+    job_id: Optional[str] = None
+    status_url: Optional[str] = None
 
 
 class AdminSystemStats(BaseModel):
@@ -39,6 +76,28 @@ class UserAuditLog(BaseModel):
 
     action_id: str
     actor_id: str
+    actor_role: Optional[str] = None
     action: str
     target: str
+    outcome: str = "success"
+    ip: Optional[str] = None
+    metadata: Dict[str, str] = Field(default_factory=dict)
     created_at: datetime
+
+
+class AuditLogFilters(BaseModel):
+    """Bộ lọc audit log."""
+
+    actor_id: Optional[str] = None
+    action: Optional[str] = None
+    target: Optional[str] = None
+    outcome: Optional[Literal["success", "failure"]] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+
+class AuditLogPage(BaseModel):
+    """Một trang audit log mới nhất trước."""
+
+    items: List[UserAuditLog]
+    next_cursor: Optional[str] = None
@@ -1,6 +1,6 @@
 """Schemas cho module analytics."""
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -19,3 +19,60 @@ class DashboardSection(BaseModel):
 class StudentDashboardResponse(BaseModel):
     generated_at: datetime
     sections: List[DashboardSection]
+
+
+class AnalyticsReportResponse(StudentDashboardResponse):
+    """Báo cáo analytics dạng section cho giảng viên/admin."""
+
+
+class TimeSeriesPoint(BaseModel):
+    bucket_start: datetime
+    value: float
+
+
+class TimeSeriesResponse(BaseModel):
+    metric: str
+    granularity: str
+    points: List[TimeSeriesPoint]
+
+
+class ActiveUsersResponse(BaseModel):
+    """Số người dùng hoạt động ước lượng bằng HyperLogLog (sai số ~1%)."""
+
+    dau: int
+    wau: int
+    mau: int
+    generated_at: datetime
+
+
+class CoursePerformanceItem(BaseModel):
+    course_id: str
+    title: str
+    learners: int
+    completion_rate: float
+    average_progress: float
+    study_minutes: int
+    quiz_attempts: int
+    average_score: float
+
+
+class InstructorCoursesResponse(BaseModel):
+    """Báo cáo khóa học của giảng viên; ``exported_at`` là thời điểm export dữ liệu."""
+
+    exported_at: Optional[datetime] = None
+    courses: List[CoursePerformanceItem]
+
+
+class StudentActivityItem(BaseModel):
+    user_id: str
+    courses: int
+    average_progress: float
+    study_minutes: int
+    quiz_attempts: int
+    average_score: float
+    last_activity: Optional[datetime] = None
+
+
+class InstructorStudentsResponse(BaseModel):
+    exported_at: Optional[datetime] = None
+    students: List[StudentActivityItem]
@@ -18,12 +18,18 @@ class AssessmentQuestion(BaseModel):
 class AssessmentStartRequest(BaseModel):
     category: str
     assessment_type: str = "skill_assessment"
+    adaptive: bool = False
+    max_questions: Optional[int] = None
 
 
 class AssessmentSubmitRequest(BaseModel):
     answers: List[int]
 
 
+class AdaptiveAnswerRequest(BaseModel):
+    answer: Optional[int] = None
+
+
 class AssessmentSummary(BaseModel):
     id: str
     user_id: str
@@ -34,6 +40,20 @@ class AssessmentSummary(BaseModel):
     strengths: List[str]
     weaknesses: List[str]
     created_at: datetime
+    questions: List[AssessmentQuestion] = []
+
+
+class AdaptiveStepResponse(BaseModel):
+    """Trạng thái bài thích ứng sau mỗi câu trả lời."""
+
+    assessment_id: str
+    theta: float
+    standard_error: Optional[float] = None
+    answered: int
+    correct: Optional[bool] = None
+    finished: bool
+    next_question: Optional[AssessmentQuestion] = None
+    summary: Optional[AssessmentSummary] = None
 
 
 class AssessmentTopicInsight(BaseModel):
@@ -2,7 +2,24 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from schemas.enrollment import ClassScheduleItem
+
+
+class ClassResponse(BaseModel):
+    """Thông tin lớp học."""
+
+    id: str
+    name: str
+    course_id: str
+    instructor_id: str
+    description: Optional[str] = None
+    max_students: Optional[int] = None
+    schedule: List[ClassScheduleItem] = []
+    status: str
+    student_count: int = 0
+    created_at: datetime
 
 
 class ClassInvitation(BaseModel):
@@ -14,6 +31,17 @@ class ClassInvitation(BaseModel):
     invite_url: str
 
 
+class ClassJoinRequest(BaseModel):
+    code: str = Field(..., min_length=4, max_length=32)
+
+
+class ClassJoinResponse(BaseModel):
+    class_id: str
+    course_id: str
+    joined_at: datetime
+    already_member: bool = False
+
+
 class RosterStudent(BaseModel):
     """Thông tin học viên trong danh sách lớp."""
 
@@ -24,3 +52,21 @@ class RosterStudent(BaseModel):
     last_active: Optional[datetime] = None
     progress_percent: float = 0.0
     tags: List[str] = []
+
+
+class RosterPage(BaseModel):
+    """Một trang roster; ``next_cursor`` rỗng khi đã hết."""
+
+    items: List[RosterStudent]
+    next_cursor: Optional[str] = None
+
+
+class RosterSummary(BaseModel):
+    """Tóm tắt roster của lớp (cache, làm mới khi có sự kiện tiến độ)."""
+
+    class_id: str
+    student_count: int
+    average_progress: float
+    completed_count: int
+    active_last_7_days: int
+    generated_at: datetime
@@ -36,3 +36,9 @@ class CourseResponse(CourseBase):
     content: List[CourseChapter] = Field(default_factory=list)
     created_at: datetime
     updated_at: datetime
+
+
+class RelatedCourseItem(BaseModel):
+    course_id: str
+    title: str
+    score: float
@@ -1,8 +1,8 @@
 """Schemas cho module enrollment & lớp học."""
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ClassScheduleItem(BaseModel):
@@ -45,3 +45,35 @@ class ProgressSnapshot(BaseModel):
     streak_days: int
     last_activity: datetime
     learning_sessions: List[StudySession]
+
+
+class ProgressEventRequest(BaseModel):
+    """Sự kiện học tập gửi từ client (hoàn thành bài học, thời gian học)."""
+
+    lesson_id: Optional[str] = None
+    duration_minutes: int = Field(default=0, ge=0, le=24 * 60)
+    activity: Optional[str] = None
+
+
+class BulkEnrollmentRequest(BaseModel):
+    """Danh sách user ID hoặc email cần đăng ký/hủy đăng ký khóa học."""
+
+    user_ids: List[str] = Field(..., min_length=1)
+    action: Literal["enroll", "unenroll"] = "enroll"
+
+
+class BulkEnrollmentRow(BaseModel):
+    """Kết quả của một dòng: enrolled, already_enrolled, unenrolled, not_enrolled,
+    not_found, invalid, duplicate hoặc failed."""
+
+    identifier: str
+    user_id: Optional[str] = None
+    status: str
+    detail: Optional[str] = None
+
+
+class BulkEnrollmentResponse(BaseModel):
+    course_id: str
+    action: str
+    summary: Dict[str, int]
+    results: List[BulkEnrollmentRow]
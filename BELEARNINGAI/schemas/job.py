@@ -0,0 +1,29 @@
+"""Schemas cho module job nền."""
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class JobAcceptedResponse(BaseModel):
+    """Phản hồi 202 khi yêu cầu đã được đưa vào hàng đợi."""
+
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+
+
+class JobStatusResponse(BaseModel):
+    """Trạng thái hiện tại của một job nền."""
+
+    job_id: str
+    job_type: str
+    status: str
+    attempts: int
+    result: Optional[dict] = None
+    progress: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
@@ -1,6 +1,6 @@
 """Schemas cho module thông báo."""
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -17,3 +17,24 @@ class NotificationResponse(BaseModel):
     message: str
     is_read: bool
     created_at: datetime
+
+
+class NotificationPage(BaseModel):
+    """Một trang hộp thư, mới nhất trước; ``next_cursor`` rỗng khi đã hết."""
+
+    items: List[NotificationResponse]
+    next_cursor: Optional[str] = None
+    unread_count: int
+
+
+class UnreadCountResponse(BaseModel):
+    """Số thông báo chưa đọc cho badge."""
+
+    unread_count: int
+
+
+class MarkAllReadResponse(BaseModel):
+    """Kết quả đánh dấu toàn bộ hộp thư đã đọc."""
+
+    marked: int
+    unread_count: int
@@ -1,12 +1,15 @@
 """Schemas cho module kiểm tra quyền."""
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PermissionResponse(BaseModel):
     resource: str
     actions: List[str]
+    owned_actions: List[str] = Field(
+        default_factory=list, description="Hành động chỉ được làm trên tài nguyên mình sở hữu"
+    )
 
 
 class RolePermissionMatrix(BaseModel):
@@ -1,5 +1,5 @@
 """Schemas cho module quiz."""
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from pydantic import BaseModel
 
@@ -17,11 +17,52 @@ class QuizCreateRequest(BaseModel):
     questions: List[QuizQuestionPayload]
 
 
+class QuizSubmitRequest(BaseModel):
+    """Bài nộp: chỉ số phương án hoặc nội dung phương án cho từng câu."""
+
+    answers: List[Optional[Union[int, str]]]
+
+
+class AdaptiveQuizRequest(BaseModel):
+    """Yêu cầu tạo quiz thích ứng từ ngân hàng câu hỏi của một lĩnh vực."""
+
+    category: str
+    max_questions: Optional[int] = None
+
+
 class QuizResultResponse(BaseModel):
     quiz_id: str
     score: float
     percentage: float
     attempts: int
+    max_score: float = 0.0
+    correct: List[bool] = []
+
+
+class QuizBatchSubmission(BaseModel):
+    user_id: str
+    answers: List[Optional[Union[int, str]]]
+
+
+class QuizBatchSubmitRequest(BaseModel):
+    """Nộp bài hàng loạt, ví dụ giảng viên thu bài thi cả lớp."""
+
+    submissions: List[QuizBatchSubmission]
+
+
+class QuizBatchResultItem(BaseModel):
+    user_id: str
+    score: float
+    percentage: float
+    correct: List[bool]
+
+
+class QuizBatchResultResponse(BaseModel):
+    quiz_id: str
+    max_score: float
+    average_percentage: float
+    question_accuracy: List[float]
+    results: List[QuizBatchResultItem]
 
 
 class QuizQuestionTemplate(BaseModel):
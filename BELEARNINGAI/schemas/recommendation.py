@@ -1,10 +1,28 @@
 """Schemas cho module gợi ý thông minh."""
-from typing import List
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class RecommendationResponse(BaseModel):
     user_id: str
     recommended_courses: List[str]
     learning_path: List[str]
+
+
+class LearningPathRequest(BaseModel):
+    target_skill: Optional[str] = Field(default=None, description="Chủ đề hoặc ID khóa học muốn đạt tới")
+    weaknesses: List[str] = Field(default_factory=list, description="Các chủ đề còn yếu")
+
+
+class LearningPathStep(BaseModel):
+    course_id: str
+    title: str
+    duration_minutes: int
+
+
+class LearningPathResponse(BaseModel):
+    target_skill: Optional[str] = None
+    steps: List[LearningPathStep]
+    total_minutes: int
+    uncovered_topics: List[str] = Field(default_factory=list)
@@ -0,0 +1,23 @@
+"""Chép phần trăm tiến độ và lần học cuối vào ``class_memberships`` cho dữ liệu có sẵn.
+
+Sau đó các trường này được giữ đồng bộ sau mỗi lô ghi tiến độ; chỉ cần chạy một lần::
+
+    python -m scripts.backfill_roster_sort_fields
+"""
+import asyncio
+
+from app.database import close_database, init_database
+from services.progress_service import backfill_roster_sort_fields
+
+
+async def main() -> None:
+    await init_database()
+    try:
+        synced = await backfill_roster_sort_fields()
+        print(f"Đã đồng bộ {synced} cặp người học × khóa học vào roster")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
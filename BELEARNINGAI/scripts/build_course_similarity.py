@@ -0,0 +1,23 @@
+"""Dựng lại toàn bộ chỉ mục khóa học tương tự (tính lại IDF) và ghi đè collection
+``course_similarity``. Cập nhật từng khóa học đã do job ``course_similarity`` đảm nhận;
+script này dùng cho lần khởi tạo đầu tiên hoặc chạy định kỳ::
+
+    python -m scripts.build_course_similarity
+"""
+import asyncio
+
+from app.database import close_database, init_database
+from services.course_similarity_service import rebuild_similarity_index
+
+
+async def main() -> None:
+    await init_database()
+    try:
+        written = await rebuild_similarity_index()
+        print(f"Đã ghi {written} hàng láng giềng khóa học")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""Hiệu chỉnh tham số IRT cho ngân hàng câu hỏi từ lịch sử bài đánh giá.
+
+Đọc các bài đánh giá đã nộp, dựng ma trận lượt làm × câu hỏi rồi ước lượng ``a``/``b``
+bằng ``modules.irt_module.calibrate`` và ghi lại bằng một lệnh ``bulk_write``::
+
+    python -m scripts.calibrate_items --category programming --three-pl
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.database import close_database, init_database
+from models.models import AssessmentDocument, QuestionBankDocument
+from modules.irt_module import calibrate
+
+
+async def calibrate_items(category: Optional[str], min_responses: int, three_pl: bool) -> int:
+    """Chạy hiệu chỉnh, trả số câu hỏi được cập nhật."""
+
+    query = {"status": "submitted"}
+    if category:
+        query["category"] = category
+    columns: Dict[str, int] = {}
+    options_count: Dict[str, int] = {}
+    rows: List[Dict[int, float]] = []
+    async for assessment in AssessmentDocument.find(query):
+        row: Dict[int, float] = {}
+        for item, is_correct in zip(assessment.questions, assessment.correct):
+            column = columns.setdefault(item.question_id, len(columns))
+            options_count[item.question_id] = len(item.options)
+            row[column] = float(is_correct)
+        if row:
+            rows.append(row)
+
+    if not rows:
+        return 0
+    responses = np.full((len(rows), len(columns)), np.nan)
+    for index, row in enumerate(rows):
+        responses[index, list(row)] = list(row.values())
+
+    item_ids = list(columns)
+    keep = np.flatnonzero((~np.isnan(responses)).sum(axis=0) >= min_responses)
+    if keep.size == 0:
+        return 0
+    responses = responses[:, keep]
+    item_ids = [item_ids[column] for column in keep]
+    guessing = None
+    if three_pl:
+        guessing = [1.0 / options_count[item_id] if options_count[item_id] else 0.0 for item_id in item_ids]
+
+    result = calibrate(responses, guessing=guessing)
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"_id": ObjectId(item_id)},
+            {
+                "$set": {
+                    "irt_a": round(float(a), 4),
+                    "irt_b": round(float(b), 4),
+                    "irt_c": round(float(c), 4),
+                    "calibrated_at": now,
+                }
+            },
+        )
+        for item_id, a, b, c in zip(item_ids, result.a, result.b, result.c)
+        if ObjectId.is_valid(item_id)
+    ]
+    if operations:
+        await QuestionBankDocument.get_pymongo_collection().bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Hiệu chỉnh tham số IRT cho ngân hàng câu hỏi")
+    parser.add_argument("--category", help="Chỉ hiệu chỉnh một lĩnh vực")
+    parser.add_argument("--min-responses", type=int, default=30, help="Số lượt trả lời tối thiểu của mỗi câu")
+    parser.add_argument("--three-pl", action="store_true", help="Cố định c = 1/số phương án (mô hình 3PL)")
+    args = parser.parse_args()
+
+    await init_database()
+    try:
+        updated = await calibrate_items(args.category, args.min_responses, args.three_pl)
+        print(f"Đã hiệu chỉnh {updated} câu hỏi")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
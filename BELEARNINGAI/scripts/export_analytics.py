@@ -0,0 +1,23 @@
+"""Export lượt làm quiz và tiến độ học tập sang Arrow IPC cho báo cáo giảng viên.
+
+Chạy hằng đêm (cron); API tự nạp bản export mới khi manifest đổi::
+
+    python -m scripts.export_analytics
+"""
+import asyncio
+
+from app.database import close_database, init_database
+from services.analytics_export_service import export_analytics
+
+
+async def main() -> None:
+    await init_database()
+    try:
+        rows = await export_analytics()
+        print(", ".join(f"{table}: {count} dòng" for table, count in rows.items()))
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
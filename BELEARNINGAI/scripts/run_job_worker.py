@@ -0,0 +1,45 @@
+"""Chạy worker job nền độc lập với tiến trình API.
+
+Dùng khi tắt worker nhúng (``job_worker_enabled=False``) để tách tải sinh nội dung AI
+khỏi worker phục vụ request::
+
+    python -m scripts.run_job_worker
+"""
+import asyncio
+import signal
+
+from app.database import close_database, get_database, init_database
+from config.logging_config import setup_logging
+from services import ai_service  # noqa: F401  # đăng ký handler course_generation
+from services import course_similarity_service  # noqa: F401  # đăng ký handler course_similarity
+from services import notification_service  # noqa: F401  # đăng ký handler announcement_fanout
+from services.job_service import JobWorker
+from services.realtime_service import build_event_backend, event_bus
+
+
+async def run_worker() -> None:
+    """Khởi động worker và chờ tín hiệu dừng."""
+
+    setup_logging()
+    await init_database()
+    # Sự kiện hoàn tất job tới được WebSocket ở tiến trình API khi realtime_backend="mongo".
+    await event_bus.start(build_event_backend(get_database))
+    worker = JobWorker()
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:  # Windows
+            pass
+    await worker.start()
+    try:
+        await stop_event.wait()
+    finally:
+        await worker.stop()
+        await event_bus.stop()
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
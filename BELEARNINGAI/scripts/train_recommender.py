@@ -0,0 +1,66 @@
+"""Huấn luyện model gợi ý khóa học (implicit ALS) từ dữ liệu đăng ký và tiến độ.
+
+Độ tin cậy của mỗi cặp người học × khóa học là ``1 + 4 * tiến độ`` (tiến độ 0..1), nên
+khóa học đã học sâu có trọng số lớn hơn khóa chỉ mới đăng ký. Model được ghi vào
+``recommender_model_dir``; API tự nạp lại khi phát hiện manifest mới::
+
+    python -m scripts.train_recommender --factors 32 --iterations 15
+"""
+import argparse
+import asyncio
+from typing import Dict, Tuple
+
+import numpy as np
+
+from app.database import close_database, init_database
+from config.config import get_settings
+from models.models import EnrollmentDocument, ProgressDocument
+from modules.recommender_module import build_interaction_matrix, save_model, train_als
+
+
+async def load_interactions() -> Dict[Tuple[str, str], float]:
+    """Gom tiến độ lớn nhất (0..1) của từng cặp người học × khóa học."""
+
+    progress: Dict[Tuple[str, str], float] = {}
+    async for enrollment in EnrollmentDocument.find_all():
+        key = (enrollment.user_id, enrollment.course_id)
+        progress[key] = max(progress.get(key, 0.0), enrollment.progress / 100)
+    async for record in ProgressDocument.find_all():
+        key = (record.user_id, record.course_id)
+        progress[key] = max(progress.get(key, 0.0), record.progress / 100)
+    return progress
+
+
+async def train(factors: int, iterations: int, regularization: float, alpha: float) -> None:
+    progress = await load_interactions()
+    if not progress:
+        print("Chưa có dữ liệu đăng ký, bỏ qua huấn luyện")
+        return
+    matrix, user_ids, course_ids = build_interaction_matrix(
+        (user_id, course_id, 1.0 + 4.0 * value) for (user_id, course_id), value in progress.items()
+    )
+    user_factors, item_factors = train_als(
+        matrix, factors=factors, regularization=regularization, alpha=alpha, iterations=iterations
+    )
+    popularity = np.asarray((matrix > 0).sum(axis=0)).ravel()
+    target = save_model(get_settings().recommender_model_dir, user_factors, item_factors, user_ids, course_ids, popularity)
+    print(f"Đã lưu model {len(user_ids)} người học × {len(course_ids)} khóa học vào {target}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Huấn luyện model gợi ý khóa học")
+    parser.add_argument("--factors", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=15)
+    parser.add_argument("--regularization", type=float, default=0.1)
+    parser.add_argument("--alpha", type=float, default=20.0)
+    args = parser.parse_args()
+
+    await init_database()
+    try:
+        await train(args.factors, args.iterations, args.regularization, args.alpha)
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
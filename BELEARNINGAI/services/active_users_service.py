@@ -0,0 +1,187 @@
+"""Đếm người dùng hoạt động (DAU/WAU/MAU) bằng sketch HyperLogLog theo ngày.
+
+Mỗi worker giữ sketch của ngày hiện tại trong bộ nhớ, cập nhật O(1) cho mỗi request đã
+xác thực hoặc sự kiện học tập; ``sketch_flusher`` định kỳ ghi đè sketch tích lũy của
+worker vào ``activity_sketches``. Ghi đè là idempotent nên thử lại an toàn. Khi đọc, sketch
+của mọi worker và mọi ngày trong cửa sổ được hợp theo phép max, nên một người hoạt động ở
+nhiều worker hay nhiều ngày chỉ được đếm một lần, với bộ nhớ cố định cho mỗi sketch.
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from bson import Binary
+from pymongo import UpdateOne
+
+from config.config import get_settings
+from models.models import ActivitySketchDocument
+from modules.hyperloglog_module import HyperLogLog
+from modules.rollup_module import bucket_range, bucket_start
+from services.rollup_service import PLATFORM_SCOPE_ID
+from utils.scheduler import PeriodicTask
+
+_settings = get_settings()
+
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+WINDOWS = {"dau": 1, "wau": 7, "mau": 30}
+
+SketchKey = Tuple[str, str, datetime]
+
+
+class SketchStore:
+    """Sketch cục bộ của worker, ghi nhớ những sketch đã đổi kể từ lần ghi trước."""
+
+    def __init__(self, precision: int) -> None:
+        self.precision = precision
+        self._sketches: Dict[SketchKey, HyperLogLog] = {}
+        self._dirty: Set[SketchKey] = set()
+
+    def __len__(self) -> int:
+        return len(self._sketches)
+
+    def add(self, key: SketchKey, member: str) -> None:
+        sketch = self._sketches.get(key)
+        if sketch is None:
+            sketch = self._sketches[key] = HyperLogLog(self.precision)
+        if sketch.add(member):
+            self._dirty.add(key)
+
+    def get(self, key: SketchKey) -> Optional[HyperLogLog]:
+        return self._sketches.get(key)
+
+    def take_dirty(self) -> Dict[SketchKey, bytes]:
+        """Chụp thanh ghi của các sketch đã đổi; gọi ``mark_dirty`` nếu ghi thất bại."""
+
+        dirty, self._dirty = self._dirty, set()
+        return {key: self._sketches[key].to_bytes() for key in dirty}
+
+    def mark_dirty(self, keys: Iterable[SketchKey]) -> None:
+        self._dirty.update(key for key in keys if key in self._sketches)
+
+    def evict_before(self, cutoff: datetime) -> None:
+        """Bỏ sketch của các ngày đã qua khi chúng đã được ghi."""
+
+        for key in [key for key in self._sketches if key[2] < cutoff and key not in self._dirty]:
+            del self._sketches[key]
+
+
+sketch_store = SketchStore(_settings.active_users_sketch_precision)
+
+
+def record_activity(user_id: Optional[str], course_id: Optional[str] = None, at: Optional[datetime] = None) -> None:
+    """Ghi nhận người dùng hoạt động trên toàn nền tảng (và trong khóa học nếu có)."""
+
+    if not user_id:
+        return
+    day = bucket_start(at or datetime.utcnow(), "day")
+    sketch_store.add(("platform", PLATFORM_SCOPE_ID, day), user_id)
+    if course_id:
+        sketch_store.add(("course", course_id, day), user_id)
+
+
+def build_sketch_operations(snapshot: Dict[SketchKey, bytes], worker_id: str, precision: int) -> List[UpdateOne]:
+    now = datetime.utcnow()
+    retention = timedelta(days=_settings.active_users_retention_days)
+    return [
+        UpdateOne(
+            {"scope": scope, "scope_id": scope_id, "bucket_start": day, "worker_id": worker_id},
+            {
+                "$set": {"registers": Binary(registers), "precision": precision, "updated_at": now},
+                "$setOnInsert": {"expires_at": day + retention},
+            },
+            upsert=True,
+        )
+        for (scope, scope_id, day), registers in snapshot.items()
+    ]
+
+
+async def flush_sketches() -> int:
+    snapshot = sketch_store.take_dirty()
+    if snapshot:
+        try:
+            await ActivitySketchDocument.get_pymongo_collection().bulk_write(
+                build_sketch_operations(snapshot, WORKER_ID, sketch_store.precision), ordered=False
+            )
+        except Exception:
+            sketch_store.mark_dirty(snapshot)
+            raise
+    sketch_store.evict_before(bucket_start(datetime.utcnow(), "day"))
+    return len(snapshot)
+
+
+sketch_flusher = PeriodicTask("active-users-flush", _settings.active_users_flush_interval_seconds, flush_sketches)
+
+
+def _merge_into(merged: Dict[Tuple[str, datetime], HyperLogLog], key: Tuple[str, datetime], sketch: HyperLogLog) -> None:
+    existing = merged.get(key)
+    if existing is None:
+        merged[key] = sketch.copy()
+    else:
+        existing.merge(sketch)
+
+
+async def load_day_sketches(
+    scope: str, scope_ids: Iterable[str], start: datetime, end: datetime
+) -> Dict[Tuple[str, datetime], HyperLogLog]:
+    """Sketch đã hợp của mọi worker theo (scope_id, ngày), gồm cả phần chưa ghi của worker này."""
+
+    scope_ids = list(scope_ids)
+    merged: Dict[Tuple[str, datetime], HyperLogLog] = {}
+    cursor = ActivitySketchDocument.get_pymongo_collection().find(
+        {
+            "scope": scope,
+            "scope_id": {"$in": scope_ids},
+            "bucket_start": {"$gte": start, "$lte": end},
+            "precision": sketch_store.precision,
+        },
+        {"scope_id": 1, "bucket_start": 1, "registers": 1},
+    )
+    async for row in cursor:
+        sketch = HyperLogLog.from_bytes(bytes(row["registers"]), sketch_store.precision)
+        _merge_into(merged, (row["scope_id"], row["bucket_start"]), sketch)
+    for day in bucket_range(start, end, "day"):
+        for scope_id in scope_ids:
+            local = sketch_store.get((scope, scope_id, day))
+            if local is not None:
+                _merge_into(merged, (scope_id, day), local)
+    return merged
+
+
+def union_window(
+    sketches: Dict[Tuple[str, datetime], HyperLogLog], scope_ids: Iterable[str], last_day: datetime, days: int
+) -> HyperLogLog:
+    """Hợp sketch của ``scope_ids`` trong ``days`` ngày kết thúc ở ``last_day``."""
+
+    result = HyperLogLog(sketch_store.precision)
+    for scope_id in scope_ids:
+        for offset in range(days):
+            sketch = sketches.get((scope_id, last_day - timedelta(days=offset)))
+            if sketch is not None:
+                result.merge(sketch)
+    return result
+
+
+async def active_user_counts(
+    scope: str = "platform", scope_id: str = PLATFORM_SCOPE_ID, now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """DAU/WAU/MAU của một phạm vi từ một lượt đọc 30 ngày sketch."""
+
+    today = bucket_start(now or datetime.utcnow(), "day")
+    sketches = await load_day_sketches(scope, [scope_id], today - timedelta(days=max(WINDOWS.values()) - 1), today)
+    return {name: len(union_window(sketches, [scope_id], today, days)) for name, days in WINDOWS.items()}
+
+
+async def active_learners(
+    course_ids: Iterable[str], days: int = 7, now: Optional[datetime] = None
+) -> Tuple[Dict[str, int], int]:
+    """Số người học hoạt động của từng khóa và của cả nhóm khóa (không đếm trùng)."""
+
+    course_ids = list(course_ids)
+    if not course_ids:
+        return {}, 0
+    today = bucket_start(now or datetime.utcnow(), "day")
+    sketches = await load_day_sketches("course", course_ids, today - timedelta(days=days - 1), today)
+    per_course = {course_id: len(union_window(sketches, [course_id], today, days)) for course_id in course_ids}
+    return per_course, len(union_window(sketches, course_ids, today, days))
@@ -0,0 +1,131 @@
+"""Bài đánh giá thích ứng dựa trên IRT.
+
+Mỗi câu trả lời cập nhật hậu nghiệm năng lực lưu ngay trên ``AssessmentDocument``;
+câu tiếp theo được chọn từ chỉ mục ngân hàng câu hỏi giữ trong bộ nhớ theo lĩnh vực.
+Lệnh ghi một câu trả lời chỉ khớp khi bài chưa có đáp án ở vị trí đó, nên hai request trả
+lời cùng một câu (bấm đúp, client thử lại) chỉ có một lần được ghi và cộng vào thành thạo.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from config.config import get_settings
+from models.models import AssessmentDocument
+from modules.irt_module import (
+    estimate_ability,
+    initial_log_posterior,
+    item_parameters,
+    update_log_posterior,
+)
+from schemas.assessment import AdaptiveStepResponse, AssessmentQuestion
+from services.assessment_service import (
+    build_summary,
+    finalize_assessment,
+    get_assessment,
+    record_topic_results,
+    save_assessment_if,
+    to_assessment_item,
+)
+from services.item_bank_service import item_bank_cache
+
+_settings = get_settings()
+
+
+def _question_view(assessment: AssessmentDocument) -> Optional[AssessmentQuestion]:
+    if len(assessment.answers) >= len(assessment.questions):
+        return None
+    item = assessment.questions[-1]
+    return AssessmentQuestion(
+        question_id=item.question_id,
+        question_text=item.question_text,
+        question_type=item.question_type,
+        options=item.options,
+        difficulty=item.difficulty,
+    )
+
+
+def build_step(assessment: AssessmentDocument, correct: Optional[bool] = None) -> AdaptiveStepResponse:
+    finished = assessment.status == "submitted"
+    return AdaptiveStepResponse(
+        assessment_id=str(assessment.id),
+        theta=round(assessment.theta, 4),
+        standard_error=None if assessment.theta_se is None else round(assessment.theta_se, 4),
+        answered=len(assessment.answers),
+        correct=correct,
+        finished=finished,
+        next_question=None if finished else _question_view(assessment),
+        summary=build_summary(assessment) if finished else None,
+    )
+
+
+async def _append_next_question(assessment: AssessmentDocument) -> bool:
+    """Chọn câu có thông tin lớn nhất tại theta hiện tại; False nếu ngân hàng đã cạn."""
+
+    bank = await item_bank_cache.get(assessment.category)
+    administered = [item.question_id for item in assessment.questions]
+    next_id = bank.irt_index.select_next(assessment.theta, exclude=administered)
+    if next_id is None:
+        return False
+    assessment.questions.append(to_assessment_item(bank.items_by_id[next_id]))
+    return True
+
+
+async def start_adaptive_assessment(
+    user_id: str,
+    category: str,
+    assessment_type: str = "adaptive",
+    max_items: Optional[int] = None,
+) -> AssessmentDocument:
+    """Tạo bài thích ứng và chọn câu hỏi đầu tiên tại theta = 0."""
+
+    log_posterior = initial_log_posterior()
+    theta, se = estimate_ability(log_posterior)
+    assessment = AssessmentDocument(
+        user_id=user_id,
+        category=category,
+        assessment_type=assessment_type,
+        adaptive=True,
+        max_items=max_items or _settings.adaptive_max_items,
+        theta=theta,
+        theta_se=se,
+        log_posterior=log_posterior.tolist(),
+    )
+    if not await _append_next_question(assessment):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ngân hàng câu hỏi chưa có dữ liệu")
+    await assessment.insert()
+    return assessment
+
+
+async def answer_adaptive(
+    assessment_id: str, user_id: str, answer: Optional[int]
+) -> Optional[AdaptiveStepResponse]:
+    """Ghi nhận đáp án câu hiện tại, cập nhật năng lực và chọn câu tiếp theo."""
+
+    assessment = await get_assessment(assessment_id, user_id)
+    if assessment is None:
+        return None
+    if not assessment.adaptive:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bài đánh giá không phải dạng thích ứng")
+    if assessment.status == "submitted" or len(assessment.answers) >= len(assessment.questions):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Bài đánh giá đã kết thúc")
+
+    answered = len(assessment.answers)
+    unanswered = {f"answers.{answered}": {"$exists": False}}
+    item = assessment.questions[answered]
+    correct = answer is not None and item.correct_answer is not None and answer == item.correct_answer
+    log_posterior = update_log_posterior(assessment.log_posterior, item_parameters(item), correct)
+    assessment.log_posterior = log_posterior.tolist()
+    assessment.theta, assessment.theta_se = estimate_ability(log_posterior)
+    assessment.answers.append(-1 if answer is None else answer)
+    assessment.correct.append(correct)
+
+    done = len(assessment.answers) >= assessment.max_items or assessment.theta_se <= _settings.adaptive_target_se
+    if done or not await _append_next_question(assessment):
+        saved = await finalize_assessment(assessment, assessment.answers, unanswered)
+    else:
+        saved = await save_assessment_if(assessment, unanswered)
+    if not saved:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Câu hỏi đã được trả lời hoặc bài đã kết thúc")
+    if item.correct_answer is not None:
+        await record_topic_results(assessment.user_id, assessment.category, [(item.topic, int(correct), 1)])
+    return build_step(assessment, correct=correct)
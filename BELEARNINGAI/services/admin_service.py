@@ -1,48 +1,73 @@
-"""Service placeholder cho chức năng quản trị."""
-from datetime import datetime, timedelta
+"""Service cho chức năng quản trị."""
+from datetime import datetime
 
-from schemas.admin import AdminBroadcastRequest, AdminSystemStats, SystemSummary, UserAuditLog
+from schemas.admin import (
+    AdminBroadcastRequest,
+    AdminSystemStats,
+    AnnouncementAcceptedResponse,
+    SystemSummary,
+)
+from services.active_users_service import active_user_counts
+from services.audit_service import record_audit
+from services.dashboard_service import current_snapshot
+from services.notification_service import publish_announcement
 
 
 async def get_system_stats() -> AdminSystemStats:
-    """Trả về số liệu hệ thống giả lập."""
+    """Số liệu hệ thống đọc từ snapshot dashboard mới nhất."""
 
-    return AdminSystemStats(users=1200, courses=340, active_sessions=85, generated_at=datetime.utcnow())
+    snapshot = await current_snapshot()
+    values = {metric.name: metric.value for metric in snapshot.metrics}
+    return AdminSystemStats(
+        users=int(values.get("total_users", 0)),
+        courses=int(values.get("total_courses", 0)),
+        active_sessions=int(values.get("active_sessions", 0)),
+        generated_at=snapshot.snapshot_at,
+    )
 
 
-async def create_announcement(payload: AdminBroadcastRequest) -> dict:
-    """Gửi thông báo broadcast (placeholder)."""
+async def create_announcement(payload: AdminBroadcastRequest, current_user: dict) -> AnnouncementAcceptedResponse:
+    """Ghi nhận thông báo chung; việc ghi cho từng người nhận (nếu có) chạy trong job nền."""
 
-    return {"message": "Thông báo đã được ghi nhận", "audience": payload.audience_roles}
+    announcement, job = await publish_announcement(
+        payload.title,
+        payload.message,
+        payload.audience_roles,
+        created_by=current_user.get("sub"),
+        mode=payload.mode,
+    )
+    record_audit(
+        "admin.announcement.create",
+        current_user,
+        target=str(announcement.id),
+        mode=announcement.mode.value,
+        audience_size=announcement.audience_size,
+    )
+    return AnnouncementAcceptedResponse(
+        announcement_id=str(announcement.id),
+        mode=announcement.mode.value,
+        status=announcement.status.value,
+        audience_size=announcement.audience_size,
+        job_id=str(job.id) if job is not None else None,
+        status_url=f"/api/v1/jobs/{job.id}" if job is not None else None,
+    )
 
 
 async def get_system_overview() -> SystemSummary:
-    """Tạo dữ liệu demo cho dashboard admin."""
+    """Tổng quan cho dashboard admin: số liệu từ snapshot, người dùng hoạt động từ sketch.
+
+    ``uptime_percent`` và ``alerts`` vẫn là dữ liệu demo cho tới khi có nguồn giám sát.
+    """
 
+    snapshot = await current_snapshot()
+    values = {metric.name: metric.value for metric in snapshot.metrics}
+    active = await active_user_counts()
     return SystemSummary(
         uptime_percent=99.8,
-        total_users=1247,
-        total_courses=156,
-        active_today=320,
+        total_users=int(values.get("total_users", 0)),
+        total_courses=int(values.get("total_courses", 0)),
+        active_today=active["dau"],
         alerts=["Cảnh báo: bộ nhớ server-2 > 80%"],
         generated_at=datetime.utcnow(),
     )
 
-
-async def list_audit_logs(limit: int = 5) -> list[UserAuditLog]:
-    """Trả danh sách log thao tác gần đây."""
-
-    now = datetime.utcnow()
-    base_time = now - timedelta(minutes=limit * 3)
-    logs: list[UserAuditLog] = []
-    for index in range(limit):
-        logs.append(
-            UserAuditLog(
-                action_id=f"audit-{index}",
-                actor_id="admin-demo",
-                action="update_user_role",
-                target=f"user-{index}",
-                created_at=base_time + timedelta(minutes=index * 3),
-            )
-        )
-    return logs
@@ -1,7 +1,12 @@
 """Service placeholder cho các tính năng AI."""
-from typing import List
+from typing import List, Optional
 
+from models.models import CourseCreate, JobDocument, ModuleOutline
 from schemas.ai import AIChatRequest, AIChatResponse, AIContentRequest, AIContentResponse
+from services.course_service import create_course
+from services.job_service import enqueue_job, register_job_handler
+
+COURSE_GENERATION_JOB = "course_generation"
 
 
 class GenAIService:
@@ -29,6 +34,43 @@ async def generate_course_from_prompt(payload: AIContentRequest) -> AIContentRes
     return AIContentResponse(outline=outline, chapters=chapters)
 
 
+async def enqueue_course_generation(
+    payload: AIContentRequest, owner_id: Optional[str], persist_course: bool = False
+) -> JobDocument:
+    """Đưa yêu cầu sinh khóa học vào hàng đợi job thay vì chờ model trả lời."""
+
+    return await enqueue_job(
+        COURSE_GENERATION_JOB,
+        {"request": payload.model_dump(), "persist_course": persist_course},
+        owner_id=owner_id,
+    )
+
+
+@register_job_handler(COURSE_GENERATION_JOB)
+async def run_course_generation_job(job: JobDocument) -> dict:
+    """Handler job: sinh outline, tùy chọn lưu thành khóa học của người yêu cầu.
+
+    Khóa học gắn với ``job.id`` nên lần chạy lại sau khi lease hết hạn không tạo khóa học trùng.
+    """
+
+    request = AIContentRequest.model_validate(job.payload.get("request", {}))
+    generated = await generate_course_from_prompt(request)
+    result = generated.model_dump()
+    if job.payload.get("persist_course") and job.owner_id:
+        course = await create_course(
+            CourseCreate(
+                title=request.topic,
+                description=f"Khóa học do AI sinh cho chủ đề {request.topic}",
+                level=request.level or "beginner",
+                modules=[ModuleOutline(name=chapter["title"]) for chapter in generated.chapters],
+            ),
+            job.owner_id,
+            source_job_id=str(job.id),
+        )
+        result["course_id"] = course.id
+    return result
+
+
 async def chat_with_ai(request: AIChatRequest) -> AIChatResponse:
     """Giả lập trả lời chat."""
 
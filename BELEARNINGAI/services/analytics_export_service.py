@@ -0,0 +1,170 @@
+"""Export dữ liệu analytics sang Arrow IPC và báo cáo giảng viên đọc từ bản export.
+
+Export (``scripts/export_analytics.py``, chạy hằng đêm) đọc quiz_attempts/progress từ
+secondary theo lô và ghi dạng cột; API nạp lại bản export khi manifest đổi. Báo cáo
+chỉ truy vấn Mongo để lấy danh sách khóa học của giảng viên, phần group-by chạy trên
+bảng Arrow trong thread riêng.
+"""
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from pymongo import ReadPreference
+
+from config.config import get_settings
+from models.models import CourseDocument, ProgressDocument, QuizAttemptDocument
+from modules.columnar_module import (
+    ATTEMPTS_TABLE,
+    MANIFEST_FILE,
+    PROGRESS_TABLE,
+    SCHEMAS,
+    AnalyticsExport,
+    ExportWriter,
+    course_performance,
+    student_activity,
+)
+from schemas.analytics import (
+    CoursePerformanceItem,
+    InstructorCoursesResponse,
+    InstructorStudentsResponse,
+    StudentActivityItem,
+)
+
+_settings = get_settings()
+
+
+class _ExportHolder:
+    """Nạp bản export theo yêu cầu và nạp lại khi manifest được ghi lại."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self._version: Optional[int] = None
+        self._export: Optional[AnalyticsExport] = None
+
+    def get(self) -> Optional[AnalyticsExport]:
+        try:
+            version = (self.directory / MANIFEST_FILE).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if version != self._version:
+            self._export = AnalyticsExport.load(self.directory)
+            self._version = version
+        return self._export
+
+
+_export_holder = _ExportHolder(_settings.analytics_export_dir)
+
+
+def get_analytics_export() -> Optional[AnalyticsExport]:
+    return _export_holder.get()
+
+
+def _attempt_columns(row: dict) -> dict:
+    return {
+        "course_id": row.get("course_id"),
+        "quiz_id": row.get("quiz_id"),
+        "user_id": row.get("user_id"),
+        "percentage": row.get("percentage", 0.0),
+        "submitted_at": row.get("submitted_at"),
+    }
+
+
+# Tài liệu tiến độ cũ chưa có ``completed_count``: đếm ``completed_lessons`` phía server thay vì kéo cả mảng.
+_PROGRESS_PROJECTION = {
+    "course_id": 1,
+    "user_id": 1,
+    "progress": 1,
+    "completed_count": {"$ifNull": ["$completed_count", {"$size": {"$ifNull": ["$completed_lessons", []]}}]},
+    "total_minutes": 1,
+    "last_activity": 1,
+}
+
+
+def _progress_columns(row: dict) -> dict:
+    return {
+        "course_id": row.get("course_id"),
+        "user_id": row.get("user_id"),
+        "progress": row.get("progress", 0.0),
+        "completed_count": row.get("completed_count", 0),
+        "total_minutes": row.get("total_minutes", 0),
+        "last_activity": row.get("last_activity"),
+    }
+
+
+async def _export_collection(
+    writer: ExportWriter, table: str, document_type, projection: dict, to_columns: Callable[[dict], dict]
+) -> None:
+    batch_size = _settings.analytics_export_batch_size
+    collection = document_type.get_pymongo_collection().with_options(
+        read_preference=ReadPreference.SECONDARY_PREFERRED
+    )
+    columns: Dict[str, list] = {name: [] for name in SCHEMAS[table].names}
+    pending = 0
+    async for row in collection.find({}, projection).batch_size(batch_size):
+        for name, value in to_columns(row).items():
+            columns[name].append(value)
+        pending += 1
+        if pending >= batch_size:
+            writer.write(table, columns)
+            columns = {name: [] for name in columns}
+            pending = 0
+    writer.write(table, columns)
+
+
+async def export_analytics(directory: Optional[str] = None) -> Dict[str, int]:
+    """Ghi bản export mới; trả số dòng của từng bảng."""
+
+    writer = ExportWriter(directory or _settings.analytics_export_dir)
+    try:
+        await _export_collection(
+            writer,
+            ATTEMPTS_TABLE,
+            QuizAttemptDocument,
+            {"course_id": 1, "quiz_id": 1, "user_id": 1, "percentage": 1, "submitted_at": 1},
+            _attempt_columns,
+        )
+        await _export_collection(
+            writer,
+            PROGRESS_TABLE,
+            ProgressDocument,
+            _PROGRESS_PROJECTION,
+            _progress_columns,
+        )
+    except BaseException:
+        writer.abort()
+        raise
+    writer.commit(datetime.utcnow())
+    return writer.rows
+
+
+async def _instructor_course_titles(instructor_id: str) -> Dict[str, str]:
+    courses = await CourseDocument.find(CourseDocument.created_by == instructor_id).to_list()
+    return {str(course.id): course.title for course in courses}
+
+
+async def get_instructor_course_report(instructor_id: str) -> InstructorCoursesResponse:
+    """Hiệu suất các khóa học của giảng viên theo bản export gần nhất."""
+
+    export = get_analytics_export()
+    titles = await _instructor_course_titles(instructor_id)
+    if export is None or not titles:
+        return InstructorCoursesResponse(exported_at=export.exported_at if export else None, courses=[])
+    rows: List[dict] = await asyncio.to_thread(course_performance, export, list(titles))
+    return InstructorCoursesResponse(
+        exported_at=export.exported_at,
+        courses=[CoursePerformanceItem(title=titles[row["course_id"]], **row) for row in rows],
+    )
+
+
+async def get_instructor_student_report(instructor_id: str, limit: int = 50) -> InstructorStudentsResponse:
+    """Học viên trong các khóa học của giảng viên, hoạt động gần nhất trước."""
+
+    export = get_analytics_export()
+    titles = await _instructor_course_titles(instructor_id)
+    if export is None or not titles:
+        return InstructorStudentsResponse(exported_at=export.exported_at if export else None, students=[])
+    rows: List[dict] = await asyncio.to_thread(student_activity, export, list(titles), limit)
+    return InstructorStudentsResponse(
+        exported_at=export.exported_at, students=[StudentActivityItem(**row) for row in rows]
+    )
@@ -1,40 +1,179 @@
-"""Service placeholder cho analytics."""
-from datetime import datetime
+"""Dịch vụ analytics đọc từ các bucket rollup đã tổng hợp sẵn."""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Mapping
 
-from schemas.analytics import DashboardSection, MetricPoint, StudentDashboardResponse
+from models.models import CourseDocument, EnrollmentDocument, EnrollmentStatus
+from modules.rollup_module import bucket_range, bucket_start, percent_change, sum_counters
+from schemas.analytics import (
+    ActiveUsersResponse,
+    AnalyticsReportResponse,
+    DashboardSection,
+    MetricPoint,
+    StudentDashboardResponse,
+    TimeSeriesPoint,
+    TimeSeriesResponse,
+)
+from services.active_users_service import active_learners, active_user_counts
+from services.rollup_service import PLATFORM_SCOPE_ID, read_buckets
 
+_WINDOW_DAYS = 7
 
-async def get_student_dashboard(user_id: str) -> StudentDashboardResponse:
-    """Trả về số liệu demo cho dashboard học viên."""
+_ACTIVITY_LABELS = {
+    "study_minutes": "Thời gian học (phút)",
+    "lessons_completed": "Bài học hoàn thành",
+    "quiz_attempts": "Số lượt làm quiz",
+    "enrollments": "Lượt đăng ký mới",
+}
 
-    _ = user_id
-    generated_at = datetime.utcnow()
-    section = DashboardSection(
-        title="Overview",
-        metrics=[
-            MetricPoint(label="Đã đăng ký", value=5, trend=12.5),
-            MetricPoint(label="Hoàn thành", value=2, trend=5.0),
-        ],
-    )
-    return StudentDashboardResponse(generated_at=generated_at, sections=[section])
+_ACTIVE_LABELS = {"dau": "Hoạt động hôm nay", "wau": "Hoạt động 7 ngày", "mau": "Hoạt động 30 ngày"}
+
+
+def _average_score(counters: Mapping[str, float]) -> float:
+    attempts = counters.get("quiz_attempts", 0)
+    return round(counters.get("quiz_score_sum", 0) / attempts, 2) if attempts else 0.0
+
+
+async def _two_windows(scope: str, scope_ids: List[str], now: datetime) -> Dict[str, tuple[Counter, Counter]]:
+    """Tổng bộ đếm 7 ngày gần nhất và 7 ngày trước đó cho từng ``scope_id``."""
 
+    today = bucket_start(now, "day")
+    current_start = today - timedelta(days=_WINDOW_DAYS - 1)
+    previous_start = current_start - timedelta(days=_WINDOW_DAYS)
+    rows = await read_buckets(scope, scope_ids, "day", previous_start)
+    windows: Dict[str, tuple[Counter, Counter]] = {scope_id: (Counter(), Counter()) for scope_id in scope_ids}
+    for row in rows:
+        current, previous = windows[row.scope_id]
+        (current if row.bucket_start >= current_start else previous).update(row.counters)
+    return windows
 
-async def build_student_dashboard(progress_percent: float) -> StudentDashboardResponse:
-    """Hàm dùng cho controller mới, trả về hai section demo."""
 
-    generated_at = datetime.utcnow()
+def _activity_metrics(current: Mapping[str, float], previous: Mapping[str, float]) -> List[MetricPoint]:
+    metrics = [
+        MetricPoint(
+            label=label,
+            value=current.get(name, 0),
+            trend=percent_change(current.get(name, 0), previous.get(name, 0)),
+        )
+        for name, label in _ACTIVITY_LABELS.items()
+    ]
+    score, previous_score = _average_score(current), _average_score(previous)
+    metrics.append(MetricPoint(label="Điểm quiz trung bình (%)", value=score, trend=percent_change(score, previous_score)))
+    return metrics
+
+
+def _learners_metric(value: int) -> MetricPoint:
+    return MetricPoint(label=f"Học viên hoạt động ({_WINDOW_DAYS} ngày)", value=value)
+
+
+async def _study_streak(user_id: str, now: datetime, max_days: int = 60) -> int:
+    today = bucket_start(now, "day")
+    rows = await read_buckets("user", [user_id], "day", today - timedelta(days=max_days))
+    active_days = {row.bucket_start for row in rows if row.counters.get("study_minutes", 0) > 0}
+    streak = 0
+    day = today if today in active_days else today - timedelta(days=1)
+    while day in active_days:
+        streak += 1
+        day -= timedelta(days=1)
+    return streak
+
+
+async def get_student_dashboard(user_id: str) -> StudentDashboardResponse:
+    """Dashboard học viên: tổng quan đăng ký + hoạt động 7 ngày so với 7 ngày trước."""
+
+    now = datetime.utcnow()
+    enrollment_rows = await EnrollmentDocument.aggregate(
+        [
+            {"$match": {"user_id": user_id}},
+            {
+                "$group": {
+                    "_id": None,
+                    "enrolled": {"$sum": 1},
+                    "completed": {"$sum": {"$cond": [{"$eq": ["$status", EnrollmentStatus.completed.value]}, 1, 0]}},
+                    "average_progress": {"$avg": "$progress"},
+                }
+            },
+        ]
+    ).to_list()
+    enrollment = enrollment_rows[0] if enrollment_rows else {}
     overview = DashboardSection(
         title="Tổng quan",
         metrics=[
-            MetricPoint(label="Tiến độ trung bình", value=progress_percent, trend=1.5),
-            MetricPoint(label="Chuỗi ngày học", value=4, trend=0.5),
+            MetricPoint(label="Đã đăng ký", value=enrollment.get("enrolled", 0)),
+            MetricPoint(label="Hoàn thành", value=enrollment.get("completed", 0)),
+            MetricPoint(label="Tiến độ trung bình", value=round(enrollment.get("average_progress") or 0.0, 2)),
+            MetricPoint(label="Chuỗi ngày học", value=await _study_streak(user_id, now)),
         ],
     )
-    commitment = DashboardSection(
-        title="Thói quen học tập",
-        metrics=[
-            MetricPoint(label="Thời gian học tuần này (phút)", value=180, trend=10.0),
-            MetricPoint(label="Số quiz đã làm", value=6, trend=2.0),
+    current, previous = (await _two_windows("user", [user_id], now))[user_id]
+    activity = DashboardSection(title="7 ngày qua", metrics=_activity_metrics(current, previous))
+    return StudentDashboardResponse(generated_at=now, sections=[overview, activity])
+
+
+async def get_time_series(
+    scope: str, scope_id: str, metric: str, granularity: str = "day", periods: int = 30
+) -> TimeSeriesResponse:
+    """Chuỗi thời gian một bộ đếm, bucket trống được điền 0."""
+
+    now = datetime.utcnow()
+    step = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}[granularity]
+    start = bucket_start(now - step * (periods - 1), granularity)
+    rows = await read_buckets(scope, [scope_id], granularity, start)
+    values = {row.bucket_start: row.counters.get(metric, 0) for row in rows}
+    return TimeSeriesResponse(
+        metric=metric,
+        granularity=granularity,
+        points=[TimeSeriesPoint(bucket_start=bucket, value=values.get(bucket, 0)) for bucket in bucket_range(start, now, granularity)],
+    )
+
+
+async def get_instructor_overview(instructor_id: str, limit: int = 10) -> AnalyticsReportResponse:
+    """Hoạt động 7 ngày của các khóa học do giảng viên tạo, mỗi khóa một section."""
+
+    now = datetime.utcnow()
+    courses = await CourseDocument.find(CourseDocument.created_by == instructor_id).to_list()
+    titles = {str(course.id): course.title for course in courses}
+    windows = await _two_windows("course", list(titles), now) if titles else {}
+    learners, distinct_learners = await active_learners(list(titles), _WINDOW_DAYS, now)
+    total_current = sum_counters(current for current, _ in windows.values())
+    total_previous = sum_counters(previous for _, previous in windows.values())
+    sections = [
+        DashboardSection(
+            title="Tất cả khóa học",
+            metrics=[_learners_metric(distinct_learners), *_activity_metrics(total_current, total_previous)],
+        )
+    ]
+    ranked = sorted(windows, key=lambda course_id: -windows[course_id][0].get("study_minutes", 0))[:limit]
+    sections.extend(
+        DashboardSection(
+            title=titles[course_id],
+            metrics=[_learners_metric(learners[course_id]), *_activity_metrics(*windows[course_id])],
+        )
+        for course_id in ranked
+    )
+    return AnalyticsReportResponse(generated_at=now, sections=sections)
+
+
+async def get_platform_activity() -> AnalyticsReportResponse:
+    """Hoạt động toàn nền tảng 7 ngày qua so với 7 ngày trước."""
+
+    now = datetime.utcnow()
+    current, previous = (await _two_windows("platform", [PLATFORM_SCOPE_ID], now))[PLATFORM_SCOPE_ID]
+    active = await active_user_counts(now=now)
+    return AnalyticsReportResponse(
+        generated_at=now,
+        sections=[
+            DashboardSection(title="Toàn nền tảng", metrics=_activity_metrics(current, previous)),
+            DashboardSection(
+                title="Người dùng hoạt động",
+                metrics=[MetricPoint(label=label, value=active[name]) for name, label in _ACTIVE_LABELS.items()],
+            ),
         ],
     )
-    return StudentDashboardResponse(generated_at=generated_at, sections=[overview, commitment])
+
+
+async def get_active_users() -> ActiveUsersResponse:
+    """DAU/WAU/MAU toàn nền tảng."""
+
+    now = datetime.utcnow()
+    return ActiveUsersResponse(**await active_user_counts(now=now), generated_at=now)
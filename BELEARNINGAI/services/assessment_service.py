@@ -1,70 +1,260 @@
-"""Service placeholder cho module đánh giá năng lực."""
+"""Service cho module đánh giá năng lực."""
 from datetime import datetime
-from typing import List
+from typing import Iterable, List, Optional, Sequence, Tuple
 
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument, UpdateOne
+
+from config.config import get_settings
+from models.models import AssessmentDocument, AssessmentItem, QuestionBankDocument, TopicMasteryDocument
+from modules.grading_module import compile_answer_key, grade_submission
+from modules.irt_module import item_parameters
 from schemas.assessment import (
+    AssessmentQuestion,
     AssessmentResultResponse,
     AssessmentSummary,
     AssessmentTopicInsight,
 )
+from services.item_bank_service import draw_questions
 
+_settings = get_settings()
 
-async def start_assessment(user_id: str, category: str, assessment_type: str) -> AssessmentSummary:
-    """Tạm thời trả về dữ liệu giả lập cho quá trình start assessment."""
+STRENGTH_RATIO = 0.7
+WEAKNESS_RATIO = 0.5
+
+
+def level_for_score(score: float) -> str:
+    """Quy đổi điểm phần trăm sang trình độ."""
+
+    if score >= 80:
+        return "advanced"
+    if score >= 50:
+        return "intermediate"
+    return "beginner"
+
+
+def level_for_theta(theta: float) -> str:
+    """Quy đổi năng lực IRT (thang N(0, 1)) sang trình độ."""
+
+    if theta >= 0.8:
+        return "advanced"
+    if theta >= -0.4:
+        return "intermediate"
+    return "beginner"
+
+
+def build_summary(assessment: AssessmentDocument) -> AssessmentSummary:
+    """Ẩn đáp án khi trả câu hỏi về cho học viên."""
 
-    now = datetime.utcnow()
     return AssessmentSummary(
-        id="demo-assessment",
+        id=str(assessment.id),
+        user_id=assessment.user_id,
+        category=assessment.category,
+        assessment_type=assessment.assessment_type,
+        score=assessment.score,
+        level=assessment.level,
+        strengths=assessment.strengths,
+        weaknesses=assessment.weaknesses,
+        created_at=assessment.created_at,
+        questions=[
+            AssessmentQuestion(
+                question_id=item.question_id,
+                question_text=item.question_text,
+                question_type=item.question_type,
+                options=item.options,
+                difficulty=item.difficulty,
+            )
+            for item in assessment.questions
+        ],
+    )
+
+
+async def start_assessment(user_id: str, category: str, assessment_type: str) -> AssessmentSummary:
+    """Rút đề phân tầng theo độ khó/chủ đề (không lặp câu đã gặp) và tạo lượt làm bài mới."""
+
+    items = await draw_questions(user_id, category, _settings.assessment_question_count)
+    assessment = AssessmentDocument(
         user_id=user_id,
         category=category,
         assessment_type=assessment_type,
-        score=0,
-        level="beginner",
-        strengths=[],
-        weaknesses=[],
-        created_at=now,
+        questions=[to_assessment_item(item) for item in items],
     )
+    await assessment.insert()
+    return build_summary(assessment)
 
 
-async def submit_assessment(assessment_id: str, answers: list[int]) -> AssessmentSummary:
-    """Placeholder chấm điểm, trả định dạng chuẩn."""
+def to_assessment_item(item: QuestionBankDocument) -> AssessmentItem:
+    """Chụp lại câu hỏi (kèm tham số IRT) vào bài đánh giá."""
 
-    score = float(len(answers) * 10)
-    now = datetime.utcnow()
-    return AssessmentSummary(
-        id=assessment_id,
-        user_id="demo-user",
-        category="programming",
-        assessment_type="skill_assessment",
-        score=score,
-        level="intermediate",
-        strengths=["arrays"],
-        weaknesses=["oop"],
-        created_at=now,
+    params = item_parameters(item)
+    return AssessmentItem(
+        question_id=str(item.id),
+        question_text=item.question_text,
+        question_type=item.question_type,
+        options=item.options,
+        correct_answer=item.correct_answer,
+        topic=item.topic,
+        difficulty=item.difficulty,
+        irt_a=params.a,
+        irt_b=params.b,
+        irt_c=params.c,
     )
 
 
-async def analyze_topics(category: str) -> List[AssessmentTopicInsight]:
-    """Sinh dữ liệu phân tích chủ đề để FE hiển thị theo mục 5.1.1."""
+async def get_assessment(assessment_id: str, user_id: str) -> Optional[AssessmentDocument]:
+    """Lấy bài đánh giá của chính người dùng, None nếu không tồn tại/không sở hữu."""
+
+    try:
+        object_id = PydanticObjectId(assessment_id)
+    except Exception:  # noqa: BLE001
+        return None
+    assessment = await AssessmentDocument.get(object_id)
+    if assessment is None or assessment.user_id != user_id:
+        return None
+    return assessment
+
+
+async def submit_assessment(assessment_id: str, user_id: str, answers: list[int]) -> Optional[AssessmentSummary]:
+    """Chấm bài đánh giá bằng grading engine và lưu kết quả.
+
+    Hai lần nộp đồng thời chỉ có một lần chốt được bài (xem ``finalize_assessment``); lần còn
+    lại trả kết quả đã lưu.
+    """
+
+    assessment = await get_assessment(assessment_id, user_id)
+    if assessment is None:
+        return None
+    if assessment.status == "submitted":
+        return build_summary(assessment)
+    condition = None
+    if assessment.adaptive:
+        # Bài thích ứng đã ghi nhận đáp án từng câu; nộp sớm chỉ chốt kết quả trên các câu đã trả
+        # lời, bỏ câu kế tiếp đã hiện nhưng chưa trả lời (trừ khi request khác vừa trả lời nó).
+        answers = assessment.answers
+        assessment.questions = assessment.questions[: len(answers)]
+        condition = {f"answers.{len(answers)}": {"$exists": False}}
+    if not await finalize_assessment(assessment, answers, condition):
+        assessment = await AssessmentDocument.get(assessment.id) or assessment
+    return build_summary(assessment)
+
+
+async def save_assessment_if(assessment: AssessmentDocument, condition: Optional[dict] = None) -> bool:
+    """Ghi đè bài đánh giá nếu bài chưa ``submitted`` và khớp ``condition``; ``False`` nếu request khác đã ghi trước."""
+
+    claimed = await AssessmentDocument.get_pymongo_collection().find_one_and_update(
+        {"_id": assessment.id, "status": {"$ne": "submitted"}, **(condition or {})},
+        {"$set": assessment.model_dump(exclude={"id", "revision_id"})},
+        projection={"_id": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    return claimed is not None
+
+
+async def finalize_assessment(
+    assessment: AssessmentDocument, answers: Sequence[int], condition: Optional[dict] = None
+) -> bool:
+    """Chấm toàn bài, suy ra trình độ và điểm mạnh/yếu theo chủ đề rồi lưu lại.
+
+    Bài chỉ được chuyển sang ``submitted`` bằng một ``find_one_and_update`` có điều kiện trạng
+    thái (và ``condition`` nếu có), và chỉ lần chuyển thành công mới cộng vào ``topic_mastery``.
+    Trả ``False`` khi bài đã được chốt hoặc ghi bởi request khác.
+    """
+
+    compiled = compile_answer_key(assessment.questions)
+    graded = grade_submission(compiled, answers)
+    ratios = {
+        topic: float(correct / total)
+        for topic, correct, total in zip(compiled.topic_labels, graded.topic_correct, graded.topic_total)
+        if total > 0
+    }
+    assessment.answers = graded.answers.tolist()
+    assessment.correct = graded.correct.tolist()
+    assessment.score = graded.percentage
+    assessment.level = level_for_theta(assessment.theta) if assessment.adaptive else level_for_score(graded.percentage)
+    assessment.strengths = [topic for topic, ratio in ratios.items() if ratio >= STRENGTH_RATIO]
+    assessment.weaknesses = [topic for topic, ratio in ratios.items() if ratio < WEAKNESS_RATIO]
+    assessment.status = "submitted"
+    assessment.submitted_at = datetime.utcnow()
+    if not await save_assessment_if(assessment, condition):
+        return False
+    if not assessment.adaptive:
+        # Bài thích ứng đã cộng dồn theo từng câu trong lúc làm bài.
+        await record_topic_results(
+            assessment.user_id,
+            assessment.category,
+            zip(compiled.topic_labels, graded.topic_correct, graded.topic_total),
+        )
+    return True
+
+
+async def record_topic_results(
+    user_id: str, category: str, results: Iterable[Tuple[str, float, float]]
+) -> None:
+    """Cộng dồn kết quả chấm vào bộ đếm chủ đề bằng một lệnh ``bulk_write`` upsert ``$inc``."""
+
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"user_id": user_id, "category": category, "topic": topic},
+            {"$inc": {"correct": int(correct), "total": int(total)}, "$set": {"updated_at": now}},
+            upsert=True,
+        )
+        for topic, correct, total in results
+        if total > 0
+    ]
+    if operations:
+        await TopicMasteryDocument.get_pymongo_collection().bulk_write(operations, ordered=False)
+
+
+def mastery_level(correct: int, total: int) -> str:
+    ratio = correct / total if total else 0.0
+    if ratio >= 0.8:
+        return "good"
+    if ratio >= WEAKNESS_RATIO:
+        return "fair"
+    return "weak"
+
+
+async def analyze_topics(user_id: str, category: str) -> List[AssessmentTopicInsight]:
+    """Đọc thống kê chủ đề của người dùng từ bộ đếm ``topic_mastery``."""
 
-    _ = category
+    rows = await TopicMasteryDocument.find(
+        TopicMasteryDocument.user_id == user_id,
+        TopicMasteryDocument.category == category,
+    ).sort("topic").to_list()
     return [
-        AssessmentTopicInsight(topic="Biến & Kiểu dữ liệu", correct=4, total=5, mastery_level="good"),
-        AssessmentTopicInsight(topic="OOP", correct=2, total=5, mastery_level="fair"),
+        AssessmentTopicInsight(
+            topic=row.topic,
+            correct=row.correct,
+            total=row.total,
+            mastery_level=mastery_level(row.correct, row.total),
+        )
+        for row in rows
     ]
 
 
-async def evaluate_skill_test(user_id: str, payload: list[int]) -> AssessmentResultResponse:
-    """Tổng hợp kết quả skill-test, trả dữ liệu demo phục vụ FE."""
+async def evaluate_skill_test(
+    user_id: str, category: str, assessment: Optional[AssessmentDocument] = None
+) -> AssessmentResultResponse:
+    """Tổng hợp năng lực theo chủ đề; ưu tiên điểm của ``assessment`` nếu có."""
 
-    _ = user_id
-    score = 78.0
+    topics = await analyze_topics(user_id, category)
+    if assessment is not None:
+        score, level = assessment.score, assessment.level
+        strengths, weaknesses = assessment.strengths, assessment.weaknesses
+    else:
+        correct = sum(topic.correct for topic in topics)
+        total = sum(topic.total for topic in topics)
+        score = round(correct / total * 100, 2) if total else 0.0
+        level = level_for_score(score)
+        strengths = [topic.topic for topic in topics if topic.correct >= STRENGTH_RATIO * topic.total]
+        weaknesses = [topic.topic for topic in topics if topic.correct < WEAKNESS_RATIO * topic.total]
     return AssessmentResultResponse(
         score=score,
-        level="intermediate",
-        strengths=["Biến cơ bản", "Cấu trúc điều khiển"],
-        weaknesses=["OOP", "Giải thuật"],
-        topics=await analyze_topics("programming"),
+        level=level,
+        strengths=strengths,
+        weaknesses=weaknesses,
+        topics=topics,
         recommended_courses=[],
         learning_path=[],
         generated_at=datetime.utcnow(),
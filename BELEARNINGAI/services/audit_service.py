@@ -0,0 +1,181 @@
+"""Audit log chỉ thêm cho thao tác xác thực và quản trị.
+
+``record_audit`` chỉ đưa sự kiện vào ring buffer trong bộ nhớ (O(1), không chờ I/O) nên
+không làm chậm request mà nó mô tả. ``audit_flusher`` định kỳ (hoặc khi buffer đủ một lô)
+ghi các sự kiện bằng ``insert_many(ordered=False)`` vào ``audit_logs``; collection tự xóa
+bản ghi quá ``audit_retention_days`` qua TTL index trên ``expires_at``. ``_id`` được sinh lúc
+ghi nhận nên ghi lại một lô sau lỗi không tạo bản trùng. Buffer đầy thì bỏ sự kiện cũ nhất
+và đếm vào ``dropped``.
+"""
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Deque, List, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo.errors import BulkWriteError
+
+from config.config import get_settings
+from models.models import AuditLogDocument
+from schemas.admin import AuditLogFilters, AuditLogPage, UserAuditLog
+from utils.pagination import decode_cursor, encode_cursor, keyset_filter
+from utils.scheduler import PeriodicTask
+
+logger = logging.getLogger("app.audit")
+_settings = get_settings()
+
+_DUPLICATE_KEY = 11000
+
+
+class AuditBuffer:
+    """Ring buffer sự kiện audit chờ ghi."""
+
+    def __init__(self, capacity: int, batch_size: int) -> None:
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._events: Deque[dict] = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def append(self, event: dict) -> bool:
+        """Thêm sự kiện; trả ``True`` khi buffer đã đủ một lô để ghi."""
+
+        if len(self._events) == self.capacity:
+            self.dropped += 1
+        self._events.append(event)
+        return len(self._events) >= self.batch_size
+
+    def take(self) -> List[dict]:
+        count = min(self.batch_size, len(self._events))
+        return [self._events.popleft() for _ in range(count)]
+
+    def requeue(self, batch: List[dict]) -> None:
+        """Trả lô ghi lỗi về đầu buffer; nếu tràn thì các sự kiện cũ nhất bị bỏ."""
+
+        overflow = len(batch) + len(self._events) - self.capacity
+        if overflow > 0:
+            self.dropped += overflow
+        self._events = deque(chain(batch, self._events), maxlen=self.capacity)
+
+
+audit_buffer = AuditBuffer(_settings.audit_buffer_capacity, _settings.audit_flush_batch_size)
+
+
+async def _insert_batch(batch: List[dict]) -> None:
+    try:
+        await AuditLogDocument.get_pymongo_collection().insert_many(batch, ordered=False)
+    except BulkWriteError as exc:
+        # Lô đã ghi một phần ở lần trước: bỏ qua bản trùng ``_id``, lỗi khác vẫn ném ra.
+        errors = exc.details.get("writeErrors", [])
+        if any(error.get("code") != _DUPLICATE_KEY for error in errors):
+            raise
+
+
+async def flush_audit_events() -> int:
+    """Ghi mọi sự kiện đang chờ theo lô; lô lỗi được đưa lại buffer cho lần sau."""
+
+    written = 0
+    while len(audit_buffer):
+        batch = audit_buffer.take()
+        try:
+            await _insert_batch(batch)
+        except Exception:  # noqa: BLE001
+            logger.exception("Ghi %d sự kiện audit thất bại", len(batch))
+            audit_buffer.requeue(batch)
+            break
+        written += len(batch)
+    if audit_buffer.dropped:
+        logger.warning("Đã bỏ %d sự kiện audit do buffer đầy", audit_buffer.dropped)
+        audit_buffer.dropped = 0
+    return written
+
+
+audit_flusher = PeriodicTask("audit-flush", _settings.audit_flush_interval_ms / 1000, flush_audit_events)
+
+
+def record_audit(
+    action: str,
+    actor: Optional[dict] = None,
+    target: Optional[str] = None,
+    outcome: str = "success",
+    ip: Optional[str] = None,
+    actor_id: Optional[str] = None,
+    **metadata: object,
+) -> None:
+    """Ghi nhận một thao tác; ``actor`` là ``current_user`` (``sub``/``role``) nếu đã xác thực."""
+
+    now = datetime.utcnow()
+    actor = actor or {}
+    event = {
+        "_id": ObjectId(),
+        "actor_id": actor_id or actor.get("sub"),
+        "actor_role": actor.get("role"),
+        "action": action,
+        "target": target,
+        "outcome": outcome,
+        "ip": ip,
+        "metadata": {key: str(value) for key, value in metadata.items() if value is not None},
+        "created_at": now,
+        "expires_at": now + timedelta(days=_settings.audit_retention_days),
+    }
+    if audit_buffer.append(event):
+        audit_flusher.wake()
+
+
+def build_audit_query(filters: AuditLogFilters) -> dict:
+    query: dict = {}
+    for field in ("actor_id", "action", "target", "outcome"):
+        value = getattr(filters, field)
+        if value:
+            query[field] = value
+    created: dict = {}
+    if filters.since:
+        created["$gte"] = filters.since
+    if filters.until:
+        created["$lt"] = filters.until
+    if created:
+        query["created_at"] = created
+    return query
+
+
+def _to_log(row: dict) -> UserAuditLog:
+    return UserAuditLog(
+        action_id=str(row["_id"]),
+        actor_id=row.get("actor_id") or "anonymous",
+        actor_role=row.get("actor_role"),
+        action=row["action"],
+        target=row.get("target") or "",
+        outcome=row.get("outcome", "success"),
+        ip=row.get("ip"),
+        metadata=row.get("metadata") or {},
+        created_at=row["created_at"],
+    )
+
+
+async def list_audit_logs(
+    filters: Optional[AuditLogFilters] = None, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> AuditLogPage:
+    """Audit log mới nhất trước, phân trang keyset trên ``(created_at, _id)``."""
+
+    filters = filters or AuditLogFilters()
+    limit = limit or _settings.audit_page_size
+    query = build_audit_query(filters)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        if not isinstance(created_at, datetime) or not ObjectId.is_valid(last_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor phân trang không hợp lệ")
+        query = {"$and": [query, keyset_filter("created_at", created_at, ObjectId(last_id), True)]}
+    rows = (
+        await AuditLogDocument.get_pymongo_collection()
+        .find(query, {"expires_at": 0}, sort=[("created_at", -1), ("_id", -1)], limit=limit + 1)
+        .to_list(length=None)
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], str(rows[-1]["_id"]))
+    return AuditLogPage(items=[_to_log(row) for row in rows], next_cursor=next_cursor)
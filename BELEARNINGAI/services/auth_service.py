@@ -15,6 +15,7 @@ from models.models import (
     UserDocument,
     UserResponse,
 )
+from services.audit_service import record_audit
 from utils.security import (
     build_fingerprint,
     create_access_token,
@@ -29,6 +30,10 @@ from utils.security import (
 _settings = get_settings()
 
 
+def _client_ip(http_request: Request) -> Optional[str]:
+    return http_request.client.host if http_request.client else None
+
+
 async def _ensure_unique_email(email: str) -> None:
     existing = await UserDocument.find_one(UserDocument.email == email)
     if existing is not None:
@@ -85,6 +90,7 @@ async def register(request: RegisterRequest) -> UserResponse:
         updated_at=now,
     )
     await user.insert()
+    record_audit("auth.register", actor_id=str(user.id), target=str(user.id), role=user.role.value)
 
     payload = user.model_dump(by_alias=True, exclude={"password_hash"})
     payload["_id"] = str(user.id)
@@ -97,6 +103,13 @@ async def login(request: LoginRequest, http_request: Request) -> TokenResponse:
     email = request.email.lower()
     user = await UserDocument.find_one(UserDocument.email == email)
     if user is None or not verify_password(request.password, user.password_hash):
+        record_audit(
+            "auth.login",
+            actor_id=str(user.id) if user else None,
+            target=email,
+            outcome="failure",
+            ip=_client_ip(http_request),
+        )
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Thông tin đăng nhập không hợp lệ")
 
     fingerprint = build_fingerprint(http_request)
@@ -120,6 +133,13 @@ async def login(request: LoginRequest, http_request: Request) -> TokenResponse:
     user.status = "active"
     user.updated_at = now
     await user.save()
+    record_audit(
+        "auth.login",
+        {"sub": str(user.id), "role": user.role.value},
+        target=email,
+        ip=_client_ip(http_request),
+        session_id=session_id,
+    )
 
     return TokenResponse(
         access_token=access_token,
@@ -213,3 +233,4 @@ async def logout(payload: RefreshRequest, http_request: Request) -> None:
 
     stored.revoked_at = datetime.now(timezone.utc)
     await stored.save()
+    record_audit("auth.logout", actor_id=user_id, target=user_id, ip=_client_ip(http_request), session_id=session_id)
@@ -1,14 +1,19 @@
 """Dịch vụ chat AI."""
 from datetime import datetime
+from typing import Optional
 
 from models.models import ChatResponse
+from services.realtime_service import push_to_user
 
 
-async def send_chat_message(session_id: str, message: str) -> ChatResponse:
-    """Giả lập gửi câu hỏi đến AI."""
+async def send_chat_message(session_id: str, message: str, user_id: Optional[str] = None) -> ChatResponse:
+    """Giả lập gửi câu hỏi đến AI; câu trả lời được đẩy tới các kết nối WebSocket của người hỏi."""
 
     _ = message
-    return ChatResponse(session_id=session_id or "session-demo", answer="Đây là câu trả lời mẫu từ AI.")
+    response = ChatResponse(session_id=session_id or "session-demo", answer="Đây là câu trả lời mẫu từ AI.")
+    if user_id:
+        await push_to_user(user_id, "chat_message", response.model_dump(mode="json"))
+    return response
 
 
 async def start_chat_session(user_id: str, course_id: str | None = None) -> str:
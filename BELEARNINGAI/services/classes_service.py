@@ -1,66 +1,471 @@
-"""Service placeholder cho quản lý lớp học."""
+"""Service quản lý lớp học và roster.
+
+Roster là một aggregation duy nhất trên ``class_memberships``, phân trang keyset theo
+``(khóa, _id)``. Phần trăm tiến độ và lần học cuối được chép sẵn vào thành viên
+(``roster_sort_fields``), nên khi sắp theo hai khóa này trang được cắt trên index
+``class_id, khóa, _id`` trước khi ``$lookup`` sang ``users``; sắp theo tên thì phải nối
+``users`` trước rồi mới cắt trang.
+Tóm tắt roster và danh sách lớp của người học được cache, xóa khi có sự kiện tiến độ
+hoặc thay đổi thành viên.
+
+Mã tham gia là chuỗi ngẫu nhiên có unique index và TTL. Tham gia lớp là một lượt tra mã
+(cache, các lượt tra trùng đang chờ DB được gộp lại) và một upsert nguyên tử vào
+``class_memberships``, nên một đợt cả lớp cùng tham gia không gây quét hay tranh chấp.
+"""
+import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+from beanie import PydanticObjectId
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
-from schemas.classes import ClassInvitation, RosterStudent
+from config.config import get_settings
+from models.models import (
+    ClassDocument,
+    ClassJoinCodeDocument,
+    ClassMembershipDocument,
+    ClassSchedule,
+    CourseDocument,
+    MembershipStatus,
+    ProgressDocument,
+    UserDocument,
+)
+from schemas.classes import (
+    ClassInvitation,
+    ClassJoinResponse,
+    ClassResponse,
+    RosterPage,
+    RosterStudent,
+    RosterSummary,
+)
 from schemas.enrollment import ClassCreateRequest
+from services.ownership_service import authorize_owned, prime_owners
+from services.permissions_service import ensure_permission
+from utils.pagination import decode_cursor, encode_cursor, keyset_filter
+
+_settings = get_settings()
+
+ROSTER_SORTS = {"progress": "progress_percent", "last_active": "last_active_key", "name": "full_name"}
+_NEVER_ACTIVE = datetime(1970, 1, 1)
+
+JOIN_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"  # bỏ 0/O, 1/I dễ nhầm
+_JOIN_CODE_ATTEMPTS = 5
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _TtlCache(Generic[K, V]):
+    """LRU có TTL trong bộ nhớ worker."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[K, tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl_seconds:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: K, value: V) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[K]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+
+roster_summary_cache: _TtlCache[str, RosterSummary] = _TtlCache(
+    _settings.roster_summary_ttl_seconds, _settings.class_cache_max_entries
+)
+membership_cache: _TtlCache[Tuple[str, str], Tuple[str, ...]] = _TtlCache(
+    _settings.class_membership_cache_ttl_seconds, _settings.class_cache_max_entries
+)
+
+
+def _to_response(document: ClassDocument) -> ClassResponse:
+    return ClassResponse.model_validate({**document.model_dump(exclude={"id"}), "id": str(document.id)})
+
+
+async def list_classes(instructor_id: str) -> List[ClassResponse]:
+    """Các lớp của giảng viên, mới nhất trước."""
+
+    classes = (
+        await ClassDocument.find(ClassDocument.instructor_id == instructor_id)
+        .sort(-ClassDocument.created_at)
+        .to_list()
+    )
+    prime_owners("class", {str(document.id): document.instructor_id for document in classes})
+    return [_to_response(document) for document in classes]
+
+
+async def create_class(payload: ClassCreateRequest, instructor_id: str) -> ClassResponse:
+    """Tạo lớp học trên một khóa học có sẵn."""
+
+    if not PydanticObjectId.is_valid(payload.course_id) or await CourseDocument.get(
+        PydanticObjectId(payload.course_id)
+    ) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy khóa học")
+    document = await ClassDocument(
+        name=payload.name,
+        course_id=payload.course_id,
+        instructor_id=instructor_id,
+        description=payload.description,
+        max_students=payload.max_students,
+        schedule=[ClassSchedule(**item.model_dump()) for item in payload.schedule],
+    ).insert()
+    prime_owners("class", {str(document.id): instructor_id})
+    return _to_response(document)
+
+
+async def get_class_for(class_id: str, current_user: dict) -> ClassDocument:
+    """Lớp học mà người gọi được quản lý (giảng viên của lớp hoặc admin)."""
+
+    document = await ClassDocument.get(PydanticObjectId(class_id)) if PydanticObjectId.is_valid(class_id) else None
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy lớp học")
+    prime_owners("class", {class_id: document.instructor_id})
+    ensure_permission(current_user, "classes", "manage", owner_id=document.instructor_id)
+    return document
+
+
+async def authorize_class(class_id: str, current_user: dict) -> None:
+    """Như ``get_class_for`` nhưng chỉ kiểm tra quyền, qua cache chủ sở hữu thay vì tải lớp học."""
+
+    await authorize_owned(current_user, "classes", "manage", "class", class_id, "Không tìm thấy lớp học")
+
+
+@dataclass(frozen=True)
+class JoinCodeEntry:
+    class_id: str
+    course_id: str
+    expires_at: datetime
+
+
+def new_join_code(length: int) -> str:
+    return "".join(secrets.choice(JOIN_CODE_ALPHABET) for _ in range(length))
+
+
+def normalize_join_code(code: str) -> str:
+    return code.strip().upper().replace("-", "").replace(" ", "")
+
+
+class JoinCodeResolver:
+    """Tra mã tham gia qua cache; các lượt tra cùng một mã chưa có trong cache dùng chung một truy vấn."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        self._cache: _TtlCache[str, JoinCodeEntry] = _TtlCache(ttl_seconds, max_entries)
+        self._inflight: Dict[str, "asyncio.Future[Optional[JoinCodeEntry]]"] = {}
+
+    def put(self, code: str, entry: JoinCodeEntry) -> None:
+        self._cache.put(code, entry)
+
+    def invalidate(self, codes: Iterable[str]) -> None:
+        self._cache.invalidate(codes)
 
+    async def _load(self, code: str) -> Optional[JoinCodeEntry]:
+        document = await ClassJoinCodeDocument.find_one({"code": code, "expires_at": {"$gt": datetime.utcnow()}})
+        if document is None:
+            return None
+        entry = JoinCodeEntry(class_id=document.class_id, course_id=document.course_id, expires_at=document.expires_at)
+        self._cache.put(code, entry)
+        return entry
 
-async def list_classes(instructor_id: str) -> List[dict]:
-    """Trả danh sách lớp giả lập."""
+    async def resolve(self, code: str) -> Optional[JoinCodeEntry]:
+        entry = self._cache.get(code)
+        if entry is None:
+            pending = self._inflight.get(code)
+            if pending is None:
+                pending = self._inflight[code] = asyncio.ensure_future(self._load(code))
+                pending.add_done_callback(lambda _: self._inflight.pop(code, None))
+            entry = await asyncio.shield(pending)
+        if entry is None or entry.expires_at <= datetime.utcnow():
+            return None
+        return entry
+
+
+join_code_resolver = JoinCodeResolver(_settings.class_join_code_cache_seconds, _settings.class_cache_max_entries)
+
+
+async def generate_join_code(class_id: str, current_user: dict) -> ClassInvitation:
+    """Sinh mã tham gia ngẫu nhiên; trùng mã (unique index) thì sinh lại."""
+
+    document = await get_class_for(class_id, current_user)
+    expires_at = datetime.utcnow() + timedelta(hours=_settings.class_join_code_ttl_hours)
+    for _ in range(_JOIN_CODE_ATTEMPTS):
+        code = new_join_code(_settings.class_join_code_length)
+        try:
+            await ClassJoinCodeDocument(
+                code=code,
+                class_id=class_id,
+                course_id=document.course_id,
+                created_by=current_user.get("sub", "demo-user"),
+                expires_at=expires_at,
+            ).insert()
+            break
+        except DuplicateKeyError:
+            continue
+    else:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Không sinh được mã tham gia")
+    join_code_resolver.put(code, JoinCodeEntry(class_id=class_id, course_id=document.course_id, expires_at=expires_at))
+    invite_url = f"{_settings.class_invite_base_url}?code={code}"
+    return ClassInvitation(class_id=class_id, join_code=code, expires_at=expires_at, invite_url=invite_url)
+
+
+def roster_sort_fields(progress: Optional[dict]) -> dict:
+    """Các trường roster chép từ tài liệu ``progress`` (``None`` khi chưa học) sang thành viên lớp."""
+
+    progress = progress or {}
+    last_active = progress.get("last_activity")
+    return {
+        "progress_percent": progress.get("progress", 0.0),
+        "last_active": last_active,
+        "last_active_key": last_active or _NEVER_ACTIVE,
+    }
+
+
+async def _claim_seat(class_id: str) -> bool:
+    """Tăng ``student_count`` nếu lớp còn chỗ (``max_students``), trong cùng một lệnh ghi."""
+
+    result = await ClassDocument.get_pymongo_collection().update_one(
+        {
+            "_id": ObjectId(class_id),
+            "$or": [{"max_students": None}, {"$expr": {"$lt": ["$student_count", "$max_students"]}}],
+        },
+        {"$inc": {"student_count": 1}},
+    )
+    return result.modified_count == 1
+
+
+async def join_class(code: str, user_id: str) -> ClassJoinResponse:
+    """Tham gia lớp bằng mã; tham gia lại là thao tác idempotent.
+
+    Chỗ trong lớp được giữ bằng ``$inc`` có điều kiện ``student_count < max_students``; lớp đã
+    đủ thì thành viên vừa upsert được trả về trạng thái trước đó và request bị từ chối (409).
+    """
+
+    entry = await join_code_resolver.resolve(normalize_join_code(code))
+    if entry is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mã tham gia không hợp lệ hoặc đã hết hạn")
+    now = datetime.utcnow()
+    progress = await ProgressDocument.get_pymongo_collection().find_one(
+        {"user_id": user_id, "course_id": entry.course_id}, {"_id": 0, "progress": 1, "last_activity": 1}
+    )
+    previous = await ClassMembershipDocument.get_pymongo_collection().find_one_and_update(
+        {"class_id": entry.class_id, "user_id": user_id},
+        {
+            "$set": {"status": MembershipStatus.active.value},
+            "$setOnInsert": {
+                "course_id": entry.course_id,
+                "tags": [],
+                "joined_at": now,
+                **roster_sort_fields(progress),
+            },
+        },
+        projection={"status": 1, "joined_at": 1},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE,
+    )
+    joined = previous is None or previous.get("status") != MembershipStatus.active.value
+    if joined:
+        if not await _claim_seat(entry.class_id):
+            memberships = ClassMembershipDocument.get_pymongo_collection()
+            key = {"class_id": entry.class_id, "user_id": user_id}
+            if previous is None:
+                await memberships.delete_one({**key, "status": MembershipStatus.active.value})
+            else:
+                await memberships.update_one(key, {"$set": {"status": previous.get("status")}})
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Lớp học đã đủ số học viên")
+        membership_changed(entry.class_id, user_id, entry.course_id)
+    return ClassJoinResponse(
+        class_id=entry.class_id,
+        course_id=entry.course_id,
+        joined_at=previous["joined_at"] if previous else now,
+        already_member=not joined,
+    )
+
+
+# Khóa sắp xếp đã chép sẵn trên ``class_memberships``: cắt trang trước khi nối ``users``.
+_MEMBERSHIP_SORT_FIELDS = frozenset({"progress_percent", "last_active_key"})
+
+
+def _member_stages() -> List[dict]:
+    """Nối hồ sơ người dùng vào từng thành viên, chỉ giữ trường hiển thị."""
 
-    _ = instructor_id
     return [
         {
-            "id": "class-1",
-            "name": "Lớp React 101",
-            "status": "active",
-            "start_date": datetime.utcnow().isoformat(),
-        }
+            "$lookup": {
+                "from": UserDocument.Settings.name,
+                "let": {"user_oid": {"$convert": {"input": "$user_id", "to": "objectId", "onError": None, "onNull": None}}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$user_oid"]}}},
+                    {"$project": {"_id": 0, "full_name": 1, "email": 1}},
+                ],
+                "as": "user_doc",
+            }
+        },
+        {
+            "$project": {
+                "user_id": 1,
+                "status": 1,
+                "tags": 1,
+                "full_name": {"$ifNull": [{"$first": "$user_doc.full_name"}, ""]},
+                "email": {"$ifNull": [{"$first": "$user_doc.email"}, ""]},
+                "progress_percent": {"$ifNull": ["$progress_percent", 0.0]},
+                "last_active": 1,
+                "last_active_key": {"$ifNull": ["$last_active_key", _NEVER_ACTIVE]},
+            }
+        },
     ]
 
 
-async def create_class(payload: ClassCreateRequest, instructor_id: str) -> dict:
-    """Placeholder tạo lớp học."""
+def build_roster_pipeline(
+    class_id: str,
+    sort: str = "progress",
+    descending: bool = True,
+    limit: int = 50,
+    after: Optional[Tuple[Any, ObjectId]] = None,
+    member_status: Optional[str] = None,
+    tag: Optional[str] = None,
+) -> List[dict]:
+    """Pipeline một trang roster; lấy dư một phần tử để biết còn trang sau hay không."""
 
-    return {
-        "id": "class-new",
-        "name": payload.name,
-        "course_id": payload.course_id,
-        "instructor_id": instructor_id,
+    field = ROSTER_SORTS[sort]
+    match: Dict[str, Any] = {
+        "class_id": class_id,
+        "status": member_status or {"$ne": MembershipStatus.removed.value},
     }
+    if tag:
+        match["tags"] = tag
+    page = []
+    if after is not None:
+        page.append({"$match": keyset_filter(field, after[0], after[1], descending)})
+    order = -1 if descending else 1
+    page.extend([{"$sort": {field: order, "_id": order}}, {"$limit": limit + 1}])
+    if field in _MEMBERSHIP_SORT_FIELDS:
+        return [{"$match": match}, *page, *_member_stages()]
+    return [{"$match": match}, *_member_stages(), *page]
 
 
-async def generate_join_code(class_id: str) -> ClassInvitation:
-    """Sinh mã mời giả lập cho lớp học."""
+async def list_roster(
+    class_id: str,
+    current_user: dict,
+    sort: str = "progress",
+    descending: bool = True,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    member_status: Optional[str] = None,
+    tag: Optional[str] = None,
+) -> RosterPage:
+    """Một trang roster đã sắp xếp/lọc phía server."""
 
-    expires_at = datetime.utcnow() + timedelta(days=3)
-    join_code = f"JOIN-{class_id[-4:].upper()}"
-    invite_url = f"https://learning.local/classes/{class_id}?code={join_code}"
-    return ClassInvitation(class_id=class_id, join_code=join_code, expires_at=expires_at, invite_url=invite_url)
+    await authorize_class(class_id, current_user)
+    after = None
+    if cursor:
+        value, last_id = decode_cursor(cursor, 2)
+        if not ObjectId.is_valid(last_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor phân trang không hợp lệ")
+        after = (value, ObjectId(last_id))
+    limit = min(limit, _settings.roster_page_size_max)
+    pipeline = build_roster_pipeline(class_id, sort, descending, limit, after, member_status, tag)
+    rows = await ClassMembershipDocument.aggregate(pipeline).to_list()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[ROSTER_SORTS[sort]], str(last["_id"]))
+    return RosterPage(
+        items=[
+            RosterStudent(
+                student_id=row["user_id"],
+                full_name=row["full_name"],
+                email=row["email"],
+                status=row["status"],
+                last_active=row.get("last_active"),
+                progress_percent=row["progress_percent"],
+                tags=row.get("tags", []),
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
 
 
-async def list_roster_preview(class_id: str) -> List[RosterStudent]:
-    """Trả danh sách học viên demo phục vụ UI roster."""
-
-    _ = class_id
+def build_summary_pipeline(class_id: str, now: datetime) -> List[dict]:
     return [
-        RosterStudent(
-            student_id="student-1",
-            full_name="Nguyễn Văn A",
-            email="student1@example.com",
-            status="active",
-            last_active=datetime.utcnow() - timedelta(hours=2),
-            progress_percent=72.5,
-            tags=["quiz-high", "focus"],
-        ),
-        RosterStudent(
-            student_id="student-2",
-            full_name="Trần Thị B",
-            email="student2@example.com",
-            status="pending",
-            last_active=None,
-            progress_percent=10.0,
-            tags=["new"],
-        ),
+        {"$match": {"class_id": class_id, "status": MembershipStatus.active.value}},
+        {
+            "$group": {
+                "_id": None,
+                "student_count": {"$sum": 1},
+                "average_progress": {"$avg": "$progress_percent"},
+                "completed_count": {"$sum": {"$cond": [{"$gte": ["$progress_percent", 100]}, 1, 0]}},
+                "active_last_7_days": {
+                    "$sum": {"$cond": [{"$gte": ["$last_active", now - timedelta(days=7)]}, 1, 0]}
+                },
+            }
+        },
     ]
+
+
+async def get_roster_summary(class_id: str, current_user: dict) -> RosterSummary:
+    """Tóm tắt roster, tính lại khi cache hết hạn hoặc bị xóa bởi sự kiện tiến độ."""
+
+    await authorize_class(class_id, current_user)
+    summary = roster_summary_cache.get(class_id)
+    if summary is None:
+        now = datetime.utcnow()
+        rows = await ClassMembershipDocument.aggregate(build_summary_pipeline(class_id, now)).to_list()
+        row = rows[0] if rows else {}
+        summary = RosterSummary(
+            class_id=class_id,
+            student_count=row.get("student_count", 0),
+            average_progress=round(row.get("average_progress") or 0.0, 2),
+            completed_count=row.get("completed_count", 0),
+            active_last_7_days=row.get("active_last_7_days", 0),
+            generated_at=now,
+        )
+        roster_summary_cache.put(class_id, summary)
+    return summary
+
+
+async def member_class_ids(user_id: str, course_id: str) -> Tuple[str, ...]:
+    """Các lớp (active) của người học trên khóa học, cache theo cặp người học × khóa học."""
+
+    key = (user_id, course_id)
+    class_ids = membership_cache.get(key)
+    if class_ids is None:
+        memberships = await ClassMembershipDocument.find(
+            {"user_id": user_id, "course_id": course_id, "status": MembershipStatus.active.value}
+        ).to_list()
+        class_ids = tuple(sorted(membership.class_id for membership in memberships))
+        membership_cache.put(key, class_ids)
+    return class_ids
+
+
+def membership_changed(class_id: str, user_id: str, course_id: str) -> None:
+    """Gọi sau khi thêm/xóa thành viên để các cache phản ánh ngay thay đổi."""
+
+    membership_cache.invalidate([(user_id, course_id)])
+    roster_summary_cache.invalidate([class_id])
+
+
+async def progress_recorded(user_id: str, course_id: str) -> Tuple[str, ...]:
+    """Xóa tóm tắt roster của các lớp bị ảnh hưởng; trả về ID các lớp đó."""
+
+    class_ids = await member_class_ids(user_id, course_id)
+    roster_summary_cache.invalidate(class_ids)
+    return class_ids
@@ -1,10 +1,15 @@
 """Dịch vụ quản lý khóa học."""
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from beanie import PydanticObjectId
+from pymongo.errors import DuplicateKeyError
 
 from models.models import CourseCreate, CourseDocument, CourseResponse
+from services.course_similarity_service import enqueue_similarity_update
+from services.learning_path_service import learning_graph_cache
+from services.lesson_index_service import assign_lesson_ids, lesson_index_cache
+from services.ownership_service import authorize_owned, prime_owners
 
 
 async def list_courses() -> List[CourseResponse]:
@@ -14,16 +19,46 @@ async def list_courses() -> List[CourseResponse]:
     return [CourseResponse.model_validate(course, from_attributes=True) for course in courses]
 
 
-async def create_course(payload: CourseCreate, user_id: str) -> CourseResponse:
-    """Tạo khóa học mới với thông tin người dùng hiện tại."""
+async def course_changed(course_id: str) -> None:
+    """Làm mới các chỉ mục dẫn xuất sau khi khóa học được tạo/sửa."""
 
+    lesson_index_cache.invalidate(course_id)
+    learning_graph_cache.invalidate()
+    await enqueue_similarity_update(course_id)
+
+
+async def _find_generated_course(source_job_id: str) -> Optional[CourseDocument]:
+    return await CourseDocument.find_one({"source_job_id": source_job_id})
+
+
+async def create_course(payload: CourseCreate, user_id: str, source_job_id: Optional[str] = None) -> CourseResponse:
+    """Tạo khóa học mới với thông tin người dùng hiện tại.
+
+    ``source_job_id`` là job AI sinh ra khóa học: job chạy lại (at-least-once) trả về khóa học
+    đã tạo trước đó thay vì tạo bản trùng; index unique trên trường này chặn hai lần chạy song song.
+    """
+
+    if source_job_id is not None:
+        existing = await _find_generated_course(source_job_id)
+        if existing is not None:
+            return CourseResponse.model_validate(existing, from_attributes=True)
     course_doc = CourseDocument(
         **payload.model_dump(),
         created_by=user_id,
+        source_job_id=source_job_id,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
-    saved = await course_doc.insert()
+    assign_lesson_ids(course_doc.modules)
+    try:
+        saved = await course_doc.insert()
+    except DuplicateKeyError:
+        existing = await _find_generated_course(source_job_id) if source_job_id is not None else None
+        if existing is None:
+            raise
+        return CourseResponse.model_validate(existing, from_attributes=True)
+    prime_owners("course", {str(saved.id): user_id})
+    await course_changed(str(saved.id))
     return CourseResponse.model_validate(saved, from_attributes=True)
 
 
@@ -34,3 +69,9 @@ async def get_course_by_id(course_id: PydanticObjectId) -> CourseResponse | None
     if course is None:
         return None
     return CourseResponse.model_validate(course, from_attributes=True)
+
+
+async def authorize_course_edit(course_id: str, current_user: dict) -> None:
+    """Người gọi được sửa khóa học (tác giả hoặc admin); tra chủ sở hữu qua cache."""
+
+    await authorize_owned(current_user, "courses", "update", "course", course_id, "Không tìm thấy khóa học")
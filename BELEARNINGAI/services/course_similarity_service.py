@@ -0,0 +1,190 @@
+"""Khóa học tương tự theo nội dung.
+
+Worker job giữ ``CourseSimilarityIndex`` trong bộ nhớ: mỗi khi một khóa học được tạo
+hoặc sửa, job ``course_similarity`` chỉ tính lại các hàng bị ảnh hưởng và ghi vào
+collection ``course_similarity``. Mỗi worker có bản chỉ mục riêng, nên trước khi áp job
+bản đó được đuổi kịp collection ``courses`` (thay đổi do job ở worker khác). Phía API nạp
+cả bảng vào một dict và đọc thẳng từ đó.
+"""
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pymongo import DeleteOne, UpdateOne
+
+from config.config import get_settings
+from models.models import CourseDocument, CourseSimilarityDocument, JobDocument, SimilarCourse
+from modules.similarity_module import CourseSimilarityIndex
+from schemas.course import RelatedCourseItem
+from services.job_service import enqueue_job, register_job_handler
+from services.recommendation_service import _enrolled_course_ids, recommended_course_ids
+
+COURSE_SIMILARITY_JOB = "course_similarity"
+_WRITE_CHUNK = 500
+
+_settings = get_settings()
+
+
+class _IndexHolder:
+    """Chỉ mục của tiến trình worker, dựng lại toàn bộ khi quá ``max_age``.
+
+    ``synced_at`` là ``updated_at`` lớn nhất đã áp vào chỉ mục; ``catch_up`` áp các khóa học
+    mới hơn mốc đó và gỡ khóa học đã bị xóa.
+    """
+
+    def __init__(self, max_age_seconds: int) -> None:
+        self.max_age_seconds = max_age_seconds
+        self.index: Optional[CourseSimilarityIndex] = None
+        self.built_at = 0.0
+        self.synced_at: Optional[datetime] = None
+
+    async def get(self) -> CourseSimilarityIndex:
+        if self.index is None or time.monotonic() - self.built_at > self.max_age_seconds:
+            courses = await CourseDocument.find_all().to_list()
+            self.index = CourseSimilarityIndex.build(courses, top_k=_settings.similarity_top_k)
+            self.synced_at = max((course.updated_at for course in courses), default=None)
+            self.built_at = time.monotonic()
+        return self.index
+
+    async def catch_up(self) -> Tuple[Set[str], Set[str]]:
+        """Đưa chỉ mục về đúng collection ``courses``; trả (hàng cần ghi lại, khóa học đã bị xóa)."""
+
+        index = await self.get()
+        affected: Set[str] = set()
+        removed: Set[str] = set()
+        # ``$gte``: khóa học cùng mốc ``updated_at`` nhưng ghi sau lần đồng bộ vẫn được áp.
+        query = {} if self.synced_at is None else {"updated_at": {"$gte": self.synced_at}}
+        for course in await CourseDocument.find(query).to_list():
+            affected |= index.upsert(course)
+            self.synced_at = max(self.synced_at or course.updated_at, course.updated_at)
+        collection = CourseDocument.get_pymongo_collection()
+        if await collection.count_documents({}) != len(index.course_ids):
+            current = {str(course_id) for course_id in await collection.distinct("_id")}
+            for course_id in set(index.course_ids) - current:
+                affected |= index.remove(course_id)
+                removed.add(course_id)
+        return affected - removed, removed
+
+
+_index_holder = _IndexHolder(_settings.similarity_index_max_age_seconds)
+
+
+async def _persist_rows(index: CourseSimilarityIndex, course_ids: Iterable[str], removed: Iterable[str] = ()) -> int:
+    now = datetime.utcnow()
+    operations: list = [DeleteOne({"course_id": course_id}) for course_id in removed]
+    for course_id in course_ids:
+        neighbours = [
+            SimilarCourse(course_id=other, title=index.titles.get(other, ""), score=score).model_dump()
+            for other, score in index.neighbours.get(course_id, [])
+        ]
+        operations.append(
+            UpdateOne(
+                {"course_id": course_id},
+                {"$set": {"neighbours": neighbours, "updated_at": now}},
+                upsert=True,
+            )
+        )
+    collection = CourseSimilarityDocument.get_pymongo_collection()
+    for start in range(0, len(operations), _WRITE_CHUNK):
+        await collection.bulk_write(operations[start : start + _WRITE_CHUNK], ordered=False)
+    return len(operations)
+
+
+async def rebuild_similarity_index() -> int:
+    """Dựng lại toàn bộ chỉ mục (cập nhật IDF) và ghi đè bảng láng giềng."""
+
+    _index_holder.index = None
+    index = await _index_holder.get()
+    stored = await CourseSimilarityDocument.get_pymongo_collection().distinct("course_id")
+    removed = set(stored) - set(index.course_ids)
+    written = await _persist_rows(index, index.course_ids, removed)
+    related_cache.invalidate()
+    return written
+
+
+async def enqueue_similarity_update(course_id: str) -> JobDocument:
+    """Xếp job cập nhật láng giềng sau khi khóa học được tạo/sửa/xóa."""
+
+    return await enqueue_job(COURSE_SIMILARITY_JOB, {"course_id": course_id})
+
+
+@register_job_handler(COURSE_SIMILARITY_JOB)
+async def run_similarity_update_job(job: JobDocument) -> dict:
+    """Handler job: cập nhật gia tăng các hàng bị ảnh hưởng bởi một khóa học."""
+
+    course_id = job.payload["course_id"]
+    affected, removed = await _index_holder.catch_up()
+    index = _index_holder.index
+    course = await CourseDocument.get(PydanticObjectId(course_id)) if PydanticObjectId.is_valid(course_id) else None
+    if course is None:
+        affected |= index.remove(course_id)
+        removed.add(course_id)
+    else:
+        affected |= index.upsert(course)
+    affected -= removed
+    await _persist_rows(index, affected, removed=removed)
+    return {"course_id": course_id, "affected_rows": len(affected)}
+
+
+class RelatedCoursesCache:
+    """Bảng ``course_id -> láng giềng`` trong bộ nhớ, nạp lại toàn bộ theo TTL."""
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._table: Dict[str, List[SimilarCourse]] = {}
+        self._loaded_at: Optional[float] = None
+
+    async def table(self) -> Dict[str, List[SimilarCourse]]:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds:
+            rows = await CourseSimilarityDocument.find_all().to_list()
+            self._table = {row.course_id: row.neighbours for row in rows}
+            self._loaded_at = time.monotonic()
+        return self._table
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+
+related_cache = RelatedCoursesCache(_settings.similarity_cache_ttl_seconds)
+
+
+async def related_courses(course_id: str, limit: int = 10) -> List[RelatedCourseItem]:
+    """Khóa học tương tự của một khóa học."""
+
+    neighbours = (await related_cache.table()).get(course_id, [])
+    return [RelatedCourseItem(**item.model_dump()) for item in neighbours[:limit]]
+
+
+async def recommend_similar_for_user(user_id: str, limit: int = 10) -> List[RelatedCourseItem]:
+    """Cộng điểm láng giềng của các khóa người học đã đăng ký; thiếu dữ liệu thì dùng model ALS."""
+
+    enrolled = await _enrolled_course_ids(user_id)
+    table = await related_cache.table()
+    scores: Dict[str, float] = defaultdict(float)
+    titles: Dict[str, str] = {}
+    for course_id in enrolled:
+        for item in table.get(course_id, []):
+            if item.course_id not in enrolled:
+                scores[item.course_id] += item.score
+                titles[item.course_id] = item.title
+    ranked = sorted(scores, key=lambda course_id: -scores[course_id])[:limit]
+    items = [RelatedCourseItem(course_id=course_id, title=titles[course_id], score=round(scores[course_id], 6)) for course_id in ranked]
+    if len(items) >= limit:
+        return items
+
+    fallback_ids = [
+        course_id
+        for course_id in await recommended_course_ids(user_id, limit=limit, exclude=enrolled | set(ranked))
+        if PydanticObjectId.is_valid(course_id)
+    ]
+    courses = await CourseDocument.find(In(CourseDocument.id, [PydanticObjectId(course_id) for course_id in fallback_ids])).to_list()
+    by_id = {str(course.id): course for course in courses}
+    items.extend(
+        RelatedCourseItem(course_id=course_id, title=by_id[course_id].title, score=0.0)
+        for course_id in fallback_ids
+        if course_id in by_id
+    )
+    return items[:limit]
@@ -1,15 +1,137 @@
-"""Dịch vụ tổng hợp số liệu dashboard."""
-from datetime import datetime
+"""Dịch vụ tổng hợp số liệu dashboard.
 
-from models.models import DashboardMetric, DashboardResponse
+Số liệu toàn nền tảng được tính định kỳ bằng aggregation pipeline và lưu thành snapshot
+trong ``dashboard_metrics``; API chỉ đọc snapshot mới nhất (một truy vấn theo index
+``snapshot_at``). Xu hướng là phần trăm thay đổi so với snapshot liền trước.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional
 
+from config.config import get_settings
+from models.models import (
+    CourseDocument,
+    DashboardDocument,
+    DashboardMetric,
+    DashboardResponse,
+    EnrollmentDocument,
+    JobDocument,
+    ProgressDocument,
+    RefreshTokenDocument,
+    UserDocument,
+)
+from modules.rollup_module import percent_change
+from services.active_users_service import active_user_counts
+from services.ai_service import COURSE_GENERATION_JOB
+from utils.scheduler import PeriodicTask
 
-async def get_dashboard_stats() -> DashboardResponse:
-    """Giả lập trả về số liệu dashboard."""
+_settings = get_settings()
+
+AI_JOB_TYPES = [COURSE_GENERATION_JOB]
+
+
+async def _first(document_type, pipeline: list) -> dict:
+    rows = await document_type.aggregate(pipeline).to_list()
+    return rows[0] if rows else {}
 
-    metrics = [
-        DashboardMetric(name="total_users", value=1250, trend=5.2),
-        DashboardMetric(name="active_courses", value=180, trend=2.1),
-        DashboardMetric(name="ai_chat_requests", value=1520, trend=8.6),
+
+def _total_and_recent(field: str, since: datetime) -> list:
+    return [
+        {
+            "$facet": {
+                "total": [{"$count": "value"}],
+                "recent": [{"$match": {field: {"$gte": since}}}, {"$count": "value"}],
+            }
+        },
+        {
+            "$project": {
+                "total": {"$ifNull": [{"$arrayElemAt": ["$total.value", 0]}, 0]},
+                "recent": {"$ifNull": [{"$arrayElemAt": ["$recent.value", 0]}, 0]},
+            }
+        },
     ]
-    return DashboardResponse(metrics=metrics, generated_at=datetime.utcnow())
+
+
+async def compute_platform_metrics(now: Optional[datetime] = None) -> Dict[str, float]:
+    """Tính số liệu toàn nền tảng tại thời điểm ``now``."""
+
+    now = now or datetime.utcnow()
+    since = now - timedelta(hours=24)
+    users = await _first(UserDocument, _total_and_recent("created_at", since))
+    courses = await _first(CourseDocument, _total_and_recent("created_at", since))
+    sessions = await _first(
+        RefreshTokenDocument,
+        [{"$match": {"revoked_at": None, "expires_at": {"$gt": now}}}, {"$count": "value"}],
+    )
+    learners = await _first(
+        ProgressDocument,
+        [{"$match": {"last_activity": {"$gte": since}}}, {"$group": {"_id": "$user_id"}}, {"$count": "value"}],
+    )
+    ai_requests = await _first(
+        JobDocument,
+        [{"$match": {"job_type": {"$in": AI_JOB_TYPES}, "created_at": {"$gte": since}}}, {"$count": "value"}],
+    )
+    enrollments = await EnrollmentDocument.get_pymongo_collection().estimated_document_count()
+    active = await active_user_counts(now=now)
+    return {
+        "total_users": users.get("total", 0),
+        "new_users_24h": users.get("recent", 0),
+        "active_sessions": sessions.get("value", 0),
+        "total_courses": courses.get("total", 0),
+        "new_courses_24h": courses.get("recent", 0),
+        "total_enrollments": enrollments,
+        "active_learners_24h": learners.get("value", 0),
+        "ai_requests_24h": ai_requests.get("value", 0),
+        "daily_active_users": active["dau"],
+        "weekly_active_users": active["wau"],
+        "monthly_active_users": active["mau"],
+    }
+
+
+async def latest_snapshot() -> Optional[DashboardDocument]:
+    return await DashboardDocument.find_all().sort(-DashboardDocument.snapshot_at).first_or_none()
+
+
+async def materialize_snapshot(now: Optional[datetime] = None) -> DashboardDocument:
+    """Tính và lưu một snapshot mới, kèm xu hướng so với snapshot trước."""
+
+    now = now or datetime.utcnow()
+    values = await compute_platform_metrics(now)
+    previous = await latest_snapshot()
+    previous_values = {metric.name: metric.value for metric in previous.metrics} if previous else {}
+    snapshot = DashboardDocument(
+        snapshot_at=now,
+        metrics=[
+            DashboardMetric(name=name, value=value, trend=percent_change(value, previous_values.get(name, 0)))
+            for name, value in values.items()
+        ],
+        expires_at=now + timedelta(days=_settings.dashboard_snapshot_retention_days),
+    )
+    return await snapshot.insert()
+
+
+async def refresh_snapshot_if_stale() -> Optional[DashboardDocument]:
+    """Callback định kỳ: bỏ qua nếu worker khác vừa chụp snapshot."""
+
+    latest = await latest_snapshot()
+    interval = timedelta(seconds=_settings.dashboard_snapshot_interval_seconds)
+    if latest is not None and datetime.utcnow() - latest.snapshot_at < interval * 0.9:
+        return None
+    return await materialize_snapshot()
+
+
+dashboard_snapshotter = PeriodicTask(
+    "dashboard-snapshot", _settings.dashboard_snapshot_interval_seconds, refresh_snapshot_if_stale, final_run=False
+)
+
+
+async def current_snapshot() -> DashboardDocument:
+    """Snapshot mới nhất; chụp ngay nếu chưa có snapshot nào."""
+
+    return await latest_snapshot() or await materialize_snapshot()
+
+
+async def get_dashboard_stats() -> DashboardResponse:
+    """Số liệu dashboard từ snapshot mới nhất."""
+
+    snapshot = await current_snapshot()
+    return DashboardResponse(metrics=snapshot.metrics, generated_at=snapshot.snapshot_at)
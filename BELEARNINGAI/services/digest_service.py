@@ -0,0 +1,348 @@
+"""Bản tin email tổng hợp thông báo theo cửa sổ thời gian.
+
+Thông báo ghi với ``email_pending=True`` được gom theo người nhận. Một người nhận được xử
+lý khi thông báo chờ cũ nhất đã quá ``digest_window_minutes`` và bản tin trước đã cách ít
+nhất một cửa sổ, nên một loạt thông báo dồn dập chỉ thành một email. Mỗi lượt:
+
+1. một aggregation trên index partial ``email_pending`` chỉ chọn tối đa ``digest_batch_users``
+   người nhận (``_id``/``oldest``), không gom nội dung thông báo;
+2. giữ người nhận bằng lease trên ``notification_counters`` để các worker không gửi trùng;
+3. đọc thông báo chờ rồi email/tùy chọn của cả lô, mỗi thứ một truy vấn ``$in``, dựng bản tin;
+4. gửi song song qua ``SmtpPool`` (pool kết nối + token bucket);
+5. ghi kết quả bằng vài lệnh ghi gộp. Lỗi tạm thời được hẹn thử lại với backoff qua
+   ``digest_lease_until``; quá ``digest_max_attempts`` hoặc lỗi 5xx thì chuyển vào
+   ``email_dead_letters``.
+"""
+import asyncio
+import html
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Sequence
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from config.config import get_settings
+from models.models import EmailDeadLetterDocument, NotificationCounterDocument, NotificationDocument, UserDocument
+from utils.mailer import SmtpPool, is_transient
+from utils.scheduler import PeriodicTask
+
+logger = logging.getLogger("app.digest")
+_settings = get_settings()
+
+STUDY_REMINDER = "study_reminder"
+
+
+@dataclass
+class Digest:
+    """Một bản tin sẵn sàng gửi cho một người nhận."""
+
+    user_id: str
+    recipient: str
+    full_name: str
+    items: List[dict]
+    notification_ids: List[ObjectId]
+    hidden_count: int = 0
+    failures: int = 0
+    message: Optional[EmailMessage] = field(default=None, repr=False)
+
+
+_mailer: Optional[SmtpPool] = None
+
+
+def get_mailer() -> SmtpPool:
+    global _mailer
+    if _mailer is None:
+        _mailer = SmtpPool(
+            _settings.smtp_host or "localhost",
+            _settings.smtp_port,
+            username=_settings.smtp_username,
+            password=_settings.smtp_password,
+            starttls=_settings.smtp_starttls,
+            pool_size=_settings.smtp_pool_size,
+            rate_per_second=_settings.smtp_rate_per_second,
+            timeout=_settings.smtp_timeout_seconds,
+            retries=_settings.smtp_send_retries,
+        )
+    return _mailer
+
+
+def build_pending_pipeline(now: datetime) -> List[dict]:
+    """Chọn người nhận có thông báo chờ đã quá một cửa sổ, cũ nhất trước.
+
+    Chỉ thông báo cũ hơn cửa sổ mới quyết định người nhận nào đến lượt, nên ``$match`` cắt
+    ngay trên index ``(created_at, target_user_id)`` (partial ``email_pending``) và ``$group``
+    chỉ giữ ``_id``/``oldest``; nội dung được đọc sau cho lô đã chọn (``load_pending_groups``).
+    """
+
+    window_start = now - timedelta(minutes=_settings.digest_window_minutes)
+    return [
+        {"$match": {"email_pending": True, "created_at": {"$lte": window_start}}},
+        {"$group": {"_id": "$target_user_id", "oldest": {"$min": "$created_at"}}},
+        # Bỏ người đang chờ thử lại hoặc vừa nhận bản tin để họ không chiếm chỗ của lô.
+        {
+            "$lookup": {
+                "from": NotificationCounterDocument.Settings.name,
+                "localField": "_id",
+                "foreignField": "user_id",
+                "as": "counter",
+            }
+        },
+        {
+            "$match": {
+                "counter.digest_lease_until": {"$not": {"$gt": now}},
+                "counter.last_digest_at": {"$not": {"$gt": window_start}},
+            }
+        },
+        {"$project": {"counter": 0}},
+        {"$sort": {"oldest": 1}},
+        {"$limit": _settings.digest_batch_users},
+    ]
+
+
+async def load_pending_groups(user_ids: Sequence[str], now: datetime) -> List[dict]:
+    """Thông báo chờ email của các người nhận đã chọn, gom theo người nhận (cũ nhất trước)."""
+
+    groups: Dict[str, dict] = {user_id: {"_id": user_id, "ids": [], "items": []} for user_id in user_ids}
+    rows = (
+        NotificationDocument.get_pymongo_collection()
+        .find(
+            {"target_user_id": {"$in": list(user_ids)}, "email_pending": True, "created_at": {"$lte": now}},
+            {"target_user_id": 1, "title": 1, "message": 1, "category": 1, "created_at": 1},
+        )
+        .sort([("created_at", 1), ("_id", 1)])
+    )
+    async for row in rows:
+        group = groups[row["target_user_id"]]
+        group["ids"].append(row["_id"])
+        group["items"].append(
+            {
+                "id": row["_id"],
+                "title": row["title"],
+                "message": row["message"],
+                "category": row.get("category"),
+                "created_at": row["created_at"],
+            }
+        )
+    return [group for group in groups.values() if group["ids"]]
+
+
+async def claim_recipients(user_ids: Sequence[str], now: datetime) -> Dict[str, int]:
+    """Giữ lease các người nhận chưa bị worker khác giữ và đã qua một cửa sổ từ bản tin trước.
+
+    Trả ``user_id -> số lần lỗi liên tiếp`` của những người giữ được.
+    """
+
+    owner = uuid.uuid4().hex
+    counters = NotificationCounterDocument.get_pymongo_collection()
+    await counters.update_many(
+        {
+            "user_id": {"$in": list(user_ids)},
+            "digest_lease_until": {"$not": {"$gt": now}},
+            "last_digest_at": {"$not": {"$gt": now - timedelta(minutes=_settings.digest_window_minutes)}},
+        },
+        {
+            "$set": {
+                "digest_lease_owner": owner,
+                "digest_lease_until": now + timedelta(seconds=_settings.digest_lease_seconds),
+            }
+        },
+    )
+    rows = await counters.find(
+        {"user_id": {"$in": list(user_ids)}, "digest_lease_owner": owner}, {"user_id": 1, "digest_failures": 1}
+    ).to_list(length=None)
+    return {row["user_id"]: row.get("digest_failures", 0) for row in rows}
+
+
+def plan_digest(group: dict, user: Optional[dict], failures: int = 0) -> tuple[Optional[Digest], List[ObjectId]]:
+    """Áp tùy chọn thông báo của người nhận lên nhóm thông báo chờ.
+
+    Trả bản tin cần gửi (``None`` nếu không còn gì để gửi) và các thông báo bỏ qua không gửi.
+    """
+
+    preferences = ((user or {}).get("preferences") or {}).get("notifications") or {}
+    if not user or not user.get("email") or not preferences.get("email", True):
+        return None, list(group["ids"])
+    skip_categories = set() if preferences.get("study_reminders", True) else {STUDY_REMINDER}
+    items = [item for item in group["items"] if item.get("category") not in skip_categories]
+    kept = {item["id"] for item in items}
+    skipped = [oid for oid in group["ids"] if oid not in kept]
+    if not items:
+        return None, skipped
+    limit = _settings.digest_max_items
+    digest = Digest(
+        user_id=group["_id"],
+        recipient=user["email"],
+        full_name=user.get("full_name") or user["email"],
+        items=items[-limit:][::-1],
+        notification_ids=[item["id"] for item in items],
+        hidden_count=max(len(items) - limit, 0),
+        failures=failures,
+    )
+    return digest, skipped
+
+
+def render_digest(digest: Digest) -> EmailMessage:
+    """Dựng email (text + HTML) liệt kê thông báo mới nhất trước."""
+
+    total = len(digest.items) + digest.hidden_count
+    message = EmailMessage()
+    message["From"] = _settings.smtp_sender
+    message["To"] = digest.recipient
+    message["Subject"] = f"Bạn có {total} thông báo mới"
+    lines = [f"Chào {digest.full_name},", "", f"Bạn có {total} thông báo mới:", ""]
+    lines += [f"- {item['title']}: {item['message']}" for item in digest.items]
+    if digest.hidden_count:
+        lines.append(f"... và {digest.hidden_count} thông báo khác trong hộp thư.")
+    message.set_content("\n".join(lines))
+    rows = "".join(
+        f"<li><strong>{html.escape(item['title'])}</strong><br>{html.escape(item['message'])}</li>"
+        for item in digest.items
+    )
+    more = f"<p>... và {digest.hidden_count} thông báo khác trong hộp thư.</p>" if digest.hidden_count else ""
+    message.add_alternative(
+        f"<p>Chào {html.escape(digest.full_name)},</p><p>Bạn có {total} thông báo mới:</p><ul>{rows}</ul>{more}",
+        subtype="html",
+    )
+    return message
+
+
+def _retry_delay(failures: int) -> timedelta:
+    return timedelta(minutes=min(2 ** failures, 24 * 60))
+
+
+async def dispatch_digests(now: Optional[datetime] = None, mailer: Optional[SmtpPool] = None) -> Dict[str, int]:
+    """Một lượt gom và gửi bản tin; trả số người nhận theo kết quả."""
+
+    now = now or datetime.utcnow()
+    candidates = await NotificationDocument.aggregate(build_pending_pipeline(now)).to_list()
+    stats = {"sent": 0, "skipped": 0, "retrying": 0, "dead_lettered": 0}
+    if not candidates:
+        return stats
+    claimed = await claim_recipients([candidate["_id"] for candidate in candidates], now)
+    user_ids = [candidate["_id"] for candidate in candidates if candidate["_id"] in claimed]
+    if not user_ids:
+        return stats
+    groups = await load_pending_groups(user_ids, now)
+
+    object_ids = [ObjectId(group["_id"]) for group in groups if ObjectId.is_valid(group["_id"])]
+    users = {
+        str(row["_id"]): row
+        for row in await UserDocument.get_pymongo_collection()
+        .find({"_id": {"$in": object_ids}}, {"email": 1, "full_name": 1, "preferences.notifications": 1})
+        .to_list(length=None)
+    }
+
+    digests: List[Digest] = []
+    released: List[str] = []
+    done_ids: List[ObjectId] = []
+    for group in groups:
+        digest, skipped = plan_digest(group, users.get(group["_id"]), claimed[group["_id"]])
+        done_ids.extend(skipped)
+        if digest is None:
+            stats["skipped"] += 1
+            released.append(group["_id"])
+            continue
+        digest.message = render_digest(digest)
+        digests.append(digest)
+
+    mailer = mailer or get_mailer()
+    outcomes = await asyncio.gather(*(mailer.send(digest.message) for digest in digests), return_exceptions=True)
+
+    counter_updates: List[UpdateOne] = [
+        UpdateOne({"user_id": user_id}, {"$set": {"digest_lease_owner": None, "digest_lease_until": None}})
+        for user_id in released
+    ]
+    emailed_ids: List[ObjectId] = []
+    dead_letters: List[dict] = []
+    for digest, outcome in zip(digests, outcomes):
+        if not isinstance(outcome, BaseException):
+            stats["sent"] += 1
+            emailed_ids.extend(digest.notification_ids)
+            counter_updates.append(
+                UpdateOne(
+                    {"user_id": digest.user_id},
+                    {
+                        "$set": {
+                            "last_digest_at": now,
+                            "digest_failures": 0,
+                            "digest_lease_owner": None,
+                            "digest_lease_until": None,
+                        }
+                    },
+                )
+            )
+            continue
+        failures = digest.failures + 1
+        if is_transient(outcome) and failures < _settings.digest_max_attempts:
+            stats["retrying"] += 1
+            logger.warning("Gửi bản tin cho %s lỗi lần %d: %s", digest.user_id, failures, outcome)
+            counter_updates.append(
+                UpdateOne(
+                    {"user_id": digest.user_id},
+                    {
+                        "$set": {
+                            "digest_failures": failures,
+                            "digest_lease_owner": None,
+                            "digest_lease_until": now + _retry_delay(failures),
+                        }
+                    },
+                )
+            )
+            continue
+        stats["dead_lettered"] += 1
+        logger.error("Chuyển bản tin của %s vào dead-letter: %s", digest.user_id, outcome)
+        done_ids.extend(digest.notification_ids)
+        dead_letters.append(
+            EmailDeadLetterDocument(
+                user_id=digest.user_id,
+                recipient=digest.recipient,
+                subject=digest.message["Subject"],
+                body=digest.message.get_body(("plain",)).get_content(),
+                notification_ids=[str(oid) for oid in digest.notification_ids],
+                error=str(outcome) or outcome.__class__.__name__,
+                attempts=failures,
+                created_at=now,
+            ).model_dump(exclude={"id"})
+        )
+        counter_updates.append(
+            UpdateOne(
+                {"user_id": digest.user_id},
+                {"$set": {"digest_failures": 0, "digest_lease_owner": None, "digest_lease_until": None}},
+            )
+        )
+
+    notifications = NotificationDocument.get_pymongo_collection()
+    if emailed_ids:
+        await notifications.update_many(
+            {"_id": {"$in": emailed_ids}}, {"$set": {"email_pending": False, "emailed_at": now}}
+        )
+    if done_ids:
+        await notifications.update_many({"_id": {"$in": done_ids}}, {"$set": {"email_pending": False}})
+    if dead_letters:
+        await EmailDeadLetterDocument.get_pymongo_collection().insert_many(dead_letters)
+    if counter_updates:
+        await NotificationCounterDocument.get_pymongo_collection().bulk_write(counter_updates, ordered=False)
+    return stats
+
+
+async def close_mailer() -> None:
+    global _mailer
+    if _mailer is not None:
+        await _mailer.close()
+        _mailer = None
+
+
+async def _dispatch_until_drained() -> None:
+    while True:
+        stats = await dispatch_digests()
+        if sum(stats.values()) < _settings.digest_batch_users:
+            return
+
+
+digest_dispatcher = PeriodicTask(
+    "email-digest", _settings.digest_interval_seconds, _dispatch_until_drained, final_run=False
+)
@@ -1,38 +1,257 @@
-"""Dịch vụ quản lý enrollment."""
+"""Dịch vụ quản lý enrollment.
+
+Tính idempotent của đăng ký dựa trên unique index ``(course_id, user_id)``: ghi thẳng và
+coi lỗi trùng khóa là "đã đăng ký", không đọc trước khi ghi. Đăng ký hàng loạt xác thực
+toàn bộ định danh bằng một truy vấn ``$in`` rồi ghi bằng ``bulk_write`` không thứ tự
+theo từng khối, trả kết quả cho từng dòng.
+"""
+import csv
+import io
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from beanie import PydanticObjectId
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import DeleteOne, InsertOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from config.config import get_settings
+from models.models import (
+    CourseDocument,
+    EnrollmentDocument,
+    EnrollmentResponse,
+    EnrollmentStatus,
+    ProgressDocument,
+    UserDocument,
+)
+from schemas.enrollment import BulkEnrollmentResponse, BulkEnrollmentRow, ProgressSnapshot, StudySession
+from services.permissions_service import ensure_permission
+from services.progress_service import record_progress_event
+from services.rollup_service import record_metrics
+
+_settings = get_settings()
 
-from models.models import EnrollmentResponse, EnrollmentStatus
-from schemas.enrollment import ProgressSnapshot, StudySession
+_DUPLICATE_KEY = 11000
+
+
+def _to_response(enrollment: EnrollmentDocument) -> EnrollmentResponse:
+    return EnrollmentResponse.model_validate({**enrollment.model_dump(exclude={"id"}), "_id": str(enrollment.id)})
 
 
 async def enroll_course(user_id: str, course_id: str) -> EnrollmentResponse:
-    """Giả lập đăng ký khóa học."""
-
-    return EnrollmentResponse.model_validate(
-        {
-            "_id": "enroll-demo",
-            "course_id": course_id,
-            "user_id": user_id,
-            "status": EnrollmentStatus.active,
-            "progress": 0.0,
-            "enrolled_at": datetime.utcnow(),
+    """Đăng ký khóa học; đăng ký lại trả về enrollment sẵn có."""
+
+    await _get_course(course_id)
+    try:
+        enrollment = await EnrollmentDocument(
+            user_id=user_id, course_id=course_id, status=EnrollmentStatus.active
+        ).insert()
+    except DuplicateKeyError:
+        enrollment = await EnrollmentDocument.find_one(
+            EnrollmentDocument.user_id == user_id, EnrollmentDocument.course_id == course_id
+        )
+        return _to_response(enrollment)
+    record_metrics(user_id, {"enrollments": 1}, course_id=course_id)
+    return _to_response(enrollment)
+
+
+async def unenroll_course(user_id: str, course_id: str) -> None:
+    """Hủy đăng ký khóa học."""
+
+    result = await EnrollmentDocument.get_pymongo_collection().delete_one({"course_id": course_id, "user_id": user_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chưa đăng ký khóa học này")
+
+
+async def _get_course(course_id: str) -> CourseDocument:
+    course = await CourseDocument.get(PydanticObjectId(course_id)) if PydanticObjectId.is_valid(course_id) else None
+    if course is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy khóa học")
+    return course
+
+
+def parse_identifiers_csv(content: bytes) -> List[str]:
+    """Đọc cột ``user_id``/``email``/``id`` (hoặc cột đầu nếu không có tiêu đề) từ CSV."""
+
+    rows = [row for row in csv.reader(io.StringIO(content.decode("utf-8-sig"))) if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    column = 0
+    for name in ("user_id", "email", "id"):
+        if name in header:
+            column = header.index(name)
+            rows = rows[1:]
+            break
+    return [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+
+
+def _lookup_key(identifier: str) -> Optional[str]:
+    if "@" in identifier:
+        return identifier.lower()
+    return identifier if ObjectId.is_valid(identifier) else None
+
+
+async def _resolve_users(keys: Sequence[str]) -> Dict[str, str]:
+    """Ánh xạ user ID/email -> user ID bằng một truy vấn ``$in`` trên ``_id`` và ``email``."""
+
+    object_ids = [ObjectId(key) for key in keys if "@" not in key]
+    emails = [key for key in keys if "@" in key]
+    clauses = []
+    if object_ids:
+        clauses.append({"_id": {"$in": object_ids}})
+    if emails:
+        clauses.append({"email": {"$in": emails}})
+    resolved: Dict[str, str] = {}
+    if not clauses:
+        return resolved
+    async for row in UserDocument.get_pymongo_collection().find({"$or": clauses}, {"email": 1}):
+        user_id = str(row["_id"])
+        resolved[user_id] = user_id
+        if row.get("email"):
+            resolved[row["email"].lower()] = user_id
+    return resolved
+
+
+async def _bulk_insert(course_id: str, targets: List[Tuple[int, str]], results: List[BulkEnrollmentRow]) -> None:
+    collection = EnrollmentDocument.get_pymongo_collection()
+    now = datetime.utcnow()
+    for start in range(0, len(targets), _settings.bulk_enrollment_chunk_size):
+        chunk = targets[start : start + _settings.bulk_enrollment_chunk_size]
+        operations = [
+            InsertOne(
+                {
+                    "course_id": course_id,
+                    "user_id": user_id,
+                    "status": EnrollmentStatus.active.value,
+                    "progress": 0.0,
+                    "enrolled_at": now,
+                }
+            )
+            for _, user_id in chunk
+        ]
+        errors: Dict[int, dict] = {}
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as error:
+            errors = {item["index"]: item for item in error.details.get("writeErrors", [])}
+        for position, (row, user_id) in enumerate(chunk):
+            error = errors.get(position)
+            if error is None:
+                results[row].status = "enrolled"
+                record_metrics(user_id, {"enrollments": 1}, course_id=course_id)
+            elif error.get("code") == _DUPLICATE_KEY:
+                results[row].status = "already_enrolled"
+            else:
+                results[row].status = "failed"
+                results[row].detail = error.get("errmsg")
+
+
+async def _bulk_delete(course_id: str, targets: List[Tuple[int, str]], results: List[BulkEnrollmentRow]) -> None:
+    collection = EnrollmentDocument.get_pymongo_collection()
+    for start in range(0, len(targets), _settings.bulk_enrollment_chunk_size):
+        chunk = targets[start : start + _settings.bulk_enrollment_chunk_size]
+        enrolled = {
+            row["user_id"]
+            async for row in collection.find(
+                {"course_id": course_id, "user_id": {"$in": [user_id for _, user_id in chunk]}}, {"user_id": 1}
+            )
         }
+        operations = [
+            DeleteOne({"course_id": course_id, "user_id": user_id}) for _, user_id in chunk if user_id in enrolled
+        ]
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+        for row, user_id in chunk:
+            results[row].status = "unenrolled" if user_id in enrolled else "not_enrolled"
+
+
+async def bulk_update_enrollments(
+    course_id: str, identifiers: Sequence[str], current_user: dict, action: str = "enroll"
+) -> BulkEnrollmentResponse:
+    """Đăng ký/hủy đăng ký hàng loạt; mỗi dòng đầu vào có một kết quả tương ứng."""
+
+    course = await _get_course(course_id)
+    ensure_permission(current_user, "courses", "manage_enrollment", owner_id=course.created_by)
+    if len(identifiers) > _settings.bulk_enrollment_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tối đa {_settings.bulk_enrollment_max_rows} dòng mỗi lượt",
+        )
+    keys = [_lookup_key(identifier.strip()) for identifier in identifiers]
+    resolved = await _resolve_users(sorted({key for key in keys if key}))
+    results: List[BulkEnrollmentRow] = []
+    targets: List[Tuple[int, str]] = []
+    seen = set()
+    for row, (identifier, key) in enumerate(zip(identifiers, keys)):
+        user_id = resolved.get(key) if key else None
+        result = BulkEnrollmentRow(identifier=identifier, user_id=user_id, status="pending")
+        if key is None:
+            result.status = "invalid"
+        elif user_id is None:
+            result.status = "not_found"
+        elif user_id in seen:
+            result.status = "duplicate"
+        else:
+            seen.add(user_id)
+            targets.append((row, user_id))
+        results.append(result)
+    if action == "enroll":
+        await _bulk_insert(course_id, targets, results)
+    else:
+        await _bulk_delete(course_id, targets, results)
+    return BulkEnrollmentResponse(
+        course_id=course_id,
+        action=action,
+        summary=dict(Counter(result.status for result in results)),
+        results=results,
     )
 
 
 async def list_enrollments(user_id: str) -> List[EnrollmentResponse]:
-    """Giả lập danh sách enrollment của user."""
+    """Danh sách enrollment của người dùng, mới nhất trước."""
+
+    enrollments = (
+        await EnrollmentDocument.find(EnrollmentDocument.user_id == user_id)
+        .sort(-EnrollmentDocument.enrolled_at)
+        .to_list()
+    )
+    return [_to_response(enrollment) for enrollment in enrollments]
 
-    return [await enroll_course(user_id, "course-demo")]
 
+async def update_progress(
+    enrollment_id: str, user_id: str, progress: Optional[float] = None, lesson_id: Optional[str] = None
+) -> EnrollmentResponse:
+    """Cập nhật tiến độ của enrollment.
 
-async def update_progress(enrollment_id: str, progress: float) -> EnrollmentResponse:
-    """Giả lập cập nhật tiến độ."""
+    Với ``lesson_id``, bài học được ghi nhận qua bộ đệm sự kiện và phần trăm được tính
+    lại từ số bài đã hoàn thành / tổng số bài (chỉ mục bài học đã cache). Phần trăm chỉ được
+    chép sang enrollment ở bước đồng bộ sau đó, nên phản hồi lấy phần trăm từ tài liệu tiến
+    độ vừa ghi. Không có ``lesson_id`` thì ghi đè trực tiếp ``progress``.
+    """
 
-    response = await enroll_course("demo-user", "course-demo")
-    response.progress = progress
-    return response
+    enrollment = await EnrollmentDocument.get(PydanticObjectId(enrollment_id)) if PydanticObjectId.is_valid(enrollment_id) else None
+    if enrollment is None or enrollment.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy enrollment")
+    if lesson_id is not None:
+        await record_progress_event(user_id, enrollment.course_id, lesson_id=lesson_id)
+        row = await ProgressDocument.get_pymongo_collection().find_one(
+            {"user_id": user_id, "course_id": enrollment.course_id}, {"_id": 0, "progress": 1}
+        )
+        # Cùng quy tắc với bước đồng bộ: ``$max`` phần trăm, đủ 100% thì hoàn thành.
+        enrollment.progress = max(enrollment.progress, (row or {}).get("progress", 0.0))
+        if enrollment.progress >= 100:
+            enrollment.status = EnrollmentStatus.completed
+    elif progress is not None:
+        await enrollment.set(
+            {
+                EnrollmentDocument.progress: progress,
+                EnrollmentDocument.status: EnrollmentStatus.completed if progress >= 100 else EnrollmentStatus.active,
+            }
+        )
+    return _to_response(enrollment)
 
 
 async def create_enrollment_placeholder(user_id: str, course_id: str) -> dict:
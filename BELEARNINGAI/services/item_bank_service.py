@@ -0,0 +1,152 @@
+"""Nạp và phục vụ ngân hàng câu hỏi từ bộ nhớ.
+
+Mỗi lĩnh vực được nạp một lần thành ``CategoryBank`` (chỉ mục IRT cho bài thích ứng và
+chỉ mục phân tầng cho bài cố định), dựng lại khi quá hạn TTL. Các câu hỏi chưa có ``seq``
+được cấp số thứ tự ngay khi nạp từ bộ đếm riêng của lĩnh vực, nên bitmap câu đã gặp chỉ
+dài theo số câu của lĩnh vực đó.
+
+Bitmap được cập nhật bằng compare-and-swap trên giá trị đã đọc (``$bit`` của MongoDB chỉ
+áp dụng cho số nguyên), hai lượt rút đề đồng thời không làm mất bit của nhau.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from config.config import get_settings
+from models.models import CounterDocument, QuestionBankDocument, SeenQuestionsDocument
+from modules.irt_module import ItemBankIndex
+from modules.item_bank_module import SeenBitmap, StratifiedItemBank, mark_seen
+
+logger = logging.getLogger(__name__)
+_settings = get_settings()
+
+_SEEN_UPDATE_ATTEMPTS = 5
+
+
+def question_sequence(category: str) -> str:
+    """Tên bộ đếm ``seq`` của một lĩnh vực."""
+
+    return f"question_bank:{category}"
+
+
+async def next_sequence(name: str, count: int = 1) -> int:
+    """Giữ chỗ ``count`` số liên tiếp của bộ đếm ``name``, trả số đầu tiên."""
+
+    raw = await CounterDocument.get_pymongo_collection().find_one_and_update(
+        {"name": name},
+        {"$inc": {"value": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return int(raw["value"]) - count
+
+
+async def _assign_missing_sequences(category: str, items: List[QuestionBankDocument]) -> None:
+    missing = [item for item in items if item.seq is None]
+    if not missing:
+        return
+    name = question_sequence(category)
+    # Câu đã có ``seq`` (kể cả cấp từ bộ đếm chung trước đây) giữ nguyên; bộ đếm bắt đầu sau chúng.
+    floor = max((item.seq for item in items if item.seq is not None), default=-1) + 1
+    await CounterDocument.get_pymongo_collection().update_one({"name": name}, {"$max": {"value": floor}}, upsert=True)
+    first = await next_sequence(name, len(missing))
+    operations = []
+    for offset, item in enumerate(missing):
+        item.seq = first + offset
+        operations.append(UpdateOne({"_id": item.id, "seq": None}, {"$set": {"seq": item.seq}}))
+    await QuestionBankDocument.get_pymongo_collection().bulk_write(operations, ordered=False)
+
+
+@dataclass
+class CategoryBank:
+    items_by_id: Dict[str, QuestionBankDocument]
+    irt_index: ItemBankIndex
+    strata: StratifiedItemBank
+
+
+class ItemBankCache:
+    """Giữ ``CategoryBank`` theo lĩnh vực, dựng lại khi quá hạn TTL."""
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, tuple[float, CategoryBank]] = {}
+
+    async def get(self, category: str) -> CategoryBank:
+        entry = self._entries.get(category)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+        items = await QuestionBankDocument.find(QuestionBankDocument.category == category).to_list()
+        await _assign_missing_sequences(category, items)
+        bank = CategoryBank(
+            items_by_id={str(item.id): item for item in items},
+            irt_index=ItemBankIndex.from_items(items),
+            strata=StratifiedItemBank(items),
+        )
+        self._entries[category] = (time.monotonic(), bank)
+        return bank
+
+    def invalidate(self, category: Optional[str] = None) -> None:
+        if category is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(category, None)
+
+
+item_bank_cache = ItemBankCache(ttl_seconds=_settings.item_index_ttl_seconds)
+
+
+async def mark_questions_seen(
+    user_id: str, category: str, seqs: Sequence[int], observed: Optional[bytes] = None, reset: bool = False
+) -> None:
+    """Bật bit các câu vừa giao cho người dùng trong bitmap đã gặp.
+
+    ``observed`` là bitmap vừa đọc (nếu có). Bản ghi chỉ được ghi đè khi bitmap trong DB vẫn
+    đúng giá trị đã đọc; nếu lượt khác đã ghi trước thì đọc lại và OR tiếp. ``reset`` bắt đầu
+    vòng mới (bỏ các bit cũ), chỉ áp dụng cho lần thử đầu để không xóa bit lượt khác vừa ghi.
+    """
+
+    collection = SeenQuestionsDocument.get_pymongo_collection()
+    key = {"user_id": user_id, "category": category}
+    for _ in range(_SEEN_UPDATE_ATTEMPTS):
+        if observed is None:
+            row = await collection.find_one(key, {"bitmap": 1})
+            observed = bytes(row["bitmap"]) if row else b""
+        updated = mark_seen(b"" if reset else observed, list(seqs))
+        try:
+            # Không khớp ``bitmap`` thì upsert đụng unique index (user_id, category): có lượt ghi khác.
+            await collection.update_one(
+                {**key, "bitmap": observed},
+                {"$set": {"bitmap": updated, "updated_at": datetime.utcnow()}},
+                upsert=True,
+            )
+            return
+        except DuplicateKeyError:
+            observed, reset = None, False
+    logger.warning("Không cập nhật được bitmap câu đã gặp của %s/%s do ghi đồng thời", user_id, category)
+
+
+async def draw_questions(user_id: str, category: str, count: int) -> List[QuestionBankDocument]:
+    """Rút ``count`` câu chưa gặp theo tỉ lệ độ khó cấu hình và ghi nhận là đã gặp.
+
+    Khi người dùng đã gặp hết câu của lĩnh vực, bitmap được làm mới để bắt đầu vòng mới.
+    """
+
+    bank = (await item_bank_cache.get(category)).strata
+    state = await SeenQuestionsDocument.find_one(
+        SeenQuestionsDocument.user_id == user_id, SeenQuestionsDocument.category == category
+    )
+    bitmap = state.bitmap if state else b""
+    mix = _settings.assessment_difficulty_mix
+    drawn = bank.sample(count, SeenBitmap(bitmap), difficulty_mix=mix)
+    reset = len(drawn) < min(count, len(bank))
+    if reset:
+        taken = {item.seq for item in drawn}
+        refill = [item for item in bank.sample(count, difficulty_mix=mix) if item.seq not in taken]
+        drawn.extend(refill[: count - len(drawn)])
+    await mark_questions_seen(user_id, category, [item.seq for item in drawn], observed=bitmap, reset=reset)
+    return drawn
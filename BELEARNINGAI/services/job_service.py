@@ -0,0 +1,283 @@
+"""Hàng đợi job nền bền vững trên MongoDB.
+
+Job được lưu trong collection ``jobs``. Worker nhận job bằng một lệnh
+``find_one_and_update`` nguyên tử và giữ *lease* có thời hạn; nếu worker chết
+giữa chừng, lease hết hạn và job được worker khác nhận lại (tối đa
+``max_attempts`` lần).
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument
+
+from config.config import get_settings
+from models.models import JobDocument, JobStatus
+from services.realtime_service import push_to_user
+
+logger = logging.getLogger("app.jobs")
+_settings = get_settings()
+
+JobHandler = Callable[[JobDocument], Awaitable[dict]]
+_handlers: Dict[str, JobHandler] = {}
+
+TERMINAL_STATUSES = (JobStatus.succeeded, JobStatus.failed)
+
+
+def register_job_handler(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """Decorator đăng ký handler xử lý một loại job."""
+
+    def decorator(handler: JobHandler) -> JobHandler:
+        _handlers[job_type] = handler
+        return handler
+
+    return decorator
+
+
+def registered_job_types() -> List[str]:
+    """Danh sách loại job mà tiến trình hiện tại xử lý được."""
+
+    return list(_handlers)
+
+
+async def enqueue_job(job_type: str, payload: dict, owner_id: Optional[str] = None) -> JobDocument:
+    """Ghi job mới vào hàng đợi, trả document vừa tạo."""
+
+    job = JobDocument(
+        job_type=job_type,
+        payload=payload,
+        owner_id=owner_id,
+        max_attempts=_settings.job_max_attempts,
+    )
+    await job.insert()
+    return job
+
+
+async def get_job(job_id: str) -> Optional[JobDocument]:
+    """Lấy job theo ID, trả None nếu ID sai định dạng hoặc không tồn tại."""
+
+    try:
+        object_id = PydanticObjectId(job_id)
+    except Exception:  # noqa: BLE001
+        return None
+    return await JobDocument.get(object_id)
+
+
+async def claim_next_job(worker_id: str, job_types: Iterable[str], lease_seconds: int) -> Optional[JobDocument]:
+    """Nhận job cũ nhất đang chờ (hoặc có lease đã hết hạn) cho worker."""
+
+    now = datetime.utcnow()
+    raw = await JobDocument.get_pymongo_collection().find_one_and_update(
+        {
+            "job_type": {"$in": list(job_types)},
+            "$or": [
+                {"status": JobStatus.queued.value},
+                {"status": JobStatus.running.value, "lease_expires_at": {"$lt": now}},
+            ],
+            "$expr": {"$lt": ["$attempts", "$max_attempts"]},
+        },
+        {
+            "$set": {
+                "status": JobStatus.running.value,
+                "lease_owner": worker_id,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+    if raw is None:
+        return None
+    return JobDocument.model_validate(raw)
+
+
+async def renew_lease(job_id: PydanticObjectId, worker_id: str, lease_seconds: int) -> bool:
+    """Gia hạn lease; trả False nếu worker đã mất quyền giữ job."""
+
+    now = datetime.utcnow()
+    result = await JobDocument.get_pymongo_collection().update_one(
+        {"_id": job_id, "lease_owner": worker_id, "status": JobStatus.running.value},
+        {"$set": {"lease_expires_at": now + timedelta(seconds=lease_seconds), "updated_at": now}},
+    )
+    return result.modified_count == 1
+
+
+async def report_job_progress(job: JobDocument, progress: dict) -> bool:
+    """Ghi tiến độ của job đang chạy; trả False nếu worker đã mất lease."""
+
+    result = await JobDocument.get_pymongo_collection().update_one(
+        {"_id": job.id, "lease_owner": job.lease_owner, "status": JobStatus.running.value},
+        {"$set": {"progress": progress, "updated_at": datetime.utcnow()}},
+    )
+    return result.modified_count == 1
+
+
+async def complete_job(job_id: PydanticObjectId, worker_id: str, result: dict) -> bool:
+    """Đánh dấu job thành công. Chỉ worker đang giữ lease mới ghi được kết quả."""
+
+    now = datetime.utcnow()
+    update = await JobDocument.get_pymongo_collection().update_one(
+        {"_id": job_id, "lease_owner": worker_id, "status": JobStatus.running.value},
+        {
+            "$set": {
+                "status": JobStatus.succeeded.value,
+                "result": result,
+                "error": None,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "updated_at": now,
+                "finished_at": now,
+            }
+        },
+    )
+    return update.modified_count == 1
+
+
+async def fail_job(job: JobDocument, worker_id: str, error: str) -> bool:
+    """Trả job về hàng đợi để thử lại, hoặc đánh dấu thất bại khi hết lượt."""
+
+    now = datetime.utcnow()
+    exhausted = job.attempts >= job.max_attempts
+    update: dict = {
+        "status": (JobStatus.failed if exhausted else JobStatus.queued).value,
+        "error": error,
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "updated_at": now,
+    }
+    if exhausted:
+        update["finished_at"] = now
+    result = await JobDocument.get_pymongo_collection().update_one(
+        {"_id": job.id, "lease_owner": worker_id, "status": JobStatus.running.value},
+        {"$set": update},
+    )
+    return result.modified_count == 1
+
+
+async def fail_abandoned_jobs() -> int:
+    """Chốt trạng thái failed cho job hết lease nhưng đã dùng hết lượt thử."""
+
+    now = datetime.utcnow()
+    result = await JobDocument.get_pymongo_collection().update_many(
+        {
+            "status": JobStatus.running.value,
+            "lease_expires_at": {"$lt": now},
+            "$expr": {"$gte": ["$attempts", "$max_attempts"]},
+        },
+        {
+            "$set": {
+                "status": JobStatus.failed.value,
+                "error": "Worker mất kết nối quá số lần cho phép",
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "updated_at": now,
+                "finished_at": now,
+            }
+        },
+    )
+    return result.modified_count
+
+
+class JobWorker:
+    """Worker asyncio nhận và chạy job từ hàng đợi MongoDB.
+
+    Có thể chạy ngay trong tiến trình API (xem ``app.main``) hoặc tách riêng
+    bằng ``scripts/run_job_worker.py``.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ) -> None:
+        self.worker_id = worker_id or f"worker-{uuid.uuid4().hex[:8]}"
+        self.concurrency = concurrency or _settings.job_worker_concurrency
+        self.lease_seconds = lease_seconds or _settings.job_lease_seconds
+        self.poll_interval = poll_interval or _settings.job_poll_interval_seconds
+        self._stopping = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Khởi chạy các vòng lặp xử lý job."""
+
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._run_loop(slot), name=f"{self.worker_id}-{slot}")
+            for slot in range(self.concurrency)
+        ]
+        logger.info("Job worker %s khởi động với %d luồng", self.worker_id, self.concurrency)
+
+    async def stop(self) -> None:
+        """Dừng worker; job đang chạy dở sẽ được nhận lại khi lease hết hạn."""
+
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _idle(self) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_loop(self, slot: int) -> None:
+        while not self._stopping.is_set():
+            try:
+                if slot == 0:
+                    await fail_abandoned_jobs()
+                job = await claim_next_job(self.worker_id, registered_job_types(), self.lease_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001
+                logger.exception("Không nhận được job từ hàng đợi")
+                job = None
+            if job is None:
+                await self._idle()
+                continue
+            await self.run_job(job)
+
+    async def _keep_lease(self, job: JobDocument) -> None:
+        interval = max(self.lease_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            if not await renew_lease(job.id, self.worker_id, self.lease_seconds):
+                logger.warning("Worker %s mất lease job %s", self.worker_id, job.id)
+                return
+
+    async def run_job(self, job: JobDocument) -> None:
+        """Chạy handler cho job đã nhận và ghi lại kết quả."""
+
+        handler = _handlers.get(job.job_type)
+        heartbeat = asyncio.create_task(self._keep_lease(job))
+        try:
+            if handler is None:
+                raise LookupError(f"Chưa đăng ký handler cho job '{job.job_type}'")
+            result = await handler(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Job %s (%s) lỗi ở lần thử %d", job.id, job.job_type, job.attempts)
+            error = str(exc) or exc.__class__.__name__
+            if await fail_job(job, self.worker_id, error) and job.attempts >= job.max_attempts:
+                await self._notify_owner(job, JobStatus.failed, {"error": error})
+        else:
+            if await complete_job(job.id, self.worker_id, result or {}):
+                await self._notify_owner(job, JobStatus.succeeded, {"result": result or {}})
+        finally:
+            heartbeat.cancel()
+
+    async def _notify_owner(self, job: JobDocument, status: JobStatus, extra: dict) -> None:
+        """Đẩy trạng thái cuối của job tới người tạo qua WebSocket thay vì để client polling."""
+
+        if job.owner_id:
+            data = {"job_id": str(job.id), "job_type": job.job_type, "status": status.value, **extra}
+            await push_to_user(job.owner_id, "job", data)
@@ -0,0 +1,93 @@
+"""Lập lộ trình học trên đồ thị tiên quyết của khóa học.
+
+Đồ thị được giữ trong bộ nhớ và chỉ dựng lại khi dấu vân tay của collection khóa học
+(số lượng + ``updated_at`` lớn nhất) thay đổi; mỗi lần dựng lại tăng ``version`` nên
+các lộ trình đã nhớ theo phiên bản cũ tự hết hiệu lực.
+"""
+import time
+from typing import Iterable, List, Optional
+
+from config.config import get_settings
+from models.models import CourseDocument, EnrollmentDocument, EnrollmentStatus
+from modules.learning_path_module import LearningGraph, LearningPlan, PlanMemo
+from schemas.recommendation import LearningPathResponse, LearningPathStep
+
+_settings = get_settings()
+
+
+async def _course_fingerprint() -> tuple:
+    pipeline = [{"$group": {"_id": None, "count": {"$sum": 1}, "updated": {"$max": "$updated_at"}}}]
+    rows = await CourseDocument.aggregate(pipeline).to_list()
+    if not rows:
+        return (0, None)
+    return (rows[0]["count"], rows[0]["updated"])
+
+
+class LearningGraphCache:
+    """Giữ ``LearningGraph`` hiện hành, kiểm tra dấu vân tay sau mỗi chu kỳ TTL."""
+
+    def __init__(self, ttl_seconds: int, memo_size: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.memo = PlanMemo(memo_size)
+        self._graph: Optional[LearningGraph] = None
+        self._fingerprint: Optional[tuple] = None
+        self._checked_at = 0.0
+
+    async def get(self) -> LearningGraph:
+        if self._graph is not None and time.monotonic() - self._checked_at < self.ttl_seconds:
+            return self._graph
+        fingerprint = await _course_fingerprint()
+        if self._graph is None or fingerprint != self._fingerprint:
+            courses = await CourseDocument.find_all().to_list()
+            version = self._graph.version + 1 if self._graph is not None else 1
+            self._graph = LearningGraph.build(courses, version=version)
+            self._fingerprint = fingerprint
+            self.memo.clear()
+        self._checked_at = time.monotonic()
+        return self._graph
+
+    def invalidate(self) -> None:
+        """Buộc lần đọc sau kiểm tra lại dấu vân tay (gọi sau khi sửa khóa học)."""
+
+        self._checked_at = 0.0
+
+
+learning_graph_cache = LearningGraphCache(_settings.learning_graph_ttl_seconds, _settings.learning_path_cache_size)
+
+
+async def plan_for_profile(weaknesses: Iterable[str], target: Optional[str] = None) -> tuple[LearningGraph, LearningPlan]:
+    """Lộ trình chung cho một hồ sơ điểm yếu, dùng lại kết quả đã nhớ nếu có."""
+
+    graph = await learning_graph_cache.get()
+    return graph, learning_graph_cache.memo.plan(graph, weaknesses, target)
+
+
+async def _completed_course_ids(user_id: str) -> set[str]:
+    enrollments = await EnrollmentDocument.find(
+        EnrollmentDocument.user_id == user_id, EnrollmentDocument.status == EnrollmentStatus.completed
+    ).to_list()
+    return {enrollment.course_id for enrollment in enrollments}
+
+
+async def plan_learning_path(
+    user_id: str, weaknesses: List[str], target: Optional[str] = None
+) -> LearningPathResponse:
+    """Lộ trình cá nhân: lấy lộ trình chung rồi bỏ các khóa người học đã hoàn thành."""
+
+    graph, plan = await plan_for_profile(weaknesses, target)
+    completed = await _completed_course_ids(user_id)
+    steps = [
+        LearningPathStep(
+            course_id=course_id,
+            title=graph.nodes[course_id].title,
+            duration_minutes=graph.nodes[course_id].duration_minutes,
+        )
+        for course_id in plan.course_ids
+        if course_id not in completed
+    ]
+    return LearningPathResponse(
+        target_skill=target,
+        steps=steps,
+        total_minutes=sum(step.duration_minutes for step in steps),
+        uncovered_topics=list(plan.uncovered_topics),
+    )
@@ -0,0 +1,102 @@
+"""Chỉ mục bài học theo khóa học: tổng số bài và ánh xạ ``lesson_id -> vị trí``.
+
+Tính phần trăm tiến độ chỉ cần ``completed_count / total``, không phải nạp lại cả khóa
+học. Chỉ mục được giữ trong LRU có TTL và bị xóa khi khóa học thay đổi.
+"""
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from beanie import PydanticObjectId
+from beanie.operators import In
+
+from config.config import get_settings
+from models.models import CourseDocument
+
+_settings = get_settings()
+
+
+def lesson_key(lesson: Any, module_position: int, lesson_position: int) -> str:
+    """ID bài học; bài học cũ chưa có ``lesson_id`` dùng vị trí ``chương.bài``."""
+
+    return lesson.lesson_id or f"{module_position}.{lesson_position}"
+
+
+def assign_lesson_ids(modules: Iterable[Any]) -> None:
+    """Sinh ``lesson_id`` cho các bài học chưa có (gọi trước khi lưu khóa học)."""
+
+    for module in modules:
+        for lesson in module.lessons:
+            if not lesson.lesson_id:
+                lesson.lesson_id = uuid.uuid4().hex[:12]
+
+
+@dataclass(frozen=True)
+class CourseLessonIndex:
+    total: int
+    positions: Dict[str, int]
+
+    @classmethod
+    def from_course(cls, course: Any) -> "CourseLessonIndex":
+        positions: Dict[str, int] = {}
+        for module_position, module in enumerate(course.modules):
+            for lesson_position, lesson in enumerate(module.lessons):
+                positions.setdefault(lesson_key(lesson, module_position, lesson_position), len(positions))
+        return cls(total=len(positions), positions=positions)
+
+    def percent(self, completed_count: int) -> float:
+        if self.total == 0:
+            return 0.0
+        return round(min(100.0, completed_count * 100.0 / self.total), 2)
+
+
+class LessonIndexCache:
+    def __init__(self, ttl_seconds: int, max_courses: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_courses = max_courses
+        self._entries: "OrderedDict[str, tuple[float, CourseLessonIndex]]" = OrderedDict()
+
+    def _fresh(self, course_id: str) -> Optional[CourseLessonIndex]:
+        entry = self._entries.get(course_id)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl_seconds:
+            return None
+        self._entries.move_to_end(course_id)
+        return entry[1]
+
+    def _store(self, course_id: str, index: CourseLessonIndex) -> None:
+        self._entries[course_id] = (time.monotonic(), index)
+        self._entries.move_to_end(course_id)
+        while len(self._entries) > self.max_courses:
+            self._entries.popitem(last=False)
+
+    async def get(self, course_id: str) -> Optional[CourseLessonIndex]:
+        return (await self.get_many([course_id])).get(course_id)
+
+    async def get_many(self, course_ids: Iterable[str]) -> Dict[str, CourseLessonIndex]:
+        """Chỉ mục của nhiều khóa học, nạp các khóa còn thiếu bằng một truy vấn."""
+
+        result: Dict[str, CourseLessonIndex] = {}
+        missing = []
+        for course_id in set(course_ids):
+            index = self._fresh(course_id)
+            if index is not None:
+                result[course_id] = index
+            elif PydanticObjectId.is_valid(course_id):
+                missing.append(PydanticObjectId(course_id))
+        if missing:
+            async for course in CourseDocument.find(In(CourseDocument.id, missing)):
+                index = CourseLessonIndex.from_course(course)
+                self._store(str(course.id), index)
+                result[str(course.id)] = index
+        return result
+
+    def invalidate(self, course_id: Optional[str] = None) -> None:
+        if course_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(course_id, None)
+
+
+lesson_index_cache = LessonIndexCache(_settings.lesson_index_ttl_seconds, _settings.lesson_index_max_courses)
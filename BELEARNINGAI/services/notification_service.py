@@ -1,35 +1,479 @@
-"""Dịch vụ thông báo hệ thống."""
-from datetime import datetime
-from typing import List
-
-from models.models import NotificationResponse
-
-
-async def list_notifications(user_id: str) -> List[NotificationResponse]:
-    """Giả lập danh sách thông báo."""
-
-    return [
-        NotificationResponse.model_validate(
-            {
-                "_id": "notify-demo",
-                "title": "Chào mừng",
-                "message": "Bạn đã đăng ký thành công",
-                "is_read": False,
-                "created_at": datetime.utcnow(),
-            }
-        )
-    ]
+"""Dịch vụ thông báo: hộp thư người dùng và phân phối thông báo chung.
+
+Thông báo chung của admin có hai chế độ:
+
+* ``fan_out``: job nền duyệt ``users`` theo index ``(role, _id)`` và ghi thông báo theo từng
+  khối ``insert_many``. Job chạy lại tiếp tục từ ``last_user_id``; unique index
+  ``(announcement_id, target_user_id)`` chặn bản ghi trùng.
+* ``on_read``: dành cho tập người nhận rất lớn, chỉ lưu một ``AnnouncementDocument``. Hộp thư
+  ghép các thông báo chung của vai trò người đọc lúc truy vấn, phân trang bằng cùng cursor
+  keyset ``(created_at, _id)`` với thông báo riêng; số chưa đọc của chúng được đếm bằng truy
+  vấn trên index ``(mode, audience_roles, created_at, _id)``.
+
+Số chưa đọc nằm trong ``notification_counters`` (một document mỗi người dùng), được ``$inc``
+cùng lúc với ghi và đánh dấu đã đọc, nên badge chỉ tốn một lần đọc theo khóa.
+"""
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from beanie import PydanticObjectId
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from config.config import get_settings
+from models.models import (
+    AnnouncementDocument,
+    AnnouncementMode,
+    AnnouncementStatus,
+    JobDocument,
+    NotificationCounterDocument,
+    NotificationDocument,
+    UserDocument,
+    UserRole,
+)
+from schemas.notification import MarkAllReadResponse, NotificationPage, NotificationResponse
+from services.job_service import enqueue_job, register_job_handler, report_job_progress
+from services.realtime_service import push_to_role, push_to_user
+from utils.pagination import decode_cursor, encode_cursor, keyset_filter
+
+ANNOUNCEMENT_FANOUT_JOB = "announcement_fanout"
+_DUPLICATE_KEY = 11000
+
+_settings = get_settings()
+
+ProgressCallback = Callable[[int], Awaitable[None]]
+
+
+def parse_roles(roles: Iterable[str]) -> List[UserRole]:
+    """Chuẩn hóa danh sách vai trò nhận thông báo, bỏ trùng và giữ thứ tự."""
+
+    parsed: List[UserRole] = []
+    for role in roles:
+        try:
+            value = UserRole(role.strip().lower())
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Vai trò không hợp lệ: {role}")
+        if value not in parsed:
+            parsed.append(value)
+    if not parsed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cần ít nhất một vai trò nhận thông báo")
+    return parsed
+
+
+def choose_mode(audience_size: int, requested: Optional[str] = None) -> AnnouncementMode:
+    """Chế độ phân phối: theo yêu cầu, hoặc ghép lúc đọc khi số người nhận vượt ngưỡng."""
+
+    if requested:
+        return AnnouncementMode(requested)
+    if audience_size > _settings.announcement_fanout_max_recipients:
+        return AnnouncementMode.on_read
+    return AnnouncementMode.fan_out
+
+
+def _audience_query(roles: Sequence[UserRole]) -> dict:
+    return {"role": {"$in": [role.value for role in roles]}}
+
+
+async def publish_announcement(
+    title: str,
+    message: str,
+    roles: Iterable[str],
+    created_by: Optional[str] = None,
+    mode: Optional[str] = None,
+) -> Tuple[AnnouncementDocument, Optional[JobDocument]]:
+    """Lưu thông báo chung; chế độ ``fan_out`` xếp thêm job ghi cho từng người nhận."""
+
+    audience = parse_roles(roles)
+    audience_size = await UserDocument.get_pymongo_collection().count_documents(_audience_query(audience))
+    chosen = choose_mode(audience_size, mode)
+    now = datetime.utcnow()
+    announcement = AnnouncementDocument(
+        title=title,
+        message=message,
+        audience_roles=audience,
+        mode=chosen,
+        created_by=created_by,
+        audience_size=audience_size,
+        created_at=now,
+        updated_at=now,
+    )
+    if chosen is AnnouncementMode.on_read:
+        announcement.status = AnnouncementStatus.delivered
+        announcement.expires_at = now + timedelta(days=_settings.announcement_retention_days)
+        await announcement.insert()
+        await _push_announcement(announcement)
+        return announcement, None
+
+    await announcement.insert()
+    job = await enqueue_job(ANNOUNCEMENT_FANOUT_JOB, {"announcement_id": str(announcement.id)}, owner_id=created_by)
+    await AnnouncementDocument.get_pymongo_collection().update_one(
+        {"_id": announcement.id}, {"$set": {"job_id": str(job.id)}}
+    )
+    announcement.job_id = str(job.id)
+    return announcement, job
+
+
+async def increment_unread(user_ids: Sequence[str]) -> None:
+    """Cộng một thông báo chưa đọc cho mỗi người dùng (upsert bộ đếm nếu chưa có)."""
+
+    if not user_ids:
+        return
+    now = datetime.utcnow()
+    await NotificationCounterDocument.get_pymongo_collection().bulk_write(
+        [
+            UpdateOne({"user_id": user_id}, {"$inc": {"unread": 1}, "$set": {"updated_at": now}}, upsert=True)
+            for user_id in user_ids
+        ],
+        ordered=False,
+    )
 
 
-async def mark_as_read(notification_id: str) -> NotificationResponse:
-    """Giả lập đánh dấu đã đọc."""
+async def recount_unread(user_ids: Sequence[str]) -> None:
+    """Đặt lại bộ đếm chưa đọc của ``user_ids`` theo số thông báo riêng chưa đọc thực tế."""
 
-    return NotificationResponse.model_validate(
+    if not user_ids:
+        return
+    rows = await NotificationDocument.aggregate(
+        [
+            {"$match": {"target_user_id": {"$in": list(user_ids)}, "is_read": False}},
+            {"$group": {"_id": "$target_user_id", "unread": {"$sum": 1}}},
+        ]
+    ).to_list()
+    counts = {row["_id"]: row["unread"] for row in rows}
+    now = datetime.utcnow()
+    await NotificationCounterDocument.get_pymongo_collection().bulk_write(
+        [
+            UpdateOne(
+                {"user_id": user_id}, {"$set": {"unread": counts.get(user_id, 0), "updated_at": now}}, upsert=True
+            )
+            for user_id in user_ids
+        ],
+        ordered=False,
+    )
+
+
+async def create_notification(
+    user_id: str, title: str, message: str, category: str = "system", email: bool = True
+) -> NotificationResponse:
+    """Ghi một thông báo riêng và tăng bộ đếm chưa đọc của người nhận.
+
+    ``email=True`` đưa thông báo vào bản tin email tổng hợp kế tiếp (xem ``digest_service``).
+    """
+
+    document = NotificationDocument(
+        target_user_id=user_id, title=title, message=message, category=category, email_pending=email
+    )
+    await document.insert()
+    await increment_unread([user_id])
+    response = _to_response(document.model_dump(by_alias=True))
+    await push_to_user(user_id, "notification", response.model_dump(mode="json"))
+    return response
+
+
+async def _push_announcement(announcement: AnnouncementDocument) -> None:
+    """Báo cho người dùng đang kết nối thuộc các vai trò nhận rằng có thông báo chung mới."""
+
+    data = {
+        "id": str(announcement.id),
+        "title": announcement.title,
+        "message": announcement.message,
+        "created_at": announcement.created_at.isoformat(),
+    }
+    for role in announcement.audience_roles:
+        await push_to_role(role.value, "announcement", data)
+
+
+async def _insert_chunk(announcement: AnnouncementDocument, user_ids: Sequence) -> int:
+    """Ghi một khối thông báo, bỏ qua người nhận đã có bản ghi từ lần chạy trước.
+
+    Người nhận mới được ``$inc`` bộ đếm. Người nhận đã có bản ghi nghĩa là lần chạy trước dừng
+    giữa ``insert_many`` và ``$inc``, nên không biết bộ đếm đã cộng chưa; bộ đếm của họ được
+    đếm lại từ ``notifications`` để job chạy lại luôn hội tụ về đúng số chưa đọc.
+    """
+
+    documents = [
         {
-            "_id": notification_id,
-            "title": "Thông báo",
-            "message": "Đã đọc",
-            "is_read": True,
-            "created_at": datetime.utcnow(),
+            "target_user_id": str(user_id),
+            "title": announcement.title,
+            "message": announcement.message,
+            "is_read": False,
+            "announcement_id": str(announcement.id),
+            "category": "announcement",
+            "email_pending": True,
+            "created_at": announcement.created_at,
         }
+        for user_id in user_ids
+    ]
+    skipped: set = set()
+    try:
+        await NotificationDocument.get_pymongo_collection().insert_many(documents, ordered=False)
+    except BulkWriteError as exc:
+        errors = exc.details.get("writeErrors", [])
+        if any(error.get("code") != _DUPLICATE_KEY for error in errors):
+            raise
+        skipped = {error["index"] for error in errors}
+    inserted = [document["target_user_id"] for index, document in enumerate(documents) if index not in skipped]
+    await increment_unread(inserted)
+    await recount_unread([documents[index]["target_user_id"] for index in sorted(skipped)])
+    return len(inserted)
+
+
+async def _save_progress(announcement: AnnouncementDocument, inserted: int, last_user_id: str) -> None:
+    await AnnouncementDocument.get_pymongo_collection().update_one(
+        {"_id": announcement.id},
+        {
+            "$inc": {"delivered_count": inserted},
+            "$set": {
+                "last_user_id": last_user_id,
+                "status": AnnouncementStatus.delivering.value,
+                "updated_at": datetime.utcnow(),
+            },
+        },
+    )
+    announcement.delivered_count += inserted
+    announcement.last_user_id = last_user_id
+
+
+async def fan_out_announcement(
+    announcement: AnnouncementDocument, on_progress: Optional[ProgressCallback] = None
+) -> int:
+    """Ghi thông báo cho mọi người nhận, duyệt ``users`` theo ``_id`` tăng dần.
+
+    Chỉ đọc trường ``_id`` qua index ``(role, _id)``, nên bộ nhớ chỉ giữ một khối mỗi lần.
+    Trả tổng số thông báo đã ghi (gồm cả các lần chạy trước).
+    """
+
+    query = _audience_query(announcement.audience_roles)
+    if announcement.last_user_id:
+        query["_id"] = {"$gt": PydanticObjectId(announcement.last_user_id)}
+    chunk_size = _settings.announcement_fanout_batch_size
+    cursor = UserDocument.get_pymongo_collection().find(
+        query, {"_id": 1}, sort=[("_id", 1)], batch_size=chunk_size
+    )
+
+    batch: list = []
+    async for row in cursor:
+        batch.append(row["_id"])
+        if len(batch) >= chunk_size:
+            await _save_progress(announcement, await _insert_chunk(announcement, batch), str(batch[-1]))
+            batch = []
+            if on_progress is not None:
+                await on_progress(announcement.delivered_count)
+    if batch:
+        await _save_progress(announcement, await _insert_chunk(announcement, batch), str(batch[-1]))
+
+    await AnnouncementDocument.get_pymongo_collection().update_one(
+        {"_id": announcement.id},
+        {"$set": {"status": AnnouncementStatus.delivered.value, "updated_at": datetime.utcnow()}},
+    )
+    announcement.status = AnnouncementStatus.delivered
+    await _push_announcement(announcement)
+    return announcement.delivered_count
+
+
+@register_job_handler(ANNOUNCEMENT_FANOUT_JOB)
+async def run_announcement_fanout_job(job: JobDocument) -> dict:
+    """Handler job: ghi thông báo chung cho từng người nhận, báo tiến độ sau mỗi khối."""
+
+    announcement_id = job.payload["announcement_id"]
+    announcement = await AnnouncementDocument.get(PydanticObjectId(announcement_id))
+    if announcement is None:
+        return {"announcement_id": announcement_id, "delivered": 0}
+
+    async def report(delivered: int) -> None:
+        await report_job_progress(job, {"delivered": delivered, "total": announcement.audience_size})
+
+    delivered = await fan_out_announcement(announcement, report)
+    return {"announcement_id": announcement_id, "delivered": delivered}
+
+
+def _to_response(raw: dict) -> NotificationResponse:
+    return NotificationResponse(
+        id=str(raw["_id"]),
+        title=raw["title"],
+        message=raw["message"],
+        is_read=raw.get("is_read", False),
+        created_at=raw["created_at"],
+    )
+
+
+def broadcast_is_read(announcement: dict, counter: dict) -> bool:
+    """Thông báo chung đã đọc khi tạo trước mốc "đọc tất cả" hoặc được đánh dấu riêng."""
+
+    read_before = counter.get("broadcasts_read_before")
+    if read_before is not None and announcement["created_at"] <= read_before:
+        return True
+    return str(announcement["_id"]) in counter.get("read_broadcast_ids", ())
+
+
+async def _load_counter(user_id: str) -> dict:
+    raw = await NotificationCounterDocument.get_pymongo_collection().find_one({"user_id": user_id})
+    return raw or {"user_id": user_id, "unread": 0}
+
+
+def _role_of(current_user: dict) -> str:
+    return current_user.get("role", UserRole.student.value)
+
+
+def _broadcast_query(role: str) -> dict:
+    return {"mode": AnnouncementMode.on_read.value, "audience_roles": role, "expires_at": {"$gt": datetime.utcnow()}}
+
+
+async def list_broadcasts(role: str, limit: int, after: Optional[Tuple[datetime, ObjectId]] = None) -> List[dict]:
+    """Tối đa ``limit + 1`` thông báo chung còn hiệu lực của vai trò, sau cursor ``after``."""
+
+    query = _broadcast_query(role)
+    if after is not None:
+        query.update(keyset_filter("created_at", after[0], after[1], descending=True))
+    return await AnnouncementDocument.get_pymongo_collection().find(
+        query,
+        {"title": 1, "message": 1, "created_at": 1},
+        sort=[("created_at", -1), ("_id", -1)],
+        limit=limit + 1,
+    ).to_list(length=limit + 1)
+
+
+async def count_unread_broadcasts(role: str, counter: dict) -> int:
+    """Số thông báo chung của vai trò chưa đọc, đếm trên index thay vì trên trang đang xem."""
+
+    query = _broadcast_query(role)
+    read_before = counter.get("broadcasts_read_before")
+    if read_before is not None:
+        query["created_at"] = {"$gt": read_before}
+    read_ids = [ObjectId(item) for item in counter.get("read_broadcast_ids", ()) if ObjectId.is_valid(item)]
+    if read_ids:
+        query["_id"] = {"$nin": read_ids}
+    return await AnnouncementDocument.get_pymongo_collection().count_documents(query)
+
+
+async def unread_total(counter: dict, role: str) -> int:
+    """Badge = bộ đếm thông báo riêng + thông báo chung của vai trò chưa đọc."""
+
+    return max(counter.get("unread", 0), 0) + await count_unread_broadcasts(role, counter)
+
+
+async def unread_count(current_user: dict) -> int:
+    """Số chưa đọc: một lần đọc bộ đếm theo ``user_id`` cộng số thông báo chung chưa đọc."""
+
+    counter = await _load_counter(current_user.get("sub", "demo-user"))
+    return await unread_total(counter, _role_of(current_user))
+
+
+def merge_inbox(
+    personal: Sequence[dict], broadcasts: Sequence[dict], counter: dict, limit: int
+) -> Tuple[List[NotificationResponse], bool]:
+    """Ghép thông báo riêng với thông báo chung theo ``(created_at, _id)`` giảm dần.
+
+    Cả hai danh sách đã được lọc sau cùng một cursor và lấy tối đa ``limit + 1`` bản ghi.
+    Trả trang kết quả và cờ còn trang sau.
+    """
+
+    entries = [((row["created_at"], ObjectId(str(row["_id"]))), _to_response(row)) for row in personal]
+    for row in broadcasts:
+        response = _to_response({**row, "is_read": broadcast_is_read(row, counter)})
+        entries.append(((row["created_at"], ObjectId(str(row["_id"]))), response))
+    entries.sort(key=lambda entry: entry[0], reverse=True)
+    return [entry[1] for entry in entries[:limit]], len(entries) > limit
+
+
+async def list_notifications(current_user: dict, limit: int = 20, cursor: Optional[str] = None) -> NotificationPage:
+    """Một trang hộp thư (thông báo riêng + thông báo chung theo vai trò), phân trang keyset."""
+
+    user_id = current_user.get("sub", "demo-user")
+    role = _role_of(current_user)
+    limit = min(limit, _settings.inbox_page_size)
+    query: dict = {"target_user_id": user_id}
+    after = None
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        if not isinstance(created_at, datetime) or not ObjectId.is_valid(last_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor phân trang không hợp lệ")
+        after = (created_at, ObjectId(last_id))
+        query.update(keyset_filter("created_at", after[0], after[1], descending=True))
+
+    personal = await NotificationDocument.get_pymongo_collection().find(
+        query, sort=[("created_at", -1), ("_id", -1)], limit=limit + 1
+    ).to_list(length=limit + 1)
+    broadcasts = await list_broadcasts(role, limit, after)
+    counter = await _load_counter(user_id)
+    items, has_more = merge_inbox(personal, broadcasts, counter, limit)
+    next_cursor = None
+    if has_more and items:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return NotificationPage(items=items, next_cursor=next_cursor, unread_count=await unread_total(counter, role))
+
+
+async def mark_as_read(notification_id: str, current_user: dict) -> NotificationResponse:
+    """Đánh dấu đã đọc một thông báo riêng hoặc một thông báo chung chế độ ``on_read``.
+
+    Bộ đếm chỉ giảm khi thông báo thật sự chuyển từ chưa đọc sang đã đọc, nên gọi lại là idempotent.
+    """
+
+    if not PydanticObjectId.is_valid(notification_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy thông báo")
+    object_id = PydanticObjectId(notification_id)
+    user_id = current_user.get("sub", "demo-user")
+    notifications = NotificationDocument.get_pymongo_collection()
+    counters = NotificationCounterDocument.get_pymongo_collection()
+    now = datetime.utcnow()
+
+    raw = await notifications.find_one_and_update(
+        {"_id": object_id, "target_user_id": user_id, "is_read": False},
+        {"$set": {"is_read": True}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if raw is not None:
+        await counters.update_one({"user_id": user_id}, {"$inc": {"unread": -1}, "$set": {"updated_at": now}})
+        return _to_response(raw)
+    raw = await notifications.find_one({"_id": object_id, "target_user_id": user_id})
+    if raw is not None:
+        return _to_response(raw)
+
+    announcement = await AnnouncementDocument.get(object_id)
+    if (
+        announcement is None
+        or announcement.mode is not AnnouncementMode.on_read
+        or _role_of(current_user) not in {item.value for item in announcement.audience_roles}
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy thông báo")
+    await counters.update_one(
+        {"user_id": user_id},
+        {"$addToSet": {"read_broadcast_ids": notification_id}, "$set": {"updated_at": now}},
+        upsert=True,
+    )
+    return NotificationResponse(
+        id=notification_id,
+        title=announcement.title,
+        message=announcement.message,
+        is_read=True,
+        created_at=announcement.created_at,
+    )
+
+
+async def mark_all_as_read(current_user: dict) -> MarkAllReadResponse:
+    """Đánh dấu cả hộp thư đã đọc bằng một ``update_many`` và trừ đúng số bản ghi đã đổi.
+
+    Dùng ``$inc`` thay vì đặt về 0 để không mất thông báo được ghi xen giữa hai lệnh.
+    """
+
+    user_id = current_user.get("sub", "demo-user")
+    now = datetime.utcnow()
+    result = await NotificationDocument.get_pymongo_collection().update_many(
+        {"target_user_id": user_id, "is_read": False}, {"$set": {"is_read": True}}
+    )
+    counter = await NotificationCounterDocument.get_pymongo_collection().find_one_and_update(
+        {"user_id": user_id},
+        {
+            "$inc": {"unread": -result.modified_count},
+            "$set": {"broadcasts_read_before": now, "read_broadcast_ids": [], "updated_at": now},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
     )
+    unread = await unread_total(counter, _role_of(current_user))
+    response = MarkAllReadResponse(marked=result.modified_count, unread_count=unread)
+    # Đồng bộ badge ở các tab/thiết bị khác của cùng người dùng.
+    await push_to_user(user_id, "unread_count", {"unread_count": response.unread_count})
+    return response
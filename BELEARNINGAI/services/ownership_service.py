@@ -0,0 +1,105 @@
+"""Cache chủ sở hữu tài nguyên cho các kiểm tra quyền phạm vi ``own``.
+
+Route của giảng viên cần biết "người gọi có sở hữu lớp/khóa học này không" ở mỗi request.
+Cache giữ ``(loại tài nguyên, id) -> owner_id`` nên một lần tra trả lời được cho mọi người
+dùng; tài nguyên không tồn tại cũng được cache (``None``) với TTL ngắn hơn để id rác không
+đánh vào MongoDB liên tục. Endpoint tạo/đọc lớp và tạo khóa học ghi sẵn chủ sở hữu đã biết
+bằng ``prime_owners``. Chủ sở hữu được gán lúc tạo và hiện không có thao tác chuyển chủ hay
+xóa lớp/khóa học, nên mục cache chỉ hết hạn theo TTL.
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+from config.config import get_settings
+from models.models import ClassDocument, CourseDocument
+from services.permissions_service import ensure_permission
+
+_settings = get_settings()
+
+# loại tài nguyên -> (document, trường chứa chủ sở hữu)
+OWNER_FIELDS = {
+    "class": (ClassDocument, "instructor_id"),
+    "course": (CourseDocument, "created_by"),
+}
+
+Key = Tuple[str, str]
+
+
+class OwnershipCache:
+    """LRU ``(resource_type, resource_id) -> owner_id`` có TTL riêng cho kết quả âm."""
+
+    def __init__(self, ttl_seconds: float, negative_ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Key, tuple[float, Optional[str]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, resource_type: str, resource_id: str) -> Tuple[bool, Optional[str]]:
+        """``(có trong cache, owner_id)``; ``owner_id`` là ``None`` khi tài nguyên không tồn tại."""
+
+        key = (resource_type, resource_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if time.monotonic() >= entry[0]:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def put(self, resource_type: str, resource_id: str, owner_id: Optional[str]) -> None:
+        ttl = self.ttl_seconds if owner_id is not None else self.negative_ttl_seconds
+        key = (resource_type, resource_id)
+        self._entries[key] = (time.monotonic() + ttl, owner_id)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+ownership_cache = OwnershipCache(
+    _settings.ownership_cache_ttl_seconds,
+    _settings.ownership_negative_ttl_seconds,
+    _settings.ownership_cache_max_entries,
+)
+
+
+def prime_owners(resource_type: str, owners: Dict[str, Optional[str]]) -> None:
+    """Ghi sẵn chủ sở hữu đã biết (vừa tạo hoặc vừa đọc ở endpoint danh sách)."""
+
+    for resource_id, owner_id in owners.items():
+        ownership_cache.put(resource_type, resource_id, owner_id)
+
+
+async def owner_of(resource_type: str, resource_id: str) -> Optional[str]:
+    """Chủ sở hữu của tài nguyên, ``None`` nếu không tồn tại; đọc DB (chỉ trường chủ sở hữu) khi cache trượt."""
+
+    hit, owner_id = ownership_cache.lookup(resource_type, resource_id)
+    if hit:
+        return owner_id
+    if ObjectId.is_valid(resource_id):
+        document, field = OWNER_FIELDS[resource_type]
+        row = await document.get_pymongo_collection().find_one({"_id": ObjectId(resource_id)}, {field: 1})
+        owner_id = row.get(field) if row else None
+    ownership_cache.put(resource_type, resource_id, owner_id)
+    return owner_id
+
+
+async def authorize_owned(
+    current_user: dict, resource: str, action: str, resource_type: str, resource_id: str, not_found: str
+) -> None:
+    """Kiểm tra ``resource:action`` trên một tài nguyên cụ thể: 404 nếu không tồn tại, 403 nếu không đủ quyền."""
+
+    owner_id = await owner_of(resource_type, resource_id)
+    if owner_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found)
+    ensure_permission(current_user, resource, action, owner_id=owner_id)
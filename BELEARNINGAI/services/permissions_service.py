@@ -1,37 +1,80 @@
-"""Service placeholder cho kiểm tra quyền tài nguyên."""
+"""Bảng quyền RBAC của hệ thống (HE_THONG.md mục 10).
+
+``ROLE_GRANTS`` khai báo ``vai trò -> tài nguyên -> hành động -> phạm vi`` và được biên dịch
+một lần khi import thành ``permission_table``. Phạm vi ``own`` nghĩa là chỉ trên tài nguyên
+mình sở hữu (giảng viên với lớp/khóa học của mình); admin có mọi quyền với phạm vi ``all``.
+"""
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from models.models import UserRole
+from modules.permission_module import ALL, OWN, compile_permissions
 from schemas.permissions import PermissionResponse, RolePermissionMatrix
 
+ROLE_GRANTS = {
+    UserRole.student.value: {
+        "courses": {"read": ALL, "enroll": ALL},
+        "classes": {"join": ALL},
+        "quiz": {"submit": ALL},
+    },
+    UserRole.instructor.value: {
+        "courses": {"read": ALL, "create": ALL, "update": OWN, "manage_enrollment": OWN},
+        "classes": {"create": ALL, "join": ALL, "manage": OWN},
+        "quiz": {"submit": ALL, "grade_batch": OWN},
+        "analytics": {"view_instructor": ALL},
+    },
+    UserRole.admin.value: {
+        "users": {"list": ALL, "update": ALL, "suspend": ALL},
+        "system": {"view_dashboard": ALL, "publish_announcement": ALL},
+        "analytics": {"view_system": ALL},
+        "audit": {"read": ALL},
+    },
+}
+
+permission_table = compile_permissions(ROLE_GRANTS, superusers=(UserRole.admin.value,))
+
+
+def _compile_matrix(role: str) -> RolePermissionMatrix:
+    grouped: dict = {}
+    for resource, action, scope in permission_table.grants_for(role):
+        entry = grouped.setdefault(resource, PermissionResponse(resource=resource, actions=[]))
+        entry.actions.append(action)
+        if scope == OWN:
+            entry.owned_actions.append(action)
+    return RolePermissionMatrix(role=role, permissions=list(grouped.values()))
+
+
+# Dựng sẵn phản hồi cho từng vai trò: các endpoint chỉ trả lại đối tượng đã có.
+_ROLE_MATRICES: Mapping[str, RolePermissionMatrix] = MappingProxyType(
+    {role.value: _compile_matrix(role.value) for role in UserRole}
+)
+_MATRIX_LIST: Tuple[RolePermissionMatrix, ...] = tuple(_ROLE_MATRICES.values())
 
-async def get_user_permissions(user_id: str) -> PermissionResponse:
-    """Trả quyền demo cho user."""
 
-    _ = user_id
-    return PermissionResponse(resource="global", actions=["read", "write"])
+def has_permission(current_user: dict, resource: str, action: str, owner_id: Optional[str] = None) -> bool:
+    """Người gọi có quyền ``resource:action``; quyền phạm vi ``own`` cần ``owner_id`` trùng người gọi."""
+
+    is_owner = owner_id is not None and owner_id == current_user.get("sub")
+    return permission_table.allows(current_user.get("role"), permission_table.bit(resource, action), is_owner)
+
+
+def ensure_permission(current_user: dict, resource: str, action: str, owner_id: Optional[str] = None) -> None:
+    """Như ``has_permission`` nhưng ném 403 khi không đủ quyền."""
+
+    if not has_permission(current_user, resource, action, owner_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Không đủ quyền truy cập")
+
+
+async def get_user_permissions(current_user: dict) -> RolePermissionMatrix:
+    """Quyền của người gọi, lấy từ bảng đã biên dịch theo vai trò trong token."""
+
+    role = current_user.get("role") or UserRole.student.value
+    return _ROLE_MATRICES.get(role) or RolePermissionMatrix(role=role, permissions=[])
 
 
 async def list_roles_matrix() -> list[RolePermissionMatrix]:
-    """Tạo bảng quyền giả lập cho admin theo HE_THONG.md mục 10."""
-
-    return [
-        RolePermissionMatrix(
-            role="student",
-            permissions=[
-                PermissionResponse(resource="courses", actions=["read", "enroll"]),
-                PermissionResponse(resource="quiz", actions=["submit"]),
-            ],
-        ),
-        RolePermissionMatrix(
-            role="instructor",
-            permissions=[
-                PermissionResponse(resource="classes", actions=["create", "update", "view_roster"]),
-                PermissionResponse(resource="analytics", actions=["view_class"]),
-            ],
-        ),
-        RolePermissionMatrix(
-            role="admin",
-            permissions=[
-                PermissionResponse(resource="users", actions=["list", "update", "suspend"]),
-                PermissionResponse(resource="system", actions=["view_dashboard", "publish_announcement"]),
-            ],
-        ),
-    ]
+    """Bảng quyền của mọi vai trò cho trang quản trị."""
+
+    return list(_MATRIX_LIST)
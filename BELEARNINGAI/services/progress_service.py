@@ -1,31 +1,327 @@
-"""Dịch vụ theo dõi tiến độ học tập."""
+"""Dịch vụ theo dõi tiến độ học tập.
+
+Sự kiện tiến độ (hoàn thành bài học, thời gian học) được gộp theo cặp người học ×
+khóa học trong ``progress_buffer`` và ghi định kỳ bằng một ``bulk_write`` gồm các
+upsert hợp tập bài học/cộng dồn phút học, kèm tính lại phần trăm tiến độ. Request
+chỉ được xác nhận sau khi lô chứa nó đã ghi xong; nếu tiến trình dừng trước đó,
+client không nhận xác nhận và gửi lại.
+
+Lô ghi lỗi được thử lại nguyên vẹn, nên mỗi lần học có ``event_id`` riêng: tài liệu tiến độ
+nhớ các id đã cộng gần nhất (``applied_events``) và bỏ qua id đã gặp, hợp tập bài học vốn
+lũy đẳng. Chép phần trăm sang ghi danh là bước riêng (``enrollment_sync_buffer``) được thử
+lại độc lập, lỗi ở bước này không làm ghi lại lô tiến độ. Cùng bước đó chép phần trăm và
+lần học cuối vào các ``class_memberships`` của cặp người học × khóa học làm khóa sắp xếp roster.
+
+Cặp có bài học mới được ghi riêng bằng ``find_one_and_update`` trả tập bài học trước khi hợp,
+để rollup ``lessons_completed`` chỉ đếm bài hoàn thành lần đầu (mở lại bài, client gửi lại
+hay lô ghi lại đều không cộng thêm).
+"""
+import asyncio
+import uuid
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
-from models.models import ProgressResponse
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument, UpdateMany, UpdateOne
 
+from config.config import get_settings
+from models.models import (
+    ClassMembershipDocument,
+    EnrollmentDocument,
+    EnrollmentStatus,
+    ProgressDocument,
+    ProgressResponse,
+)
+from services.active_users_service import record_activity
+from services.classes_service import member_class_ids, progress_recorded, roster_sort_fields
+from services.lesson_index_service import lesson_index_cache
+from services.rollup_service import record_metrics
+from utils.scheduler import PeriodicTask
+from utils.write_buffer import CoalescingBuffer
 
-async def get_progress(user_id: str, course_id: str) -> ProgressResponse:
-    """Giả lập trả về tiến độ hiện tại."""
+_settings = get_settings()
+
+ProgressKey = Tuple[str, str]
+
+RECENT_SESSIONS = 50
+# Đủ lớn để phủ mọi lần thử lại của một lô (``progress_flush_max_attempts`` chu kỳ flush).
+APPLIED_EVENTS = 200
+_SYNC_CHUNK = 500
+
+
+@dataclass(frozen=True)
+class ProgressDelta:
+    """Thay đổi tiến độ đã gộp của một cặp người học × khóa học.
+
+    ``study`` giữ từng lần học ``(event_id, phút)`` thay vì tổng để lần ghi lại chỉ cộng
+    những sự kiện chưa được áp dụng.
+    """
+
+    lessons: FrozenSet[str] = field(default_factory=frozenset)
+    study: Tuple[Tuple[str, int], ...] = ()
+    activities: FrozenSet[str] = field(default_factory=frozenset)
+    last_activity: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def minutes(self) -> int:
+        return sum(minutes for _, minutes in self.study)
+
+    def merge(self, other: "ProgressDelta") -> "ProgressDelta":
+        return ProgressDelta(
+            lessons=self.lessons | other.lessons,
+            study=self.study + other.study,
+            activities=self.activities | other.activities,
+            last_activity=max(self.last_activity, other.last_activity),
+        )
+
+
+def _progress_expression(total: int) -> dict:
+    if total <= 0:
+        return {"$ifNull": ["$progress", 0.0]}
+    percent = {"$multiply": [{"$divide": ["$completed_count", total]}, 100]}
+    return {"$min": [100.0, {"$round": [percent, 2]}]}
 
-    return ProgressResponse.model_validate(
+
+def _progress_pipeline(delta: ProgressDelta, total: int, now: datetime) -> list[dict]:
+    events = [{"id": event_id, "minutes": minutes} for event_id, minutes in delta.study]
+    sessions = {"$ifNull": ["$learning_sessions", []]}
+    session = {
+        "session_date": {"$literal": now},
+        "duration_minutes": "$_new_minutes",
+        "activities": {"$literal": sorted(delta.activities)},
+    }
+    return [
+        {
+            "$set": {
+                "_new_events": {
+                    "$filter": {
+                        "input": {"$literal": events},
+                        "cond": {"$not": [{"$in": ["$$this.id", {"$ifNull": ["$applied_events", []]}]}]},
+                    }
+                }
+            }
+        },
+        {"$set": {"_new_minutes": {"$sum": "$_new_events.minutes"}}},
         {
-            "_id": "progress-demo",
-            "course_id": course_id,
-            "user_id": user_id,
-            "progress": 45.0,
-            "completed_lessons": ["lesson-1"],
-        }
+            "$set": {
+                "completed_lessons": {
+                    "$setUnion": [{"$ifNull": ["$completed_lessons", []]}, {"$literal": sorted(delta.lessons)}]
+                },
+                "total_minutes": {"$add": [{"$ifNull": ["$total_minutes", 0]}, "$_new_minutes"]},
+                "learning_sessions": {
+                    "$cond": [
+                        {"$gt": ["$_new_minutes", 0]},
+                        {"$slice": [{"$concatArrays": [sessions, [session]]}, -RECENT_SESSIONS]},
+                        sessions,
+                    ]
+                },
+                "applied_events": {
+                    "$slice": [
+                        {"$concatArrays": [{"$ifNull": ["$applied_events", []]}, "$_new_events.id"]},
+                        -APPLIED_EVENTS,
+                    ]
+                },
+                "streak_days": {"$ifNull": ["$streak_days", 0]},
+                "last_activity": {"$max": ["$last_activity", {"$literal": delta.last_activity}]},
+                "updated_at": {"$literal": now},
+            }
+        },
+        {"$set": {"completed_count": {"$size": "$completed_lessons"}}},
+        {"$set": {"progress": _progress_expression(total)}},
+        {"$unset": ["_new_events", "_new_minutes"]},
+    ]
+
+
+def build_progress_operations(batch: Dict[ProgressKey, ProgressDelta], totals: Dict[str, int]) -> list[UpdateOne]:
+    """Một upsert dạng pipeline cho mỗi cặp: hợp tập bài học, cộng phút, tính lại phần trăm.
+
+    Chỉ các lần học có ``event_id`` chưa nằm trong ``applied_events`` được cộng vào
+    ``total_minutes`` và ghi thành phiên học, nên chạy lại cùng một lô không cộng trùng.
+    ``completed_count`` và ``progress`` được tính ngay trên server từ số bài học đã biết
+    của khóa học (``totals``), không cần đọc tài liệu tiến độ hay khóa học.
+    """
+
+    now = datetime.utcnow()
+    return [
+        UpdateOne(
+            {"user_id": user_id, "course_id": course_id},
+            _progress_pipeline(delta, totals.get(course_id, 0), now),
+            upsert=True,
+        )
+        for (user_id, course_id), delta in batch.items()
+    ]
+
+
+async def _sync_enrollments(keys: List[ProgressKey]) -> None:
+    """Chép phần trăm vừa tính sang ghi danh và thành viên lớp: một lượt đọc + mỗi collection một bulk_write.
+
+    Lũy đẳng (``$max``/``$set`` giá trị vừa đọc) nên chạy lại sau lỗi là an toàn.
+    """
+
+    progress_collection = ProgressDocument.get_pymongo_collection()
+    operations = []
+    membership_operations = []
+    for start in range(0, len(keys), _SYNC_CHUNK):
+        chunk = keys[start : start + _SYNC_CHUNK]
+        cursor = progress_collection.find(
+            {"$or": [{"user_id": user_id, "course_id": course_id} for user_id, course_id in chunk]},
+            {"user_id": 1, "course_id": 1, "progress": 1, "last_activity": 1},
+        )
+        async for row in cursor:
+            key = {"user_id": row["user_id"], "course_id": row["course_id"]}
+            update: dict = {"$max": {"progress": row["progress"]}}
+            if row["progress"] >= 100:
+                update["$set"] = {"status": EnrollmentStatus.completed.value}
+            operations.append(UpdateMany(key, update))
+            membership_operations.append(UpdateMany(key, {"$set": roster_sort_fields(row)}))
+    if operations:
+        await EnrollmentDocument.get_pymongo_collection().bulk_write(operations, ordered=False)
+        await ClassMembershipDocument.get_pymongo_collection().bulk_write(membership_operations, ordered=False)
+
+
+async def backfill_roster_sort_fields() -> int:
+    """Điền khóa sắp xếp roster cho các thành viên lớp có từ trước khi chúng được chép sẵn.
+
+    Trả về số cặp người học × khóa học đã đồng bộ.
+    """
+
+    memberships = ClassMembershipDocument.get_pymongo_collection()
+    await memberships.update_many({"last_active_key": {"$exists": False}}, {"$set": roster_sort_fields(None)})
+    keys = sorted(
+        {(row["user_id"], row["course_id"]) async for row in memberships.find({}, {"_id": 0, "user_id": 1, "course_id": 1})}
+    )
+    for start in range(0, len(keys), _SYNC_CHUNK):
+        await _sync_enrollments(keys[start : start + _SYNC_CHUNK])
+    return len(keys)
+
+
+async def _write_lessons(key: ProgressKey, delta: ProgressDelta, total: int, now: datetime) -> None:
+    """Ghi một cặp có bài học mới và cộng ``lessons_completed`` cho các bài lần đầu hoàn thành."""
+
+    user_id, course_id = key
+    before = await ProgressDocument.get_pymongo_collection().find_one_and_update(
+        {"user_id": user_id, "course_id": course_id},
+        _progress_pipeline(delta, total, now),
+        projection={"_id": 0, "completed_lessons": 1},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE,
+    )
+    first_completed = delta.lessons - set((before or {}).get("completed_lessons") or [])
+    if first_completed:
+        record_metrics(
+            user_id,
+            {"lessons_completed": len(first_completed)},
+            course_id=course_id,
+            class_ids=await member_class_ids(user_id, course_id),
+        )
+
+
+async def _write_progress(batch: Dict[ProgressKey, ProgressDelta]) -> None:
+    indexes = await lesson_index_cache.get_many(course_id for _, course_id in batch)
+    totals = {course_id: index.total for course_id, index in indexes.items()}
+    now = datetime.utcnow()
+    writes = [_write_lessons(key, delta, totals.get(key[1], 0), now) for key, delta in batch.items() if delta.lessons]
+    others = {key: delta for key, delta in batch.items() if not delta.lessons}
+    if others:
+        operations = build_progress_operations(others, totals)
+        writes.append(ProgressDocument.get_pymongo_collection().bulk_write(operations, ordered=False))
+    # Lỗi ở bất kỳ phần nào làm cả lô được thử lại; cặp đã ghi thì bài học không còn là "lần đầu".
+    outcomes = await asyncio.gather(*writes, return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    for key in batch:
+        enrollment_sync_buffer.add_nowait(key, None)
+
+
+async def _write_enrollment_sync(batch: Dict[ProgressKey, None]) -> None:
+    await _sync_enrollments(list(batch))
+
+
+async def flush_progress_events() -> int:
+    written = await progress_buffer.flush()
+    await enrollment_sync_buffer.flush()
+    return written
+
+
+progress_flusher = PeriodicTask(
+    "progress-flush", _settings.progress_flush_interval_ms / 1000, flush_progress_events
+)
+progress_buffer: CoalescingBuffer[ProgressKey, ProgressDelta] = CoalescingBuffer(
+    merge=ProgressDelta.merge,
+    writer=_write_progress,
+    max_pending=_settings.progress_buffer_max_keys,
+    max_attempts=_settings.progress_flush_max_attempts,
+    on_full=progress_flusher.wake,
+)
+enrollment_sync_buffer: CoalescingBuffer[ProgressKey, None] = CoalescingBuffer(
+    merge=lambda current, _: current,
+    writer=_write_enrollment_sync,
+    max_pending=_settings.progress_buffer_max_keys,
+    max_attempts=_settings.progress_flush_max_attempts,
+    on_full=progress_flusher.wake,
+)
+
+
+async def record_progress_event(
+    user_id: str,
+    course_id: str,
+    lesson_id: Optional[str] = None,
+    duration_minutes: int = 0,
+    activity: Optional[str] = None,
+) -> None:
+    """Đưa một sự kiện vào bộ đệm và chờ tới khi nó được ghi."""
+
+    if lesson_id is not None:
+        index = await lesson_index_cache.get(course_id)
+        if index is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Không tìm thấy khóa học")
+        if lesson_id not in index.positions:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bài học không thuộc khóa học")
+    delta = ProgressDelta(
+        lessons=frozenset([lesson_id]) if lesson_id else frozenset(),
+        study=((uuid.uuid4().hex, duration_minutes),) if duration_minutes else (),
+        activities=frozenset([activity]) if activity else frozenset(),
     )
+    future = progress_buffer.add((user_id, course_id), delta)
+    if not progress_flusher.running:
+        # Script/CLI không chạy vòng flush: ghi ngay.
+        await flush_progress_events()
+    await future
+    record_activity(user_id, course_id)
+    class_ids = await progress_recorded(user_id, course_id)
+    # ``lessons_completed`` được cộng lúc ghi, chỉ khi bài học hoàn thành lần đầu.
+    record_metrics(user_id, {"study_minutes": duration_minutes}, course_id=course_id, class_ids=class_ids)
+
+
+def _to_response(document: Optional[dict], user_id: str, course_id: str) -> ProgressResponse:
+    if document is None:
+        return ProgressResponse(id="", course_id=course_id, user_id=user_id, progress=0.0, completed_lessons=[])
+    document["_id"] = str(document["_id"])
+    return ProgressResponse.model_validate(document)
+
+
+async def get_progress(user_id: str, course_id: str) -> ProgressResponse:
+    """Tiến độ hiện tại của người học trong một khóa học."""
+
+    document = await ProgressDocument.get_pymongo_collection().find_one({"user_id": user_id, "course_id": course_id})
+    return _to_response(document, user_id, course_id)
 
 
 async def update_progress(user_id: str, course_id: str, progress: float) -> ProgressResponse:
-    """Giả lập cập nhật tiến độ."""
-
-    response = await get_progress(user_id, course_id)
-    response.progress = progress
-    response.completed_lessons.append("lesson-auto")
-    response_dict = response.model_dump(by_alias=True)
-    response_dict["progress"] = progress
-    response_dict["completed_lessons"] = response.completed_lessons
-    response_dict["_id"] = response.id
-    return ProgressResponse.model_validate(response_dict)
+    """Ghi đè phần trăm tiến độ (dùng cho client tự tính tiến độ)."""
+
+    document = await ProgressDocument.get_pymongo_collection().find_one_and_update(
+        {"user_id": user_id, "course_id": course_id},
+        {
+            "$set": {"progress": progress, "updated_at": datetime.utcnow(), "last_activity": datetime.utcnow()},
+            "$setOnInsert": {"completed_lessons": [], "streak_days": 0, "learning_sessions": [], "total_minutes": 0},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    enrollment_sync_buffer.add_nowait((user_id, course_id), None)
+    if not progress_flusher.running:
+        await enrollment_sync_buffer.flush()
+    return _to_response(document, user_id, course_id)
@@ -1,9 +1,24 @@
 """Dịch vụ quản lý quiz."""
-from typing import List
+from typing import Any, List, Optional, Sequence
 
-from models.models import QuizDocument, QuizQuestion, QuizResponse
-from schemas.quiz import QuizGenerationResponse, QuizQuestionTemplate
+from beanie import PydanticObjectId
+from fastapi import HTTPException, status
+
+from models.models import EnrollmentDocument, QuizAttemptDocument, QuizDocument, QuizQuestion, QuizResponse
+from modules.grading_module import CompiledAnswerKey, answer_key_cache, compile_answer_key, grade_batch, grade_submission
+from schemas.quiz import (
+    QuizBatchResultItem,
+    QuizBatchResultResponse,
+    QuizBatchSubmission,
+    QuizGenerationResponse,
+    QuizQuestionTemplate,
+    QuizResultResponse,
+)
+from services.active_users_service import record_activity
 from services.ai_service import GenAIService
+from services.classes_service import member_class_ids
+from services.ownership_service import authorize_owned
+from services.rollup_service import record_metrics
 
 
 async def generate_quiz(course_id: str) -> QuizResponse:
@@ -27,11 +42,141 @@ async def list_quizzes(course_id: str) -> List[QuizResponse]:
 
 
 async def save_quiz(quiz: QuizDocument) -> QuizDocument:
-    """Placeholder lưu quiz."""
+    """Placeholder lưu quiz, đồng thời bỏ đáp án đã biên dịch khỏi cache."""
 
+    if quiz.id is not None:
+        answer_key_cache.invalidate(str(quiz.id))
     return quiz
 
 
+async def _get_answer_key(quiz_id: str) -> Optional[tuple[str, CompiledAnswerKey]]:
+    """Trả (course_id, đáp án biên dịch); chỉ đọc DB khi cache chưa có quiz."""
+
+    cached = answer_key_cache.get(quiz_id)
+    if cached is not None:
+        return cached
+    try:
+        object_id = PydanticObjectId(quiz_id)
+    except Exception:  # noqa: BLE001
+        return None
+    quiz = await QuizDocument.get(object_id)
+    if quiz is None:
+        return None
+    entry = (quiz.course_id, compile_answer_key(quiz.questions))
+    answer_key_cache.put(quiz_id, entry)
+    return entry
+
+
+async def submit_quiz(quiz_id: str, user_id: str, answers: Sequence[Any]) -> Optional[QuizResultResponse]:
+    """Chấm một bài nộp, lưu lượt làm và trả kết quả. None nếu quiz không tồn tại."""
+
+    entry = await _get_answer_key(quiz_id)
+    if entry is None:
+        return None
+    course_id, compiled = entry
+    graded = grade_submission(compiled, answers)
+    await QuizAttemptDocument(
+        quiz_id=quiz_id,
+        course_id=course_id,
+        user_id=user_id,
+        answers=graded.answers.tolist(),
+        correct=graded.correct.tolist(),
+        score=graded.score,
+        max_score=graded.max_score,
+        percentage=graded.percentage,
+    ).insert()
+    record_activity(user_id, course_id)
+    record_metrics(
+        user_id,
+        {"quiz_attempts": 1, "quiz_score_sum": graded.percentage},
+        course_id=course_id,
+        class_ids=await member_class_ids(user_id, course_id),
+    )
+    attempts = await QuizAttemptDocument.find(
+        QuizAttemptDocument.quiz_id == quiz_id,
+        QuizAttemptDocument.user_id == user_id,
+    ).count()
+    return QuizResultResponse(
+        quiz_id=quiz_id,
+        score=graded.score,
+        percentage=graded.percentage,
+        attempts=attempts,
+        max_score=graded.max_score,
+        correct=graded.correct.tolist(),
+    )
+
+
+async def _ensure_enrolled(course_id: str, user_ids: Sequence[str]) -> None:
+    """Ném 400 nếu có người học trong lô chưa đăng ký khóa học."""
+
+    enrolled = set(
+        await EnrollmentDocument.get_pymongo_collection().distinct(
+            "user_id", {"course_id": course_id, "user_id": {"$in": list(set(user_ids))}}
+        )
+    )
+    missing = sorted(set(user_ids) - enrolled)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Người học chưa đăng ký khóa học: {', '.join(missing)}",
+        )
+
+
+async def submit_quiz_batch(
+    quiz_id: str, submissions: Sequence[QuizBatchSubmission], current_user: dict
+) -> Optional[QuizBatchResultResponse]:
+    """Chấm cả lô bài nộp trong một lượt vector hóa và ghi bằng một lệnh insert_many.
+
+    Chỉ chủ khóa học của quiz được chấm, và mọi người học trong lô phải đã đăng ký khóa học.
+    """
+
+    entry = await _get_answer_key(quiz_id)
+    if entry is None:
+        return None
+    course_id, compiled = entry
+    await authorize_owned(current_user, "quiz", "grade_batch", "course", course_id, "Không tìm thấy khóa học")
+    await _ensure_enrolled(course_id, [item.user_id for item in submissions])
+    graded = grade_batch(compiled, [item.answers for item in submissions])
+    attempts = [
+        QuizAttemptDocument(
+            quiz_id=quiz_id,
+            course_id=course_id,
+            user_id=item.user_id,
+            answers=graded.answers[row].tolist(),
+            correct=graded.correctness[row].tolist(),
+            score=float(graded.scores[row]),
+            max_score=compiled.max_score,
+            percentage=float(graded.percentages[row]),
+        )
+        for row, item in enumerate(submissions)
+    ]
+    if attempts:
+        await QuizAttemptDocument.insert_many(attempts)
+        for attempt in attempts:
+            record_activity(attempt.user_id, course_id)
+            record_metrics(
+                attempt.user_id,
+                {"quiz_attempts": 1, "quiz_score_sum": attempt.percentage},
+                course_id=course_id,
+                class_ids=await member_class_ids(attempt.user_id, course_id),
+            )
+    return QuizBatchResultResponse(
+        quiz_id=quiz_id,
+        max_score=compiled.max_score,
+        average_percentage=round(float(graded.percentages.mean()), 2) if attempts else 0.0,
+        question_accuracy=graded.question_accuracy.round(4).tolist(),
+        results=[
+            QuizBatchResultItem(
+                user_id=attempt.user_id,
+                score=attempt.score,
+                percentage=attempt.percentage,
+                correct=attempt.correct,
+            )
+            for attempt in attempts
+        ],
+    )
+
+
 async def generate_quiz_template(topic: str, num_questions: int = 5) -> QuizGenerationResponse:
     """Gọi GenAIService (mock) để sinh template câu hỏi."""
 
@@ -0,0 +1,181 @@
+"""Cổng WebSocket đẩy sự kiện (thông báo, chat, job) tới người dùng đang kết nối.
+
+Mỗi kết nối đăng ký vào kênh ``user:<id>`` và ``role:<vai trò>`` của ``event_bus``. Dịch vụ
+khác chỉ cần ``push_to_user``/``push_to_role``; nếu cấu hình ``realtime_backend="mongo"``,
+sự kiện phát từ worker job hoặc tiến trình API khác cũng tới được kết nối ở tiến trình này.
+"""
+import asyncio
+import logging
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+from jose import JWTError
+
+from config.config import get_settings
+from services.active_users_service import record_activity
+from utils.pubsub import EventBus, MongoCappedBackend, PubSubBackend
+from utils.security import decode_token
+
+logger = logging.getLogger("app.realtime")
+_settings = get_settings()
+
+event_bus = EventBus()
+
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def role_channel(role: str) -> str:
+    return f"role:{role}"
+
+
+async def push_to_user(user_id: str, event_type: str, data: dict) -> None:
+    """Đẩy sự kiện tới mọi kết nối của một người dùng (ở mọi worker nếu có backend)."""
+
+    await event_bus.publish(user_channel(user_id), {"type": event_type, "data": data})
+
+
+async def push_to_role(role: str, event_type: str, data: dict) -> None:
+    """Đẩy sự kiện tới mọi người dùng đang kết nối thuộc một vai trò."""
+
+    await event_bus.publish(role_channel(role), {"type": event_type, "data": data})
+
+
+def build_event_backend(get_database: Callable[[], Any]) -> Optional[PubSubBackend]:
+    """Backend phát sự kiện giữa các tiến trình theo cấu hình, ``None`` nếu chỉ chạy một tiến trình."""
+
+    if _settings.realtime_backend == "mongo":
+        return MongoCappedBackend(
+            get_database(), _settings.realtime_events_collection, _settings.realtime_events_size_bytes
+        )
+    return None
+
+
+class ConnectionRegistry:
+    """Các WebSocket đang mở của tiến trình, nhóm theo kênh.
+
+    Chỉ đăng ký vào bus khi kênh có kết nối đầu tiên và hủy khi kết nối cuối đóng. Kết nối
+    gửi chậm quá ``send_timeout`` hoặc lỗi bị loại để không làm nghẽn các kết nối khác.
+    """
+
+    def __init__(self, bus: EventBus, max_per_user: int, send_timeout: float) -> None:
+        self.bus = bus
+        self.max_per_user = max_per_user
+        self.send_timeout = send_timeout
+        self._sockets: Dict[str, Dict[WebSocket, None]] = {}
+        self._unsubscribe: Dict[str, Callable[[], None]] = {}
+        self._channels: Dict[WebSocket, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def is_online(self, user_id: str) -> bool:
+        return bool(self._sockets.get(user_channel(user_id)))
+
+    def connect(self, user_id: str, role: str, websocket: WebSocket) -> List[WebSocket]:
+        """Ghi nhận kết nối; trả các kết nối cũ nhất bị loại khi vượt ``max_per_user``."""
+
+        evicted: List[WebSocket] = []
+        existing = self._sockets.get(user_channel(user_id), {})
+        while len(existing) >= self.max_per_user:
+            oldest = next(iter(existing))
+            evicted.append(oldest)
+            self.disconnect(oldest)
+        channels = (user_channel(user_id), role_channel(role))
+        self._channels[websocket] = channels
+        for channel in channels:
+            sockets = self._sockets.get(channel)
+            if sockets is None:
+                sockets = self._sockets[channel] = {}
+                self._unsubscribe[channel] = self.bus.subscribe(channel, partial(self._broadcast, channel))
+            sockets[websocket] = None
+        return evicted
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        for channel in self._channels.pop(websocket, ()):
+            sockets = self._sockets.get(channel)
+            if sockets is None:
+                continue
+            sockets.pop(websocket, None)
+            if not sockets:
+                del self._sockets[channel]
+                self._unsubscribe.pop(channel)()
+
+    async def _broadcast(self, channel: str, message: dict) -> None:
+        sockets = list(self._sockets.get(channel, ()))
+        if sockets:
+            await asyncio.gather(*(self._send(websocket, message) for websocket in sockets))
+
+    async def _send(self, websocket: WebSocket, message: dict) -> None:
+        try:
+            await asyncio.wait_for(websocket.send_json(message), timeout=self.send_timeout)
+        except Exception:  # noqa: BLE001
+            logger.info("Loại kết nối WebSocket gửi lỗi hoặc quá chậm")
+            self.disconnect(websocket)
+            await _close_quietly(websocket, status.WS_1011_INTERNAL_ERROR)
+
+
+registry = ConnectionRegistry(
+    event_bus, _settings.realtime_max_connections_per_user, _settings.realtime_send_timeout_seconds
+)
+
+
+async def _close_quietly(websocket: WebSocket, code: int) -> None:
+    try:
+        await websocket.close(code=code)
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def _token_from(websocket: WebSocket) -> Optional[str]:
+    # Trình duyệt không gửi được header Authorization khi mở WebSocket nên nhận thêm ?token=.
+    token = websocket.query_params.get("token")
+    header = websocket.headers.get("authorization", "")
+    if not token and header.startswith("Bearer "):
+        token = header.replace("Bearer ", "", 1).strip()
+    return token or None
+
+
+async def serve_connection(websocket: WebSocket) -> None:
+    """Xác thực bằng JWT, đăng ký kết nối rồi giữ heartbeat tới khi client ngắt.
+
+    Server gửi ``{"type": "ping"}`` khi không nhận được gì trong ``realtime_heartbeat_seconds``;
+    nếu thêm một chu kỳ nữa vẫn im lặng thì đóng kết nối. Client gửi ``"ping"`` sẽ nhận ``pong``.
+    """
+
+    token = _token_from(websocket)
+    try:
+        payload = decode_token(token) if token else None
+    except JWTError:
+        payload = None
+    if not payload or not payload.get("sub"):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Token không hợp lệ")
+        return
+
+    user_id = payload["sub"]
+    await websocket.accept()
+    for stale in registry.connect(user_id, payload.get("role", "student"), websocket):
+        await _close_quietly(stale, status.WS_1008_POLICY_VIOLATION)
+    record_activity(user_id)
+    awaiting_pong = False
+    try:
+        await websocket.send_json({"type": "ready", "data": {"user_id": user_id}})
+        while True:
+            try:
+                text = await asyncio.wait_for(websocket.receive_text(), timeout=_settings.realtime_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if awaiting_pong:
+                    await _close_quietly(websocket, status.WS_1001_GOING_AWAY)
+                    return
+                awaiting_pong = True
+                await websocket.send_json({"type": "ping"})
+                continue
+            awaiting_pong = False
+            if text == "ping":
+                await websocket.send_json({"type": "pong"})
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        registry.disconnect(websocket)
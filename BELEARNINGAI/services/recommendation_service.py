@@ -1,46 +1,129 @@
-"""Service placeholder cho gợi ý học tập."""
-from datetime import datetime
-from typing import List
+"""Service gợi ý học tập.
 
+Gợi ý khóa học dùng model ALS huấn luyện offline (``scripts/train_recommender.py``);
+khi chưa có model, service trả các khóa học được đăng ký nhiều nhất.
+"""
+from pathlib import Path
+from typing import List, Optional, Set
+
+from beanie import PydanticObjectId
+from beanie.operators import In
+
+from config.config import get_settings
+from models.models import CourseDocument, EnrollmentDocument, EnrollmentStatus
+from modules.recommender_module import MANIFEST_FILE, RecommenderModel
 from schemas.assessment import RecommendationItem
 from schemas.recommendation import RecommendationResponse
+from services.learning_path_service import plan_for_profile
+
+_settings = get_settings()
+
+
+class _RecommenderHolder:
+    """Nạp model theo yêu cầu và nạp lại khi file manifest được huấn luyện lại."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self._version: Optional[int] = None
+        self._model: Optional[RecommenderModel] = None
+
+    def get(self) -> Optional[RecommenderModel]:
+        try:
+            version = (self.directory / MANIFEST_FILE).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if version != self._version:
+            self._model = RecommenderModel.load(self.directory)
+            self._version = version
+        return self._model
+
+
+_recommender = _RecommenderHolder(_settings.recommender_model_dir)
+
+
+def get_recommender() -> Optional[RecommenderModel]:
+    return _recommender.get()
+
+
+async def _enrolled_course_ids(user_id: str) -> Set[str]:
+    enrollments = await EnrollmentDocument.find(EnrollmentDocument.user_id == user_id).to_list()
+    return {enrollment.course_id for enrollment in enrollments}
+
+
+async def _popular_course_ids(exclude: Set[str], limit: int) -> List[str]:
+    pipeline = [
+        {"$group": {"_id": "$course_id", "learners": {"$sum": 1}}},
+        {"$sort": {"learners": -1}},
+        {"$limit": limit + len(exclude)},
+    ]
+    rows = await EnrollmentDocument.aggregate(pipeline).to_list()
+    return [row["_id"] for row in rows if row["_id"] not in exclude][:limit]
+
+
+async def recommended_course_ids(user_id: str, limit: int = 10, exclude: Optional[Set[str]] = None) -> List[str]:
+    """Danh sách ID khóa học gợi ý, đã loại khóa người học đang theo."""
+
+    exclude = exclude if exclude is not None else await _enrolled_course_ids(user_id)
+    model = get_recommender()
+    if model is None:
+        return await _popular_course_ids(exclude, limit)
+    return [course_id for course_id, _ in model.recommend(user_id, exclude=exclude, k=limit)]
 
 
 async def build_learning_path(strengths: list[str], weaknesses: list[str]) -> List[str]:
-    """Sinh lộ trình học tập demo dựa trên điểm mạnh/yếu."""
+    """Lộ trình (tên khóa học theo thứ tự học) để khắc phục các chủ đề yếu."""
 
     _ = strengths
-    return [
-        "Ôn tập kiến thức nền tảng",
-        "Hoàn thành module OOP cơ bản",
-        "Thực hành dự án mini về thuật toán",
-    ] + [f"Tăng cường chủ đề: {item}" for item in weaknesses]
+    graph, plan = await plan_for_profile(weaknesses)
+    return [graph.nodes[course_id].title for course_id in plan.course_ids] + [
+        f"Tăng cường chủ đề: {topic}" for topic in plan.uncovered_topics
+    ]
 
 
-async def suggest_courses(user_id: str, category: str) -> List[RecommendationItem]:
-    """Trả về danh sách khóa học minh họa được đề xuất."""
+async def suggest_courses(user_id: str, category: str, limit: int = 5) -> List[RecommendationItem]:
+    """Gợi ý khóa học trong một lĩnh vực, bổ sung khóa mới nhất khi model chưa đủ."""
 
-    _ = user_id
-    now = datetime.utcnow().strftime("%Y-%m")
-    return [
+    enrolled = await _enrolled_course_ids(user_id)
+    candidate_ids = await recommended_course_ids(user_id, limit=limit * 4, exclude=enrolled)
+    object_ids = [PydanticObjectId(course_id) for course_id in candidate_ids if PydanticObjectId.is_valid(course_id)]
+    courses = await CourseDocument.find(In(CourseDocument.id, object_ids), CourseDocument.category == category).to_list()
+    rank = {course_id: position for position, course_id in enumerate(candidate_ids)}
+    courses.sort(key=lambda course: rank[str(course.id)])
+    items = [
         RecommendationItem(
-            course_id="course-python-foundation",
-            title="Lập trình Python nền tảng",
-            reason=f"Phù hợp để củng cố biến & kiểu dữ liệu ({now})",
-        ),
-        RecommendationItem(
-            course_id="course-oop-fast-track",
-            title="OOP trong Python",
-            reason="Giải quyết điểm yếu OOP từ bài đánh giá",
-        ),
+            course_id=str(course.id),
+            title=course.title,
+            reason="Học viên có lộ trình tương tự cũng theo học khóa này",
+        )
+        for course in courses[:limit]
     ]
+    if len(items) < limit:
+        seen = enrolled | {item.course_id for item in items}
+        latest = (
+            await CourseDocument.find(CourseDocument.category == category)
+            .sort(-CourseDocument.created_at)
+            .limit(limit + len(seen))
+            .to_list()
+        )
+        items.extend(
+            RecommendationItem(course_id=str(course.id), title=course.title, reason=f"Khóa học mới trong lĩnh vực {category}")
+            for course in latest
+            if str(course.id) not in seen
+        )
+    return items[:limit]
 
 
-async def recommend_for_user(user_id: str) -> RecommendationResponse:
-    """Trả về danh sách khóa học gợi ý giả lập."""
+async def recommend_for_user(user_id: str, limit: int = 10) -> RecommendationResponse:
+    """Gợi ý khóa học mới và lộ trình tiếp tục các khóa đang học dở."""
 
+    enrollments = await EnrollmentDocument.find(EnrollmentDocument.user_id == user_id).to_list()
+    enrolled = {enrollment.course_id for enrollment in enrollments}
+    in_progress = sorted(
+        (enrollment for enrollment in enrollments if enrollment.status != EnrollmentStatus.completed),
+        key=lambda enrollment: -enrollment.progress,
+    )
     return RecommendationResponse(
         user_id=user_id,
-        recommended_courses=["course-1", "course-2"],
-        learning_path=["course-1", "course-3"],
+        recommended_courses=await recommended_course_ids(user_id, limit=limit, exclude=enrolled),
+        learning_path=[enrollment.course_id for enrollment in in_progress],
     )
@@ -1,8 +1,47 @@
-"""Dịch vụ xử lý thông tin người dùng."""
+"""Dịch vụ xử lý thông tin người dùng.
+
+Danh sách người dùng cho admin lọc theo vai trò, trạng thái, khoảng ``created_at`` và tiền
+tố email (regex neo ``^`` nên MongoDB quét đúng một đoạn của index ``email``), phân trang
+keyset theo ``(khóa sắp xếp, _id)``. Tổng số không dùng ``count_documents`` trên cả
+collection: không lọc thì lấy ``estimated_document_count`` (metadata), có lọc thì đếm bằng một
+aggregate riêng ``$match`` → ``$limit`` → ``$count`` nên chỉ quét tối đa ``admin_user_count_cap``
+khóa index. Trang dữ liệu luôn là một ``find`` có ``sort``/``limit`` theo index; tổng được
+cache theo bộ lọc cho các trang sau.
+"""
+import re
+import time
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException, status
 
-from models.models import UserResponse, UserRole
+from config.config import get_settings
+from models.models import UserDocument, UserResponse, UserRole
+from schemas.admin import AdminUserFilters, AdminUserPage
+from utils.pagination import decode_cursor, encode_cursor, keyset_filter
+
+_settings = get_settings()
+
+USER_FIELDS = {
+    field: 1
+    for field in (
+        "email",
+        "full_name",
+        "role",
+        "avatar_url",
+        "profile",
+        "preferences",
+        "is_active",
+        "status",
+        "created_at",
+        "updated_at",
+        "last_login",
+    )
+}
+
+_COUNT_CACHE_MAX_ENTRIES = 1024
+_count_cache: Dict[tuple, Tuple[float, int, bool]] = {}
 
 
 async def get_user_profile(user_id: str) -> UserResponse:
@@ -22,10 +61,110 @@ async def get_user_profile(user_id: str) -> UserResponse:
     )
 
 
-async def list_users() -> List[UserResponse]:
-    """Giả lập danh sách user."""
+def build_user_query(filters: AdminUserFilters) -> Tuple[dict, str, int]:
+    """Điều kiện lọc và khóa sắp xếp ``(field, 1|-1)`` khớp với index của ``users``.
+
+    Có tiền tố email thì duyệt index ``(email, _id)`` theo thứ tự tăng; còn lại sắp xếp mới
+    nhất trước trên ``(created_at, _id)``, đứng sau ``role``/``status`` nếu có lọc.
+    """
+
+    if filters.created_from and filters.created_to and filters.created_from > filters.created_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Khoảng thời gian tạo không hợp lệ")
+    query: dict = {}
+    if filters.role is not None:
+        query["role"] = filters.role.value
+    if filters.status:
+        query["status"] = filters.status
+    created: dict = {}
+    if filters.created_from:
+        created["$gte"] = filters.created_from
+    if filters.created_to:
+        created["$lt"] = filters.created_to
+    if created:
+        query["created_at"] = created
+    prefix = (filters.email_prefix or "").strip().lower()
+    if prefix:
+        # Email được lưu chữ thường (auth_service) nên regex không cần cờ ``i`` và vẫn dùng được index.
+        query["email"] = {"$regex": f"^{re.escape(prefix)}"}
+        return query, "email", 1
+    return query, "created_at", -1
+
+
+def _filter_key(query: dict) -> tuple:
+    return tuple(sorted((field, repr(value)) for field, value in query.items()))
+
+
+def _cached_total(key: tuple) -> Optional[Tuple[int, bool]]:
+    entry = _count_cache.get(key)
+    if entry is None or time.monotonic() - entry[0] >= _settings.admin_user_count_cache_seconds:
+        return None
+    return entry[1], entry[2]
+
+
+def _store_total(key: tuple, total: int, is_estimate: bool) -> None:
+    if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.clear()
+    _count_cache[key] = (time.monotonic(), total, is_estimate)
 
-    return [await get_user_profile("demo-user")]
+
+def _capped_count_stages() -> List[dict]:
+    return [{"$limit": _settings.admin_user_count_cap}, {"$count": "total"}]
+
+
+def _total_from(rows: List[dict]) -> Tuple[int, bool]:
+    total = rows[0]["total"] if rows else 0
+    return total, total >= _settings.admin_user_count_cap
+
+
+async def _count_users(query: dict) -> Tuple[int, bool]:
+    key = _filter_key(query)
+    cached = _cached_total(key)
+    if cached is not None:
+        return cached
+    collection = UserDocument.get_pymongo_collection()
+    if not query:
+        total, is_estimate = await collection.estimated_document_count(), True
+    else:
+        rows = await UserDocument.aggregate([{"$match": query}, *_capped_count_stages()]).to_list()
+        total, is_estimate = _total_from(rows)
+    _store_total(key, total, is_estimate)
+    return total, is_estimate
+
+
+def _to_response(row: dict) -> UserResponse:
+    return UserResponse.model_validate({**row, "_id": str(row["_id"])})
+
+
+async def list_users(
+    filters: Optional[AdminUserFilters] = None, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> AdminUserPage:
+    """Một trang người dùng khớp bộ lọc cùng tổng số (chính xác tới ``admin_user_count_cap``)."""
+
+    filters = filters or AdminUserFilters()
+    limit = min(limit or _settings.admin_user_page_size, 200)
+    query, field, direction = build_user_query(filters)
+    sort = [(field, direction), ("_id", direction)]
+    page_query = query
+    if cursor:
+        value, last_id = decode_cursor(cursor, 2)
+        if not ObjectId.is_valid(last_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor phân trang không hợp lệ")
+        page_query = {"$and": [query, keyset_filter(field, value, ObjectId(last_id), direction < 0)]}
+
+    rows = (
+        await UserDocument.get_pymongo_collection()
+        .find(page_query, USER_FIELDS, sort=sort, limit=limit + 1)
+        .to_list(length=None)
+    )
+    total, is_estimate = await _count_users(query)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][field], str(rows[-1]["_id"]))
+    return AdminUserPage(
+        items=[_to_response(row) for row in rows], next_cursor=next_cursor, total=total, total_is_estimate=is_estimate
+    )
 
 
 async def deactivate_user(user_id: str) -> UserResponse:
@@ -0,0 +1,127 @@
+"""Kiểm thử audit log: ring buffer, ghi gộp insert_many và phân trang keyset."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from schemas.admin import AuditLogFilters
+from services import audit_service
+from services.audit_service import AuditBuffer
+from utils.pagination import decode_cursor
+
+
+@pytest.fixture
+def buffer(monkeypatch: pytest.MonkeyPatch) -> AuditBuffer:
+    fresh = AuditBuffer(capacity=5, batch_size=2)
+    monkeypatch.setattr(audit_service, "audit_buffer", fresh)
+    return fresh
+
+
+def _patch_collection(monkeypatch: pytest.MonkeyPatch, **methods) -> None:
+    monkeypatch.setattr(
+        audit_service.AuditLogDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(**methods)),
+    )
+
+
+def test_record_is_buffered_and_drops_oldest_when_full(buffer: AuditBuffer, monkeypatch: pytest.MonkeyPatch) -> None:
+    wakes = []
+    monkeypatch.setattr(audit_service.audit_flusher, "wake", lambda: wakes.append(True))
+
+    audit_service.record_audit("admin.user.suspend", {"sub": "admin-1", "role": "admin"}, target="u1", reason=None)
+    assert wakes == []
+    for index in range(6):
+        audit_service.record_audit("auth.login", actor_id=f"u{index}", ip="10.0.0.1", session_id="s")
+
+    events = list(buffer._events)
+    assert len(events) == 5 and buffer.dropped == 2
+    assert [event["actor_id"] for event in events] == ["u1", "u2", "u3", "u4", "u5"]
+    assert events[0]["metadata"] == {"session_id": "s"}
+    assert events[0]["expires_at"] - events[0]["created_at"] == timedelta(days=audit_service._settings.audit_retention_days)
+    assert wakes
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_batches_and_requeues_failures(buffer: AuditBuffer, monkeypatch: pytest.MonkeyPatch) -> None:
+    batches = []
+    fail = {"next": False}
+
+    async def insert_many(documents, ordered):
+        assert ordered is False
+        if fail["next"]:
+            fail["next"] = False
+            raise BulkWriteError({"writeErrors": [{"index": 0, "code": 91, "errmsg": "shutdown"}]})
+        batches.append([document["action"] for document in documents])
+
+    _patch_collection(monkeypatch, insert_many=insert_many)
+    for index in range(3):
+        audit_service.record_audit(f"a{index}")
+
+    assert await audit_service.flush_audit_events() == 3
+    assert batches == [["a0", "a1"], ["a2"]] and len(buffer) == 0
+
+    audit_service.record_audit("b0")
+    audit_service.record_audit("b1")
+    fail["next"] = True
+    assert await audit_service.flush_audit_events() == 0
+    assert [event["action"] for event in buffer._events] == ["b0", "b1"]
+    assert await audit_service.flush_audit_events() == 2
+
+
+@pytest.mark.asyncio
+async def test_retried_batch_ignores_duplicate_ids(buffer: AuditBuffer, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def insert_many(documents, ordered):
+        raise BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate key"}]})
+
+    _patch_collection(monkeypatch, insert_many=insert_many)
+    audit_service.record_audit("a0")
+
+    assert await audit_service.flush_audit_events() == 1
+    assert len(buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_list_is_keyset_paginated_newest_first(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = datetime(2024, 5, 1)
+    rows = [
+        {
+            "_id": ObjectId(),
+            "actor_id": "admin-1",
+            "actor_role": "admin",
+            "action": "admin.user.suspend",
+            "target": f"u{index}",
+            "outcome": "success",
+            "metadata": {},
+            "created_at": now - timedelta(minutes=index),
+        }
+        for index in range(3)
+    ]
+    calls = []
+
+    def find(query, projection, sort, limit):
+        calls.append((query, projection, sort, limit))
+
+        async def to_list(length=None):
+            return rows
+
+        return SimpleNamespace(to_list=to_list)
+
+    _patch_collection(monkeypatch, find=find)
+    filters = AuditLogFilters(actor_id="admin-1", since=now - timedelta(days=1))
+
+    page = await audit_service.list_audit_logs(filters, limit=2)
+
+    assert [item.target for item in page.items] == ["u0", "u1"]
+    assert calls[0][0] == {"actor_id": "admin-1", "created_at": {"$gte": now - timedelta(days=1)}}
+    assert calls[0][1] == {"expires_at": 0}
+    assert calls[0][2] == [("created_at", -1), ("_id", -1)] and calls[0][3] == 3
+    assert decode_cursor(page.next_cursor, 2) == [rows[1]["created_at"], str(rows[1]["_id"])]
+
+    await audit_service.list_audit_logs(filters, limit=2, cursor=page.next_cursor)
+
+    keyset = calls[1][0]["$and"][1]["$or"]
+    assert keyset[0] == {"created_at": {"$lt": rows[1]["created_at"]}}
+    assert keyset[1] == {"created_at": rows[1]["created_at"], "_id": {"$lt": rows[1]["_id"]}}
@@ -0,0 +1,74 @@
+"""Kiểm thử snapshot số liệu dashboard."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from models.models import DashboardMetric
+from services import admin_service, dashboard_service
+
+
+class _Snapshot(SimpleNamespace):
+    stored: list = []
+
+    async def insert(self):
+        self.stored.append(self)
+        return self
+
+
+@pytest.fixture
+def fake_snapshots(monkeypatch: pytest.MonkeyPatch) -> list:
+    stored: list = []
+
+    async def latest():
+        return stored[-1] if stored else None
+
+    monkeypatch.setattr(dashboard_service, "latest_snapshot", latest)
+    monkeypatch.setattr(dashboard_service, "DashboardDocument", _Snapshot)
+    monkeypatch.setattr(_Snapshot, "stored", stored)
+    return stored
+
+
+@pytest.mark.asyncio
+async def test_trend_is_relative_to_previous_snapshot(monkeypatch: pytest.MonkeyPatch, fake_snapshots: list) -> None:
+    values = iter([{"total_users": 100, "active_sessions": 0}, {"total_users": 110, "active_sessions": 4}])
+
+    async def compute(now=None):
+        return next(values)
+
+    monkeypatch.setattr(dashboard_service, "compute_platform_metrics", compute)
+    first = await dashboard_service.materialize_snapshot()
+    second = await dashboard_service.materialize_snapshot()
+
+    assert [metric.trend for metric in first.metrics] == [None, None]
+    trends = {metric.name: metric.trend for metric in second.metrics}
+    assert trends == {"total_users": 10.0, "active_sessions": None}
+
+
+@pytest.mark.asyncio
+async def test_fresh_snapshot_is_not_recomputed(monkeypatch: pytest.MonkeyPatch, fake_snapshots: list) -> None:
+    fake_snapshots.append(_Snapshot(snapshot_at=datetime.utcnow() - timedelta(seconds=5), metrics=[]))
+
+    async def compute(now=None):
+        raise AssertionError("không được tính lại khi snapshot còn mới")
+
+    monkeypatch.setattr(dashboard_service, "compute_platform_metrics", compute)
+    assert await dashboard_service.refresh_snapshot_if_stale() is None
+
+
+@pytest.mark.asyncio
+async def test_admin_stats_read_latest_snapshot(fake_snapshots: list) -> None:
+    snapshot_at = datetime(2024, 1, 1)
+    fake_snapshots.append(
+        _Snapshot(
+            snapshot_at=snapshot_at,
+            metrics=[
+                DashboardMetric(name="total_users", value=42),
+                DashboardMetric(name="total_courses", value=7),
+                DashboardMetric(name="active_sessions", value=3),
+            ],
+        )
+    )
+    stats = await admin_service.get_system_stats()
+
+    assert (stats.users, stats.courses, stats.active_sessions, stats.generated_at) == (42, 7, 3, snapshot_at)
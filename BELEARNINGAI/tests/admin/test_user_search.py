@@ -0,0 +1,137 @@
+"""Kiểm thử danh sách người dùng cho admin: bộ lọc theo index, keyset và tổng số."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from models.models import UserRole
+from schemas.admin import AdminUserFilters
+from services import user_service
+from utils.pagination import decode_cursor
+
+
+def _row(index: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "email": f"user{index}@example.com",
+        "full_name": f"User {index}",
+        "role": "student",
+        "is_active": True,
+        "status": "active",
+        "created_at": datetime(2024, 1, 1) - timedelta(days=index),
+        "updated_at": datetime(2024, 1, 1),
+    }
+
+
+@pytest.fixture(autouse=True)
+def _empty_count_cache():
+    user_service._count_cache.clear()
+    yield
+    user_service._count_cache.clear()
+
+
+def test_query_uses_anchored_escaped_prefix_and_range() -> None:
+    query, field, direction = user_service.build_user_query(
+        AdminUserFilters(
+            role=UserRole.instructor,
+            status="active",
+            created_from=datetime(2024, 1, 1),
+            created_to=datetime(2024, 2, 1),
+            email_prefix=" An.B+ ",
+        )
+    )
+
+    assert query == {
+        "role": "instructor",
+        "status": "active",
+        "created_at": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2024, 2, 1)},
+        "email": {"$regex": r"^an\.b\+"},
+    }
+    assert (field, direction) == ("email", 1)
+    assert user_service.build_user_query(AdminUserFilters())[1:] == ("created_at", -1)
+    with pytest.raises(HTTPException):
+        user_service.build_user_query(
+            AdminUserFilters(created_from=datetime(2024, 2, 1), created_to=datetime(2024, 1, 1))
+        )
+
+
+@pytest.mark.asyncio
+async def test_pages_use_indexed_find_and_capped_count_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    rows = [_row(index) for index in range(3)]
+    pipelines = []
+    finds = []
+
+    def aggregate(pipeline):
+        pipelines.append(pipeline)
+
+        async def to_list():
+            return [{"total": 3}]
+
+        return SimpleNamespace(to_list=to_list)
+
+    def find(query, projection, sort, limit):
+        finds.append((query, projection, sort, limit))
+
+        async def to_list(length=None):
+            return rows[:limit] if len(finds) == 1 else rows[2:]
+
+        return SimpleNamespace(to_list=to_list)
+
+    monkeypatch.setattr(user_service.UserDocument, "aggregate", aggregate)
+    monkeypatch.setattr(
+        user_service.UserDocument, "get_pymongo_collection", classmethod(lambda cls: SimpleNamespace(find=find))
+    )
+    filters = AdminUserFilters(role=UserRole.student)
+
+    first = await user_service.list_users(filters, limit=2)
+
+    assert [item.email for item in first.items] == ["user0@example.com", "user1@example.com"]
+    assert (first.total, first.total_is_estimate) == (3, False)
+    assert pipelines[0] == [
+        {"$match": {"role": "student"}},
+        {"$limit": user_service._settings.admin_user_count_cap},
+        {"$count": "total"},
+    ]
+    query, projection, sort, limit = finds[0]
+    assert query == {"role": "student"} and "password_hash" not in projection
+    assert sort == [("created_at", -1), ("_id", -1)] and limit == 3
+    assert decode_cursor(first.next_cursor, 2) == [rows[1]["created_at"], str(rows[1]["_id"])]
+
+    second = await user_service.list_users(filters, limit=2, cursor=first.next_cursor)
+
+    assert len(pipelines) == 1
+    assert [item.email for item in second.items] == ["user2@example.com"] and second.next_cursor is None
+    assert second.total == 3
+    query, _, sort, limit = finds[1]
+    assert query["$and"][0] == {"role": "student"}
+    assert query["$and"][1]["$or"][0] == {"created_at": {"$lt": rows[1]["created_at"]}}
+    assert sort == [("created_at", -1), ("_id", -1)] and limit == 3
+
+
+@pytest.mark.asyncio
+async def test_unfiltered_total_is_estimated(monkeypatch: pytest.MonkeyPatch) -> None:
+    def find(query, projection, sort, limit):
+        async def to_list(length=None):
+            return [_row(0)]
+
+        return SimpleNamespace(to_list=to_list)
+
+    async def estimated_document_count():
+        return 120_000
+
+    def aggregate(pipeline):
+        raise AssertionError("không đếm khi không lọc")
+
+    monkeypatch.setattr(user_service.UserDocument, "aggregate", aggregate)
+    monkeypatch.setattr(
+        user_service.UserDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find=find, estimated_document_count=estimated_document_count)),
+    )
+
+    page = await user_service.list_users()
+
+    assert (page.total, page.total_is_estimate) == (120_000, True)
+    assert page.items[0].id
@@ -0,0 +1,86 @@
+"""Kiểm thử sketch HyperLogLog và kho sketch người dùng hoạt động."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from modules.hyperloglog_module import HyperLogLog
+from services import active_users_service
+from services.active_users_service import SketchStore, build_sketch_operations, union_window
+
+
+def test_estimate_within_two_percent() -> None:
+    sketch = HyperLogLog()
+    sketch.update(f"user-{index}" for index in range(100_000))
+    sketch.update(f"user-{index}" for index in range(50_000))  # lặp lại không làm tăng ước lượng
+
+    assert abs(sketch.estimate() - 100_000) / 100_000 < 0.02
+    small = HyperLogLog()
+    small.update(["a", "b", "c", "a"])
+    assert len(small) == 3
+
+
+def test_merge_counts_overlap_once() -> None:
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(f"user-{index}" for index in range(0, 6000))
+    right.update(f"user-{index}" for index in range(4000, 10_000))
+
+    merged = HyperLogLog.from_bytes(left.to_bytes()).merge(right)
+
+    assert abs(merged.estimate() - 10_000) / 10_000 < 0.02
+    assert len(left) < len(merged)
+    with pytest.raises(ValueError):
+        merged.merge(HyperLogLog(precision=12))
+
+
+def test_window_union_dedupes_across_days() -> None:
+    today = datetime(2024, 5, 16)
+    sketches = {}
+    for offset in range(10):
+        sketch = HyperLogLog()
+        sketch.update(f"user-{index}" for index in range(offset * 100, offset * 100 + 500))
+        sketches[("all", today - timedelta(days=offset))] = sketch
+
+    assert len(union_window(sketches, ["all"], today, 1)) == pytest.approx(500, rel=0.02)
+    # 7 ngày gần nhất phủ user-0 .. user-1099
+    assert len(union_window(sketches, ["all"], today, 7)) == pytest.approx(1100, rel=0.02)
+
+
+def test_store_flushes_only_changed_sketches(monkeypatch: pytest.MonkeyPatch) -> None:
+    store = SketchStore(precision=14)
+    monkeypatch.setattr(active_users_service, "sketch_store", store)
+    day = datetime(2024, 5, 16)
+
+    active_users_service.record_activity("u1", course_id="c1", at=day + timedelta(hours=3))
+    snapshot = store.take_dirty()
+    assert set(snapshot) == {("platform", "all", day), ("course", "c1", day)}
+
+    active_users_service.record_activity("u1", at=day + timedelta(hours=5))
+    assert store.take_dirty() == {}  # cùng người dùng, thanh ghi không đổi
+
+    operation = build_sketch_operations(snapshot, "worker-a", 14)[0]
+    assert operation._filter["worker_id"] == "worker-a"
+    assert operation._doc["$setOnInsert"]["expires_at"] > day
+    assert operation._upsert is True
+
+    store.evict_before(day + timedelta(days=1))
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_sketches_dirty(monkeypatch: pytest.MonkeyPatch) -> None:
+    store = SketchStore(precision=14)
+    monkeypatch.setattr(active_users_service, "sketch_store", store)
+
+    async def failing_bulk_write(operations, ordered):
+        raise RuntimeError("mongo down")
+
+    collection = SimpleNamespace(bulk_write=failing_bulk_write)
+    monkeypatch.setattr(
+        active_users_service.ActivitySketchDocument, "get_pymongo_collection", classmethod(lambda cls: collection)
+    )
+    active_users_service.record_activity("u1")
+
+    with pytest.raises(RuntimeError):
+        await active_users_service.flush_sketches()
+    assert len(store.take_dirty()) == 1
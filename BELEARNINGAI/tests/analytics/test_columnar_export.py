@@ -0,0 +1,130 @@
+"""Kiểm thử export Arrow IPC và báo cáo giảng viên trên bản export."""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from modules.columnar_module import (
+    ATTEMPTS_TABLE,
+    PROGRESS_TABLE,
+    AnalyticsExport,
+    ExportWriter,
+    course_performance,
+    student_activity,
+)
+from services import analytics_export_service
+
+
+def _write_export(directory) -> None:
+    writer = ExportWriter(directory)
+    writer.write(
+        PROGRESS_TABLE,
+        {
+            "course_id": ["c1", "c1", "c2"],
+            "user_id": ["u1", "u2", "u1"],
+            "progress": [100.0, 50.0, 20.0],
+            "completed_count": [10, 5, 1],
+            "total_minutes": [120, 60, 15],
+            "last_activity": [datetime(2024, 5, 1), datetime(2024, 5, 3), datetime(2024, 5, 2)],
+        },
+    )
+    # Có cả lượt làm quiz ở khóa học của giảng viên khác.
+    writer.write(
+        ATTEMPTS_TABLE,
+        {
+            "course_id": ["c1", "c1", "other"],
+            "quiz_id": ["q1", "q1", "q9"],
+            "user_id": ["u1", "u3", "u1"],
+            "percentage": [80.0, 60.0, 10.0],
+            "submitted_at": [datetime(2024, 5, 4), datetime(2024, 5, 5), datetime(2024, 5, 6)],
+        },
+    )
+    writer.commit(datetime(2024, 5, 6, 2))
+
+
+def test_course_performance_from_memory_mapped_export(tmp_path) -> None:
+    _write_export(tmp_path / "analytics")
+    export = AnalyticsExport.load(tmp_path / "analytics")
+
+    report = {row["course_id"]: row for row in course_performance(export, ["c1", "c2", "empty"])}
+
+    assert export.exported_at == datetime(2024, 5, 6, 2)
+    assert report["c1"] == {
+        "course_id": "c1",
+        "learners": 2,
+        "completion_rate": 50.0,
+        "average_progress": 75.0,
+        "study_minutes": 180,
+        "quiz_attempts": 2,
+        "average_score": 70.0,
+    }
+    assert report["c2"]["quiz_attempts"] == 0
+    assert report["empty"]["learners"] == 0
+
+
+def test_student_activity_orders_by_latest_activity(tmp_path) -> None:
+    _write_export(tmp_path / "analytics")
+    export = AnalyticsExport.load(tmp_path / "analytics")
+
+    rows = student_activity(export, ["c1", "c2"], limit=2)
+
+    assert [row["user_id"] for row in rows] == ["u3", "u1"]
+    assert rows[0]["courses"] == 0 and rows[0]["quiz_attempts"] == 1
+    assert rows[1]["courses"] == 2 and rows[1]["study_minutes"] == 135
+    assert rows[1]["last_activity"] == datetime(2024, 5, 4)  # bài quiz ở khóa "other" không tính
+
+
+def test_rewrite_replaces_previous_export(tmp_path) -> None:
+    directory = tmp_path / "analytics"
+    _write_export(directory)
+    writer = ExportWriter(directory)
+    writer.commit(datetime(2024, 5, 7, 2))
+
+    export = AnalyticsExport.load(directory)
+
+    assert export.attempts.num_rows == 0 and export.progress.num_rows == 0
+    assert not (tmp_path / "analytics.tmp").exists()
+
+
+@pytest.mark.asyncio
+async def test_export_counts_completed_lessons_in_projection(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    projections = {}
+
+    def _collection(name, rows):
+        class _Cursor:
+            def batch_size(self, size):
+                self._rows = iter(rows)
+                return self
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                try:
+                    return next(self._rows)
+                except StopIteration:
+                    raise StopAsyncIteration
+
+        def find(query, projection):
+            projections[name] = projection
+            return _Cursor()
+
+        collection = SimpleNamespace(find=find)
+        collection.with_options = lambda read_preference: collection
+        return classmethod(lambda cls: collection)
+
+    progress_row = {"course_id": "c1", "user_id": "u1", "progress": 40.0, "completed_count": 3, "total_minutes": 30}
+    monkeypatch.setattr(
+        analytics_export_service.ProgressDocument, "get_pymongo_collection", _collection("progress", [progress_row])
+    )
+    monkeypatch.setattr(
+        analytics_export_service.QuizAttemptDocument, "get_pymongo_collection", _collection("attempts", [])
+    )
+
+    rows = await analytics_export_service.export_analytics(str(tmp_path))
+
+    assert rows[PROGRESS_TABLE] == 1
+    assert projections["progress"]["completed_count"] == {
+        "$ifNull": ["$completed_count", {"$size": {"$ifNull": ["$completed_lessons", []]}}]
+    }
+    assert "completed_lessons" not in projections["progress"]
@@ -0,0 +1,45 @@
+"""Kiểm thử bucket thời gian và bộ đếm analytics rollup."""
+from datetime import datetime
+
+from modules.rollup_module import bucket_range, bucket_start, percent_change, rollup_keys
+from services import rollup_service
+
+
+def test_bucket_boundaries() -> None:
+    moment = datetime(2024, 5, 16, 14, 37, 12)  # thứ Năm
+
+    assert bucket_start(moment, "hour") == datetime(2024, 5, 16, 14)
+    assert bucket_start(moment, "day") == datetime(2024, 5, 16)
+    assert bucket_start(moment, "week") == datetime(2024, 5, 13)
+    assert bucket_range(datetime(2024, 5, 14, 23), moment, "day") == [
+        datetime(2024, 5, 14),
+        datetime(2024, 5, 15),
+        datetime(2024, 5, 16),
+    ]
+    assert len(rollup_keys(moment, [("user", "u1"), ("platform", "all")])) == 6
+
+
+def test_percent_change_handles_empty_previous_window() -> None:
+    assert percent_change(15, 10) == 50.0
+    assert percent_change(5, 0) is None
+
+
+def test_events_coalesce_into_inc_upserts() -> None:
+    buffer = rollup_service.rollup_buffer
+    buffer._pending.clear()
+    moment = datetime(2024, 5, 16, 14, 5)
+
+    rollup_service.record_metrics("u1", {"study_minutes": 10, "lessons_completed": 1}, course_id="c1", at=moment)
+    rollup_service.record_metrics("u1", {"study_minutes": 5, "lessons_completed": 0}, course_id="c1", at=moment)
+    rollup_service.record_metrics("u2", {"quiz_attempts": 1}, class_ids=["k1"], at=moment)
+
+    batch = {key: entry.value for key, entry in buffer._pending.items()}
+    buffer._pending.clear()
+    assert batch[("user", "u1", "day", datetime(2024, 5, 16))] == {"study_minutes": 15, "lessons_completed": 1}
+    assert batch[("platform", "all", "hour", datetime(2024, 5, 16, 14))]["quiz_attempts"] == 1
+    assert ("class", "k1", "week", datetime(2024, 5, 13)) in batch
+
+    operations = {op._filter["granularity"] + op._filter["scope"]: op for op in rollup_service.build_rollup_operations(batch)}
+    assert operations["daycourse"]._doc["$inc"] == {"counters.study_minutes": 15, "counters.lessons_completed": 1}
+    assert "expires_at" in operations["hourcourse"]._doc["$setOnInsert"]
+    assert "$setOnInsert" not in operations["weekcourse"]._doc
@@ -0,0 +1,62 @@
+"""Kiểm thử engine IRT cho bài đánh giá thích ứng."""
+import time
+
+import numpy as np
+
+from modules.irt_module import (
+    ItemBankIndex,
+    ItemParameters,
+    calibrate,
+    estimate_ability,
+    initial_log_posterior,
+    probability,
+    update_log_posterior,
+)
+
+
+def test_select_next_prefers_items_near_ability_and_skips_administered() -> None:
+    index = ItemBankIndex(["easy", "medium", "hard"], a=[1.0, 1.0, 1.0], b=[-2.0, 0.0, 2.0], c=[0.0, 0.0, 0.0])
+
+    assert index.select_next(0.0) == "medium"
+    assert index.select_next(1.9) == "hard"
+    assert index.select_next(0.0, exclude=["medium"]) in {"easy", "hard"}
+    assert index.select_next(0.0, exclude=["easy", "medium", "hard"]) is None
+
+
+def test_select_next_stays_within_latency_budget() -> None:
+    """Chọn câu trong ngân hàng 5.000 câu phải dưới 2 ms."""
+
+    rng = np.random.default_rng(7)
+    size = 5000
+    index = ItemBankIndex([str(i) for i in range(size)], rng.uniform(0.5, 2, size), rng.normal(size=size), np.zeros(size))
+    administered = [str(i) for i in range(40)]
+
+    start = time.perf_counter()
+    for theta in np.linspace(-3, 3, 200):
+        index.select_next(float(theta), exclude=administered)
+    assert (time.perf_counter() - start) / 200 < 0.002
+
+
+def test_ability_moves_with_answers() -> None:
+    params = ItemParameters(a=1.2, b=0.0, c=0.0)
+    log_posterior = initial_log_posterior()
+    for _ in range(5):
+        log_posterior = update_log_posterior(log_posterior, params, correct=True)
+    theta_up, se_up = estimate_ability(log_posterior)
+
+    assert theta_up > 0.5
+    assert se_up < 1.0
+
+
+def test_calibrate_recovers_difficulty() -> None:
+    rng = np.random.default_rng(0)
+    theta = rng.normal(size=1000)
+    a = rng.uniform(0.6, 2.0, 20)
+    b = rng.normal(size=20)
+    responses = (rng.random((1000, 20)) < probability(theta[:, None], a, b)).astype(float)
+    responses[rng.random(responses.shape) < 0.3] = np.nan
+
+    result = calibrate(responses)
+
+    assert np.corrcoef(result.b, b)[0, 1] > 0.95
+    assert np.abs(result.b - b).mean() < 0.2
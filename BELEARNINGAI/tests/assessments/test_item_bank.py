@@ -0,0 +1,75 @@
+"""Kiểm thử chỉ mục ngân hàng câu hỏi phân tầng."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from modules.item_bank_module import SeenBitmap, StratifiedItemBank, allocate, mark_seen
+from services import item_bank_service
+
+
+def _bank(size: int = 60) -> StratifiedItemBank:
+    difficulties = ["easy", "medium", "hard"]
+    return StratifiedItemBank(
+        [SimpleNamespace(seq=i, difficulty=difficulties[i % 3], topic=f"topic-{i % 4}") for i in range(size)]
+    )
+
+
+def test_bitmap_round_trip() -> None:
+    seen = SeenBitmap(mark_seen(mark_seen(None, [0, 9]), [17]))
+
+    assert [seq for seq in range(40) if seq in seen] == [0, 9, 17]
+    assert seen.unseen(np.arange(20, dtype=np.int64)).tolist() == [
+        seq for seq in range(20) if seq not in (0, 9, 17)
+    ]
+
+
+def test_sample_follows_difficulty_mix_and_skips_seen() -> None:
+    bank = _bank()
+    seen = SeenBitmap(mark_seen(None, list(range(0, 60, 2))))
+
+    drawn = bank.sample(10, seen, {"easy": 0.3, "medium": 0.4, "hard": 0.3}, rng=np.random.default_rng(3))
+
+    assert len({item.seq for item in drawn}) == 10
+    assert all(item.seq % 2 == 1 for item in drawn)
+    counts = {level: sum(item.difficulty == level for item in drawn) for level in ("easy", "medium", "hard")}
+    assert counts == allocate(10, {"easy": 0.3, "medium": 0.4, "hard": 0.3})
+
+
+def test_sample_redistributes_when_a_difficulty_runs_out() -> None:
+    """Độ khó cạn câu nhường phần thiếu cho độ khó khác, không trả đề ngắn hơn yêu cầu."""
+
+    bank = _bank(9)
+    drawn = bank.sample(8, difficulty_mix={"easy": 1.0}, rng=np.random.default_rng(1))
+
+    assert len({item.seq for item in drawn}) == 8
+    assert sum(item.difficulty == "easy" for item in drawn) == 3
+
+
+@pytest.mark.asyncio
+async def test_mark_seen_retries_on_concurrent_write(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Lượt ghi thua compare-and-swap đọc lại bitmap và giữ bit lượt kia vừa ghi."""
+
+    stored = {"bitmap": mark_seen(None, [1])}
+    updates = []
+
+    async def find_one(query, projection):
+        return dict(stored)
+
+    async def update_one(query, update, upsert):
+        updates.append(query["bitmap"])
+        if query["bitmap"] != stored["bitmap"]:
+            raise DuplicateKeyError("E11000")
+        stored["bitmap"] = update["$set"]["bitmap"]
+
+    monkeypatch.setattr(
+        item_bank_service.SeenQuestionsDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find_one=find_one, update_one=update_one)),
+    )
+
+    await item_bank_service.mark_questions_seen("u1", "python", [5], observed=b"", reset=True)
+
+    assert updates == [b"", mark_seen(None, [1])]
+    assert [seq for seq in range(8) if seq in SeenBitmap(stored["bitmap"])] == [1, 5]
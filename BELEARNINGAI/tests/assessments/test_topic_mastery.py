@@ -0,0 +1,187 @@
+"""Kiểm thử bộ đếm thành thạo theo chủ đề."""
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from models.models import AssessmentDocument, AssessmentItem
+from modules.irt_module import initial_log_posterior
+from services import adaptive_service, assessment_service
+
+
+class _FakeCollection:
+    def __init__(self) -> None:
+        self.operations = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.operations.extend(operations)
+
+
+@pytest.mark.asyncio
+async def test_record_topic_results_uses_inc_upserts(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Mỗi chủ đề có câu chấm được là một upsert ``$inc``; chủ đề không có câu bị bỏ qua."""
+
+    collection = _FakeCollection()
+    monkeypatch.setattr(assessment_service.TopicMasteryDocument, "get_pymongo_collection", lambda: collection)
+
+    await assessment_service.record_topic_results("u1", "programming", [("oop", 1.0, 3.0), ("essay", 0.0, 0.0)])
+
+    assert len(collection.operations) == 1
+    operation = collection.operations[0]
+    assert operation._filter == {"user_id": "u1", "category": "programming", "topic": "oop"}
+    assert operation._doc["$inc"] == {"correct": 1, "total": 3}
+    assert operation._upsert is True
+
+
+def test_mastery_level_thresholds() -> None:
+    assert assessment_service.mastery_level(4, 5) == "good"
+    assert assessment_service.mastery_level(3, 5) == "fair"
+    assert assessment_service.mastery_level(1, 5) == "weak"
+    assert assessment_service.mastery_level(0, 0) == "weak"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submit_counts_mastery_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Chỉ lần nộp chuyển được trạng thái sang ``submitted`` mới cộng vào bộ đếm chủ đề."""
+
+    status = {"value": "in_progress"}
+    filters = []
+    recorded = []
+
+    async def find_one_and_update(query, update, projection, return_document):
+        filters.append(query)
+        if status["value"] == "submitted":
+            return None
+        status["value"] = update["$set"]["status"]
+        return {"_id": query["_id"]}
+
+    async def record(user_id, category, results):
+        recorded.append(list(results))
+
+    monkeypatch.setattr(
+        AssessmentDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find_one_and_update=find_one_and_update)),
+    )
+    monkeypatch.setattr(assessment_service, "record_topic_results", record)
+
+    def _assessment() -> AssessmentDocument:
+        document = AssessmentDocument(
+            user_id="u1",
+            category="programming",
+            questions=[
+                AssessmentItem(question_id="q1", question_text="?", options=["a", "b"], correct_answer=1, topic="oop")
+            ],
+        )
+        document.id = assessment_id
+        return document
+
+    assessment_id = ObjectId()
+    first, second = _assessment(), _assessment()
+
+    assert await assessment_service.finalize_assessment(first, [1]) is True
+    assert await assessment_service.finalize_assessment(second, [0]) is False
+    assert filters[0] == {"_id": assessment_id, "status": {"$ne": "submitted"}}
+    assert len(recorded) == 1 and recorded[0][0][0] == "oop"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_adaptive_answer_is_written_and_counted_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Hai request trả lời cùng một câu: chỉ lệnh ghi khớp ``answers.n`` chưa tồn tại được tính."""
+
+    stored = {"answers": []}
+    recorded = []
+    assessment_id = ObjectId()
+
+    async def find_one_and_update(query, update, projection, return_document):
+        position = int(next(key for key in query if key.startswith("answers.")).split(".")[1])
+        if len(stored["answers"]) > position:
+            return None
+        stored["answers"] = update["$set"]["answers"]
+        return {"_id": query["_id"]}
+
+    async def record(user_id, category, results):
+        recorded.append(list(results))
+
+    def _assessment() -> AssessmentDocument:
+        document = AssessmentDocument(
+            user_id="u1",
+            category="programming",
+            adaptive=True,
+            max_items=5,
+            log_posterior=initial_log_posterior().tolist(),
+            questions=[
+                AssessmentItem(question_id="q1", question_text="?", options=["a", "b"], correct_answer=1, topic="oop")
+            ],
+        )
+        document.id = assessment_id
+        return document
+
+    async def get_assessment(assessment_id, user_id):
+        # Cả hai request đều đọc bài trước khi request kia ghi.
+        return _assessment()
+
+    async def append_next(assessment):
+        assessment.questions.append(
+            AssessmentItem(question_id="q2", question_text="?", options=["a", "b"], correct_answer=0, topic="oop")
+        )
+        return True
+
+    monkeypatch.setattr(
+        AssessmentDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find_one_and_update=find_one_and_update)),
+    )
+    monkeypatch.setattr(adaptive_service, "get_assessment", get_assessment)
+    monkeypatch.setattr(adaptive_service, "_append_next_question", append_next)
+    monkeypatch.setattr(adaptive_service, "record_topic_results", record)
+    monkeypatch.setattr(adaptive_service._settings, "adaptive_target_se", 0.0)
+
+    step = await adaptive_service.answer_adaptive(str(assessment_id), "u1", 1)
+    with pytest.raises(HTTPException) as duplicate:
+        await adaptive_service.answer_adaptive(str(assessment_id), "u1", 1)
+
+    assert step.answered == 1 and duplicate.value.status_code == 409
+    assert stored["answers"] == [1]
+    assert recorded == [[("oop", 1, 1)]]
+
+
+@pytest.mark.asyncio
+async def test_early_adaptive_submit_grades_only_answered_questions(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Câu kế tiếp đã hiện nhưng chưa trả lời không bị tính là sai khi nộp sớm."""
+
+    saved = {}
+
+    async def find_one_and_update(query, update, projection, return_document):
+        saved.update(query=query, document=update["$set"])
+        return {"_id": query["_id"]}
+
+    monkeypatch.setattr(
+        AssessmentDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find_one_and_update=find_one_and_update)),
+    )
+    assessment = AssessmentDocument(
+        user_id="u1",
+        category="programming",
+        adaptive=True,
+        questions=[
+            AssessmentItem(question_id="q1", question_text="?", options=["a", "b"], correct_answer=1, topic="oop"),
+            AssessmentItem(question_id="q2", question_text="?", options=["a", "b"], correct_answer=0, topic="sql"),
+        ],
+        answers=[1],
+        correct=[True],
+    )
+    assessment.id = ObjectId()
+
+    async def get_assessment(assessment_id, user_id):
+        return assessment
+
+    monkeypatch.setattr(assessment_service, "get_assessment", get_assessment)
+
+    summary = await assessment_service.submit_assessment(str(assessment.id), "u1", [])
+
+    assert summary.score == 100.0 and summary.weaknesses == []
+    assert [item.question_id for item in summary.questions] == ["q1"]
+    assert saved["query"]["answers.1"] == {"$exists": False}
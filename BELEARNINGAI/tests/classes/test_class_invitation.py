@@ -1,13 +1,158 @@
-"""Kiểm thử placeholder cho mã mời lớp học."""
+"""Kiểm thử mã tham gia lớp học và upsert thành viên."""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
 import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
 
 from services import classes_service
+from services.classes_service import JOIN_CODE_ALPHABET, JoinCodeEntry, JoinCodeResolver
+
+
+def test_codes_use_unambiguous_alphabet() -> None:
+    codes = {classes_service.new_join_code(8) for _ in range(200)}
+
+    assert len(codes) == 200
+    assert all(len(code) == 8 and set(code) <= set(JOIN_CODE_ALPHABET) for code in codes)
+    assert classes_service.normalize_join_code(" abcd-efgh ") == "ABCDEFGH"
+
+
+@pytest.mark.asyncio
+async def test_join_burst_resolves_code_with_one_query(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    async def find_one(query):
+        calls.append(query)
+        await asyncio.sleep(0)
+        expires_at = datetime.utcnow() + timedelta(days=1)
+        return SimpleNamespace(class_id="class-1", course_id="course-1", expires_at=expires_at)
+
+    monkeypatch.setattr(classes_service.ClassJoinCodeDocument, "find_one", find_one)
+    resolver = JoinCodeResolver(ttl_seconds=60, max_entries=100)
+
+    entries = await asyncio.gather(*(resolver.resolve("ABCD2345") for _ in range(300)))
+
+    assert len(calls) == 1 and calls[0]["code"] == "ABCD2345"
+    assert {entry.class_id for entry in entries} == {"class-1"}
+    resolver.put("OLDCODE1", JoinCodeEntry("class-1", "course-1", datetime.utcnow() - timedelta(seconds=1)))
+    assert await resolver.resolve("OLDCODE1") is None
+
+
+@pytest.mark.asyncio
+async def test_generate_join_code_retries_on_collision(monkeypatch: pytest.MonkeyPatch) -> None:
+    inserted = []
+
+    class _JoinCode:
+        def __init__(self, **fields) -> None:
+            self.fields = fields
+
+        async def insert(self):
+            if not inserted:
+                inserted.append(None)
+                raise DuplicateKeyError("E11000 duplicate key")
+            inserted.append(self.fields["code"])
+            return self
+
+    async def owned(class_id: str, current_user: dict):
+        return SimpleNamespace(id=class_id, course_id="course-1")
+
+    monkeypatch.setattr(classes_service, "get_class_for", owned)
+    monkeypatch.setattr(classes_service, "ClassJoinCodeDocument", _JoinCode)
+
+    invite = await classes_service.generate_join_code("class-1", {"sub": "teacher", "role": "instructor"})
+
+    assert inserted[-1] == invite.join_code
+    assert invite.invite_url.endswith(f"?code={invite.join_code}")
+    assert (await classes_service.join_code_resolver.resolve(invite.join_code)).course_id == "course-1"
+
+
+def _no_progress(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def find_one(query, projection):
+        return None
+
+    monkeypatch.setattr(
+        classes_service.ProgressDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find_one=find_one)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_rejoin_is_idempotent(monkeypatch: pytest.MonkeyPatch) -> None:
+    class_id = str(ObjectId())
+    memberships: dict = {}
+    increments = []
+
+    async def find_one_and_update(query, update, projection, upsert, return_document):
+        key = (query["class_id"], query["user_id"])
+        previous = memberships.get(key)
+        memberships[key] = {**update["$setOnInsert"], **(previous or {}), **update["$set"]}
+        return dict(previous) if previous else None
+
+    async def update_one(query, update):
+        increments.append(update["$inc"]["student_count"])
+        return SimpleNamespace(modified_count=1)
+
+    monkeypatch.setattr(
+        classes_service.ClassMembershipDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find_one_and_update=find_one_and_update)),
+    )
+    monkeypatch.setattr(
+        classes_service.ClassDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(update_one=update_one)),
+    )
+    _no_progress(monkeypatch)
+    classes_service.join_code_resolver.put(
+        "JOINME22", JoinCodeEntry(class_id, "course-1", datetime.utcnow() + timedelta(hours=1))
+    )
+
+    first = await classes_service.join_class("joinme22", "student-1")
+    second = await classes_service.join_class("JOINME22", "student-1")
+
+    assert not first.already_member and second.already_member
+    assert memberships[(class_id, "student-1")]["last_active_key"] == datetime(1970, 1, 1)
+    assert second.joined_at == first.joined_at
+    assert increments == [1]
 
 
-@pytest.mark.skip(reason="placeholder: cần tích hợp DB lớp học thực")
 @pytest.mark.asyncio
-async def test_generate_join_code_format():
-    """Join code demo phải bắt đầu bằng tiền tố JOIN."""
+async def test_join_full_class_is_rejected_and_membership_rolled_back(monkeypatch: pytest.MonkeyPatch) -> None:
+    class_id = str(ObjectId())
+    seat_filters, deleted = [], []
+
+    async def find_one_and_update(query, update, projection, upsert, return_document):
+        return None
+
+    async def delete_one(query):
+        deleted.append(query)
+
+    async def update_one(query, update):
+        seat_filters.append(query)
+        return SimpleNamespace(modified_count=0)
+
+    monkeypatch.setattr(
+        classes_service.ClassMembershipDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find_one_and_update=find_one_and_update, delete_one=delete_one)),
+    )
+    monkeypatch.setattr(
+        classes_service.ClassDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(update_one=update_one)),
+    )
+    _no_progress(monkeypatch)
+    classes_service.join_code_resolver.put(
+        "FULLCLS2", JoinCodeEntry(class_id, "course-1", datetime.utcnow() + timedelta(hours=1))
+    )
+
+    with pytest.raises(HTTPException) as error:
+        await classes_service.join_class("FULLCLS2", "student-9")
 
-    invite = await classes_service.generate_join_code("class-xyz")
-    assert invite.join_code.startswith("JOIN-")
+    assert error.value.status_code == 409
+    assert seat_filters[0]["$or"][1] == {"$expr": {"$lt": ["$student_count", "$max_students"]}}
+    assert deleted == [{"class_id": class_id, "user_id": "student-9", "status": "active"}]
@@ -0,0 +1,119 @@
+"""Kiểm thử roster lớp học: pipeline keyset, cursor và cache tóm tắt."""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from schemas.classes import RosterSummary
+from services import classes_service
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip_and_rejects_garbage() -> None:
+    moment = datetime(2024, 5, 16, 8, 30)
+    assert decode_cursor(encode_cursor(moment, "abc"), 2) == [moment, "abc"]
+
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not-a-cursor", 2)
+    assert error.value.status_code == 400
+
+
+def test_roster_pipeline_pages_on_membership_before_lookup() -> None:
+    last_id = ObjectId()
+    pipeline = classes_service.build_roster_pipeline(
+        "class-1", sort="last_active", descending=True, limit=20, after=(datetime(2024, 5, 1), last_id), tag="focus"
+    )
+
+    assert pipeline[0] == {"$match": {"class_id": "class-1", "status": {"$ne": "removed"}, "tags": "focus"}}
+    assert pipeline[1] == {
+        "$match": {
+            "$or": [
+                {"last_active_key": {"$lt": datetime(2024, 5, 1)}},
+                {"last_active_key": datetime(2024, 5, 1), "_id": {"$lt": last_id}},
+            ]
+        }
+    }
+    assert pipeline[2:4] == [{"$sort": {"last_active_key": -1, "_id": -1}}, {"$limit": 21}]
+    lookups = [stage["$lookup"]["from"] for stage in pipeline if "$lookup" in stage]
+    assert lookups == ["users"] and "$lookup" in pipeline[4]
+
+
+def test_roster_pipeline_by_name_joins_users_before_paging() -> None:
+    pipeline = classes_service.build_roster_pipeline("class-1", sort="name", descending=False, limit=10)
+
+    assert "$lookup" in pipeline[1]
+    assert pipeline[-2:] == [{"$sort": {"full_name": 1, "_id": 1}}, {"$limit": 11}]
+
+
+def test_roster_sort_fields_default_for_students_without_progress() -> None:
+    assert classes_service.roster_sort_fields(None) == {
+        "progress_percent": 0.0,
+        "last_active": None,
+        "last_active_key": datetime(1970, 1, 1),
+    }
+    moment = datetime(2024, 5, 2)
+    fields = classes_service.roster_sort_fields({"progress": 40.0, "last_activity": moment})
+    assert fields["progress_percent"] == 40.0 and fields["last_active_key"] == moment
+
+
+@pytest.mark.asyncio
+async def test_list_roster_returns_next_cursor(monkeypatch: pytest.MonkeyPatch) -> None:
+    ids = [ObjectId() for _ in range(3)]
+    rows = [
+        {
+            "_id": ids[index],
+            "user_id": f"u{index}",
+            "status": "active",
+            "tags": [],
+            "full_name": f"User {index}",
+            "email": f"u{index}@example.com",
+            "progress_percent": 90.0 - index * 10,
+            "last_active": None,
+            "last_active_key": datetime(1970, 1, 1),
+        }
+        for index in range(3)
+    ]
+    captured = {}
+
+    async def owned(class_id: str, current_user: dict) -> None:
+        return None
+
+    def aggregate(pipeline):
+        captured["pipeline"] = pipeline
+
+        async def to_list():
+            return rows
+
+        return SimpleNamespace(to_list=to_list)
+
+    monkeypatch.setattr(classes_service, "authorize_class", owned)
+    monkeypatch.setattr(classes_service.ClassMembershipDocument, "aggregate", aggregate)
+
+    page = await classes_service.list_roster("class-1", {"sub": "teacher"}, limit=2)
+
+    assert [item.student_id for item in page.items] == ["u0", "u1"]
+    assert captured["pipeline"][1:3] == [{"$sort": {"progress_percent": -1, "_id": -1}}, {"$limit": 3}]
+    assert decode_cursor(page.next_cursor, 2) == [80.0, str(ids[1])]
+
+
+@pytest.mark.asyncio
+async def test_progress_event_invalidates_cached_summary(monkeypatch: pytest.MonkeyPatch) -> None:
+    summary = RosterSummary(
+        class_id="class-1",
+        student_count=30,
+        average_progress=40.0,
+        completed_count=2,
+        active_last_7_days=12,
+        generated_at=datetime.utcnow(),
+    )
+    classes_service.roster_summary_cache.put("class-1", summary)
+    classes_service.membership_cache.put(("u1", "course-1"), ("class-1",))
+
+    class_ids = await classes_service.progress_recorded("u1", "course-1")
+
+    assert class_ids == ("class-1",)
+    assert classes_service.roster_summary_cache.get("class-1") is None
+    classes_service.membership_changed("class-1", "u1", "course-1")
+    assert classes_service.membership_cache.get(("u1", "course-1")) is None
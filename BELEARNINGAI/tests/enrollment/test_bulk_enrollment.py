@@ -0,0 +1,102 @@
+"""Kiểm thử đăng ký khóa học hàng loạt."""
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from services import enrollment_service
+
+
+class _Cursor:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+
+    def __aiter__(self):
+        async def iterate():
+            for row in self.rows:
+                yield row
+
+        return iterate()
+
+
+def test_parse_csv_picks_identifier_column() -> None:
+    with_header = "\ufeffname,email\nAn,an@example.com\nBinh,BINH@example.com\n,\n".encode("utf-8")
+    without_header = b"64b7f0c2a1b2c3d4e5f60718\n64b7f0c2a1b2c3d4e5f60719\n"
+
+    assert enrollment_service.parse_identifiers_csv(with_header) == ["an@example.com", "BINH@example.com"]
+    assert enrollment_service.parse_identifiers_csv(without_header) == [
+        "64b7f0c2a1b2c3d4e5f60718",
+        "64b7f0c2a1b2c3d4e5f60719",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_enroll_reports_each_row(monkeypatch: pytest.MonkeyPatch) -> None:
+    users = [ObjectId() for _ in range(4)]
+    user_queries, batches, metrics = [], [], []
+
+    async def course(course_id: str):
+        return SimpleNamespace(created_by="teacher")
+
+    def find_users(query, projection):
+        user_queries.append(query)
+        return _Cursor([{"_id": users[0], "email": "an@example.com"}] + [{"_id": oid} for oid in users[1:]])
+
+    async def bulk_write(operations, ordered):
+        assert ordered is False
+        batches.append([operation._doc["user_id"] for operation in operations])
+        if len(batches) == 2:
+            # Dòng thứ hai của khối thứ hai đã có enrollment (unique index).
+            raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"}]})
+
+    monkeypatch.setattr(enrollment_service, "_get_course", course)
+    monkeypatch.setattr(enrollment_service._settings, "bulk_enrollment_chunk_size", 2)
+    monkeypatch.setattr(
+        enrollment_service.UserDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find=find_users)),
+    )
+    monkeypatch.setattr(
+        enrollment_service.EnrollmentDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(bulk_write=bulk_write)),
+    )
+    monkeypatch.setattr(enrollment_service, "record_metrics", lambda user_id, counters, course_id: metrics.append(user_id))
+
+    identifiers = [
+        "AN@example.com",
+        str(users[1]),
+        "not-an-id",
+        str(users[0]),
+        str(users[2]),
+        str(users[3]),
+        str(ObjectId()),
+    ]
+    response = await enrollment_service.bulk_update_enrollments("course-1", identifiers, {"sub": "teacher", "role": "instructor"})
+
+    assert len(user_queries) == 1
+    assert [row.status for row in response.results] == [
+        "enrolled",
+        "enrolled",
+        "invalid",
+        "duplicate",
+        "enrolled",
+        "already_enrolled",
+        "not_found",
+    ]
+    assert batches == [[str(users[0]), str(users[1])], [str(users[2]), str(users[3])]]
+    assert metrics == [str(users[0]), str(users[1]), str(users[2])]
+    assert response.summary["enrolled"] == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_enroll_requires_course_owner(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def course(course_id: str):
+        return SimpleNamespace(created_by="someone-else")
+
+    monkeypatch.setattr(enrollment_service, "_get_course", course)
+
+    with pytest.raises(enrollment_service.HTTPException) as error:
+        await enrollment_service.bulk_update_enrollments("course-1", ["x"], {"sub": "teacher", "role": "instructor"})
+    assert error.value.status_code == 403
@@ -0,0 +1,45 @@
+"""Kiểm thử chỉ mục bài học dùng để tính phần trăm tiến độ."""
+from types import SimpleNamespace
+
+from services.lesson_index_service import CourseLessonIndex, LessonIndexCache, assign_lesson_ids
+
+
+def _course() -> SimpleNamespace:
+    lesson = lambda lesson_id: SimpleNamespace(lesson_id=lesson_id)  # noqa: E731
+    return SimpleNamespace(
+        id="c1",
+        modules=[
+            SimpleNamespace(lessons=[lesson("intro"), lesson(None)]),
+            SimpleNamespace(lessons=[lesson("oop"), lesson("oop")]),
+        ],
+    )
+
+
+def test_index_maps_lessons_and_computes_percent() -> None:
+    index = CourseLessonIndex.from_course(_course())
+
+    assert index.positions == {"intro": 0, "0.1": 1, "oop": 2}
+    assert index.total == 3
+    assert index.percent(1) == 33.33
+    assert index.percent(5) == 100.0
+    assert CourseLessonIndex(total=0, positions={}).percent(2) == 0.0
+
+
+def test_assign_lesson_ids_only_fills_missing() -> None:
+    course = _course()
+    assign_lesson_ids(course.modules)
+
+    ids = [lesson.lesson_id for module in course.modules for lesson in module.lessons]
+    assert ids[0] == "intro" and ids[2] == "oop"
+    assert ids[1] and len(ids[1]) == 12
+
+
+def test_cache_invalidation_drops_course() -> None:
+    cache = LessonIndexCache(ttl_seconds=60, max_courses=1)
+    cache._store("c1", CourseLessonIndex(total=1, positions={"a": 0}))
+    cache._store("c2", CourseLessonIndex(total=2, positions={"a": 0, "b": 1}))
+
+    assert cache._fresh("c1") is None
+    assert cache._fresh("c2").total == 2
+    cache.invalidate("c2")
+    assert cache._fresh("c2") is None
@@ -0,0 +1,81 @@
+"""Kiểm thử PATCH tiến độ theo bài học khi vòng flush định kỳ đang chạy."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from beanie import PydanticObjectId
+
+from models.models import EnrollmentStatus
+from services import enrollment_service, progress_service
+from services.progress_service import ProgressDelta
+from utils.scheduler import PeriodicTask
+from utils.write_buffer import CoalescingBuffer
+
+
+@pytest.mark.asyncio
+async def test_lesson_update_returns_fresh_progress_with_flusher_running(monkeypatch: pytest.MonkeyPatch) -> None:
+    stored = {"completed_lessons": set()}
+    synced = []
+
+    async def find_one_and_update(query, pipeline, projection, upsert, return_document):
+        before = {"completed_lessons": sorted(stored["completed_lessons"])}
+        stored["completed_lessons"].update(["l1"])
+        return before
+
+    async def find_one(query, projection):
+        return {"progress": 100.0 * len(stored["completed_lessons"]) / 2}
+
+    async def get_index(course_id):
+        return SimpleNamespace(positions={"l1": 0, "l2": 1}, total=2)
+
+    async def get_many(course_ids):
+        return {course_id: SimpleNamespace(total=2) for course_id in course_ids}
+
+    async def sync(keys):
+        synced.append(keys)
+
+    async def no_classes(user_id, course_id):
+        return ()
+
+    collection = classmethod(
+        lambda cls: SimpleNamespace(find_one_and_update=find_one_and_update, find_one=find_one)
+    )
+    monkeypatch.setattr(progress_service.ProgressDocument, "get_pymongo_collection", collection)
+    monkeypatch.setattr(progress_service.EnrollmentDocument, "get_pymongo_collection", collection)
+    monkeypatch.setattr(progress_service.lesson_index_cache, "get", get_index)
+    monkeypatch.setattr(progress_service.lesson_index_cache, "get_many", get_many)
+    monkeypatch.setattr(progress_service, "_sync_enrollments", sync)
+    monkeypatch.setattr(progress_service, "progress_recorded", no_classes)
+    monkeypatch.setattr(progress_service, "member_class_ids", no_classes)
+    monkeypatch.setattr(progress_service, "record_activity", lambda user_id, course_id: None)
+    monkeypatch.setattr(progress_service, "record_metrics", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        progress_service, "progress_buffer", CoalescingBuffer(ProgressDelta.merge, progress_service._write_progress)
+    )
+    monkeypatch.setattr(
+        progress_service,
+        "enrollment_sync_buffer",
+        CoalescingBuffer(lambda current, _: current, progress_service._write_enrollment_sync),
+    )
+    flusher = PeriodicTask("progress-test", 0.01, progress_service.flush_progress_events)
+    monkeypatch.setattr(progress_service, "progress_flusher", flusher)
+
+    enrollment = enrollment_service.EnrollmentDocument(
+        id=PydanticObjectId(), user_id="u1", course_id="c1", status=EnrollmentStatus.active
+    )
+
+    async def get(enrollment_id):
+        return enrollment
+
+    monkeypatch.setattr(enrollment_service.EnrollmentDocument, "get", get)
+
+    flusher.start()
+    try:
+        response = await asyncio.wait_for(
+            enrollment_service.update_progress(str(enrollment.id), "u1", lesson_id="l1"), timeout=2
+        )
+    finally:
+        await flusher.stop()
+
+    assert response.progress == 50.0
+    assert synced == [[("u1", "c1")]]
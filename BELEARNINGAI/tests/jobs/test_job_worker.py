@@ -0,0 +1,135 @@
+"""Kiểm thử worker của hàng đợi job nền."""
+from types import SimpleNamespace
+
+import pytest
+
+from services import job_service
+
+
+def _fake_job(job_type: str, attempts: int = 1, max_attempts: int = 3, owner_id=None) -> SimpleNamespace:
+    return SimpleNamespace(
+        id="job-1",
+        job_type=job_type,
+        payload={"x": 2},
+        attempts=attempts,
+        max_attempts=max_attempts,
+        owner_id=owner_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_job_records_handler_result(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Handler chạy xong thì kết quả được ghi qua complete_job."""
+
+    completed = {}
+
+    async def fake_complete(job_id, worker_id, result):
+        completed.update(job_id=job_id, worker_id=worker_id, result=result)
+        return True
+
+    async def double(job):
+        return {"value": job.payload["x"] * 2}
+
+    monkeypatch.setitem(job_service._handlers, "test_double", double)
+    monkeypatch.setattr(job_service, "complete_job", fake_complete)
+
+    worker = job_service.JobWorker(worker_id="w-test", lease_seconds=30)
+    await worker.run_job(_fake_job("test_double"))
+    assert completed == {"job_id": "job-1", "worker_id": "w-test", "result": {"value": 4}}
+
+
+@pytest.mark.asyncio
+async def test_run_job_failure_goes_through_fail_job(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Handler lỗi thì job được trả lại hàng đợi kèm thông báo lỗi."""
+
+    failures = []
+
+    async def fake_fail(job, worker_id, error):
+        failures.append((job.id, worker_id, error))
+        return True
+
+    async def broken(_job):
+        raise RuntimeError("model timeout")
+
+    monkeypatch.setitem(job_service._handlers, "test_broken", broken)
+    monkeypatch.setattr(job_service, "fail_job", fake_fail)
+
+    worker = job_service.JobWorker(worker_id="w-test", lease_seconds=30)
+    await worker.run_job(_fake_job("test_broken"))
+    assert failures == [("job-1", "w-test", "model timeout")]
+
+
+@pytest.mark.asyncio
+async def test_finished_job_is_pushed_to_owner(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Job xong đẩy trạng thái tới người tạo; lần thử lỗi còn lượt thì không đẩy."""
+
+    pushed = []
+
+    async def fake_complete(job_id, worker_id, result):
+        return True
+
+    async def fake_fail(job, worker_id, error):
+        return True
+
+    async def fake_push(user_id, event_type, data):
+        pushed.append((user_id, event_type, data["status"]))
+
+    async def double(job):
+        return {"value": 4}
+
+    async def broken(_job):
+        raise RuntimeError("model timeout")
+
+    monkeypatch.setitem(job_service._handlers, "test_double", double)
+    monkeypatch.setitem(job_service._handlers, "test_broken", broken)
+    monkeypatch.setattr(job_service, "complete_job", fake_complete)
+    monkeypatch.setattr(job_service, "fail_job", fake_fail)
+    monkeypatch.setattr(job_service, "push_to_user", fake_push)
+
+    worker = job_service.JobWorker(worker_id="w-test", lease_seconds=30)
+    await worker.run_job(_fake_job("test_double", owner_id="u1"))
+    await worker.run_job(_fake_job("test_broken", attempts=1, owner_id="u1"))
+    await worker.run_job(_fake_job("test_broken", attempts=3, owner_id="u1"))
+    assert pushed == [("u1", "job", "succeeded"), ("u1", "job", "failed")]
+
+
+@pytest.mark.asyncio
+async def test_course_generation_retry_reuses_course_of_job(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Job chạy lại trả về khóa học đã tạo theo ``source_job_id`` thay vì tạo bản mới."""
+
+    from datetime import datetime
+
+    from services import ai_service, course_service
+
+    queries = []
+    existing = SimpleNamespace(
+        _id="course-1",
+        title="Python",
+        description="Mô tả",
+        level="beginner",
+        category="Khoa học",
+        estimated_duration_hours=4.0,
+        tags=[],
+        prerequisites=[],
+        modules=[],
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+
+    async def find_generated(source_job_id):
+        queries.append(source_job_id)
+        return existing
+
+    def fail_insert(self):
+        raise AssertionError("không được tạo khóa học trùng")
+
+    monkeypatch.setattr(course_service, "_find_generated_course", find_generated)
+    monkeypatch.setattr(course_service.CourseDocument, "insert", fail_insert)
+
+    job = SimpleNamespace(
+        id="job-7", owner_id="u1", payload={"request": {"topic": "Python"}, "persist_course": True}
+    )
+    result = await ai_service.run_course_generation_job(job)
+
+    assert result["course_id"] == "course-1"
+    assert queries == ["job-7"]
@@ -0,0 +1,141 @@
+"""Kiểm thử phân phối thông báo chung: fan-out theo khối và ghép lúc đọc."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import BulkWriteError
+
+from models.models import AnnouncementMode, AnnouncementStatus, UserRole
+from services import notification_service
+
+
+class _Cursor:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+
+    def __aiter__(self):
+        async def iterate():
+            for row in self.rows:
+                yield row
+
+        return iterate()
+
+
+def test_mode_switches_to_on_read_for_large_audiences(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(notification_service._settings, "announcement_fanout_max_recipients", 100)
+
+    assert notification_service.choose_mode(100) is AnnouncementMode.fan_out
+    assert notification_service.choose_mode(101) is AnnouncementMode.on_read
+    assert notification_service.choose_mode(10**6, "fan_out") is AnnouncementMode.fan_out
+    assert notification_service.parse_roles(["Student", "student", "admin"]) == [UserRole.student, UserRole.admin]
+    with pytest.raises(HTTPException) as error:
+        notification_service.parse_roles(["guest"])
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_fan_out_streams_ids_and_inserts_in_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    users = sorted(ObjectId() for _ in range(5))
+    finds, batches, updates, progress, counted, recounted, pipelines = [], [], [], [], [], [], []
+    announcement = SimpleNamespace(
+        id=ObjectId(),
+        title="Bảo trì",
+        message="Hệ thống bảo trì tối nay",
+        audience_roles=[UserRole.student],
+        created_at=datetime(2024, 5, 16),
+        last_user_id=str(users[0]),
+        delivered_count=1,
+        status=AnnouncementStatus.delivering,
+    )
+
+    def find(query, projection, sort, batch_size):
+        finds.append((query, projection, sort))
+        return _Cursor([{"_id": oid} for oid in users if oid > query["_id"]["$gt"]])
+
+    async def insert_many(documents, ordered):
+        assert ordered is False
+        batches.append([document["target_user_id"] for document in documents])
+        if len(batches) == 1:
+            # Lần chạy trước đã ghi người nhận đầu khối trước khi worker chết.
+            raise BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate key"}]})
+
+    async def update_one(query, update):
+        updates.append(update)
+
+    async def bulk_write(operations, ordered):
+        for operation in operations:
+            if "$inc" in operation._doc:
+                counted.append(operation._filter["user_id"])
+            else:
+                recounted.append((operation._filter["user_id"], operation._doc["$set"]["unread"]))
+
+    def aggregate(pipeline):
+        pipelines.append(pipeline)
+
+        async def to_list():
+            return [{"_id": str(users[1]), "unread": 4}]
+
+        return SimpleNamespace(to_list=to_list)
+
+    async def on_progress(delivered: int) -> None:
+        progress.append(delivered)
+
+    monkeypatch.setattr(notification_service._settings, "announcement_fanout_batch_size", 2)
+    monkeypatch.setattr(
+        notification_service.UserDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find=find)),
+    )
+    monkeypatch.setattr(
+        notification_service.NotificationDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(insert_many=insert_many)),
+    )
+    monkeypatch.setattr(notification_service.NotificationDocument, "aggregate", aggregate)
+    monkeypatch.setattr(
+        notification_service.NotificationCounterDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(bulk_write=bulk_write)),
+    )
+    monkeypatch.setattr(
+        notification_service.AnnouncementDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(update_one=update_one)),
+    )
+
+    delivered = await notification_service.fan_out_announcement(announcement, on_progress)
+
+    query, projection, sort = finds[0]
+    assert query["role"] == {"$in": ["student"]} and projection == {"_id": 1} and sort == [("_id", 1)]
+    assert batches == [[str(users[1]), str(users[2])], [str(users[3]), str(users[4])]]
+    assert [update["$inc"]["delivered_count"] for update in updates[:2]] == [1, 2]
+    assert counted == [str(oid) for oid in users[2:]]
+    # Người nhận đã có bản ghi từ lần chạy trước được đếm lại thay vì bị bỏ qua bộ đếm.
+    assert recounted == [(str(users[1]), 4)]
+    assert pipelines[0][0] == {"$match": {"target_user_id": {"$in": [str(users[1])]}, "is_read": False}}
+    assert progress == [2, 4] and delivered == 4
+    assert announcement.last_user_id == str(users[4])
+    assert updates[-1]["$set"]["status"] == "delivered"
+
+
+def test_merge_inbox_interleaves_broadcasts_with_read_state() -> None:
+    now = datetime.utcnow()
+    personal = [
+        {"_id": ObjectId(), "title": "Bài mới", "message": "m", "is_read": False, "created_at": now},
+        {"_id": ObjectId(), "title": "Điểm quiz", "message": "m", "is_read": True, "created_at": now - timedelta(days=2)},
+    ]
+    broadcasts = [
+        {"_id": ObjectId(), "title": "Bảo trì", "message": "m", "created_at": now - timedelta(days=1)},
+        {"_id": ObjectId(), "title": "Chào mừng", "message": "m", "created_at": now - timedelta(days=3)},
+    ]
+    counter = {"unread": 1, "read_broadcast_ids": [str(broadcasts[0]["_id"])]}
+
+    inbox, has_more = notification_service.merge_inbox(personal, broadcasts, counter, limit=3)
+
+    assert [item.title for item in inbox] == ["Bài mới", "Bảo trì", "Điểm quiz"]
+    assert [item.is_read for item in inbox] == [False, True, True]
+    assert has_more
+    assert not notification_service.broadcast_is_read(broadcasts[1], counter)
+    assert notification_service.broadcast_is_read(broadcasts[1], {**counter, "broadcasts_read_before": now})
@@ -0,0 +1,217 @@
+"""Kiểm thử bản tin email: pool SMTP (với máy chủ SMTP giả lập cục bộ) và lượt gom/gửi."""
+import smtplib
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from services import digest_service
+from utils.mailer import SmtpPool, is_transient
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """Máy chủ SMTP tối giản: 451 cho lần RCPT đầu của flaky@, 550 cho bad@."""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        state = self.server.state
+        with state["lock"]:
+            state["connections"] += 1
+        self._reply("220 localhost ESMTP")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line.upper()
+            if not line or command == "QUIT":
+                self._reply("221 bye")
+                return
+            if command.startswith(("EHLO", "HELO")):
+                self._reply("250 localhost")
+            elif command.startswith("RCPT"):
+                if "BAD@" in command:
+                    self._reply("550 no such user")
+                elif "FLAKY@" in command and not state["flaked"]:
+                    state["flaked"] = True
+                    self._reply("451 try again later")
+                else:
+                    self._reply("250 ok")
+            elif command == "DATA":
+                self._reply("354 end with .")
+                while self.rfile.readline().rstrip(b"\r\n") != b".":
+                    pass
+                with state["lock"]:
+                    state["delivered"] += 1
+                self._reply("250 queued")
+            else:
+                self._reply("250 ok")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpHandler)
+    server.daemon_threads = True
+    server.state = {"lock": threading.Lock(), "connections": 0, "delivered": 0, "flaked": False}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _message(to: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "no-reply@example.com"
+    message["To"] = to
+    message["Subject"] = "Bản tin"
+    message.set_content("Xin chào")
+    return message
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_connections_and_retries_transient_errors(smtp_server) -> None:
+    host, port = smtp_server.server_address
+    pool = SmtpPool(host, port, pool_size=2, rate_per_second=1000, timeout=5, retries=1, backoff_seconds=0)
+
+    for index in range(5):
+        await pool.send(_message(f"user{index}@example.com"))
+    await pool.send(_message("flaky@example.com"))
+    with pytest.raises(smtplib.SMTPRecipientsRefused) as error:
+        await pool.send(_message("bad@example.com"))
+    await pool.close()
+
+    assert smtp_server.state["delivered"] == 6
+    assert smtp_server.state["connections"] <= 3
+    assert not is_transient(error.value)
+
+
+def test_plan_digest_applies_preferences(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(digest_service._settings, "digest_max_items", 2)
+    now = datetime.utcnow()
+    items = [
+        {"id": ObjectId(), "title": f"t{index}", "message": "m", "category": category, "created_at": now}
+        for index, category in enumerate(["system", "study_reminder", "announcement", "system"])
+    ]
+    group = {"_id": "u1", "ids": [item["id"] for item in items], "items": items}
+    user = {"email": "an@example.com", "preferences": {"notifications": {"email": True, "study_reminders": False}}}
+
+    digest, skipped = digest_service.plan_digest(group, user)
+
+    assert skipped == [items[1]["id"]]
+    assert [item["title"] for item in digest.items] == ["t3", "t2"] and digest.hidden_count == 1
+    assert len(digest.notification_ids) == 3
+    assert "1 thông báo khác" in digest_service.render_digest(digest).get_body(("plain",)).get_content()
+
+    opted_out = {"email": "an@example.com", "preferences": {"notifications": {"email": False}}}
+    assert digest_service.plan_digest(group, opted_out) == (None, group["ids"])
+
+
+@pytest.mark.asyncio
+async def test_dispatch_retries_transient_and_dead_letters_permanent(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = datetime(2024, 5, 16, 12, 0)
+    users = {name: ObjectId() for name in ("ok", "flaky", "bad")}
+    notes = {name: ObjectId() for name in users}
+    candidates = [{"_id": str(oid), "oldest": now - timedelta(hours=2)} for oid in users.values()]
+    pending = [
+        {
+            "_id": notes[name],
+            "target_user_id": str(users[name]),
+            "title": "Bài mới",
+            "message": "m",
+            "category": "system",
+            "created_at": now - timedelta(hours=2),
+        }
+        for name in users
+    ]
+    writes = {"update_many": [], "dead": [], "counters": [], "item_queries": []}
+
+    def aggregate(pipeline):
+        window_start = now - timedelta(minutes=digest_service._settings.digest_window_minutes)
+        assert pipeline[0] == {"$match": {"email_pending": True, "created_at": {"$lte": window_start}}}
+        assert pipeline[1] == {"$group": {"_id": "$target_user_id", "oldest": {"$min": "$created_at"}}}
+
+        async def to_list():
+            return candidates
+
+        return SimpleNamespace(to_list=to_list)
+
+    class _Cursor:
+        def sort(self, keys):
+            self._rows = iter(pending)
+            return self
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            try:
+                return next(self._rows)
+            except StopIteration:
+                raise StopAsyncIteration
+
+    def find_notifications(query, projection):
+        writes["item_queries"].append(query)
+        return _Cursor()
+
+    async def claim(user_ids, at):
+        return {user_id: (3 if user_id == str(users["bad"]) else 0) for user_id in user_ids}
+
+    def find_users(query, projection):
+        async def to_list(length):
+            return [{"_id": oid, "email": f"{name}@example.com"} for name, oid in users.items()]
+
+        return SimpleNamespace(to_list=to_list)
+
+    class _Mailer:
+        async def send(self, message):
+            if message["To"].startswith("flaky"):
+                raise smtplib.SMTPServerDisconnected("connection lost")
+            if message["To"].startswith("bad"):
+                raise smtplib.SMTPRecipientsRefused({message["To"]: (550, b"no such user")})
+
+    async def update_many(query, update):
+        writes["update_many"].append((query["_id"]["$in"], update["$set"]))
+
+    async def insert_many(documents):
+        writes["dead"].extend(documents)
+
+    async def bulk_write(operations, ordered):
+        writes["counters"].extend((op._filter["user_id"], op._doc["$set"]) for op in operations)
+
+    monkeypatch.setattr(digest_service.NotificationDocument, "aggregate", aggregate)
+    monkeypatch.setattr(digest_service, "claim_recipients", claim)
+    monkeypatch.setattr(
+        digest_service.UserDocument, "get_pymongo_collection", classmethod(lambda cls: SimpleNamespace(find=find_users))
+    )
+    monkeypatch.setattr(
+        digest_service.NotificationDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(update_many=update_many, find=find_notifications)),
+    )
+    monkeypatch.setattr(
+        digest_service.EmailDeadLetterDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(insert_many=insert_many)),
+    )
+    monkeypatch.setattr(
+        digest_service.NotificationCounterDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(bulk_write=bulk_write)),
+    )
+
+    stats = await digest_service.dispatch_digests(now, mailer=_Mailer())
+
+    assert stats == {"sent": 1, "skipped": 0, "retrying": 1, "dead_lettered": 1}
+    assert writes["item_queries"] == [
+        {"target_user_id": {"$in": [str(oid) for oid in users.values()]}, "email_pending": True, "created_at": {"$lte": now}}
+    ]
+    assert writes["update_many"][0] == ([notes["ok"]], {"email_pending": False, "emailed_at": now})
+    assert writes["update_many"][1] == ([notes["bad"]], {"email_pending": False})
+    assert [(letter["recipient"], letter["attempts"]) for letter in writes["dead"]] == [("bad@example.com", 4)]
+    counters = dict(writes["counters"])
+    assert counters[str(users["ok"])]["last_digest_at"] == now
+    assert counters[str(users["flaky"])]["digest_lease_until"] == now + timedelta(minutes=2)
@@ -0,0 +1,191 @@
+"""Kiểm thử hộp thư: bộ đếm chưa đọc và phân trang keyset."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from services import notification_service
+from utils.pagination import decode_cursor
+
+
+class _Counters:
+    def __init__(self, unread: int) -> None:
+        self.doc = {"user_id": "u1", "unread": unread}
+        self.updates = []
+
+    async def find_one(self, query):
+        return dict(self.doc)
+
+    async def update_one(self, query, update, upsert=False):
+        self.updates.append(update)
+        self.doc["unread"] += update.get("$inc", {}).get("unread", 0)
+
+    async def find_one_and_update(self, query, update, upsert, return_document):
+        self.updates.append(update)
+        self.doc["unread"] += update["$inc"]["unread"]
+        self.doc.update(update["$set"])
+        return dict(self.doc)
+
+
+class _Announcements:
+    def __init__(self, rows: list, unread: int = 0) -> None:
+        self.rows = rows
+        self.unread = unread
+        self.finds = []
+        self.counts = []
+
+    def find(self, query, projection, sort, limit):
+        self.finds.append(query)
+
+        async def to_list(length):
+            return self.rows[:length]
+
+        return SimpleNamespace(to_list=to_list)
+
+    async def count_documents(self, query):
+        self.counts.append(query)
+        return self.unread
+
+
+def _patch_announcements(monkeypatch: pytest.MonkeyPatch, announcements: _Announcements) -> None:
+    monkeypatch.setattr(
+        notification_service.AnnouncementDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: announcements),
+    )
+
+
+@pytest.fixture
+def no_broadcasts(monkeypatch: pytest.MonkeyPatch) -> None:
+    _patch_announcements(monkeypatch, _Announcements([]))
+
+
+@pytest.mark.asyncio
+async def test_mark_read_decrements_counter_once(monkeypatch: pytest.MonkeyPatch, no_broadcasts) -> None:
+    notification_id = ObjectId()
+    stored = {"_id": notification_id, "title": "t", "message": "m", "is_read": False, "created_at": datetime.utcnow()}
+    counters = _Counters(unread=3)
+
+    async def find_one_and_update(query, update, return_document):
+        if stored["is_read"] != query["is_read"]:
+            return None
+        stored.update(update["$set"])
+        return dict(stored)
+
+    async def find_one(query):
+        return dict(stored)
+
+    async def update_many(query, update):
+        return SimpleNamespace(modified_count=2)
+
+    monkeypatch.setattr(
+        notification_service.NotificationDocument,
+        "get_pymongo_collection",
+        classmethod(
+            lambda cls: SimpleNamespace(
+                find_one_and_update=find_one_and_update, find_one=find_one, update_many=update_many
+            )
+        ),
+    )
+    monkeypatch.setattr(
+        notification_service.NotificationCounterDocument, "get_pymongo_collection", classmethod(lambda cls: counters)
+    )
+    user = {"sub": "u1", "role": "student"}
+
+    first = await notification_service.mark_as_read(str(notification_id), user)
+    second = await notification_service.mark_as_read(str(notification_id), user)
+
+    assert first.is_read and second.is_read
+    assert await notification_service.unread_count(user) == 2
+    result = await notification_service.mark_all_as_read(user)
+    assert (result.marked, result.unread_count) == (2, 0)
+
+
+@pytest.mark.asyncio
+async def test_inbox_pages_by_created_at_keyset(monkeypatch: pytest.MonkeyPatch, no_broadcasts) -> None:
+    now = datetime(2024, 5, 16, 9, 0)
+    rows = [
+        {
+            "_id": ObjectId(),
+            "title": f"n{index}",
+            "message": "m",
+            "is_read": False,
+            "created_at": now - timedelta(hours=index),
+        }
+        for index in range(3)
+    ]
+    queries = []
+
+    def find(query, sort, limit):
+        queries.append((query, sort, limit))
+
+        async def to_list(length):
+            return rows[:length]
+
+        return SimpleNamespace(to_list=to_list)
+
+    monkeypatch.setattr(
+        notification_service.NotificationDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find=find)),
+    )
+    monkeypatch.setattr(
+        notification_service.NotificationCounterDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: _Counters(unread=3)),
+    )
+    user = {"sub": "u1", "role": "student"}
+
+    page = await notification_service.list_notifications(user, limit=2)
+    assert [item.title for item in page.items] == ["n0", "n1"] and page.unread_count == 3
+    assert queries[0] == ({"target_user_id": "u1"}, [("created_at", -1), ("_id", -1)], 3)
+
+    await notification_service.list_notifications(user, limit=2, cursor=page.next_cursor)
+    assert decode_cursor(page.next_cursor, 2) == [rows[1]["created_at"], str(rows[1]["_id"])]
+    assert queries[1][0]["$or"][1] == {"created_at": rows[1]["created_at"], "_id": {"$lt": rows[1]["_id"]}}
+
+
+@pytest.mark.asyncio
+async def test_broadcasts_share_cursor_and_are_counted_by_query(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Thông báo chung cũ hơn trang đầu vẫn hiện ở trang sau và vẫn được tính vào badge."""
+
+    now = datetime(2024, 5, 16, 9, 0)
+    read_id = ObjectId()
+    rows = [
+        {"_id": ObjectId(), "title": f"b{index}", "message": "m", "created_at": now - timedelta(days=index)}
+        for index in range(2)
+    ]
+    announcements = _Announcements(rows, unread=7)
+    _patch_announcements(monkeypatch, announcements)
+
+    def find(query, sort, limit):
+        async def to_list(length):
+            return []
+
+        return SimpleNamespace(to_list=to_list)
+
+    monkeypatch.setattr(
+        notification_service.NotificationDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find=find)),
+    )
+    counters = _Counters(unread=1)
+    counters.doc.update(broadcasts_read_before=now - timedelta(days=30), read_broadcast_ids=[str(read_id), "bad"])
+    monkeypatch.setattr(
+        notification_service.NotificationCounterDocument, "get_pymongo_collection", classmethod(lambda cls: counters)
+    )
+    user = {"sub": "u1", "role": "student"}
+    cursor_id = ObjectId()
+    cursor = notification_service.encode_cursor(now, str(cursor_id))
+
+    page = await notification_service.list_notifications(user, limit=1, cursor=cursor)
+
+    assert [item.title for item in page.items] == ["b0"] and page.next_cursor is not None
+    assert page.unread_count == 8
+    listed = announcements.finds[0]
+    assert listed["mode"] == "on_read" and listed["audience_roles"] == "student"
+    assert listed["$or"][1] == {"created_at": now, "_id": {"$lt": cursor_id}}
+    counted = announcements.counts[0]
+    assert counted["created_at"] == {"$gt": now - timedelta(days=30)}
+    assert counted["_id"] == {"$nin": [read_id]}
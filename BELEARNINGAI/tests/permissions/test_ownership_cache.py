@@ -0,0 +1,84 @@
+"""Kiểm thử cache chủ sở hữu lớp/khóa học."""
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from services import ownership_service
+from services.ownership_service import OwnershipCache
+
+
+def _fake_collection(monkeypatch: pytest.MonkeyPatch, rows: list, calls: list) -> None:
+    async def find_one(query, projection):
+        calls.append((query, projection))
+        return next((row for row in rows if row["_id"] == query["_id"]), None)
+
+    monkeypatch.setattr(
+        ownership_service.ClassDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find_one=find_one)),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    ownership_service.ownership_cache.clear()
+    yield
+    ownership_service.ownership_cache.clear()
+
+
+def test_negative_entries_expire_sooner(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(ownership_service.time, "monotonic", lambda: now[0])
+    cache = OwnershipCache(ttl_seconds=60, negative_ttl_seconds=5, max_entries=2)
+    cache.put("class", "a", "teacher-1")
+    cache.put("class", "missing", None)
+
+    assert cache.lookup("class", "missing") == (True, None)
+    now[0] += 10
+    assert cache.lookup("class", "missing") == (False, None)
+    assert cache.lookup("class", "a") == (True, "teacher-1")
+    cache.put("class", "b", "teacher-2")
+    cache.put("class", "c", "teacher-3")
+    assert len(cache) == 2 and cache.lookup("class", "a") == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_owner_lookup_reads_only_owner_field_and_caches_absent_ids(monkeypatch: pytest.MonkeyPatch) -> None:
+    owned, absent = ObjectId(), ObjectId()
+    calls: list = []
+    _fake_collection(monkeypatch, [{"_id": owned, "instructor_id": "teacher-1"}], calls)
+
+    assert await ownership_service.owner_of("class", str(owned)) == "teacher-1"
+    assert await ownership_service.owner_of("class", str(absent)) is None
+    assert await ownership_service.owner_of("class", "not-an-id") is None
+    assert calls == [({"_id": owned}, {"instructor_id": 1}), ({"_id": absent}, {"instructor_id": 1})]
+
+    assert await ownership_service.owner_of("class", str(owned)) == "teacher-1"
+    assert await ownership_service.owner_of("class", str(absent)) is None
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_authorize_uses_cache_until_entry_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(ownership_service.time, "monotonic", lambda: now[0])
+    class_id = str(ObjectId())
+    calls: list = []
+    rows = [{"_id": ObjectId(class_id), "instructor_id": "teacher-2"}]
+    _fake_collection(monkeypatch, rows, calls)
+    ownership_service.prime_owners("class", {class_id: "teacher-1"})
+    teacher = {"sub": "teacher-1", "role": "instructor"}
+
+    await ownership_service.authorize_owned(teacher, "classes", "manage", "class", class_id, "missing")
+    assert calls == []
+
+    now[0] += ownership_service.ownership_cache.ttl_seconds
+    with pytest.raises(HTTPException) as forbidden:
+        await ownership_service.authorize_owned(teacher, "classes", "manage", "class", class_id, "missing")
+    assert forbidden.value.status_code == 403 and len(calls) == 1
+
+    with pytest.raises(HTTPException) as missing:
+        await ownership_service.authorize_owned(teacher, "classes", "manage", "class", str(ObjectId()), "missing")
+    assert missing.value.status_code == 404
@@ -0,0 +1,69 @@
+"""Kiểm thử bảng quyền bitset và dependency ``require_permission``."""
+import pytest
+from fastapi import HTTPException
+
+from middleware.rbac import require_permission
+from modules.permission_module import ALL, OWN, compile_permissions
+from services import permissions_service
+
+
+def test_compile_assigns_one_bit_per_permission_and_scopes() -> None:
+    table = compile_permissions(
+        {"student": {"courses": {"read": ALL}}, "instructor": {"courses": {"read": ALL, "update": OWN}}},
+        superusers=("admin",),
+    )
+    read, update = table.bit("courses", "read"), table.bit("courses", "update")
+
+    assert read != update and bin(read | update).count("1") == 2
+    assert table.scope("student", update) is None
+    assert table.scope("instructor", update) == OWN
+    assert table.scope("admin", update) == ALL
+    assert not table.allows("instructor", update)
+    assert table.allows("instructor", update, is_owner=True)
+    assert not table.allows(None, read)
+    with pytest.raises(TypeError):
+        table.global_masks["student"] = 0
+    with pytest.raises(KeyError):
+        table.bit("courses", "delete")
+    with pytest.raises(ValueError):
+        compile_permissions({"student": {"courses": {"read": "sometimes"}}})
+
+
+def test_ensure_permission_checks_ownership() -> None:
+    instructor = {"sub": "teacher-1", "role": "instructor"}
+
+    permissions_service.ensure_permission(instructor, "classes", "manage", owner_id="teacher-1")
+    permissions_service.ensure_permission({"sub": "root", "role": "admin"}, "classes", "manage", owner_id="teacher-1")
+    with pytest.raises(HTTPException) as exc:
+        permissions_service.ensure_permission(instructor, "classes", "manage", owner_id="teacher-2")
+    assert exc.value.status_code == 403
+    with pytest.raises(HTTPException):
+        permissions_service.ensure_permission({"sub": "s", "role": "student"}, "classes", "manage", owner_id="s")
+
+
+@pytest.mark.asyncio
+async def test_require_permission_allows_owned_scope_and_rejects_others() -> None:
+    checker = require_permission("classes", "manage")
+    instructor = {"sub": "teacher-1", "role": "instructor"}
+
+    assert await checker(instructor) is instructor
+    with pytest.raises(HTTPException) as exc:
+        await checker({"sub": "s", "role": "student"})
+    assert exc.value.status_code == 403
+    with pytest.raises(KeyError):
+        require_permission("classes", "unknown")
+
+
+@pytest.mark.asyncio
+async def test_permissions_me_is_served_from_compiled_matrix() -> None:
+    first = await permissions_service.get_user_permissions({"sub": "t", "role": "instructor"})
+    second = await permissions_service.get_user_permissions({"sub": "u", "role": "instructor"})
+    admin = await permissions_service.get_user_permissions({"sub": "a", "role": "admin"})
+
+    assert first is second
+    classes = next(item for item in first.permissions if item.resource == "classes")
+    assert classes.owned_actions == ["manage"] and "manage" in classes.actions
+    admin_actions = {(item.resource, action) for item in admin.permissions for action in item.actions}
+    assert ("classes", "manage") in admin_actions and ("system", "publish_announcement") in admin_actions
+    assert all(not item.owned_actions for item in admin.permissions)
+    assert [matrix.role for matrix in await permissions_service.list_roles_matrix()] == ["student", "instructor", "admin"]
@@ -0,0 +1,225 @@
+"""Kiểm thử bộ đệm gộp ghi sự kiện tiến độ."""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from services import progress_service
+from services.progress_service import ProgressDelta, build_progress_operations
+from utils.write_buffer import CoalescingBuffer
+
+
+def _study(event_id: str, minutes: int) -> tuple:
+    return ((event_id, minutes),)
+
+
+def _buffer(writer, max_attempts: int = 3) -> CoalescingBuffer:
+    return CoalescingBuffer(merge=ProgressDelta.merge, writer=writer, max_attempts=max_attempts)
+
+
+@pytest.mark.asyncio
+async def test_events_for_same_pair_are_written_once() -> None:
+    batches = []
+
+    async def writer(batch):
+        batches.append(batch)
+
+    buffer = _buffer(writer)
+    futures = [
+        buffer.add(("u1", "c1"), ProgressDelta(lessons=frozenset({"l1"}), study=_study("e1", 5))),
+        buffer.add(("u1", "c1"), ProgressDelta(lessons=frozenset({"l2"}), study=_study("e2", 10))),
+        buffer.add(("u2", "c1"), ProgressDelta(study=_study("e3", 3))),
+    ]
+    assert not any(future.done() for future in futures)
+
+    assert await buffer.flush() == 2
+    await asyncio.gather(*futures)
+    assert batches[0][("u1", "c1")].lessons == {"l1", "l2"}
+    assert batches[0][("u1", "c1")].minutes == 15
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried_then_reported() -> None:
+    calls = []
+
+    async def writer(batch):
+        calls.append(batch)
+        if len(calls) < 2:
+            raise RuntimeError("mongo down")
+
+    buffer = _buffer(writer)
+    future = buffer.add(("u1", "c1"), ProgressDelta(study=_study("e1", 5)))
+    buffer.add(("u1", "c1"), ProgressDelta(study=_study("e2", 1)))
+    await buffer.flush()
+    assert not future.done() and len(buffer) == 1
+
+    await buffer.flush()
+    await future
+    assert calls[-1][("u1", "c1")].minutes == 6
+
+    async def failing(batch):
+        raise RuntimeError("mongo down")
+
+    buffer = _buffer(failing, max_attempts=1)
+    future = buffer.add(("u1", "c1"), ProgressDelta(study=_study("e1", 5)))
+    await buffer.flush()
+    with pytest.raises(RuntimeError):
+        await future
+
+
+def test_operations_union_lessons_and_skip_applied_events() -> None:
+    operations = build_progress_operations(
+        {
+            ("u1", "c1"): ProgressDelta(
+                lessons=frozenset({"l2", "l1"}), study=_study("e1", 7), activities=frozenset({"video"})
+            )
+        },
+        totals={"c1": 8},
+    )
+
+    operation = operations[0]
+    assert operation._filter == {"user_id": "u1", "course_id": "c1"}
+    assert operation._upsert is True
+    fresh, new_minutes, main, count, percent, cleanup = operation._doc
+    events = fresh["$set"]["_new_events"]["$filter"]
+    assert events["input"] == {"$literal": [{"id": "e1", "minutes": 7}]}
+    assert events["cond"] == {"$not": [{"$in": ["$$this.id", {"$ifNull": ["$applied_events", []]}]}]}
+    assert new_minutes == {"$set": {"_new_minutes": {"$sum": "$_new_events.minutes"}}}
+    assert main["$set"]["completed_lessons"]["$setUnion"][1] == {"$literal": ["l1", "l2"]}
+    assert main["$set"]["total_minutes"] == {"$add": [{"$ifNull": ["$total_minutes", 0]}, "$_new_minutes"]}
+    assert main["$set"]["applied_events"]["$slice"][1] == -progress_service.APPLIED_EVENTS
+    assert count == {"$set": {"completed_count": {"$size": "$completed_lessons"}}}
+    assert "$divide" in str(percent) and "8" in str(percent)
+    assert cleanup == {"$unset": ["_new_events", "_new_minutes"]}
+
+
+@pytest.mark.asyncio
+async def test_enrollment_sync_failure_does_not_rewrite_progress(monkeypatch: pytest.MonkeyPatch) -> None:
+    progress_writes = []
+    sync_calls = []
+
+    async def get_many(course_ids):
+        return {course_id: SimpleNamespace(total=4) for course_id in course_ids}
+
+    async def bulk_write(operations, ordered):
+        progress_writes.append(len(operations))
+
+    async def sync(keys):
+        sync_calls.append(keys)
+        if len(sync_calls) == 1:
+            raise RuntimeError("mongo down")
+
+    progress = CoalescingBuffer(merge=ProgressDelta.merge, writer=progress_service._write_progress)
+    enrollments = CoalescingBuffer(merge=lambda current, _: current, writer=progress_service._write_enrollment_sync)
+    monkeypatch.setattr(progress_service, "progress_buffer", progress)
+    monkeypatch.setattr(progress_service, "enrollment_sync_buffer", enrollments)
+    monkeypatch.setattr(progress_service.lesson_index_cache, "get_many", get_many)
+    monkeypatch.setattr(progress_service, "_sync_enrollments", sync)
+    monkeypatch.setattr(
+        progress_service.ProgressDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(bulk_write=bulk_write)),
+    )
+
+    future = progress.add(("u1", "c1"), ProgressDelta(study=_study("e1", 5)))
+    assert await progress_service.flush_progress_events() == 1
+    await future
+    assert len(enrollments) == 1
+
+    await progress_service.flush_progress_events()
+    assert progress_writes == [1]
+    assert sync_calls == [[("u1", "c1")], [("u1", "c1")]] and len(enrollments) == 0
+
+
+@pytest.mark.asyncio
+async def test_sync_copies_roster_sort_fields_to_memberships(monkeypatch: pytest.MonkeyPatch) -> None:
+    moment = datetime(2024, 5, 2)
+    writes = {}
+
+    class _Cursor:
+        def __init__(self, rows):
+            self._rows = iter(rows)
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            try:
+                return next(self._rows)
+            except StopIteration:
+                raise StopAsyncIteration
+
+    def find(query, projection):
+        assert projection["last_activity"] == 1
+        return _Cursor([{"user_id": "u1", "course_id": "c1", "progress": 100.0, "last_activity": moment}])
+
+    def _collection(name):
+        async def bulk_write(operations, ordered):
+            writes[name] = operations
+
+        return classmethod(lambda cls: SimpleNamespace(bulk_write=bulk_write, find=find))
+
+    monkeypatch.setattr(progress_service.ProgressDocument, "get_pymongo_collection", _collection("progress"))
+    monkeypatch.setattr(progress_service.EnrollmentDocument, "get_pymongo_collection", _collection("enrollments"))
+    monkeypatch.setattr(progress_service.ClassMembershipDocument, "get_pymongo_collection", _collection("memberships"))
+
+    await progress_service._sync_enrollments([("u1", "c1")])
+
+    membership = writes["memberships"][0]
+    assert membership._filter == {"user_id": "u1", "course_id": "c1"}
+    assert membership._doc == {
+        "$set": {"progress_percent": 100.0, "last_active": moment, "last_active_key": moment}
+    }
+    assert writes["enrollments"][0]._doc["$set"] == {"status": "completed"}
+
+
+@pytest.mark.asyncio
+async def test_same_lesson_twice_counts_one_completion(monkeypatch: pytest.MonkeyPatch) -> None:
+    completed: set = set()
+    metrics = []
+
+    async def find_one_and_update(query, pipeline, projection, upsert, return_document):
+        before = {"completed_lessons": sorted(completed)}
+        completed.update(pipeline[2]["$set"]["completed_lessons"]["$setUnion"][1]["$literal"])
+        return before
+
+    async def get_index(course_id):
+        return SimpleNamespace(positions={"l1": 0, "l2": 1}, total=2)
+
+    async def get_many(course_ids):
+        return {course_id: SimpleNamespace(total=2) for course_id in course_ids}
+
+    async def no_classes(user_id, course_id):
+        return ()
+
+    async def sync(keys):
+        return None
+
+    monkeypatch.setattr(
+        progress_service.ProgressDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(find_one_and_update=find_one_and_update)),
+    )
+    monkeypatch.setattr(progress_service.lesson_index_cache, "get", get_index)
+    monkeypatch.setattr(progress_service.lesson_index_cache, "get_many", get_many)
+    monkeypatch.setattr(progress_service, "progress_buffer", _buffer(progress_service._write_progress))
+    monkeypatch.setattr(
+        progress_service,
+        "enrollment_sync_buffer",
+        CoalescingBuffer(merge=lambda current, _: current, writer=progress_service._write_enrollment_sync),
+    )
+    monkeypatch.setattr(progress_service, "_sync_enrollments", sync)
+    monkeypatch.setattr(progress_service, "member_class_ids", no_classes)
+    monkeypatch.setattr(progress_service, "progress_recorded", no_classes)
+    monkeypatch.setattr(progress_service, "record_activity", lambda user_id, course_id: None)
+    monkeypatch.setattr(
+        progress_service, "record_metrics", lambda user_id, counters, **kwargs: metrics.append(dict(counters))
+    )
+
+    await progress_service.record_progress_event("u1", "c1", lesson_id="l1")
+    await progress_service.record_progress_event("u1", "c1", lesson_id="l1", duration_minutes=5)
+
+    lessons = [counters["lessons_completed"] for counters in metrics if "lessons_completed" in counters]
+    assert lessons == [1]
+    assert {"study_minutes": 5} in metrics
@@ -0,0 +1,69 @@
+"""Kiểm thử quyền chấm quiz hàng loạt: chủ khóa học và người học đã đăng ký."""
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from modules.grading_module import compile_answer_key
+from schemas.quiz import QuizBatchSubmission
+from services import ownership_service, quiz_service
+
+
+@pytest.fixture
+def course_id(monkeypatch: pytest.MonkeyPatch) -> str:
+    course_id = str(ObjectId())
+    compiled = compile_answer_key([SimpleNamespace(options=["A", "B"], correct_answer=0, topic="t")])
+    inserted = []
+
+    async def answer_key(quiz_id):
+        return course_id, compiled
+
+    async def distinct(field, query):
+        assert query["course_id"] == course_id
+        return [user_id for user_id in query["user_id"]["$in"] if user_id != "outsider"]
+
+    async def insert_many(documents):
+        inserted.extend(documents)
+
+    async def no_classes(user_id, course):
+        return ()
+
+    monkeypatch.setattr(quiz_service, "_get_answer_key", answer_key)
+    monkeypatch.setattr(
+        quiz_service.EnrollmentDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(distinct=distinct)),
+    )
+    monkeypatch.setattr(
+        quiz_service.QuizAttemptDocument, "get_pymongo_collection", classmethod(lambda cls: SimpleNamespace())
+    )
+    monkeypatch.setattr(quiz_service.QuizAttemptDocument, "insert_many", insert_many)
+    monkeypatch.setattr(quiz_service, "member_class_ids", no_classes)
+    monkeypatch.setattr(quiz_service, "record_activity", lambda user_id, course: None)
+    monkeypatch.setattr(quiz_service, "record_metrics", lambda *args, **kwargs: None)
+    ownership_service.ownership_cache.clear()
+    ownership_service.prime_owners("course", {course_id: "teacher-1"})
+    yield course_id
+    ownership_service.ownership_cache.clear()
+
+
+def _submissions(*user_ids: str) -> list:
+    return [QuizBatchSubmission(user_id=user_id, answers=[0]) for user_id in user_ids]
+
+
+@pytest.mark.asyncio
+async def test_only_course_owner_can_grade_enrolled_students(course_id: str) -> None:
+    owner = {"sub": "teacher-1", "role": "instructor"}
+    other = {"sub": "teacher-2", "role": "instructor"}
+
+    with pytest.raises(HTTPException) as forbidden:
+        await quiz_service.submit_quiz_batch("quiz-1", _submissions("s1"), other)
+    assert forbidden.value.status_code == 403
+
+    with pytest.raises(HTTPException) as outsider:
+        await quiz_service.submit_quiz_batch("quiz-1", _submissions("s1", "outsider"), owner)
+    assert outsider.value.status_code == 400 and "outsider" in outsider.value.detail
+
+    result = await quiz_service.submit_quiz_batch("quiz-1", _submissions("s1", "s2"), owner)
+    assert [item.user_id for item in result.results] == ["s1", "s2"]
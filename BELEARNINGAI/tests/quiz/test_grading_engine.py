@@ -0,0 +1,52 @@
+"""Kiểm thử engine chấm điểm vector hóa."""
+from types import SimpleNamespace
+
+import numpy as np
+
+from modules.grading_module import AnswerKeyCache, compile_answer_key, grade_batch, grade_submission
+
+
+def _questions() -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(options=["A", "B", "C", "D"], correct_answer=1, topic="arrays"),
+        SimpleNamespace(options=["đúng", "sai"], correct_answer="sai", topic="arrays"),
+        SimpleNamespace(options=["x", "y", "z"], correct_answer="C", topic="oop"),
+        SimpleNamespace(options=[], correct_answer=None, topic="essay"),
+    ]
+
+
+def test_grade_submission_accepts_index_and_text_answers() -> None:
+    """Câu tự luận không tính điểm, đáp án dạng chữ được quy về chỉ số."""
+
+    compiled = compile_answer_key(_questions())
+    result = grade_submission(compiled, [1, "sai", 0, "bài làm"])
+
+    assert compiled.max_score == 3
+    assert result.score == 2
+    assert result.percentage == 66.67
+    assert result.correct.tolist() == [True, True, False, False]
+    topics = dict(zip(compiled.topic_labels, zip(result.topic_correct, result.topic_total)))
+    assert topics["arrays"] == (2, 2)
+    assert topics["oop"] == (0, 1)
+
+
+def test_grade_batch_matches_single_grading() -> None:
+    """Chấm hàng loạt cho cùng kết quả với chấm từng bài."""
+
+    compiled = compile_answer_key(_questions())
+    submissions = [[1, 1, 2, None], [0, 0, 2, None], [1, "sai"]]
+    batch = grade_batch(compiled, submissions)
+
+    expected = [grade_submission(compiled, answers).score for answers in submissions]
+    assert batch.scores.tolist() == expected
+    assert np.allclose(batch.question_accuracy[:3], [2 / 3, 2 / 3, 2 / 3])
+
+
+def test_answer_key_cache_evicts_and_invalidates() -> None:
+    cache = AnswerKeyCache(maxsize=1)
+    cache.put("quiz-1", "key-1")
+    cache.put("quiz-2", "key-2")
+    assert cache.get("quiz-1") is None
+
+    cache.invalidate("quiz-2")
+    assert cache.get_or_compile("quiz-2", lambda: "fresh") == "fresh"
@@ -0,0 +1,73 @@
+"""Kiểm thử kênh realtime: bus pub/sub, registry kết nối và xác thực WebSocket."""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from routers.realtime_router import router
+from services import realtime_service
+from services.realtime_service import ConnectionRegistry
+from utils.pubsub import EventBus
+from utils.security import create_access_token
+
+
+class _Socket:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.sent = []
+        self.closed = None
+
+    async def send_json(self, message):
+        await asyncio.sleep(self.delay)
+        self.sent.append(message["type"])
+
+    async def close(self, code):
+        self.closed = code
+
+
+@pytest.mark.asyncio
+async def test_registry_routes_channels_and_drops_slow_sockets() -> None:
+    bus = EventBus()
+    registry = ConnectionRegistry(bus, max_per_user=2, send_timeout=0.05)
+    phone, laptop, slow = _Socket(), _Socket(), _Socket(delay=1)
+
+    registry.connect("u1", "student", phone)
+    registry.connect("u1", "student", laptop)
+    registry.connect("u2", "student", slow)
+    await bus.publish("user:u1", {"type": "notification"})
+    await bus.publish("role:student", {"type": "announcement"})
+
+    assert phone.sent == laptop.sent == ["notification", "announcement"]
+    assert slow.closed is not None and not registry.is_online("u2")
+
+    tablet = _Socket()
+    assert registry.connect("u1", "student", tablet) == [phone]
+    registry.disconnect(laptop)
+    registry.disconnect(tablet)
+    assert not bus.has_subscribers("user:u1") and not bus.has_subscribers("role:student")
+
+
+def test_websocket_requires_valid_token_and_heartbeats(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(realtime_service._settings, "realtime_heartbeat_seconds", 0.05)
+    monkeypatch.setattr(realtime_service, "record_activity", lambda user_id: None)
+    app = FastAPI()
+    app.include_router(router, prefix="/realtime")
+    client = TestClient(app)
+
+    with pytest.raises(WebSocketDisconnect) as error:
+        with client.websocket_connect("/realtime/ws?token=garbage") as websocket:
+            websocket.receive_json()
+    assert error.value.code == 1008
+
+    token = create_access_token({"sub": "u1", "role": "student"})
+    with client.websocket_connect(f"/realtime/ws?token={token}") as websocket:
+        assert websocket.receive_json() == {"type": "ready", "data": {"user_id": "u1"}}
+        websocket.send_text("ping")
+        assert websocket.receive_json() == {"type": "pong"}
+        assert websocket.receive_json() == {"type": "ping"}
+        with pytest.raises(WebSocketDisconnect) as error:
+            websocket.receive_json()
+        assert error.value.code == 1001
+    assert len(realtime_service.registry) == 0
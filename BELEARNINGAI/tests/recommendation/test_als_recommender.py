@@ -0,0 +1,47 @@
+"""Kiểm thử model gợi ý ALS."""
+import numpy as np
+
+from modules.recommender_module import RecommenderModel, build_interaction_matrix, save_model, train_als
+
+
+def _interactions() -> list[tuple[str, str, float]]:
+    """Hai nhóm học viên, mỗi nhóm chỉ học khóa của nhóm mình."""
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for user in range(400):
+        group = user % 2
+        for course in rng.choice(20, 5, replace=False):
+            rows.append((f"user-{user}", f"course-{group * 20 + course}", 1.0))
+    return rows
+
+
+def test_recommendations_follow_groups_and_mask_enrolled(tmp_path) -> None:
+    interactions = _interactions()
+    matrix, user_ids, course_ids = build_interaction_matrix(interactions)
+    user_factors, item_factors = train_als(matrix, factors=4, iterations=8)
+    popularity = np.asarray(matrix.sum(axis=0)).ravel()
+    save_model(tmp_path / "model", user_factors, item_factors, user_ids, course_ids, popularity)
+
+    model = RecommenderModel.load(tmp_path / "model")
+    assert isinstance(model.item_factors, np.memmap)
+
+    enrolled = {course for user, course, _ in interactions if user == "user-0"}
+    recommended = [course for course, _ in model.recommend("user-0", exclude=enrolled, k=5)]
+    assert len(recommended) == 5
+    assert not enrolled & set(recommended)
+    assert all(int(course.split("-")[1]) < 20 for course in recommended)
+
+
+def test_unknown_user_falls_back_to_popularity(tmp_path) -> None:
+    save_model(
+        tmp_path / "model",
+        np.zeros((1, 2), dtype=np.float32),
+        np.ones((3, 2), dtype=np.float32),
+        ["user-a"],
+        ["c1", "c2", "c3"],
+        np.array([5.0, 9.0, 1.0]),
+    )
+    model = RecommenderModel.load(tmp_path / "model")
+
+    assert [course for course, _ in model.recommend("new-user", exclude={"c2"}, k=2)] == ["c1", "c3"]
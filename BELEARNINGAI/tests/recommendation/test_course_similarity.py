@@ -0,0 +1,140 @@
+"""Kiểm thử chỉ mục khóa học tương tự."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from modules.similarity_module import CourseSimilarityIndex
+from services import course_similarity_service
+from services.course_similarity_service import _IndexHolder
+
+
+def _course(course_id: str, title: str, description: str, tags: list[str]) -> SimpleNamespace:
+    return SimpleNamespace(id=course_id, title=title, description=description, tags=tags, modules=[])
+
+
+def _catalog() -> list[SimpleNamespace]:
+    return [
+        _course("py-1", "Python cơ bản", "Biến, vòng lặp, hàm trong python", ["python", "programming"]),
+        _course("py-2", "Python nâng cao", "Decorator, generator, async trong python", ["python"]),
+        _course("ds-1", "Khoa học dữ liệu", "Pandas, numpy với python", ["python", "data"]),
+        _course("ux-1", "Thiết kế UX", "Nghiên cứu người dùng, wireframe", ["design"]),
+        _course("ux-2", "Thiết kế UI", "Màu sắc, typography, wireframe", ["design"]),
+    ]
+
+
+def test_build_ranks_courses_by_content() -> None:
+    index = CourseSimilarityIndex.build(_catalog(), top_k=2)
+
+    assert [course_id for course_id, _ in index.neighbours["ux-1"]] == ["ux-2"]
+    assert {course_id for course_id, _ in index.neighbours["py-1"]} == {"py-2", "ds-1"}
+    assert all(len(items) <= 2 for items in index.neighbours.values())
+
+
+def test_upsert_only_touches_affected_rows() -> None:
+    index = CourseSimilarityIndex.build(_catalog(), top_k=2)
+    before = {course_id: list(items) for course_id, items in index.neighbours.items()}
+
+    affected = index.upsert(_course("ux-3", "Thiết kế UX chuyên sâu", "Wireframe, prototype", ["design"]))
+
+    assert "ux-3" in affected
+    assert affected <= {"ux-1", "ux-2", "ux-3"}
+    assert "ux-3" in {course_id for course_id, _ in index.neighbours["ux-1"]}
+    for course_id in ("py-1", "py-2", "ds-1"):
+        assert index.neighbours[course_id] == before[course_id]
+
+
+def test_remove_refills_neighbour_lists() -> None:
+    index = CourseSimilarityIndex.build(_catalog(), top_k=2)
+
+    affected = index.remove("py-2")
+
+    assert "py-2" not in index.neighbours
+    assert "py-1" in affected
+    assert all("py-2" not in {course_id for course_id, _ in items} for items in index.neighbours.values())
+    assert index.positions == {course_id: row for row, course_id in enumerate(index.course_ids)}
+
+
+@pytest.mark.asyncio
+async def test_job_on_another_worker_sees_courses_indexed_elsewhere(monkeypatch: pytest.MonkeyPatch) -> None:
+    start = datetime(2024, 5, 1)
+    catalog = {}
+    for offset, course in enumerate(_catalog()):
+        course.id = str(ObjectId())
+        course.updated_at = start + timedelta(minutes=offset)
+        catalog[course.id] = course
+    rows = {}
+
+    def find(query=None):
+        since = (query or {}).get("updated_at", {}).get("$gte", datetime.min)
+
+        async def to_list():
+            return [course for course in catalog.values() if course.updated_at >= since]
+
+        return SimpleNamespace(to_list=to_list)
+
+    async def get(course_id):
+        return catalog.get(str(course_id))
+
+    async def count_documents(query):
+        return len(catalog)
+
+    async def distinct(field):
+        return [ObjectId(course_id) for course_id in catalog]
+
+    async def bulk_write(operations, ordered):
+        for operation in operations:
+            if hasattr(operation, "_doc"):
+                rows[operation._filter["course_id"]] = [item["course_id"] for item in operation._doc["$set"]["neighbours"]]
+            else:
+                rows.pop(operation._filter["course_id"], None)
+
+    courses = course_similarity_service.CourseDocument
+    monkeypatch.setattr(courses, "find_all", classmethod(lambda cls: find()))
+    monkeypatch.setattr(courses, "find", classmethod(lambda cls, query: find(query)))
+    monkeypatch.setattr(courses, "get", get)
+    monkeypatch.setattr(
+        courses,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(count_documents=count_documents, distinct=distinct)),
+    )
+    monkeypatch.setattr(
+        course_similarity_service.CourseSimilarityDocument,
+        "get_pymongo_collection",
+        classmethod(lambda cls: SimpleNamespace(bulk_write=bulk_write)),
+    )
+    monkeypatch.setattr(course_similarity_service._settings, "similarity_top_k", 2)
+    first, second = _IndexHolder(3600), _IndexHolder(3600)
+    await first.get()
+    await second.get()
+
+    async def run(holder, course_id):
+        monkeypatch.setattr(course_similarity_service, "_index_holder", holder)
+        job = SimpleNamespace(payload={"course_id": course_id})
+        await course_similarity_service.run_similarity_update_job(job)
+
+    created = _course(str(ObjectId()), "Thiết kế UX chuyên sâu", "Nghiên cứu người dùng, wireframe", ["design"])
+    created.updated_at = start + timedelta(hours=1)
+    catalog[created.id] = created
+    await run(first, created.id)
+
+    ux_1 = next(course for course in catalog.values() if course.title == "Thiết kế UX")
+    ux_1.description = "Nghiên cứu người dùng, wireframe, prototype"
+    ux_1.updated_at = start + timedelta(hours=2)
+    await run(second, ux_1.id)
+
+    assert created.id in rows[ux_1.id]
+    await first.catch_up()
+    # So sánh như tập hợp: các láng giềng cùng điểm có thể đứng theo thứ tự khác nhau.
+    assert {key: set(items) for key, items in second.index.neighbours.items()} == {
+        key: set(items) for key, items in first.index.neighbours.items()
+    }
+    for course_id in rows:
+        assert set(rows[course_id]) == {other for other, _ in first.index.neighbours[course_id]}
+
+    removed = next(course_id for course_id, course in catalog.items() if course.title == "Python nâng cao")
+    del catalog[removed]
+    await run(first, ux_1.id)
+    assert removed not in rows
+    assert all(removed not in neighbours for neighbours in rows.values())
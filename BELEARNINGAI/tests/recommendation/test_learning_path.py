@@ -0,0 +1,58 @@
+"""Kiểm thử đồ thị tiên quyết và bộ lập lộ trình học."""
+from types import SimpleNamespace
+
+from modules.learning_path_module import LearningGraph, PlanMemo, plan_path
+
+
+def _course(course_id: str, hours: float, tags: list[str], prerequisites: list[str] = ()) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=course_id,
+        title=course_id.upper(),
+        tags=tags,
+        modules=[],
+        estimated_duration_hours=hours,
+        prerequisites=list(prerequisites),
+    )
+
+
+def _graph(version: int = 1) -> LearningGraph:
+    return LearningGraph.build(
+        [
+            _course("basics", 2, ["biến", "vòng lặp"]),
+            _course("functions", 3, ["hàm"], ["basics"]),
+            _course("oop-full", 6, ["OOP"], ["functions"]),
+            _course("oop-fast", 2, ["OOP"], ["basics"]),
+            _course("web", 8, ["web"], ["oop-full"]),
+            _course("web-lite", 20, ["web"]),
+        ],
+        version=version,
+    )
+
+
+def test_path_respects_prerequisites_and_prefers_short_chain() -> None:
+    plan = plan_path(_graph(), ["Vòng lặp"], target="web")
+
+    assert plan.course_ids == ("basics", "functions", "oop-full", "web")
+    assert plan.total_minutes == (2 + 3 + 6 + 8) * 60
+    assert plan.uncovered_topics == ()
+
+
+def test_weaknesses_without_target_pick_cheapest_course() -> None:
+    plan = plan_path(_graph(), ["oop", "thuật toán"])
+
+    assert plan.course_ids == ("basics", "oop-fast")
+    assert plan.uncovered_topics == ("thuật toán",)
+
+
+def test_memo_reuses_plan_until_graph_version_changes() -> None:
+    memo = PlanMemo(max_entries=2)
+    graph = _graph(version=1)
+
+    first = memo.plan(graph, ["OOP", "hàm"])
+    assert memo.plan(graph, ["hàm", "oop"]) is first
+    assert len(memo) == 1
+
+    memo.plan(_graph(version=2), ["OOP", "hàm"])
+    assert len(memo) == 2
+    memo.plan(graph, ["web"])
+    assert len(memo) == 2
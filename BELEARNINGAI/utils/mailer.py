@@ -0,0 +1,123 @@
+"""Client SMTP dùng chung: pool kết nối, giới hạn tốc độ và thử lại lỗi tạm thời.
+
+``smtplib`` là thư viện đồng bộ nên mỗi lần kết nối/gửi chạy trong ``asyncio.to_thread``.
+Kết nối gửi thành công được trả lại pool để dùng tiếp; kết nối lỗi bị đóng, lần sau mở mới.
+"""
+import asyncio
+import smtplib
+import time
+from email.message import EmailMessage
+from typing import List, Optional
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Lỗi 4xx hoặc lỗi mạng đáng thử lại; lỗi 5xx (địa chỉ sai, bị từ chối) thì không."""
+
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    return isinstance(exc, OSError)
+
+
+class RateLimiter:
+    """Token bucket: trung bình ``rate`` lượt mỗi giây, cho phép dồn tối đa ``burst`` lượt."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = burst or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _quit_quietly(connection: smtplib.SMTP) -> None:
+    try:
+        connection.quit()
+    except (smtplib.SMTPException, OSError):
+        connection.close()
+
+
+class SmtpPool:
+    """Gửi email qua tối đa ``pool_size`` kết nối SMTP song song."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = False,
+        pool_size: int = 4,
+        rate_per_second: float = 10.0,
+        timeout: float = 10.0,
+        retries: int = 2,
+        backoff_seconds: float = 0.5,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self._idle: List[smtplib.SMTP] = []
+        self._slots = asyncio.Semaphore(pool_size)
+        self._limiter = RateLimiter(rate_per_second)
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                connection.starttls()
+            if self.username:
+                connection.login(self.username, self.password or "")
+        except BaseException:
+            _quit_quietly(connection)
+            raise
+        return connection
+
+    def _deliver(self, connection: Optional[smtplib.SMTP], message: EmailMessage) -> smtplib.SMTP:
+        connection = connection or self._connect()
+        try:
+            connection.send_message(message)
+        except BaseException:
+            _quit_quietly(connection)
+            raise
+        return connection
+
+    async def send(self, message: EmailMessage) -> None:
+        """Gửi một email; lỗi tạm thời được thử lại với backoff, lỗi còn lại ném ra cho bên gọi."""
+
+        async with self._slots:
+            attempt = 0
+            while True:
+                await self._limiter.acquire()
+                connection = self._idle.pop() if self._idle else None
+                try:
+                    connection = await asyncio.to_thread(self._deliver, connection, message)
+                except Exception as exc:  # noqa: BLE001
+                    if not is_transient(exc) or attempt >= self.retries:
+                        raise
+                    attempt += 1
+                    await asyncio.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+                    continue
+                self._idle.append(connection)
+                return
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await asyncio.to_thread(_quit_quietly, connection)
@@ -0,0 +1,54 @@
+"""Cursor phân trang keyset: mã hóa bộ giá trị sắp xếp của phần tử cuối trang.
+
+Trang tiếp theo lọc ``(khóa sắp xếp, _id)`` lớn/nhỏ hơn cursor thay vì ``skip``, nên chi
+phí mỗi trang không tăng theo vị trí trang.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$oid" in value:
+            return ObjectId(value["$oid"])
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Giải mã cursor gồm ``size`` giá trị; cursor hỏng trả 400."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(value) for value in json.loads(raw)]
+    except (ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor phân trang không hợp lệ")
+    return values
+
+
+def keyset_filter(field: str, value: Any, last_id: Any, descending: bool) -> dict:
+    """Điều kiện lấy các phần tử đứng sau ``(value, last_id)`` theo thứ tự ``(field, _id)``."""
+
+    operator = "$lt" if descending else "$gt"
+    return {"$or": [{field: {operator: value}}, {field: value, "_id": {operator: last_id}}]}
@@ -0,0 +1,150 @@
+"""Bus pub/sub trong tiến trình, có thể nối backend để phát sự kiện giữa các worker.
+
+``EventBus.publish`` giao sự kiện ngay cho subscriber trong tiến trình rồi chuyển cho
+backend (nếu có) để các tiến trình khác nhận qua ``EventBus.deliver``. Backend chỉ cần cài
+``start``/``publish``/``stop``; mặc định không có backend, tức là chỉ phát trong tiến trình.
+"""
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Callable[[dict], Awaitable[None]]
+Deliver = Callable[[str, dict], Awaitable[None]]
+
+
+class PubSubBackend:
+    """Giao diện backend phát sự kiện giữa các tiến trình."""
+
+    async def start(self, deliver: Deliver) -> None:
+        """Bắt đầu nhận sự kiện của tiến trình khác, gọi ``deliver(channel, message)``."""
+
+    async def publish(self, channel: str, message: dict) -> None:
+        """Gửi sự kiện cho các tiến trình khác."""
+
+    async def stop(self) -> None:
+        """Dừng nhận sự kiện."""
+
+
+class EventBus:
+    """Bảng ``channel -> subscriber`` trong bộ nhớ, lỗi của một subscriber không ảnh hưởng cái khác."""
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, Set[Subscriber]] = defaultdict(set)
+        self.backend: Optional[PubSubBackend] = None
+
+    def subscribe(self, channel: str, subscriber: Subscriber) -> Callable[[], None]:
+        """Đăng ký nhận sự kiện của ``channel``; trả hàm hủy đăng ký."""
+
+        self._subscribers[channel].add(subscriber)
+
+        def unsubscribe() -> None:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[channel]
+
+        return unsubscribe
+
+    def has_subscribers(self, channel: str) -> bool:
+        return bool(self._subscribers.get(channel))
+
+    async def deliver(self, channel: str, message: dict) -> None:
+        """Giao sự kiện cho subscriber trong tiến trình hiện tại."""
+
+        for subscriber in list(self._subscribers.get(channel, ())):
+            try:
+                await subscriber(message)
+            except Exception:  # noqa: BLE001
+                logger.exception("Subscriber của kênh %s lỗi", channel)
+
+    async def publish(self, channel: str, message: dict) -> None:
+        """Phát sự kiện trong tiến trình và qua backend (nếu đã nối)."""
+
+        await self.deliver(channel, message)
+        if self.backend is not None:
+            try:
+                await self.backend.publish(channel, message)
+            except Exception:  # noqa: BLE001
+                logger.exception("Không phát được sự kiện kênh %s qua backend", channel)
+
+    async def start(self, backend: Optional[PubSubBackend]) -> None:
+        if backend is None:
+            return
+        self.backend = backend
+        await backend.start(self.deliver)
+
+    async def stop(self) -> None:
+        if self.backend is not None:
+            await self.backend.stop()
+            self.backend = None
+
+
+class MongoCappedBackend(PubSubBackend):
+    """Backend dùng capped collection của MongoDB và tailable cursor.
+
+    Mỗi tiến trình ghi sự kiện vào collection và đuôi (tail) collection đó để nhận sự kiện
+    của tiến trình khác; sự kiện do chính nó ghi bị bỏ qua vì đã giao trực tiếp. Capped
+    collection tự xoay vòng nên không cần dọn dẹp.
+    """
+
+    def __init__(self, database: Any, collection_name: str, size_bytes: int, retry_seconds: float = 1.0) -> None:
+        self.database = database
+        self.collection_name = collection_name
+        self.size_bytes = size_bytes
+        self.retry_seconds = retry_seconds
+        self.origin = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self) -> Any:
+        return self.database[self.collection_name]
+
+    async def _ensure_collection(self) -> None:
+        try:
+            await self.database.create_collection(self.collection_name, capped=True, size=self.size_bytes)
+        except CollectionInvalid:
+            pass
+
+    async def start(self, deliver: Deliver) -> None:
+        await self._ensure_collection()
+        # Chỉ nhận sự kiện ghi sau thời điểm khởi động.
+        latest = await self.collection.find_one({}, sort=[("$natural", -1)])
+        self._task = asyncio.create_task(self._tail(deliver, latest["_id"] if latest else None), name="pubsub-tail")
+
+    async def publish(self, channel: str, message: dict) -> None:
+        await self.collection.insert_one(
+            {"channel": channel, "message": message, "origin": self.origin, "created_at": datetime.utcnow()}
+        )
+
+    async def _tail(self, deliver: Deliver, last_id: Any) -> None:
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            try:
+                cursor = self.collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                async for event in cursor:
+                    last_id = event["_id"]
+                    if event.get("origin") != self.origin:
+                        await deliver(event["channel"], event["message"])
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError:
+                logger.exception("Tailable cursor của %s bị ngắt, kết nối lại", self.collection_name)
+            # Cursor chết khi collection rỗng hoặc mất kết nối: chờ rồi mở lại.
+            await asyncio.sleep(self.retry_seconds)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
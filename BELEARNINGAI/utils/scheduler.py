@@ -0,0 +1,65 @@
+"""Tác vụ asyncio chạy định kỳ trong tiến trình API/worker."""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Gọi ``callback`` mỗi ``interval`` giây; ``wake()`` cho phép chạy sớm hơn.
+
+    Mặc định ``stop()`` chạy ``callback`` thêm một lần cuối để không bỏ sót dữ liệu đang
+    chờ; tác vụ chỉ đọc/tính toán đặt ``final_run=False``.
+    """
+
+    def __init__(
+        self, name: str, interval: float, callback: Callable[[], Awaitable[object]], final_run: bool = True
+    ) -> None:
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.final_run = final_run
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name=self.name)
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self.final_run:
+            await self._run_once()
+
+    async def _run_once(self) -> None:
+        try:
+            await self.callback()
+        except Exception:  # noqa: BLE001
+            logger.exception("Tác vụ định kỳ %s lỗi", self.name)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                return
+            await self._run_once()
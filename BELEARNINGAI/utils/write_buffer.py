@@ -0,0 +1,100 @@
+"""Bộ đệm gộp ghi (write coalescing) cho các cập nhật cộng dồn tần suất cao.
+
+Các thay đổi cùng khóa được gộp bằng ``merge`` trong bộ nhớ và ghi một lần khi flush.
+Mỗi lần ``add`` trả một future chỉ hoàn tất sau khi lô chứa nó đã ghi thành công, nên
+bên gọi chỉ xác nhận với client khi dữ liệu đã bền vững (at-least-once: client thử lại
+khi không nhận được xác nhận). Lô ghi lỗi được gộp lại vào bộ đệm để thử ở lần sau.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class _Pending(Generic[V]):
+    value: V
+    futures: List[asyncio.Future] = field(default_factory=list)
+    attempts: int = 0
+
+
+class CoalescingBuffer(Generic[K, V]):
+    def __init__(
+        self,
+        merge: Callable[[V, V], V],
+        writer: Callable[[Dict[K, V]], Awaitable[None]],
+        max_pending: int = 5000,
+        max_attempts: int = 3,
+        on_full: Callable[[], None] = lambda: None,
+    ) -> None:
+        self.merge = merge
+        self.writer = writer
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.on_full = on_full
+        self._pending: Dict[K, _Pending[V]] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, key: K, value: V) -> asyncio.Future:
+        """Gộp ``value`` vào khóa ``key``; future hoàn tất khi lô đã được ghi."""
+
+        future = asyncio.get_running_loop().create_future()
+        self._merge(key, value, future)
+        return future
+
+    def add_nowait(self, key: K, value: V) -> None:
+        """Như ``add`` nhưng không theo dõi kết quả (số liệu cho phép mất khi lỗi)."""
+
+        self._merge(key, value, None)
+
+    def _merge(self, key: K, value: V, future: Optional[asyncio.Future]) -> None:
+        futures = [future] if future is not None else []
+        entry = self._pending.get(key)
+        if entry is None:
+            self._pending[key] = _Pending(value, futures)
+        else:
+            entry.value = self.merge(entry.value, value)
+            entry.futures.extend(futures)
+        if len(self._pending) >= self.max_pending:
+            self.on_full()
+
+    async def flush(self) -> int:
+        """Ghi toàn bộ thay đổi đang chờ, trả số khóa đã ghi."""
+
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            try:
+                await self.writer({key: entry.value for key, entry in batch.items()})
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Ghi lô %d khóa thất bại", len(batch))
+                self._requeue(batch, exc)
+                return 0
+            for entry in batch.values():
+                for future in entry.futures:
+                    if not future.done():
+                        future.set_result(None)
+            return len(batch)
+
+    def _requeue(self, batch: Dict[K, _Pending[V]], error: Exception) -> None:
+        for key, entry in batch.items():
+            entry.attempts += 1
+            if entry.attempts >= self.max_attempts:
+                for future in entry.futures:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            newer = self._pending.get(key)
+            if newer is not None:
+                entry.value = self.merge(entry.value, newer.value)
+                entry.futures.extend(newer.futures)
+            self._pending[key] = entry